@@ -11,6 +11,9 @@ Start-Process uv -ArgumentList "run pyinstaller --onefile --noconsole --distpath
 Get-ChildItem "$PSScriptRoot\ClassificationBanner_Install" | ForEach-Object {
     Copy-Item $_.FullName .\dist\Windows -Recurse
 }
+# Regenerate the ADMX/ADML templates from the settings schema
+Start-Process uv -ArgumentList "run python -m classification_banner.policy_templates --output `"Group Policy`"" -WorkingDirectory "$PSScriptRoot\src\Windows" -wait
+
 Get-ChildItem "$PSScriptRoot\src\Windows\Group Policy" | ForEach-Object {
     Copy-Item $_.FullName .\dist\Windows\SupportFiles -Recurse
 }
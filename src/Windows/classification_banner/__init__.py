@@ -4,20 +4,61 @@ are needed for it."""
 __all__ = [
     "banner",
     "appbar",
+    "backend",
     "banner_window",
     "constants",
+    "dry_run",
+    "edge_cost",
+    "event_log",
+    "fakes",
+    "file_config",
+    "foreground_rules",
+    "idle_budget",
+    "instance",
+    "ip_provider",
+    "layout",
+    "leak_detector",
+    "marking",
     "monitor_manager",
+    "overlay_window",
+    "panels",
+    "policy_templates",
+    "policy_validator",
+    "polling",
+    "profiler",
     "registry_manager",
+    "replay",
+    "resource_policy",
+    "scaling",
+    "scheduler",
     "settings",
+    "settings_reference",
+    "settings_schema",
+    "shutdown",
+    "soak",
+    "supervisor",
     "system_info",
+    "threat_level",
+    "update_bus",
+    "visibility",
+    "watermark",
+    "win32",
+    "x11",
+    "x11_backend",
 ]
 __version__ = "1.3.0"
 
-from . import appbar
-from . import banner
-from . import banner_window
-from . import constants
-from . import monitor_manager
-from . import registry_manager
-from . import settings
-from . import system_info
+import importlib
+
+
+def __getattr__(name):
+    """Import submodules on first access
+
+    Entry points such as ``main.py --dry-run`` only pay for the modules they
+    use; in particular tkinter is not loaded unless a banner is created.
+    """
+    if name in __all__:
+        module = importlib.import_module(f".{name}", __name__)
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
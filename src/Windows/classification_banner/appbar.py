@@ -3,40 +3,27 @@ Windows AppBar management for Classification Banner
 """
 
 import ctypes
-from ctypes import wintypes
-from typing import Literal, Any
-from .constants import ABM_NEW, ABM_REMOVE, ABM_SETPOS, ABE_TOP
+from typing import Any, Dict, List, Sequence, Tuple
+from .constants import ABM_NEW, ABM_REMOVE, ABM_SETPOS, ABE_TOP, SWP_NOACTIVATE, SWP_NOZORDER
+from .win32 import APPBARDATA, RECT, api  # noqa: F401 (structures re-exported)
+from . import event_log
 
+# One preallocated structure per registered window, reused on every move
+_appbars: Dict[int, APPBARDATA] = {}
 
-class RECT(ctypes.Structure):
-    _fields_ = [
-        ("left", wintypes.LONG),
-        ("top", wintypes.LONG),
-        ("right", wintypes.LONG),
-        ("bottom", wintypes.LONG),
-    ]
 
-
-class APPBARDATA(ctypes.Structure):
-    _fields_ = [
-        ("cbSize", wintypes.DWORD),
-        ("hWnd", wintypes.HWND),
-        ("uCallbackMessage", wintypes.UINT),
-        ("uEdge", wintypes.UINT),
-        ("rc", RECT),
-        ("lParam", wintypes.LPARAM),
-    ]
-
-
-_shell32 = ctypes.windll.shell32
-_user32 = ctypes.windll.user32
-
-
-def register_appbar_for_window(hwnd: Any, x: int, y: int, width: int, height: int, edge: Literal[1]=ABE_TOP) -> APPBARDATA:
-    """Register/position a window as an AppBar so maximized windows avoid it."""
+def _new_appbar_data(hwnd: Any) -> APPBARDATA:
     abd = APPBARDATA()
     abd.cbSize = ctypes.sizeof(APPBARDATA)
     abd.hWnd = hwnd
+    return abd
+
+
+def _negotiate(win32: Any, hwnd: Any, x: int, y: int, width: int, height: int, edge: int) -> APPBARDATA:
+    """Register (once) and position one AppBar, without moving its window"""
+    abd = _appbars.get(hwnd)
+    if abd is None:
+        abd = _appbars[hwnd] = _new_appbar_data(hwnd)
     abd.uCallbackMessage = 0
     abd.uEdge = edge
 
@@ -45,24 +32,64 @@ def register_appbar_for_window(hwnd: Any, x: int, y: int, width: int, height: in
     abd.rc.right = x + width
     abd.rc.bottom = y + height
 
-    _shell32.SHAppBarMessage(ABM_NEW, ctypes.byref(abd))
-    _shell32.SHAppBarMessage(ABM_SETPOS, ctypes.byref(abd))
+    # ABM_NEW is a no-op for a window that is already registered
+    win32.SHAppBarMessage(ABM_NEW, ctypes.byref(abd))
+    win32.SHAppBarMessage(ABM_SETPOS, ctypes.byref(abd))
+    return abd
 
-    _user32.MoveWindow(
-        hwnd,
-        abd.rc.left,
-        abd.rc.top,
-        abd.rc.right - abd.rc.left,
-        abd.rc.bottom - abd.rc.top,
-        True,
-    )
+
+def register_appbar_for_window(hwnd: Any, x: int, y: int, width: int, height: int, edge: int = ABE_TOP) -> APPBARDATA:
+    """Register/position a window as an AppBar so maximized windows avoid it."""
+    win32 = api()
+    abd = _negotiate(win32, hwnd, x, y, width, height, edge)
+
+    try:
+        win32.MoveWindow(
+            hwnd,
+            abd.rc.left,
+            abd.rc.top,
+            abd.rc.right - abd.rc.left,
+            abd.rc.bottom - abd.rc.top,
+            True,
+        )
+    except OSError as e:
+        event_log.warning("appbar", f"Error moving AppBar window: {e}")
 
     return abd
 
 
+def register_appbars(spaces: Sequence[Tuple[Any, int, int, int, int, int]]) -> List[APPBARDATA]:
+    """Register/position several AppBars as one transaction
+
+    ``spaces`` holds ``(hwnd, x, y, width, height, edge)`` tuples, e.g. the
+    top and bottom banners of a monitor. All rectangles are negotiated with
+    the shell first, then the windows move together in one DeferWindowPos
+    batch, so the work area is recomputed for the final layout only.
+    """
+    win32 = api()
+    bars = [_negotiate(win32, *space) for space in spaces]
+
+    try:
+        hdwp = win32.BeginDeferWindowPos(len(bars))
+        for abd in bars:
+            hdwp = win32.DeferWindowPos(
+                hdwp,
+                abd.hWnd,
+                None,
+                abd.rc.left,
+                abd.rc.top,
+                abd.rc.right - abd.rc.left,
+                abd.rc.bottom - abd.rc.top,
+                SWP_NOZORDER | SWP_NOACTIVATE,
+            )
+        win32.EndDeferWindowPos(hdwp)
+    except OSError as e:
+        event_log.warning("appbar", f"Error moving AppBar windows: {e}")
+
+    return bars
+
+
 def remove_appbar_for_window(hwnd: Any) -> None:
     """Unregister the AppBar."""
-    abd = APPBARDATA()
-    abd.cbSize = ctypes.sizeof(APPBARDATA)
-    abd.hWnd = hwnd
-    _shell32.SHAppBarMessage(ABM_REMOVE, ctypes.byref(abd))
+    abd = _appbars.pop(hwnd, None) or _new_appbar_data(hwnd)
+    api().SHAppBarMessage(ABM_REMOVE, ctypes.byref(abd))
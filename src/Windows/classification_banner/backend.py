@@ -0,0 +1,194 @@
+"""
+Platform backends
+
+The core (settings schema, marking engine, scheduling, layout diffing,
+occlusion geometry) has no platform dependency. What talks to the OS sits
+behind a backend:
+
+- ``config_source()``: ``load_settings()`` and ``read_group_id()``, and
+  optionally ``watch(callback)`` / ``stop()`` to report changes
+- ``monitor_manager()``: ``get_all_monitors()``, optionally ``watch`` /
+  ``stop`` to report layout changes instead of being polled
+- ``screen_size()``: the primary screen, for the monitor assumed when none
+  can be enumerated
+- ``window_source()``: z-order enumeration for the visibility auditor, or
+  None to keep the blind keep-on-top loop
+- ``foreground_tracker()``: follows the foreground window for
+  per-application ``MarkingRules``, or None where windows cannot be
+  tracked (the rules are then ignored)
+- ``resource_os()``: process priorities and working-set trims
+- ``prepare_window()``, ``reserve_space()`` and ``release_space()``: the
+  banner window's style and the screen space kept free for it (an AppBar on
+  Windows, ``_NET_WM_STRUT_PARTIAL`` on X11); ``reserve_spaces()`` and
+  ``release_spaces()`` handle all edges of a monitor in one transaction
+- ``create_overlay()``, ``update_overlay()`` and ``destroy_overlay()``: the
+  click-through watermark window; None from ``create_overlay()`` means the
+  platform has no overlay and the watermark setting is ignored
+
+``current()`` picks the backend for the platform; the
+``CLASSIFICATION_BANNER_BACKEND`` environment variable (``windows`` or
+``x11``) overrides the choice, and tests install one with ``use()``.
+"""
+
+import abc
+import os
+import sys
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple
+from .constants import ABE_TOP
+from .monitor_manager import MonitorManager
+from .resource_policy import NullResourceOS, Win32ResourceOS
+
+BACKEND_VARIABLE = "CLASSIFICATION_BANNER_BACKEND"
+
+# GetSystemMetrics: primary screen width and height
+SM_CXSCREEN = 0
+SM_CYSCREEN = 1
+
+
+class Backend(abc.ABC):
+    """Platform services used by the banner
+
+    Also the interface; every backend supplies ``config_source``, and the
+    other defaults suit a platform with nothing to reserve and no way to
+    enumerate windows.
+    """
+
+    name = "null"
+
+    @abc.abstractmethod
+    def config_source(self) -> Any:
+        """Where settings come from"""
+
+    def monitor_manager(self) -> Any:
+        """Monitor enumeration"""
+        return MonitorManager()
+
+    def screen_size(self) -> Optional[Tuple[int, int]]:
+        """Width and height of the primary screen, or None if unknown"""
+        return None
+
+    def window_source(self) -> Any:
+        """Z-order for the visibility auditor, or None"""
+        return None
+
+    def foreground_tracker(self, rules: List[Any], on_change: Callable[[Optional[str]], Any]) -> Any:
+        """Tracker for per-application MarkingRules, or None if unsupported
+
+        The tracker calls ``on_change`` with the foreground window's marking
+        (see foreground_rules.ForegroundTracker).
+        """
+        return None
+
+    def resource_os(self) -> NullResourceOS:
+        """Process controls for the resource policy"""
+        return NullResourceOS()
+
+    def prepare_window(self, window: Any) -> None:
+        """Style a new banner window before it is mapped"""
+        window.overrideredirect(True)
+
+    def reserve_space(self, hwnd: Any, x: int, y: int, width: int, height: int,
+                      edge: int = ABE_TOP) -> None:
+        """Keep maximized windows out of the banner's rectangle"""
+
+    def release_space(self, hwnd: Any) -> None:
+        """Give the banner's rectangle back"""
+
+    def reserve_spaces(self, spaces: Sequence[Tuple[Any, Any]]) -> None:
+        """Reserve ``(hwnd, placement)`` pairs together (see layout.Placement)"""
+        for hwnd, placement in spaces:
+            self.reserve_space(hwnd, *placement)
+
+    def release_spaces(self, hwnds: Iterable[Any]) -> None:
+        """Release several windows' rectangles"""
+        for hwnd in hwnds:
+            self.release_space(hwnd)
+
+    def create_overlay(self, x: int, y: int, width: int, height: int) -> Any:
+        """Handle of a new watermark overlay window, or None if unsupported"""
+        return None
+
+    def update_overlay(self, handle: Any, x: int, y: int, watermark: Any) -> None:
+        """Show ``watermark`` (see watermark.Watermark) in the overlay"""
+
+    def destroy_overlay(self, handle: Any) -> None:
+        """Remove an overlay window"""
+
+
+class WindowsBackend(Backend):
+    """Registry, screeninfo, AppBars and EnumWindows"""
+
+    name = "windows"
+
+    def config_source(self) -> Any:
+        from .registry_manager import RegistryManager
+        return RegistryManager()
+
+    def screen_size(self) -> Optional[Tuple[int, int]]:
+        from . import win32
+        size = win32.api().GetSystemMetrics(SM_CXSCREEN), win32.api().GetSystemMetrics(SM_CYSCREEN)
+        return size if all(size) else None
+
+    def window_source(self) -> Any:
+        from .visibility import Win32WindowSource
+        return Win32WindowSource()
+
+    def foreground_tracker(self, rules: List[Any], on_change: Callable[[Optional[str]], Any]) -> Any:
+        from .foreground_rules import ForegroundTracker
+        return ForegroundTracker(rules, on_change)
+
+    def resource_os(self) -> NullResourceOS:
+        return Win32ResourceOS()
+
+    def reserve_space(self, hwnd: Any, x: int, y: int, width: int, height: int,
+                      edge: int = ABE_TOP) -> None:
+        from .appbar import register_appbar_for_window
+        register_appbar_for_window(hwnd, x, y, width, height, edge=edge)
+
+    def release_space(self, hwnd: Any) -> None:
+        from .appbar import remove_appbar_for_window
+        remove_appbar_for_window(hwnd)
+
+    def reserve_spaces(self, spaces: Sequence[Tuple[Any, Any]]) -> None:
+        from .appbar import register_appbars
+        register_appbars([(hwnd, *placement) for hwnd, placement in spaces])
+
+    def create_overlay(self, x: int, y: int, width: int, height: int) -> Any:
+        from .overlay_window import create_overlay
+        return create_overlay(x, y, width, height)
+
+    def update_overlay(self, handle: Any, x: int, y: int, watermark: Any) -> None:
+        from .overlay_window import update_overlay
+        update_overlay(handle, x, y, watermark)
+
+    def destroy_overlay(self, handle: Any) -> None:
+        handle.destroy()
+
+
+def create(name: str) -> Backend:
+    """Backend by name"""
+    if name == "windows":
+        return WindowsBackend()
+    if name == "x11":
+        from .x11_backend import X11Backend
+        return X11Backend()
+    raise ValueError(f"unknown backend {name!r} (expected windows or x11)")
+
+
+_backend: Optional[Backend] = None
+
+
+def current() -> Backend:
+    """Backend for this platform, created on first use"""
+    global _backend
+    if _backend is None:
+        default = "windows" if sys.platform == "win32" else "x11"
+        _backend = create(os.environ.get(BACKEND_VARIABLE, default).lower())
+    return _backend
+
+
+def use(backend: Optional[Backend]) -> Optional[Backend]:
+    """Install ``backend`` (None: back to the platform default); returns it"""
+    global _backend
+    _backend = backend
+    return backend
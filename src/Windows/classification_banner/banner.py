@@ -2,44 +2,155 @@
 Main Classification Banner application
 """
 
-import sys
-from typing import List
+import tkinter as tk
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from .constants import BANNER_BATCH_SIZE, KEEP_ON_TOP_INTERVAL, RESOURCE_POLICY_DELAY
 from .settings import BannerSettings
-from .registry_manager import RegistryManager
 from .system_info import SystemInfoGatherer
-from .monitor_manager import MonitorManager
-from .banner_window import BannerWindow
+from .monitor_manager import MonitorIndex
+from .banner_window import BannerWindow, create_root
+from .foreground_rules import ForegroundTracker, parse_rules, resolve_marking
+from .polling import AdaptivePoller
+from .resource_policy import NullResourceOS, ResourcePolicy
+from .ip_provider import AddressPolicy, AddressProvider
+from .leak_detector import LeakDetector
+from .scheduler import TkScheduler
+from .shutdown import ShutdownCoordinator
+from .profiler import ProfileController
+from .supervisor import HeartbeatClient
+from .threat_level import ThreatLevelProvider, ThreatLevels, format_threat_levels, make_source
+from .update_bus import UpdateBus
+from .visibility import VisibilityAuditor
+from .settings_schema import LAYOUT, MARKING, MONITORS, REBUILD, SYSTEM_INFO, THREAT_LEVEL
+from . import backend, event_log, panels, settings_schema
 
 
 class ClassificationBanner:
     """Main Classification Banner application"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        registry_manager: Any = None,
+        monitor_manager: Any = None,
+        scheduler: Any = None,
+        window_factory: Callable[..., Any] = BannerWindow,
+        window_source: Any = None,
+        resource_os: Any = None,
+    ):
         self.settings = BannerSettings()
-        self.registry_manager = RegistryManager()
+        # Registry or config files, monitors, z-order and process controls
+        self.backend = backend.current()
+        self.registry_manager = registry_manager or self.backend.config_source()
+        self.monitor_manager = monitor_manager or self.backend.monitor_manager()
+        self.scheduler = scheduler or TkScheduler(self._first_root)
+        self.window_factory = window_factory
+        # Hidden Tk root all real banners are Toplevels of: one interpreter
+        # and one event source however many monitors there are
+        self.root: tk.Tk | None = None
         self.system_info_gatherer = SystemInfoGatherer()
+        # Banners keyed by stable monitor identity; ``windows`` lists the same
+        # objects in creation order
+        self.windows_by_id: Dict[str, BannerWindow] = {}
         self.windows: List[BannerWindow] = []
+        self.system_info: Dict[str, str] = {}
         self.system_info_text: str = ""
-
-        # Track monitor layout (x, y, width, height for each monitor)
-        self._last_monitor_layout: list[tuple[int, int, int, int]] | None = None
+        self.foreground_tracker: ForegroundTracker | None = None
+        self.leak_detector: LeakDetector | None = None
+        self.rebuild_count: int = 0
+
+        # Occlusion checks replace the blind keep-on-top loop wherever the
+        # window z-order can be enumerated
+        if window_source is None and window_factory is BannerWindow:
+            try:
+                window_source = self.backend.window_source()
+            except OSError as e:
+                event_log.error("banner", f"Visibility auditing unavailable: {e}")
+        self.visibility_auditor: VisibilityAuditor | None = None
+        if window_source is not None:
+            self.visibility_auditor = VisibilityAuditor(window_source, clock=self.scheduler.clock)
+
+        # Priorities and working-set trims apply to the real process only
+        if resource_os is None:
+            real = window_factory is BannerWindow
+            resource_os = self.backend.resource_os() if real else NullResourceOS()
+        self.resource_policy = ResourcePolicy(resource_os)
+
+        # FPCON/CPCON from a ThreatLevelSource provider, and the text shown
+        self.threat_provider: ThreatLevelProvider | None = None
+        self.threat_text: str = ""
+        self.threat_updates: int = 0
+
+        # Monitor layout the banners were built for
+        self._monitor_index: MonitorIndex | None = None
+
+        # Layout changes handled in place, and re-enumerations that only
+        # reordered monitors (each of which used to trigger a full rebuild)
+        self.monitor_updates: int = 0
+        self.avoided_rebuilds: int = 0
+
+        # Settings changes applied to the existing windows (repaint/relayout)
+        self.in_place_updates: int = 0
+
+        # Heartbeat to the --supervise watchdog, sent from the monitor check
+        self.heartbeat = HeartbeatClient.from_environment()
+
+        # Config sources and monitor managers that report changes themselves
+        # (inotify, RandR) are checked at once instead of on the next poll
+        self.config_events: int = 0
+        self.monitor_events: int = 0
+        self._watching_config = False
+        self._watching_monitors = False
+        self._monitors_dirty = True
+
+        # Updates from worker threads (address, threat levels, config and
+        # monitor events) coalesce per key and reach the Tk thread through
+        # one idle wake; panel texts they stage are applied in one pass
+        self.update_bus = UpdateBus(self.scheduler.call_idle, on_batch=self._apply_staged,
+                                    clock=self.scheduler.clock)
+        self._staged: Dict[str, str] = {}
+
+        # One bounded release pass on logoff, session end, close or signals
+        self.shutdown = ShutdownCoordinator(self)
+        # Control channel (instance.ControlServer), started by main.py
+        self.control_server: Any = None
 
         # Load initial settings
         self._load_settings()
         self.settings.store_current_state()
 
+        # Registry poll interval adapts to how often the config changes
+        self.registry_poller = AdaptivePoller(
+            self.settings.check_interval,
+            self.settings.min_check_interval,
+            self.settings.max_check_interval,
+            clock=self.scheduler.clock,
+        )
+
+        # Profiling is triggered from the registry check, not its own timer
+        self.profiler = ProfileController(
+            self.scheduler, initial_seconds=self.settings.profile_seconds
+        )
+
         # Gather system info if needed
         if self.settings.needs_system_info():
             self._gather_system_info()
 
         # Generate Classification Text
         self.settings.get_classification_text()
+        self.threat_text = self._registry_threat_text()
 
         # Create banners if enabled
         if self.settings.enabled:
             self._create_banners()
+            # After the banners exist, so updates have a Tk root to post to
+            self._start_threat_tracking()
+            self._start_foreground_tracking()
             self._schedule_registry_check()
             self._schedule_monitor_check()
+            self._schedule_visibility_check()
+            self._schedule_keep_on_top()
+            self._schedule_resource_policy("startup")
+            self._start_change_watches()
 
     def _load_settings(self):
         """Load settings from registry"""
@@ -53,26 +164,216 @@ class ClassificationBanner:
         if self.settings.show_group_id:
             group_id = self.registry_manager.read_group_id()
 
+        # Track the IP address through change notifications
+        if self.settings.show_ip_address:
+            self._start_address_tracking()
+        else:
+            self._stop_address_tracking()
+
         # Gather info
-        info = self.system_info_gatherer.gather_all(
+        self.system_info = self.system_info_gatherer.gather_all(
             self.settings.get_show_flags(), group_id
         )
 
         # Build display text
-        self.system_info_text = self.system_info_gatherer.build_display_text(info)
+        self.system_info_text = self.system_info_gatherer.build_display_text(
+            self.system_info
+        )
+
+    def _start_address_tracking(self):
+        """(Re)start the address provider with the configured policy"""
+        self._stop_address_tracking()
+        provider = AddressProvider(
+            policy=AddressPolicy(
+                self.settings.ip_address_family, self.settings.ip_address_adapter
+            )
+        )
+        provider.start(self._on_address_change)
+        self.system_info_gatherer.address_provider = provider
+
+    def _stop_address_tracking(self):
+        """Stop address change notifications"""
+        provider = self.system_info_gatherer.address_provider
+        if provider is not None:
+            provider.stop()
+            self.system_info_gatherer.address_provider = None
+
+    def _on_address_change(self, address: str):
+        """Called from the notification thread when the selected IP changes"""
+        self.update_bus.post("ip_address", self._update_ip_address, address)
+
+    def _update_ip_address(self, address: str):
+        """Stage a new IP address for the left panel (applied by the bus batch)"""
+        self.system_info["ip_address"] = address
+        text = self.system_info_gatherer.build_display_text(self.system_info)
+        if text == self.system_info_text:
+            return
+        self.system_info_text = text
+        self._staged[SYSTEM_INFO] = text
+
+    def _refresh_system_info(self):
+        """Regather system info for changed ShowXxx/IP settings, in place"""
+        if self.settings.needs_system_info():
+            self._gather_system_info()
+        else:
+            self._stop_address_tracking()
+            self.system_info = {}
+            self.system_info_text = ""
+        self._push_system_info(self.system_info_text)
+
+    def _push_system_info(self, text: str):
+        """Show new left panel text on every banner"""
+        self.system_info_text = text
+        self._staged[SYSTEM_INFO] = text
+        self._apply_staged()
+
+    def _apply_staged(self):
+        """Apply staged panel texts to the banners in one pass"""
+        staged, self._staged = self._staged, {}
+        if not staged:
+            return
+        system_info = staged.get(SYSTEM_INFO)
+        threat = staged.get(THREAT_LEVEL)
+        for window in self.windows:
+            if (system_info is not None and not window.update_system_info(system_info)) or (
+                    threat is not None and not window.update_threat_levels(threat)):
+                # Panel did not exist yet; the rebuild shows every staged text
+                self._recreate_banners()
+                return
+
+    def _registry_threat_text(self) -> str:
+        """Right panel text from the FPCON/CPCON registry values"""
+        return format_threat_levels(self.settings.fpcon, self.settings.cpcon)
+
+    def _start_threat_tracking(self):
+        """(Re)start the threat level provider for ThreatLevelSource"""
+        self._stop_threat_tracking()
+        try:
+            source = make_source(self.settings.threat_level_source)
+        except (OSError, ValueError) as e:
+            event_log.error("banner", f"Error in ThreatLevelSource: {e}")
+            source = None
+
+        if source is None:
+            # Registry values, applied by the registry check
+            self._update_threat_levels(self._registry_threat_text())
+            return
+
+        self.threat_provider = ThreatLevelProvider(
+            source,
+            self.settings.fpcon,
+            self.settings.cpcon,
+            stale_after=self.settings.threat_level_stale_after,
+        )
+        self.threat_provider.start(self._on_threat_change)
+
+    def _stop_threat_tracking(self):
+        """Stop the threat level provider"""
+        if self.threat_provider is not None:
+            self.threat_provider.stop()
+            self.threat_provider = None
+
+    def _on_threat_change(self, levels: ThreatLevels):
+        """Called from the provider thread when the levels or staleness change"""
+        self.update_bus.post("threat_levels", self._stage_threat_levels, levels.display_text())
+
+    def _stage_threat_levels(self, text: str):
+        """Stage new FPCON/CPCON text for the right panel"""
+        if text == self.threat_text:
+            return
+        self.threat_text = text
+        self.threat_updates += 1
+        self._staged[THREAT_LEVEL] = text
+
+    def _update_threat_levels(self, text: str):
+        """Push new FPCON/CPCON text into the right panel without a rebuild"""
+        self._stage_threat_levels(text)
+        self._apply_staged()
+
+    def _read_monitor_layout(self) -> MonitorIndex:
+        """Monitors to show banners on, with spanned surfaces split per SpannedSurfaces"""
+        monitors = self.monitor_manager.get_all_monitors()
+        return MonitorIndex(
+            panels.expand(monitors, self.settings.spanned_surfaces, self.settings.panel_size)
+        )
 
     def _create_banners(self):
         """Create banner windows for all monitors"""
-        monitors = MonitorManager.get_all_monitors()
-
         # Store the layout we built banners for
-        self._last_monitor_layout = [
-            (m.x, m.y, m.width, m.height) for m in monitors
-        ]
-
-        for monitor in monitors:
-            window = BannerWindow(monitor, self.settings, self.system_info_text)
-            self.windows.append(window)
+        self._monitor_index = self._read_monitor_layout()
+
+        if self.root is None and self.window_factory is BannerWindow:
+            self.root = create_root()
+        self._create_windows(self._monitor_index.monitors.items())
+
+    def _create_windows(self, monitors: Iterable[Tuple[str, Any]]):
+        """Create the banners of ``(identity, monitor)`` pairs
+
+        Their space is reserved BANNER_BATCH_SIZE monitors at a time, one
+        AppBar transaction per batch instead of one per monitor.
+        """
+        batch: List[Any] = []
+        for identity, monitor in monitors:
+            batch.append(self._create_window(identity, monitor))
+            if len(batch) == BANNER_BATCH_SIZE:
+                self.window_factory.reserve_all(batch)
+                batch = []
+        self.window_factory.reserve_all(batch)
+        self.windows = list(self.windows_by_id.values())
+
+    def _create_window(self, identity: str, monitor: Any) -> Any:
+        """Create the banner for one monitor, without reserving its space"""
+        window = self.window_factory(
+            monitor,
+            self.settings,
+            self.system_info_text,
+            # One timer raises every banner (_keep_on_top)
+            keep_on_top=False,
+            root=self.root,
+            reserve=False,
+        )
+        window.on_session_end = self.shutdown.run
+        if self.threat_text != self._registry_threat_text():
+            # Built with the registry values; show the provider's instead
+            window.update_threat_levels(self.threat_text)
+        self.windows_by_id[identity] = window
+        return window
+
+    def _reserve(self, windows: List[Any]):
+        """Reserve the space of ``windows``, BANNER_BATCH_SIZE per transaction"""
+        for start in range(0, len(windows), BANNER_BATCH_SIZE):
+            self.window_factory.reserve_all(windows[start:start + BANNER_BATCH_SIZE])
+
+    def _update_in_place(self, changes: Dict[str, str]):
+        """Apply repaint/relayout changes to the existing banners"""
+        groups = settings_schema.groups(changes)
+        self.in_place_updates += 1
+
+        if LAYOUT in groups:
+            for window in self.windows:
+                window.relayout(reserve=False)
+            self._reserve(self.windows)
+
+        if MONITORS in groups:
+            # Spanned surfaces split into panels or merge back: only their
+            # banners change, as for a monitor layout change
+            self._update_monitor_layout()
+
+        if THREAT_LEVEL in groups:
+            if "threat_level_source" in changes:
+                self._start_threat_tracking()
+            elif self.threat_provider is None:
+                self._update_threat_levels(self._registry_threat_text())
+
+        if SYSTEM_INFO in groups:
+            self._refresh_system_info()
+
+        if MARKING in groups:
+            self.settings.get_classification_text()
+            if "marking_rules" in changes:
+                self._start_foreground_tracking()
+            tracker = self.foreground_tracker
+            self._apply_foreground_marking(tracker.current_marking if tracker else None)
 
     def _recreate_banners(self):
         """Destroy and recreate all banners"""
@@ -88,85 +389,335 @@ class ClassificationBanner:
 
         # Create new banners
         self._create_banners()
+        self._start_foreground_tracking()
+        self.rebuild_count += 1
+
+        # Without a shared root, timers and the update bus's wake lived on a
+        # destroyed window; move them to the new one
+        self.scheduler.rehome()
+        self.update_bus.rewake()
+        self._schedule_resource_policy("rebuild")
+
+        if self.settings.leak_report:
+            self._report_leaks()
+
+    def _schedule_resource_policy(self, reason: str):
+        """Apply the resource policy once the banners have been painted"""
+        self.scheduler.schedule(
+            "resource_policy", RESOURCE_POLICY_DELAY, self._apply_resource_policy, reason
+        )
+
+    def _apply_resource_policy(self, reason: str):
+        """Lower priorities (first time or on change) and trim the working set"""
+        self.resource_policy.configure(self.settings)
+        self.resource_policy.trim(self.settings, reason)
+
+    def _report_leaks(self):
+        """Sample resource counters after a rebuild (LeakReport registry value)"""
+        if self.leak_detector is None:
+            # LeakReport=2 also traces Python allocations
+            self.leak_detector = LeakDetector(trace_python=self.settings.leak_report >= 2)
+        violations = self.leak_detector.record(self.roots())
+        event_log.info("banner", self.leak_detector.report())
+        for violation in violations:
+            event_log.warning(
+                "banner",
+                f"Resource budget exceeded after {self.rebuild_count} rebuilds: {violation}",
+            )
+
+    def _start_foreground_tracking(self):
+        """Track the foreground window if per-application rules are configured"""
+        self._stop_foreground_tracking()
+
+        rules = parse_rules(self.settings.marking_rules or [])
+        if not rules:
+            return
+
+        try:
+            tracker = self.backend.foreground_tracker(rules, self._apply_foreground_marking)
+            if tracker is None:
+                event_log.warning("banner", f"MarkingRules ignored: the {self.backend.name} backend "
+                                            "cannot track the foreground window")
+                return
+            tracker.start()
+        except OSError as e:
+            event_log.error("banner", f"Error starting foreground tracking: {e}")
+            return
+        self.foreground_tracker = tracker
+
+    def _stop_foreground_tracking(self):
+        """Remove foreground hooks"""
+        if self.foreground_tracker is not None:
+            self.foreground_tracker.stop()
+            self.foreground_tracker = None
+
+    def _apply_foreground_marking(self, marking: Optional[str]):
+        """Update all banners in place for the foreground window's marking"""
+        if marking is None:
+            text = self.settings.classification_text
+            bg, fg = self.settings.bg_color, self.settings.fg_color
+        else:
+            text, bg, fg = resolve_marking(marking)
+
+        for window in self.windows:
+            window.update_marking(text, bg, fg)
 
     def _close_all_windows(self):
         """Close all banner windows"""
         for window in self.windows:
             window.destroy()
+        self.windows_by_id = {}
         self.windows = []
 
-    def _get_monitor_layout(self) -> list[tuple[int, int, int, int]]:
-        """Return a simple list describing all monitors."""
-        monitors = MonitorManager.get_all_monitors()
-        return [(m.x, m.y, m.width, m.height) for m in monitors]
+    def _close_root(self):
+        """Destroy the shared Tk root, which ends the main loop"""
+        root, self.root = self.root, None
+        if root is not None:
+            try:
+                root.destroy()
+            except tk.TclError as e:
+                event_log.warning("banner", f"Error destroying the Tk root: {e}")
+
+    def roots(self) -> List[Any]:
+        """Live Tk roots: the shared one, or each banner's own"""
+        if self.root is not None:
+            return [self.root]
+        return [root for root in (w.get_window() for w in self.windows) if root is not None]
+
+    def _apply_layout_diff(self, index: MonitorIndex, diff: Any):
+        """Update banners for added, removed and moved monitors only"""
+        for identity in diff.removed:
+            self.windows_by_id.pop(identity).destroy()
+        if self.visibility_auditor is not None:
+            self.visibility_auditor.forget(diff.removed)
+        self.windows = list(self.windows_by_id.values())
+
+        moved = [self.windows_by_id[identity] for identity in diff.moved]
+        for identity, window in zip(diff.moved, moved):
+            window.move_to(index.monitors[identity], reserve=False)
+        self._reserve(moved)
+
+        self._create_windows((identity, index.monitors[identity]) for identity in diff.added)
+
+        self._monitor_index = index
+        self.monitor_updates += 1
+
+        if diff.added and self.foreground_tracker is not None:
+            self._apply_foreground_marking(self.foreground_tracker.current_marking)
+
+        if diff.removed:
+            # Without a shared root, timers may have lived on a destroyed window
+            self.scheduler.rehome()
+            self.update_bus.rewake()
+
+    def _start_change_watches(self):
+        """Subscribe to config and monitor change notifications, if offered"""
+        watch = getattr(self.registry_manager, "watch", None)
+        if watch is not None:
+            try:
+                watch(lambda: self.update_bus.post("config", self._on_config_event))
+                self._watching_config = True
+            except OSError as e:
+                event_log.info("banner", f"Config changes are polled: {e}")
+
+        watch = getattr(self.monitor_manager, "watch", None)
+        if watch is not None:
+            try:
+                watch(lambda: self.update_bus.post("monitors", self._on_monitor_event))
+                self._watching_monitors = True
+            except OSError as e:
+                event_log.info("banner", f"Monitor changes are polled: {e}")
+
+    def _stop_change_watches(self):
+        """Stop config and monitor change notifications"""
+        for source, watching in ((self.registry_manager, self._watching_config),
+                                 (self.monitor_manager, self._watching_monitors)):
+            if watching:
+                source.stop()
+        self._watching_config = self._watching_monitors = False
+
+    def _on_config_event(self):
+        """A config file changed: check now rather than at the next poll"""
+        self.config_events += 1
+        self._check_registry_changes()
+
+    def _on_monitor_event(self):
+        """The monitor layout changed: re-enumerate now"""
+        self.monitor_events += 1
+        self._monitors_dirty = True
+        self._check_monitor_changes()
+
+    def _first_root(self) -> tk.Tk | None:
+        """Tk root that application timers run on"""
+        if self.root is not None:
+            return self.root
+        return self.windows[0].get_window() if self.windows else None
 
     def _schedule_monitor_check(self):
         """Schedule periodic checks for monitor/resolution changes."""
+        # Every 2 seconds – tune as needed
         if self.windows:
-            # Every 2 seconds – tune as needed
-            self.windows[0].get_window().after(2000, self._check_monitor_changes)
+            self.scheduler.schedule("monitor", 2000, self._check_monitor_changes)
 
     def _check_monitor_changes(self):
-        """Recreate banners if the monitor layout has changed."""
+        """Update banners if the monitor layout has changed."""
+        if self.heartbeat is not None:
+            self.heartbeat.beat()
+
+        if self._watching_monitors and not self._monitors_dirty:
+            # Layout changes are pushed; the timer only carries the heartbeat
+            self._schedule_monitor_check()
+            return
+        self._monitors_dirty = False
+
         try:
-            current_layout = self._get_monitor_layout()
-
-            if self._last_monitor_layout is None:
-                # First time – just remember it
-                self._last_monitor_layout = current_layout
-            elif current_layout != self._last_monitor_layout:
-                print("Monitor layout changed – recreating banners...")
-                self._last_monitor_layout = current_layout
-                self._recreate_banners()
+            self._update_monitor_layout()
 
             # Keep checking
             self._schedule_monitor_check()
 
         except SystemError as e:
-            print(f"Error checking monitor layout: {e}")
+            event_log.error("banner", f"Error checking monitor layout: {e}")
+            self._monitors_dirty = True
             # Try again next time even on error
             self._schedule_monitor_check()
-    
+
+    def _update_monitor_layout(self):
+        """Re-enumerate the monitors and update only the banners that changed"""
+        index = self._read_monitor_layout()
+
+        if self._monitor_index is None:
+            # First time – just remember it
+            self._monitor_index = index
+            return
+        diff = self._monitor_index.diff(index)
+        if diff.changed:
+            event_log.info(
+                "banner",
+                f"Monitor layout changed – added {len(diff.added)}, "
+                f"removed {len(diff.removed)}, moved {len(diff.moved)}"
+            )
+            self._apply_layout_diff(index, diff)
+        elif list(index.monitors) != list(self._monitor_index.monitors):
+            # Same monitors enumerated in a different order
+            self.avoided_rebuilds += 1
+            self._monitor_index = index
+
+    def _schedule_keep_on_top(self):
+        """Schedule the blind raise where occlusion cannot be audited"""
+        if self.windows and self.visibility_auditor is None:
+            self.scheduler.schedule("keep_on_top", KEEP_ON_TOP_INTERVAL, self._keep_on_top)
+
+    def _keep_on_top(self):
+        """Raise every banner; one timer however many monitors there are"""
+        for window in self.windows:
+            window.raise_to_top()
+        self._schedule_keep_on_top()
+
+    def _schedule_visibility_check(self):
+        """Schedule the next occlusion audit"""
+        if self.windows and self.visibility_auditor is not None:
+            self.scheduler.schedule(
+                "visibility", self.visibility_auditor.next_interval, self._check_visibility
+            )
+
+    def _check_visibility(self):
+        """Raise only the banners that other windows are covering"""
+        targets = {
+            hwnd: identity
+            for identity, window in self.windows_by_id.items()
+            for hwnd in window.hwnds
+            if hwnd
+        }
+        for identity in self.visibility_auditor.check(targets):
+            self.windows_by_id[identity].raise_to_top()
+        self._schedule_visibility_check()
+
     def _schedule_registry_check(self):
         """Schedule next registry check"""
         if self.windows:
-            self.windows[0].get_window().after(
-                self.settings.check_interval, self._check_registry_changes
+            self.scheduler.schedule(
+                "registry", self.registry_poller.current_interval, self._check_registry_changes
             )
 
-    def _check_registry_changes(self):
-        """Check for registry changes and update if needed"""
-        try:
-            # Reload settings
-            self._load_settings()
-
-            # Check if changed
-            if self.settings.has_changed():
-                print("Registry settings changed - updating banner...")
+    def reload_settings(self) -> Dict[str, Any]:
+        """Read the settings now and apply any change; returns what happened
 
-                # If disabled, close everything
-                if not self.settings.enabled:
-                    print("Banner disabled - closing...")
-                    self._close_all_windows()
-                    sys.exit(0)
+        A banner disabled by the new settings is not closed here: the
+        shutdown pass is posted to the Tk thread and runs after the caller
+        returns, so a control-channel reply still goes out.
+        """
+        rebuilds, updates = self.rebuild_count, self.in_place_updates
+        self._load_settings()
+        self._apply_poll_settings()
+
+        changed = self.settings.has_changed()
+        self.registry_poller.record(changed)
+        if changed:
+            event_log.info("banner", "Registry settings changed - updating banner...")
+            if self.settings.enabled:
+                self._apply_changes(self.settings.changes())
+                self.settings.store_current_state()
+                event_log.info("banner", "Banner updated successfully")
+            else:
+                event_log.info("banner", "Banner disabled - closing...")
+                self.shutdown.request("disabled")
+
+        return {
+            "changed": changed,
+            "disabled": not self.settings.enabled,
+            "rebuilt": self.rebuild_count > rebuilds,
+            "updated_in_place": self.in_place_updates > updates,
+            "next_check_ms": self.registry_poller.current_interval,
+        }
+
+    def _apply_poll_settings(self):
+        """Pass the freshly read settings to the poller, profiler and policies"""
+        self.registry_poller.configure(
+            self.settings.check_interval,
+            self.settings.min_check_interval,
+            self.settings.max_check_interval,
+        )
+        self.profiler.check(self.settings.profile_seconds)
+        if self.threat_provider is not None:
+            self.threat_provider.stale_after = self.settings.threat_level_stale_after
+        if self.resource_policy.configured:
+            self.resource_policy.configure(self.settings)
 
-                # Recreate banners
-                self._recreate_banners()
+    def _apply_changes(self, changes):
+        """Rebuild the banners or update them in place, whichever the changes need"""
+        if settings_schema.impact(changes) != REBUILD:
+            self._update_in_place(changes)
+            return
 
-                # Update stored settings
-                self.settings.store_current_state()
+        source_changed = "threat_level_source" in changes
+        if source_changed:
+            self._stop_threat_tracking()
+        if self.threat_provider is None:
+            self.threat_text = self._registry_threat_text()
 
-                print("Banner updated successfully")
+        self._recreate_banners()
 
-            # Schedule next check
-            self._schedule_registry_check()
+        if source_changed:
+            self._start_threat_tracking()
 
+    def _check_registry_changes(self):
+        """Check for registry changes and update if needed"""
+        try:
+            self.reload_settings()
         except SystemError as e:
-            print(f"Error checking registry changes: {e}")
-            # Continue checking even on error
-            self._schedule_registry_check()
+            event_log.error("banner", f"Error checking registry changes: {e}")
+
+        # Schedule next check, even after an error; the shutdown pass of a
+        # disabled banner cancels it
+        self._schedule_registry_check()
 
     def run(self):
         """Start the banner application"""
-        if self.windows:
-            self.windows[0].get_window().mainloop()
+        root = self._first_root()
+        if self.windows and root is not None:
+            try:
+                root.mainloop()
+            finally:
+                # Main loop left some other way (e.g. KeyboardInterrupt)
+                self.shutdown.run("exit")
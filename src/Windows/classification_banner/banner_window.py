@@ -1,71 +1,149 @@
 """
 Banner window creation and management
+
+One BannerWindow covers a monitor: the banner on every edge of the plan
+(top, bottom or both). The banners of a monitor share one font, keep-on-top
+timer and space reservation. Given the application's hidden root
+(``create_root()``), every edge is a Toplevel of it, so the banners of all
+monitors share one Tcl interpreter; on its own, the first edge's window is
+the Tk root. With ``Watermark`` set, it also owns the monitor's watermark
+overlay (see watermark.py).
 """
 
 import tkinter as tk
 from tkinter import font
-from .appbar import register_appbar_for_window, remove_appbar_for_window
-from .constants import ABE_TOP, INNER_PADX, INNER_PADY, KEEP_ON_TOP_INTERVAL
+from typing import Any, Callable, Sequence
+from .constants import INNER_PADX, INNER_PADY, KEEP_ON_TOP_INTERVAL
+from .layout import Placement, plan_banners
+from .threat_level import format_threat_levels
+from .watermark import WatermarkOverlay
+from . import backend, event_log
+
+
+def create_root() -> tk.Tk:
+    """Hidden Tk root for the banners of every monitor"""
+    root = tk.Tk()
+    root.withdraw()
+    # Callback errors go to the event log, not a (missing) console
+    root.report_callback_exception = event_log.report_tk_exception
+    return root
 
 
 class BannerWindow:
-    """Manages a single banner window"""
+    """Manages the banners of one monitor"""
 
-    def __init__(self, monitor, settings, system_info_text: str = ""):
+    def __init__(self, monitor, settings, system_info_text: str = "", keep_on_top: bool = True,
+                 root: tk.Tk | None = None, reserve: bool = True):
         self.monitor = monitor
         self.settings = settings
         self.system_info_text = system_info_text
-        self.window: tk.Tk | None = None
+        # Blind raise loop; off when the visibility auditor raises on demand
+        # or the application raises all banners from one timer
+        self.keep_on_top = keep_on_top
+        # Shared root the banners are Toplevels of; None to own a Tk root
+        self.root = root
+        # False when the caller reserves the space of several monitors at
+        # once (``reserve_all``)
+        self.reserve = reserve
+        self.window: tk.Misc | None = None
         self.hwnd = None
+        # One window per edge; the first is ``window`` itself
+        self.placements: tuple[Placement, ...] = ()
+        self.surfaces: list[tk.Misc] = []
+        self.hwnds: list[int] = []
+        # AppBar on Windows, EWMH struts on X11
+        self.backend = backend.current()
+
+        # Widgets that are recolored in place when the marking changes
+        self._frames: list[tk.Frame] = []
+        self._labels: list[tk.Label] = []
+        self.center_labels: list[tk.Label] = []
+        self.system_info_labels: list[tk.Label] = []
+        self.threat_labels: list[tk.Label] = []
+        self.label_font: font.Font | None = None
+        # Full-screen watermark, when enabled
+        self.overlay: WatermarkOverlay | None = None
+
+        # Pending keep-on-top callback, cancelled on destroy
+        self._keep_on_top_id: str | None = None
+
+        # Called with a reason when the window is closed (taskkill) or the
+        # session ends (Tk reports WM_QUERYENDSESSION as WM_SAVE_YOURSELF);
+        # the banner shuts the whole process down. Without it a close only
+        # destroys this window.
+        self.on_session_end: Callable[[str], Any] | None = None
+
+        # Failures while releasing the AppBar/window, for leak diagnostics
+        self.cleanup_errors: list[str] = []
+        self.spaces_released = False
+        self.destroyed = False
 
         self._create_window()
 
     def _create_window(self):
-        """Create the banner window"""
-        self.window = tk.Tk()
-
-        # Position at top of monitor
-        self.window.geometry(
-            f"{self.monitor.width}x{self.settings.banner_height}"
-            f"+{self.monitor.x}+{self.monitor.y}"
-        )
-
-        # Remove window decorations
-        self.window.overrideredirect(True)
-
-        # Set background color
-        self.window.configure(bg=self.settings.bg_color)
-
-        # Always on top
-        self.window.attributes("-topmost", True)
-
-        # Register as AppBar
+        """Create the banner windows"""
+        self.placements = plan_banners(self.monitor, self.settings.banner_height, self.settings.edges)
+        for placement in self.placements:
+            if self.root is None and not self.surfaces:
+                # Standalone: the first edge's window is the root
+                surface = tk.Tk()
+                # Callback errors go to the event log, not a (missing) console
+                surface.report_callback_exception = event_log.report_tk_exception
+            else:
+                surface = tk.Toplevel(self.root or self.surfaces[0])
+            surface.geometry(placement.geometry)
+
+            # Remove window decorations
+            self.backend.prepare_window(surface)
+
+            # Set background color
+            surface.configure(bg=self.settings.bg_color)
+
+            # Always on top
+            surface.attributes("-topmost", True)
+
+            # Cleanup on close
+            surface.protocol("WM_DELETE_WINDOW", self._on_close)
+            surface.protocol("WM_SAVE_YOURSELF", self._on_save_yourself)
+            self.surfaces.append(surface)
+
+        self.window = self.surfaces[0]
+
+        # Reserve the banners' screen space (AppBars) in one transaction
         self.window.update_idletasks()
-        self.hwnd = self.window.winfo_id()
-
-        register_appbar_for_window(
-            self.hwnd,
-            self.monitor.x,
-            self.monitor.y,
-            self.monitor.width,
-            self.settings.banner_height,
-            edge=ABE_TOP,
-        )
+        self.hwnds = [surface.winfo_id() for surface in self.surfaces]
+        self.hwnd = self.hwnds[0]
+        if self.reserve:
+            self.backend.reserve_spaces(self.spaces)
 
         # Create UI
         self._create_ui()
 
-        # Keep on top
-        self._keep_on_top()
+        if self.settings.watermark:
+            self.overlay = WatermarkOverlay(self.backend, self.monitor)
+            self._update_overlay(self.settings.classification_text, self.settings.bg_color)
 
-        # Cleanup on close
-        self.window.protocol("WM_DELETE_WINDOW", self._on_close)
+        # Keep on top
+        if self.keep_on_top:
+            self._keep_on_top()
 
     def _create_ui(self):
-        """Create the banner UI elements"""
+        """Create the banner UI elements, sharing one font across edges"""
+        self.label_font = font.Font(
+            root=self.window,
+            family=self.settings.font_family,
+            size=self.settings.font_size,
+            weight="bold",
+        )
+        for surface in self.surfaces:
+            self._create_panels(surface, self.label_font)
+
+    def _create_panels(self, surface, label_font):
+        """Create the panels of one banner"""
         # Main frame
-        main_frame = tk.Frame(self.window, bg=self.settings.bg_color)
+        main_frame = tk.Frame(surface, bg=self.settings.bg_color)
         main_frame.pack(fill=tk.BOTH, expand=True)
+        self._frames.append(main_frame)
 
         # Configure grid
         main_frame.grid_rowconfigure(0, weight=1)
@@ -75,13 +153,6 @@ class BannerWindow:
         main_frame.grid_columnconfigure(1, weight=0)  # center stays natural size
         main_frame.grid_columnconfigure(2, weight=1, uniform="sides")  # right grows
 
-        # Create font
-        label_font = font.Font(
-            family=self.settings.font_family,
-            size=self.settings.font_size,
-            weight="bold",
-        )
-
         # Left side: System information
         if self.system_info_text:
             self._create_left_panel(main_frame, label_font)
@@ -90,12 +161,13 @@ class BannerWindow:
         self._create_center_panel(main_frame, label_font)
 
         # Right side: FPCON/CPCON
-        if self.settings.fpcon or self.settings.cpcon:
+        if self.settings.fpcon or self.settings.cpcon or self.settings.threat_level_source:
             self._create_right_panel(main_frame, label_font)
 
     def _create_left_panel(self, parent, label_font):
         """Create left panel with system info"""
         left_frame = tk.Frame(parent, bg=self.settings.bg_color)
+        self._frames.append(left_frame)
         left_frame.grid(
             row=0,
             column=0,
@@ -113,10 +185,13 @@ class BannerWindow:
             anchor="w",
         )
         sys_info_label.pack(fill=tk.BOTH, expand=True)
+        self._labels.append(sys_info_label)
+        self.system_info_labels.append(sys_info_label)
 
     def _create_center_panel(self, parent, label_font):
         """Create center panel with classification"""
         center_frame = tk.Frame(parent, bg=self.settings.bg_color)
+        self._frames.append(center_frame)
         center_frame.grid(
             row=0,
             column=1,
@@ -134,10 +209,13 @@ class BannerWindow:
             anchor="center",
         )
         classification_label.pack(expand=True, fill=tk.BOTH)
+        self._labels.append(classification_label)
+        self.center_labels.append(classification_label)
 
     def _create_right_panel(self, parent, label_font):
         """Create right panel with FPCON/CPCON"""
         right_frame = tk.Frame(parent, bg=self.settings.bg_color)
+        self._frames.append(right_frame)
         right_frame.grid(
             row=0,
             column=2,
@@ -147,13 +225,7 @@ class BannerWindow:
         )
 
         # Build text
-        right_text_parts = []
-        if self.settings.fpcon:
-            right_text_parts.append(f"FPCON: {self.settings.fpcon}")
-        if self.settings.cpcon:
-            right_text_parts.append(f"CPCON: {self.settings.cpcon}")
-
-        right_text = " | ".join(right_text_parts)
+        right_text = format_threat_levels(self.settings.fpcon, self.settings.cpcon)
 
         right_label = tk.Label(
             right_frame,
@@ -164,36 +236,180 @@ class BannerWindow:
             anchor="e",
         )
         right_label.pack(side=tk.RIGHT, expand=True, fill=tk.BOTH)
+        self._labels.append(right_label)
+        self.threat_labels.append(right_label)
+
+    @property
+    def spaces(self) -> list:
+        """``(hwnd, placement)`` of every edge, as ``reserve_spaces`` takes them"""
+        return list(zip(self.hwnds, self.placements))
+
+    @staticmethod
+    def reserve_all(windows: Sequence["BannerWindow"]) -> None:
+        """Reserve the space of several monitors' banners in one transaction"""
+        if windows:
+            windows[0].backend.reserve_spaces([space for window in windows for space in window.spaces])
+
+    def move_to(self, monitor, reserve: bool = True):
+        """Reposition the banners and their AppBars for a moved/resized monitor
+
+        With ``reserve`` False the caller reserves the new space
+        (``reserve_all``).
+        """
+        self.monitor = monitor
+        self.placements = plan_banners(monitor, self.settings.banner_height, self.settings.edges)
+        for surface, placement in zip(self.surfaces, self.placements):
+            surface.geometry(placement.geometry)
+        self.window.update_idletasks()
+        if reserve:
+            self.backend.reserve_spaces(self.spaces)
+        if self.overlay is not None:
+            self.overlay.move_to(monitor)
+
+    def relayout(self, reserve: bool = True):
+        """Apply a new banner height or font without recreating the window"""
+        if self.label_font is not None:
+            self.label_font.configure(
+                family=self.settings.font_family, size=self.settings.font_size
+            )
+        self.move_to(self.monitor, reserve)
+
+    def update_marking(self, text: str, bg: str, fg: str):
+        """Update the classification text and colors in place"""
+        for surface in self.surfaces:
+            surface.configure(bg=bg)
+        for frame in self._frames:
+            frame.configure(bg=bg)
+        for label in self._labels:
+            label.configure(bg=bg, fg=fg)
+        for label in self.center_labels:
+            label.configure(text=text)
+        self._update_overlay(text, bg)
+
+    def _update_overlay(self, text: str, color: str):
+        """Redraw the watermark if the marking or opacity changed"""
+        if self.overlay is not None:
+            self.overlay.update(text, color, self.settings.watermark_opacity)
+
+    def update_system_info(self, text: str) -> bool:
+        """Update the system info text in place
+
+        Returns False if the window was built without a left panel and has to
+        be recreated to show it.
+        """
+        if not self.system_info_labels:
+            return not text
+        self.system_info_text = text
+        for label in self.system_info_labels:
+            label.configure(text=text)
+        return True
+
+    def update_threat_levels(self, text: str) -> bool:
+        """Update the FPCON/CPCON text in place
+
+        Returns False if the window was built without a right panel and has
+        to be recreated to show it.
+        """
+        if not self.threat_labels:
+            return not text
+        for label in self.threat_labels:
+            label.configure(text=text)
+        return True
+
+    def raise_to_top(self) -> bool:
+        """Put the banners back above other topmost windows"""
+        try:
+            for surface in self.surfaces:
+                surface.attributes("-topmost", True)
+                surface.lift()
+            return True
+        except tk.TclError as e:
+            event_log.warning("banner_window", f"Error raising banner: {e}")
+            return False
 
     def _keep_on_top(self):
         """Keep window on top"""
-        try:
-            self.window.attributes("-topmost", True)
-            self.window.lift()
-            self.window.after(KEEP_ON_TOP_INTERVAL, self._keep_on_top)
-        except:
-            pass
+        if self.raise_to_top():
+            self._keep_on_top_id = self.window.after(
+                KEEP_ON_TOP_INTERVAL, self._keep_on_top
+            )
+        else:
+            # Window was destroyed
+            self._keep_on_top_id = None
 
     def _on_close(self):
         """Handle window close"""
+        if self.on_session_end is not None:
+            self.on_session_end("close")
+        else:
+            self.destroy()
+
+    def _on_save_yourself(self):
+        """Logoff or shutdown: release everything before the session ends"""
+        if self.on_session_end is not None:
+            self.on_session_end("session end")
+
+    def release_spaces(self):
+        """Give the banners' screen space back (once); safe from any thread"""
+        if self.spaces_released:
+            return
+        self.spaces_released = True
         try:
-            remove_appbar_for_window(self.hwnd)
-        except:
-            pass
-        self.window.destroy()
+            self.backend.release_spaces(self.hwnds)
+        except OSError as e:
+            self.cleanup_errors.append(f"remove_appbar: {e}")
 
     def destroy(self):
-        """Destroy the window"""
-        try:
-            remove_appbar_for_window(self.hwnd)
-        except:
-            pass
-
-        try:
-            self.window.destroy()
-        except:
-            pass
+        """Destroy the windows and release everything they hold"""
+        if self.destroyed:
+            return
+        self.destroyed = True
+
+        self._cancel_keep_on_top()
+        self.release_spaces()
+        self._destroy_overlay()
+        self._destroy_surfaces()
+
+        # Drop widget and font references so the interpreter can be freed
+        self._frames = []
+        self._labels = []
+        self.surfaces = []
+        self.center_labels = []
+        self.system_info_labels = []
+        self.threat_labels = []
+        self.label_font = None
+
+        for error in self.cleanup_errors:
+            event_log.warning("banner_window", f"Error releasing banner window: {error}")
+
+    def _cancel_keep_on_top(self):
+        """Stop the per-window keep-on-top timer"""
+        if self._keep_on_top_id is not None:
+            try:
+                self.window.after_cancel(self._keep_on_top_id)
+            except tk.TclError as e:
+                self.cleanup_errors.append(f"after_cancel: {e}")
+            self._keep_on_top_id = None
+
+    def _destroy_overlay(self):
+        """Remove the watermark overlay"""
+        if self.overlay is not None:
+            try:
+                self.overlay.destroy()
+            except OSError as e:
+                self.cleanup_errors.append(f"destroy_overlay: {e}")
+            self.overlay = None
+
+    def _destroy_surfaces(self):
+        """Destroy the Tk windows of every edge"""
+        # Destroying an owned root also destroys the other edges' Toplevels;
+        # a shared root stays for the other monitors
+        for surface in [self.window] if self.root is None else self.surfaces:
+            try:
+                surface.destroy()
+            except tk.TclError as e:
+                self.cleanup_errors.append(f"destroy: {e}")
 
     def get_window(self):
-        """Get the Tk window object"""
+        """Get the Tk window object: the owned root, or the first edge's Toplevel"""
         return self.window
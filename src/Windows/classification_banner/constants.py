@@ -14,6 +14,10 @@ ABE_TOP = 1
 ABE_RIGHT = 2
 ABE_BOTTOM = 3
 
+# SetWindowPos/DeferWindowPos flags
+SWP_NOZORDER = 0x0004
+SWP_NOACTIVATE = 0x0010
+
 # Default banner settings
 DEFAULT_CLASSIFICATION = "UNCONFIGURED"
 DEFAULT_BG_COLOR = "#FFFFFF"
@@ -21,12 +25,32 @@ DEFAULT_FG_COLOR = "#000000"
 DEFAULT_BANNER_HEIGHT = 20
 DEFAULT_FONT_SIZE = 6
 DEFAULT_FONT_FAMILY = "Arial"
+DEFAULT_EDGES = "top"  # top, bottom or both
+DEFAULT_WATERMARK = False  # full-screen overlay with the marking
+DEFAULT_WATERMARK_OPACITY = 8  # percent
+DEFAULT_SPANNED_SURFACES = "surface"  # surface or panel (one banner per video wall panel)
+DEFAULT_PANEL_SIZE = ""  # WIDTHxHEIGHT of a video wall panel; empty detects it
 DEFAULT_ENABLED = 1
 DEFAULT_FPCON = "Alpha"
 DEFAULT_CPCON = "1"
 DEFAULT_CHECK_INTERVAL = 15000  # 15 seconds in milliseconds
+DEFAULT_MIN_CHECK_INTERVAL = 2000  # 2 seconds, used in burst mode
+DEFAULT_MAX_CHECK_INTERVAL = 300000  # 5 minutes, backoff ceiling
 DEFAULT_CAVEATS = None
 DEFAULT_DISSEMINATION_CONTROLS = None
+DEFAULT_MARKING_RULES = None
+DEFAULT_LEAK_REPORT = 0  # 1 = counters after each rebuild, 2 = also tracemalloc
+DEFAULT_PROFILE_SECONDS = 60
+DEFAULT_IP_ADDRESS_FAMILY = "ipv4"  # ipv4, ipv6 or any
+DEFAULT_IP_ADDRESS_ADAPTER = "*"  # glob on the adapter's friendly name
+DEFAULT_THREAT_LEVEL_SOURCE = ""  # registry FPCON/CPCON; or file path, http:// or tcp:// on loopback
+DEFAULT_THREAT_LEVEL_STALE_AFTER = 900  # seconds without fresh data before flagging STALE
+DEFAULT_LOG_TARGET = "file"  # file, eventlog, both or none
+DEFAULT_ECO_QOS = True  # opt into power throttling after the first paint
+DEFAULT_LOW_CPU_PRIORITY = True  # below-normal priority class
+DEFAULT_LOW_IO_PRIORITY = True
+DEFAULT_LOW_MEMORY_PRIORITY = True
+DEFAULT_TRIM_WORKING_SET = True  # after startup and after each rebuild
 
 # Registry paths
 REGISTRY_PATHS = [
@@ -34,20 +58,159 @@ REGISTRY_PATHS = [
     ("HKEY_CURRENT_USER", r"SOFTWARE\ClassificationBanner"),
 ]
 
+# Config files read instead of the registry on X11, in the same precedence
+CONFIG_PATHS = [
+    "/etc/classification-banner/banner.conf",
+    "~/.config/classification-banner/banner.conf",
+]
+CONFIG_SECTION = "ClassificationBanner"
+
 # Classification color schemes
 COLOR_SCHEMES = {
-    "UNCONFIGURED": {"bg": "#FFFFFF", "fg": "#000000", "text": "UNCONFIGURED", "caveats":"", "dc": ""},
-    "UNCLASSIFIED": {"bg": "#00FF00", "fg": "#000000", "text": "UNCLASSIFIED", "caveats":"", "dc": ""},
-    "CUI": {"bg": "#502B85", "fg": "#FFFFFF", "text": "CUI", "caveats":"", "dc": ""},
-    "CONFIDENTIAL": {"bg": "#0000FF", "fg": "#FFFFFF", "text": "CONFIDENTIAL", "caveats":"", "dc": ""},
-    "SECRET": {"bg": "#FF0000", "fg": "#000000", "text": "SECRET", "caveats":"", "dc": ""},
-    "TOP SECRET": {"bg": "#FF8C00", "fg": "#000000", "text": "TOP SECRET", "caveats":"", "dc": ""},
-    "SCI": {"bg": "#FFFF00", "fg": "#000000", "text": "TOP SECRET", "caveats":"HCS/SI/TK/G", "dc": "NOFORN"},
+    "UNCONFIGURED": {"bg": "#FFFFFF", "fg": "#000000", "text": "UNCONFIGURED", "caveats": "", "dc": ""},
+    "UNCLASSIFIED": {"bg": "#00FF00", "fg": "#000000", "text": "UNCLASSIFIED", "caveats": "", "dc": ""},
+    "CUI": {"bg": "#502B85", "fg": "#FFFFFF", "text": "CUI", "caveats": "", "dc": ""},
+    "CONFIDENTIAL": {"bg": "#0000FF", "fg": "#FFFFFF", "text": "CONFIDENTIAL", "caveats": "", "dc": ""},
+    "SECRET": {"bg": "#FF0000", "fg": "#000000", "text": "SECRET", "caveats": "", "dc": ""},
+    "TOP SECRET": {"bg": "#FF8C00", "fg": "#000000", "text": "TOP SECRET", "caveats": "", "dc": ""},
+    "SCI": {"bg": "#FFFF00", "fg": "#000000", "text": "TOP SECRET", "caveats": "HCS/SI/TK/G", "dc": "NOFORN"},
 }
 
 # UI layout settings
 INNER_PADX = 10
 INNER_PADY = 0
 
-# Keep on top interval (milliseconds)
+# Keep on top interval (milliseconds); one timer raises every banner
 KEEP_ON_TOP_INTERVAL = 100
+
+# Occlusion auditing (replaces the keep-on-top loop where windows can be
+# enumerated): check interval and ceiling in milliseconds, and the share of
+# one core the checks may use before the interval is stretched
+VISIBILITY_CHECK_INTERVAL = 1000
+VISIBILITY_MAX_INTERVAL = 5000
+VISIBILITY_CPU_BUDGET = 0.002
+
+# Foreground marking rules: number of window handles kept in the lookup
+# cache, and the milliseconds an uncached lookup may take (checked by
+# foreground_rules.py with thousands of rules)
+FOREGROUND_CACHE_SIZE = 512
+FOREGROUND_RULE_BUDGET_MS = 1.0
+
+# Registry polling backoff: interval multiplier while stable, and how long
+# (milliseconds) to keep polling at the minimum interval after a change
+CHECK_BACKOFF_FACTOR = 2
+CHECK_BURST_DURATION = 180000
+
+# Resource growth budgets for the leak detector (soak runs and LeakReport mode)
+LEAK_BUDGET_RSS_BYTES = 16 * 1024 * 1024
+LEAK_BUDGET_PYTHON_BYTES = 2 * 1024 * 1024
+LEAK_BUDGET_GC_OBJECTS = 5000
+LEAK_BUDGET_TK_WIDGETS = 0
+LEAK_BUDGET_TK_FONTS = 0
+LEAK_BUDGET_GDI_HANDLES = 50
+LEAK_BUDGET_USER_HANDLES = 50
+LEAK_BUDGET_HANDLES = 100
+
+# On-demand profiling: named event that starts a profile window, and the
+# longest window allowed (seconds)
+PROFILE_EVENT_NAME = "Local\\ClassificationBannerProfile"
+PROFILE_MAX_SECONDS = 600
+
+# Idle wakeup budgets per simulated hour (checked by idle_budget.py)
+IDLE_BUDGET_REGISTRY_READS = 60
+IDLE_BUDGET_MONITOR_ENUMERATIONS = 1800
+IDLE_BUDGET_VISIBILITY_CHECKS = 3600
+IDLE_BUDGET_ZORDER_CALLS_PER_MONITOR = 0
+IDLE_BUDGET_OTHER_CALLBACKS = 60
+# Without a window source (no occlusion auditing, e.g. X11 without
+# _NET_CLIENT_LIST_STACKING) one timer raises every banner each
+# KEEP_ON_TOP_INTERVAL instead of the visibility checks
+IDLE_BUDGET_BLIND_RAISES = 3600 * 1000 // KEEP_ON_TOP_INTERVAL
+IDLE_BUDGET_BLIND_ZORDER_CALLS_PER_MONITOR = IDLE_BUDGET_BLIND_RAISES
+
+# Supervisor (--supervise): seconds without a heartbeat before the child is
+# considered hung, restart backoff bounds, and the uptime after which a child
+# counts as healthy again
+SUPERVISOR_HEARTBEAT_TIMEOUT = 15
+SUPERVISOR_RESTART_MIN_DELAY = 0.25
+SUPERVISOR_RESTART_MAX_DELAY = 60
+SUPERVISOR_STABLE_UPTIME = 120
+SUPERVISOR_ADDRESS_ENV = "CLASSIFICATION_BANNER_SUPERVISOR"
+SUPERVISOR_AUTHKEY_ENV = "CLASSIFICATION_BANNER_SUPERVISOR_KEY"
+
+# Threat level providers: HTTP poll interval, connect/read timeout, retry
+# backoff bounds after a failed fetch (seconds), file poll interval where
+# change notifications are unavailable, and the indicator appended when stale
+THREAT_LEVEL_POLL_INTERVAL = 30
+THREAT_LEVEL_CONNECT_TIMEOUT = 5
+THREAT_LEVEL_RETRY_MIN = 1
+THREAT_LEVEL_RETRY_MAX = 60
+THREAT_LEVEL_FILE_POLL_INTERVAL = 5
+THREAT_LEVEL_STALE_MARK = " (STALE)"
+
+# Event log: records kept in memory, seconds the writer waits to batch
+# records after the first one arrives, log file rotation, and the Windows
+# event log source name
+EVENT_LOG_CAPACITY = 2048
+EVENT_LOG_FLUSH_DELAY = 1.0
+EVENT_LOG_MAX_BYTES = 1024 * 1024
+EVENT_LOG_BACKUPS = 3
+EVENT_LOG_SOURCE = "ClassificationBanner"
+
+# Resource policy: milliseconds after the banners are created (or rebuilt)
+# before priorities are lowered and the working set is trimmed
+RESOURCE_POLICY_DELAY = 2000
+
+# Marking engine: rendered markings kept in the memo cache
+MARKING_CACHE_SIZE = 4096
+
+# Watermark overlay: pixels per font dot at 96 DPI, blank glyph cells
+# between repeats of the marking, blank glyph heights between rows, and
+# rendered bitmaps kept (about 32 MiB each at 4K; identical monitors share one)
+WATERMARK_GLYPH_SCALE = 4
+WATERMARK_TEXT_GAP = 8
+WATERMARK_ROW_GAP = 6
+WATERMARK_CACHE_SIZE = 4
+
+# Shutdown: milliseconds the release pass may take on logoff, session end,
+# console close or a signal; steps still pending after it are skipped (the
+# AppBars and windows are always released first)
+SHUTDOWN_BUDGET_MS = 1000
+
+# Single instance: name of the per-session lock and channel files, seconds a
+# client waits for the running instance's channel, seconds the instance has
+# to answer a control command, seconds a connected client has to send its
+# request, and how many clients are served at once
+INSTANCE_NAME = "ClassificationBanner"
+CONTROL_CONNECT_TIMEOUT = 5.0
+CONTROL_REPLY_TIMEOUT = 5.0
+CONTROL_REQUEST_TIMEOUT = 2.0
+CONTROL_MAX_CLIENTS = 4
+
+# Large layouts (video walls): monitors whose banners are created, moved or
+# relaid out per AppBar transaction, and the size of the monitor assumed when
+# neither the monitors nor the screen size can be read
+BANNER_BATCH_SIZE = 16
+FALLBACK_MONITOR_SIZE = (1920, 1080)
+
+# Spanned surfaces (Mosaic, Eyefinity): panel resolutions tried, largest
+# first, when PanelSize is not set (a monitor of exactly one of these sizes
+# is a single display and never split), and the widest bezel compensation
+# between panels as a share of the panel size
+COMMON_PANEL_SIZES = (
+    (7680, 4320), (5120, 2880), (5120, 1440), (3840, 2160), (3840, 1600), (3840, 1080),
+    (3440, 1440), (2560, 1600), (2560, 1440), (2560, 1080), (1920, 1200), (1920, 1080),
+    (1680, 1050), (1600, 900), (1366, 768), (1280, 1024), (1280, 720),
+)
+MAX_BEZEL_FRACTION = 0.1
+
+# Scaling budgets with fake windows (checked by scaling.py): milliseconds of
+# the banner's own work per monitor at startup, for a marking change, an
+# unchanged monitor check and an occlusion check; timers pending at once
+# whatever the monitor count; and the wall size checked by default
+SCALING_BUDGET_STARTUP_MS = 1.0
+SCALING_BUDGET_MARKING_MS = 0.5
+SCALING_BUDGET_MONITOR_CHECK_MS = 0.5
+SCALING_BUDGET_VISIBILITY_MS = 0.5
+SCALING_BUDGET_TIMERS = 6
+SCALING_TARGET_MONITORS = 64
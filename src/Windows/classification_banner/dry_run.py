@@ -0,0 +1,105 @@
+"""
+Headless resolution of the effective configuration and layout plan
+
+Used by ``main.py --dry-run``. Nothing here imports tkinter or creates
+windows, so it is cheap enough for login scripts and compliance scans.
+"""
+
+import json
+from typing import Any, Dict, Optional
+from . import __version__
+from .constants import COLOR_SCHEMES
+from .ip_provider import AddressPolicy, AddressProvider
+from .layout import EDGE_NAMES, plan_banners
+from .monitor_manager import MonitorIndex
+from .settings import BannerSettings
+from .system_info import SystemInfoGatherer
+from . import backend, marking, panels
+
+
+def resolve_settings(registry_manager: Any) -> BannerSettings:
+    """Load registry values into settings and build the marking text"""
+    settings = BannerSettings()
+    settings.update_from_registry(registry_manager.load_settings())
+    settings.get_classification_text()
+    return settings
+
+
+def resolve_system_info(settings: BannerSettings, registry_manager: Any) -> Dict[str, str]:
+    """Gather the system info the left panel would show"""
+    if not settings.needs_system_info():
+        return {}
+
+    gatherer = SystemInfoGatherer()
+    if settings.show_ip_address:
+        # Enumerate once with the configured policy, without subscribing
+        provider = AddressProvider(
+            policy=AddressPolicy(settings.ip_address_family, settings.ip_address_adapter)
+        )
+        provider.refresh()
+        gatherer.address_provider = provider
+
+    group_id = registry_manager.read_group_id() if settings.show_group_id else None
+    return gatherer.gather_all(settings.get_show_flags(), group_id)
+
+
+def plan_monitors(settings: BannerSettings, monitor_manager: Any = None) -> list[Dict[str, Any]]:
+    """Per-monitor banner geometry and AppBar registrations, one per edge
+
+    Spanned surfaces are split into panels as ``SpannedSurfaces`` asks.
+    """
+    monitor_manager = monitor_manager or backend.current().monitor_manager()
+    index = MonitorIndex(panels.expand(monitor_manager.get_all_monitors(),
+                                       settings.spanned_surfaces, settings.panel_size))
+
+    plan: list[Dict[str, Any]] = []
+    for identity, monitor in index.monitors.items():
+        placements = plan_banners(monitor, settings.banner_height, settings.edges)
+        plan.append({
+            "identity": identity,
+            "monitor": {"x": monitor.x, "y": monitor.y,
+                        "width": monitor.width, "height": monitor.height},
+            "banners": [
+                {
+                    "edge": EDGE_NAMES[p.edge],
+                    "x": p.x, "y": p.y, "width": p.width, "height": p.height,
+                    "appbar": {"edge": EDGE_NAMES[p.edge], "rect": list(p.rect)},
+                }
+                for p in placements
+            ],
+        })
+    return plan
+
+
+def build_plan(registry_manager: Any = None, monitor_manager: Any = None) -> Dict[str, Any]:
+    """Resolve everything the GUI would display, as a JSON-serializable dict"""
+    if registry_manager is None:
+        # The registry on Windows, config files on X11
+        registry_manager = backend.current().config_source()
+
+    settings = resolve_settings(registry_manager)
+    system_info = resolve_system_info(settings, registry_manager)
+
+    rendered = marking.render(settings.classification, settings.caveats,
+                              settings.dissemination_controls, settings.custom_classification)
+    effective = {
+        name: value for name, value in vars(settings).items()
+        if name != "previous_settings"
+    }
+    return {
+        "version": __version__,
+        "enabled": bool(settings.enabled),
+        "classification_text": settings.classification_text,
+        "color_scheme": COLOR_SCHEMES.get(rendered.level),
+        "marking_problems": list(rendered.problems),
+        "settings": effective,
+        "system_info": system_info,
+        "system_info_text": SystemInfoGatherer().build_display_text(system_info),
+        "monitors": plan_monitors(settings, monitor_manager) if settings.enabled else [],
+    }
+
+
+def render_plan(registry_manager: Any = None, monitor_manager: Any = None,
+                indent: Optional[int] = 2) -> str:
+    """Build the plan and serialize it as JSON"""
+    return json.dumps(build_plan(registry_manager, monitor_manager), indent=indent, default=str)
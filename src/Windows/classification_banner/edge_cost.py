@@ -0,0 +1,183 @@
+"""
+Marginal cost of banners on both screen edges
+
+Builds the same layout with ``Edges`` set to ``top`` and to ``both`` and
+reports the difference:
+
+- on the virtual clock with fake windows: timer callbacks (other than the
+  CPU-budgeted occlusion checks), registry reads, monitor enumerations and
+  AppBar transactions, none of which may grow with the second edge
+- with real Tk windows, when a display is available: startup time, working
+  set, Tk widgets and fonts, GDI/USER handles and pending Tk timers; fonts
+  and timers must not grow either
+
+::
+
+    python -m classification_banner.edge_cost --monitors 1 2 --repeat 5
+"""
+
+import argparse
+import statistics
+import sys
+import time
+import tkinter as tk
+from typing import Dict, List, NamedTuple, Optional
+from .banner import ClassificationBanner
+from .fakes import FakeMonitorManager, FakeRegistryManager, FakeWindowFactory, FakeWindowSource, make_monitor_row
+from .idle_budget import IDLE_SETTINGS, measure_idle
+from .leak_detector import ResourceSampler
+from .resource_policy import NullResourceOS
+from .scheduler import VirtualScheduler
+
+# Counters that are shared by all edges of a monitor
+SHARED_COUNTERS = ("callbacks", "registry_reads", "monitor_enumerations", "appbar_transactions",
+                   "tk_fonts", "tk_timers")
+
+
+class EdgeCost(NamedTuple):
+    """Counters for one ``Edges`` value (-1 when not measured)"""
+
+    edges: str
+    monitors: int
+    # Per simulated hour
+    callbacks: float
+    registry_reads: float
+    monitor_enumerations: float
+    # At startup plus one monitor move
+    appbar_transactions: int
+    appbar_registrations: int
+    # Real windows, medians over the repeats
+    startup_ms: float = -1
+    rss_bytes: int = -1
+    tk_widgets: int = -1
+    tk_fonts: int = -1
+    tk_timers: int = -1
+    gdi_handles: int = -1
+    user_handles: int = -1
+
+
+def _settings(edges: str) -> Dict[str, object]:
+    return {**IDLE_SETTINGS, "Edges": edges}
+
+
+def measure_virtual(edges: str, monitors: int = 1, hours: float = 0.25) -> EdgeCost:
+    """Wakeups and AppBar traffic with fake windows"""
+    wakeups = measure_idle(monitors, hours, settings=_settings(edges))
+
+    scheduler = VirtualScheduler()
+    factory = FakeWindowFactory(scheduler)
+    monitor_manager = FakeMonitorManager(make_monitor_row(monitors))
+    ClassificationBanner(
+        registry_manager=FakeRegistryManager(_settings(edges)),
+        monitor_manager=monitor_manager,
+        scheduler=scheduler,
+        window_factory=factory,
+        window_source=FakeWindowSource(factory),
+    )
+    # A resolution change on the first monitor moves its banners
+    monitor_manager.monitors[0] = make_monitor_row(1, width=2560, height=1440)[0]
+    scheduler.advance(10_000)
+
+    # Occlusion checks stretch their interval with their measured CPU cost,
+    # so their count varies from run to run; the other timers are exact
+    callbacks = sum(n for name, n in wakeups.by_timer.items() if name != "visibility")
+    return EdgeCost(edges, monitors, callbacks, wakeups.registry_reads,
+                    wakeups.monitor_enumerations, factory.appbar_transactions,
+                    factory.appbar_registrations)
+
+
+def measure_windows(edges: str, monitors: int = 1, repeat: int = 5) -> Dict[str, float]:
+    """Startup time and resource counters of real banners; needs a display"""
+    sampler = ResourceSampler()
+    samples: Dict[str, List[float]] = {}
+    for _ in range(repeat):
+        before = sampler.sample()
+        started = time.perf_counter()
+        banner = ClassificationBanner(
+            registry_manager=FakeRegistryManager(_settings(edges)),
+            monitor_manager=FakeMonitorManager(make_monitor_row(monitors)),
+            resource_os=NullResourceOS(),
+        )
+        try:
+            roots = banner.roots()
+            for root in roots:
+                root.update()
+            startup_ms = (time.perf_counter() - started) * 1000
+            after = sampler.sample(roots)
+            timers = sum(len(root.tk.call("after", "info")) for root in roots)
+        finally:
+            banner._close_all_windows()
+            banner._close_root()
+
+        values = {
+            "startup_ms": startup_ms,
+            "rss_bytes": after.rss_bytes - before.rss_bytes,
+            "tk_widgets": after.tk_widgets,
+            "tk_fonts": after.tk_fonts,
+            "tk_timers": timers,
+            "gdi_handles": after.gdi_handles - before.gdi_handles,
+            "user_handles": after.user_handles - before.user_handles,
+        }
+        for name, value in values.items():
+            samples.setdefault(name, []).append(value)
+    return {name: statistics.median(values) for name, values in samples.items()}
+
+
+def measure(edges: str, monitors: int = 1, repeat: int = 5, windows: bool = True) -> EdgeCost:
+    """Virtual counters, plus real-window counters if ``windows`` is set"""
+    cost = measure_virtual(edges, monitors)
+    if windows:
+        cost = cost._replace(**measure_windows(edges, monitors, repeat))
+    return cost
+
+
+def marginal(top: EdgeCost, both: EdgeCost) -> Dict[str, float]:
+    """Growth of every measured counter from ``top`` to ``both``"""
+    return {
+        name: getattr(both, name) - getattr(top, name)
+        for name in EdgeCost._fields[2:]
+        if getattr(top, name) != -1 and getattr(both, name) != -1
+    }
+
+
+def check_shared(top: EdgeCost, both: EdgeCost) -> List[str]:
+    """One message per shared counter that grows with the second edge"""
+    return [
+        f"{top.monitors} monitor(s): {name} grows from {getattr(top, name):g} "
+        f"to {getattr(both, name):g} with the bottom edge"
+        for name, growth in marginal(top, both).items()
+        if name in SHARED_COUNTERS and growth > 0
+    ]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Print the marginal cost; exit status 1 when a shared counter grows"""
+    parser = argparse.ArgumentParser(description="Measure the cost of the bottom banner")
+    parser.add_argument("--monitors", type=int, nargs="+", default=[1, 2])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--no-windows", action="store_true",
+                        help="fake windows only (no display needed)")
+    args = parser.parse_args(argv)
+
+    windows = not args.no_windows
+    failures: List[str] = []
+    for monitors in args.monitors:
+        try:
+            top = measure("top", monitors, args.repeat, windows)
+            both = measure("both", monitors, args.repeat, windows)
+        except tk.TclError as e:
+            print(f"Real windows unavailable ({e}); measuring fake windows only")
+            windows = False
+            top = measure("top", monitors, args.repeat, windows)
+            both = measure("both", monitors, args.repeat, windows)
+        growth = ", ".join(f"{name}={value:+g}" for name, value in marginal(top, both).items())
+        print(f"{monitors} monitor(s), top -> both: {growth}")
+        failures.extend(check_shared(top, both))
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
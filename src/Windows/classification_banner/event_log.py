@@ -0,0 +1,369 @@
+"""
+Bounded in-memory event log with a batched background writer
+
+Logging a record is one append to a fixed-size ring buffer; nothing is
+formatted or written on the calling (usually Tk) thread. A daemon thread
+wakes when the first record arrives after an idle period, waits
+``EVENT_LOG_FLUSH_DELAY`` to collect a batch, and hands it to the sinks:
+a rotating file, the Windows event log and/or stderr. Unhandled exceptions
+dump the whole buffer to a crash file synchronously.
+
+Compare the cost of a log call with print()::
+
+    python -m classification_banner.event_log --bench
+"""
+
+import argparse
+import atexit
+import ctypes
+import faulthandler
+import io
+import itertools
+import os
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from collections import deque
+from ctypes import wintypes
+from typing import Any, Deque, IO, List, Optional, Tuple
+from .constants import (
+    DEFAULT_LOG_TARGET,
+    EVENT_LOG_BACKUPS,
+    EVENT_LOG_CAPACITY,
+    EVENT_LOG_FLUSH_DELAY,
+    EVENT_LOG_MAX_BYTES,
+    EVENT_LOG_SOURCE,
+)
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+CRITICAL = 50
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR", CRITICAL: "CRITICAL"}
+
+# (sequence, wall time, level, source, message)
+Record = Tuple[int, float, int, str, str]
+
+
+def log_directory() -> str:
+    """Per-user directory for log and crash files"""
+    base = os.environ.get("LOCALAPPDATA") or tempfile.gettempdir()
+    directory = os.path.join(base, "ClassificationBanner")
+    try:
+        os.makedirs(directory, exist_ok=True)
+    except OSError:
+        directory = tempfile.gettempdir()
+    return directory
+
+
+def format_record(record: Record) -> str:
+    """One log line"""
+    _, when, level, source, message = record
+    stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(when))
+    millis = int((when % 1) * 1000)
+    return f"{stamp}.{millis:03d} {LEVEL_NAMES.get(level, level)} {source}: {message}"
+
+
+class RotatingFileSink:
+    """Appends batches to a file, rotating it at ``max_bytes``"""
+
+    def __init__(self, path: str, max_bytes: int = EVENT_LOG_MAX_BYTES,
+                 backups: int = EVENT_LOG_BACKUPS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+
+    def write(self, records: List[Record]) -> None:
+        """Write one batch; the file is only open while writing"""
+        with open(self.path, "a", encoding="utf-8") as log_file:
+            log_file.write("".join(format_record(r) + "\n" for r in records))
+            size = log_file.tell()
+        if size >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self) -> None:
+        for index in range(self.backups - 1, 0, -1):
+            older = f"{self.path}.{index}"
+            if os.path.exists(older):
+                os.replace(older, f"{self.path}.{index + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+    def close(self) -> None:
+        """Nothing held open"""
+
+
+class StreamSink:
+    """Echoes batches to a console stream (off the UI thread)"""
+
+    def __init__(self, stream: IO[str]):
+        self.stream = stream
+
+    def write(self, records: List[Record]) -> None:
+        """Write one batch"""
+        try:
+            self.stream.write("".join(format_record(r) + "\n" for r in records))
+            self.stream.flush()
+        except (OSError, ValueError):
+            # Console detached or closed
+            pass
+
+    def close(self) -> None:
+        """The stream belongs to the process"""
+
+
+class WindowsEventLogSink:
+    """Reports warnings and errors to the Windows Application event log"""
+
+    EVENT_TYPES = {WARNING: 0x0002, ERROR: 0x0001, CRITICAL: 0x0001}
+
+    def __init__(self, source: str = EVENT_LOG_SOURCE, min_level: int = WARNING):
+        self.min_level = min_level
+        self._advapi32 = ctypes.WinDLL("advapi32", use_last_error=True)
+        self._advapi32.RegisterEventSourceW.argtypes = [wintypes.LPCWSTR, wintypes.LPCWSTR]
+        self._advapi32.RegisterEventSourceW.restype = wintypes.HANDLE
+        self._advapi32.ReportEventW.argtypes = [
+            wintypes.HANDLE, wintypes.WORD, wintypes.WORD, wintypes.DWORD, ctypes.c_void_p,
+            wintypes.WORD, wintypes.DWORD, ctypes.POINTER(wintypes.LPCWSTR), ctypes.c_void_p]
+        self._advapi32.DeregisterEventSource.argtypes = [wintypes.HANDLE]
+        self._handle = self._advapi32.RegisterEventSourceW(None, source)
+        if not self._handle:
+            raise ctypes.WinError(ctypes.get_last_error())
+
+    def write(self, records: List[Record]) -> None:
+        """Report each record at or above ``min_level``"""
+        for record in records:
+            level = record[2]
+            if level < self.min_level:
+                continue
+            strings = (wintypes.LPCWSTR * 1)(f"{record[3]}: {record[4]}")
+            self._advapi32.ReportEventW(
+                self._handle, self.EVENT_TYPES.get(level, 0x0004), 0, 1, None, 1, 0, strings, None)
+
+    def close(self) -> None:
+        """Release the event source"""
+        if self._handle:
+            self._advapi32.DeregisterEventSource(self._handle)
+            self._handle = None
+
+
+class EventLog:
+    """Fixed-size ring buffer of records plus a background batch writer"""
+
+    def __init__(self, capacity: int = EVENT_LOG_CAPACITY,
+                 flush_delay: float = EVENT_LOG_FLUSH_DELAY):
+        self.records: Deque[Record] = deque(maxlen=capacity)
+        self.flush_delay = flush_delay
+        self.sinks: List[Any] = []
+        self.name = "banner"
+        # Records overwritten in the ring before the writer got to them
+        self.dropped = 0
+        self._sequence = itertools.count()
+        self._written = -1
+        self._idle = True
+        self._wake = threading.Event()
+        self._closing = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def log(self, level: int, source: str, message: str) -> None:
+        """Record an event; safe from any thread"""
+        self.records.append((next(self._sequence), time.time(), level, source, message))
+        if self._idle:
+            # First record since the last flush wakes the writer
+            self._idle = False
+            self._wake.set()
+
+    def configure(self, target: str = DEFAULT_LOG_TARGET, name: str = "banner",
+                  echo: Optional[bool] = None) -> None:
+        """Choose the sinks and start the writer
+
+        ``target`` is ``file``, ``eventlog``, ``both`` or ``none``. Records
+        logged before this call are kept in the ring and written now.
+        """
+        target = (target or DEFAULT_LOG_TARGET).lower()
+        sinks: List[Any] = []
+        if target in ("file", "both"):
+            sinks.append(RotatingFileSink(
+                os.path.join(log_directory(), f"ClassificationBanner-{name}.log")))
+        if target in ("eventlog", "both") and sys.platform == "win32":
+            try:
+                sinks.append(WindowsEventLogSink())
+            except OSError as e:
+                self.log(WARNING, "event_log", f"Windows event log unavailable: {e}")
+        if echo is None:
+            # No stderr in the --noconsole build
+            echo = sys.stderr is not None
+        if echo:
+            sinks.append(StreamSink(sys.stderr))
+
+        with self._flush_lock:
+            old, self.sinks = self.sinks, sinks
+            self.name = name
+        for sink in old:
+            sink.close()
+
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="event-log", daemon=True)
+            self._thread.start()
+            # Write whatever is still buffered when the process exits
+            atexit.register(self.close)
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._closing.is_set():
+            self._wake.wait()
+            self._wake.clear()
+            # Let the rest of the batch arrive
+            self._closing.wait(self.flush_delay)
+            self._idle = True
+            self.flush()
+
+    def pending(self) -> List[Record]:
+        """Records not yet handed to the sinks"""
+        return [r for r in list(self.records) if r[0] > self._written]
+
+    def flush(self) -> None:
+        """Write pending records to every sink now"""
+        with self._flush_lock:
+            batch = self.pending()
+            if not batch or not self.sinks:
+                return
+            lost = batch[0][0] - self._written - 1
+            if lost > 0:
+                self.dropped += lost
+                batch.insert(0, (batch[0][0], batch[0][1], WARNING, "event_log",
+                                 f"{lost} records overwritten before they were written"))
+            self._written = batch[-1][0]
+            for sink in self.sinks:
+                try:
+                    sink.write(batch)
+                except OSError:
+                    # Nowhere left to report it; the records stay in the ring
+                    pass
+
+    def dump(self, path: str) -> str:
+        """Write the whole ring buffer to ``path`` synchronously"""
+        with open(path, "w", encoding="utf-8") as dump_file:
+            dump_file.write("".join(format_record(r) + "\n" for r in list(self.records)))
+        return path
+
+    def dump_crash(self) -> Optional[str]:
+        """Dump the buffer to a timestamped crash file and flush the sinks"""
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(log_directory(), f"ClassificationBanner-{self.name}-crash-{stamp}.log")
+        try:
+            self.dump(path)
+        except OSError:
+            path = None
+        self.flush()
+        return path
+
+    def close(self) -> None:
+        """Flush and stop the writer"""
+        self._closing.set()
+        self._wake.set()
+        self.flush()
+        for sink in self.sinks:
+            sink.close()
+
+
+EVENT_LOG = EventLog()
+
+
+def debug(source: str, message: str) -> None:
+    EVENT_LOG.log(DEBUG, source, message)
+
+
+def info(source: str, message: str) -> None:
+    EVENT_LOG.log(INFO, source, message)
+
+
+def warning(source: str, message: str) -> None:
+    EVENT_LOG.log(WARNING, source, message)
+
+
+def error(source: str, message: str) -> None:
+    EVENT_LOG.log(ERROR, source, message)
+
+
+def report_tk_exception(exc_type, exc, tb) -> None:
+    """Tk ``report_callback_exception`` replacement: log instead of stderr"""
+    EVENT_LOG.log(ERROR, "tk", "".join(traceback.format_exception(exc_type, exc, tb)).rstrip())
+
+
+_fault_file: Optional[IO[str]] = None
+
+
+def install_crash_hooks(event_log: EventLog = EVENT_LOG) -> None:
+    """Dump the buffer on unhandled exceptions and native faults"""
+    global _fault_file
+    previous_hook = sys.excepthook
+    previous_thread_hook = threading.excepthook
+
+    def excepthook(exc_type, exc, tb):
+        event_log.log(CRITICAL, "crash",
+                      "".join(traceback.format_exception(exc_type, exc, tb)).rstrip())
+        event_log.dump_crash()
+        previous_hook(exc_type, exc, tb)
+
+    def thread_excepthook(args):
+        if args.exc_type is not SystemExit:
+            name = args.thread.name if args.thread is not None else "?"
+            event_log.log(CRITICAL, "crash", f"Unhandled exception in thread {name}: " + "".join(
+                traceback.format_exception(args.exc_type, args.exc_value, args.exc_traceback)).rstrip())
+            event_log.dump_crash()
+        previous_thread_hook(args)
+
+    sys.excepthook = excepthook
+    threading.excepthook = thread_excepthook
+
+    if _fault_file is None:
+        try:
+            _fault_file = open(os.path.join(
+                log_directory(), f"ClassificationBanner-{event_log.name}-fault.log"), "a")
+            faulthandler.enable(_fault_file)
+        except (OSError, RuntimeError):
+            _fault_file = None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Micro-benchmark: cost per call of log() against print()"""
+    parser = argparse.ArgumentParser(description="Event log micro-benchmark")
+    parser.add_argument("--bench", action="store_true", help="run the benchmark")
+    parser.add_argument("--calls", type=int, default=200000)
+    args = parser.parse_args(argv)
+    if not args.bench:
+        parser.print_help()
+        return 0
+
+    def per_call(function, *call_args) -> float:
+        started = time.perf_counter()
+        for _ in range(args.calls):
+            function(*call_args)
+        return (time.perf_counter() - started) / args.calls * 1e9
+
+    ring: Deque[Any] = deque(maxlen=EVENT_LOG_CAPACITY)
+    event_log = EventLog()  # no sinks: measures the hot path only
+    message = "Registry settings changed - updating banner..."
+    with open(os.devnull, "w", encoding="utf-8") as devnull:
+        console = io.TextIOWrapper(devnull.buffer, write_through=True)
+        results = {
+            "deque.append": per_call(ring.append, message),
+            "EventLog.log": per_call(event_log.log, INFO, "banner", message),
+            "print (devnull, unbuffered)": per_call(
+                lambda m: print(m, file=console), message),
+        }
+        console.detach()
+    for name, nanoseconds in results.items():
+        print(f"{name:<28} {nanoseconds:8.0f} ns/call")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,298 @@
+"""
+In-memory stand-ins for the registry and monitor backends
+"""
+
+from typing import Any, Dict, List, Optional
+from .constants import KEEP_ON_TOP_INTERVAL
+from .layout import plan_banners
+from .threat_level import format_threat_levels
+from .visibility import Rect, WindowRecord
+from .watermark import WatermarkOverlay
+
+
+class FakeMonitor:
+    """Monitor with the attributes used from screeninfo.Monitor"""
+
+    def __init__(self, x: int, y: int, width: int, height: int,
+                 name: Optional[str] = None, is_primary: bool = False):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.name = name
+        self.is_primary = is_primary
+
+    def __repr__(self):
+        return f"FakeMonitor({self.x}, {self.y}, {self.width}, {self.height}, name={self.name!r})"
+
+
+def make_monitor_row(count: int, width: int = 1920, height: int = 1080) -> List[FakeMonitor]:
+    """Build ``count`` monitors side by side"""
+    return [
+        FakeMonitor(i * width, 0, width, height, name=f"\\\\.\\DISPLAY{i + 1}", is_primary=i == 0)
+        for i in range(count)
+    ]
+
+
+def make_monitor_grid(columns: int, rows: int, width: int = 1920, height: int = 1080) -> List[FakeMonitor]:
+    """Build a video wall of ``columns`` x ``rows`` monitors, row by row"""
+    return [
+        FakeMonitor(column * width, row * height, width, height,
+                    name=f"\\\\.\\DISPLAY{row * columns + column + 1}", is_primary=row == column == 0)
+        for row in range(rows)
+        for column in range(columns)
+    ]
+
+
+class FakeMonitorManager:
+    """Monitor backend returning a settable layout"""
+
+    def __init__(self, monitors: Optional[List[Any]] = None):
+        self.monitors: List[Any] = list(monitors or make_monitor_row(1))
+        self.calls = 0
+
+    def get_all_monitors(self) -> List[Any]:
+        """Return the current layout"""
+        self.calls += 1
+        return list(self.monitors)
+
+
+class FakeRegistryManager:
+    """Registry backend returning a settable dictionary of values"""
+
+    def __init__(self, values: Optional[Dict[str, Any]] = None):
+        self.values: Dict[str, Any] = dict(values or {})
+        self.calls = 0
+
+    def load_settings(self) -> Dict[str, Any]:
+        """Return a copy of the current values"""
+        self.calls += 1
+        return dict(self.values)
+
+    def read_group_id(self) -> Optional[str]:
+        """Return the GroupID value"""
+        return self.values.get("GroupID")
+
+
+class FakeOverlayBackend:
+    """Watermark overlay calls of a backend, recorded instead of made"""
+
+    def __init__(self):
+        self.created = 0
+        self.destroyed = 0
+        # (handle, x, y, watermark) per upload
+        self.uploads: List[Any] = []
+        self.live: Dict[int, Any] = {}
+
+    def create_overlay(self, x: int, y: int, width: int, height: int) -> int:
+        """New overlay handle"""
+        self.created += 1
+        self.live[self.created] = None
+        return self.created
+
+    def update_overlay(self, handle: int, x: int, y: int, watermark: Any) -> None:
+        """Record the bitmap shown"""
+        self.uploads.append((handle, x, y, watermark))
+        self.live[handle] = watermark
+
+    def destroy_overlay(self, handle: int) -> None:
+        """Forget the overlay"""
+        self.destroyed += 1
+        del self.live[handle]
+
+
+class FakeWindowFactory:
+    """Creates FakeBannerWindow objects and counts AppBar traffic
+
+    Pass an instance as ``window_factory`` to ClassificationBanner.
+    ``appbar_registrations`` counts AppBars (one per edge) and
+    ``appbar_transactions`` the reservations that set them, whether one
+    window's or several (``reserve_all``). Watermark overlays go to
+    ``overlays``.
+    """
+
+    def __init__(self, scheduler: Any = None):
+        self.scheduler = scheduler
+        self.created = 0
+        self.destroyed = 0
+        self.appbar_registrations = 0
+        self.appbar_transactions = 0
+        self.appbar_removals = 0
+        self.keep_on_top_calls = 0
+        self.overlays = FakeOverlayBackend()
+        # Windows not yet destroyed, in creation order
+        self.live: List["FakeBannerWindow"] = []
+        self._next_hwnd = 1
+
+    def __call__(self, monitor: Any, settings: Any, system_info_text: str = "",
+                 keep_on_top: bool = True, root: Any = None, reserve: bool = True) -> "FakeBannerWindow":
+        self.created += 1
+        return FakeBannerWindow(monitor, settings, system_info_text, factory=self,
+                                keep_on_top=keep_on_top, reserve=reserve)
+
+    def reserve_all(self, windows: List["FakeBannerWindow"]) -> None:
+        """Count one transaction for several windows' AppBars"""
+        if windows:
+            self.appbar_transactions += 1
+            self.appbar_registrations += sum(len(window.placements) for window in windows)
+
+
+class FakeBannerWindow:
+    """BannerWindow stand-in without Tk
+
+    Registers a simulated AppBar and, if the factory has a scheduler, runs the
+    same keep-on-top loop as the real window so timer counts are realistic.
+    """
+
+    def __init__(self, monitor: Any, settings: Any, system_info_text: str = "",
+                 factory: Optional[FakeWindowFactory] = None, keep_on_top: bool = True,
+                 reserve: bool = True):
+        self.monitor = monitor
+        self.settings = settings
+        self.system_info_text = system_info_text
+        self.factory = factory or FakeWindowFactory()
+        self.marking = (settings.classification_text, settings.bg_color, settings.fg_color)
+        self.threat_text = format_threat_levels(settings.fpcon, settings.cpcon)
+        self.has_threat_panel = bool(self.threat_text or settings.threat_level_source)
+        self.relayouts = 0
+        self.on_session_end: Optional[Any] = None
+        self.cleanup_errors: List[str] = []
+        self.spaces_released = False
+        self.destroyed = False
+        self._timer_name = f"keep_on_top:{id(self)}"
+        self.placements = plan_banners(monitor, settings.banner_height, settings.edges)
+        self.hwnds = list(range(self.factory._next_hwnd, self.factory._next_hwnd + len(self.placements)))
+        self.hwnd = self.hwnds[0]
+        self.factory._next_hwnd += len(self.placements)
+        self.factory.live.append(self)
+
+        if reserve:
+            self._reserve()
+        self.overlay = None
+        if settings.watermark:
+            self.overlay = WatermarkOverlay(self.factory.overlays, monitor)
+            self.overlay.update(settings.classification_text, settings.bg_color, settings.watermark_opacity)
+        if keep_on_top:
+            self._keep_on_top()
+
+    @property
+    def rect(self) -> Rect:
+        """Screen rectangle of the first banner"""
+        return self.placements[0].rect
+
+    @property
+    def rects(self) -> List[Rect]:
+        """Screen rectangle of each edge's banner, in ``hwnds`` order"""
+        return [placement.rect for placement in self.placements]
+
+    @property
+    def spaces(self) -> List[Any]:
+        """``(hwnd, placement)`` of every edge"""
+        return list(zip(self.hwnds, self.placements))
+
+    def _reserve(self):
+        self.factory.appbar_transactions += 1
+        self.factory.appbar_registrations += len(self.placements)
+
+    def raise_to_top(self) -> bool:
+        """Count one z-order call per edge"""
+        self.factory.keep_on_top_calls += len(self.placements)
+        return not self.destroyed
+
+    def _keep_on_top(self):
+        if self.destroyed or self.factory.scheduler is None:
+            return
+        self.factory.keep_on_top_calls += len(self.placements)
+        self.factory.scheduler.schedule(self._timer_name, KEEP_ON_TOP_INTERVAL, self._keep_on_top)
+
+    def move_to(self, monitor: Any, reserve: bool = True):
+        """Simulate repositioning the AppBars"""
+        self.monitor = monitor
+        self.placements = plan_banners(monitor, self.settings.banner_height, self.settings.edges)
+        if reserve:
+            self._reserve()
+        if self.overlay is not None:
+            self.overlay.move_to(monitor)
+
+    def relayout(self, reserve: bool = True):
+        """Record a height/font change and reposition the AppBar"""
+        self.relayouts += 1
+        self.move_to(self.monitor, reserve)
+
+    def update_marking(self, text: str, bg: str, fg: str):
+        """Record the marking shown"""
+        self.marking = (text, bg, fg)
+        if self.overlay is not None:
+            self.overlay.update(text, bg, self.settings.watermark_opacity)
+
+    def update_system_info(self, text: str) -> bool:
+        """Record the system info text"""
+        if not self.system_info_text and text:
+            return False
+        self.system_info_text = text
+        return True
+
+    def update_threat_levels(self, text: str) -> bool:
+        """Record the threat level text"""
+        if not self.has_threat_panel:
+            return not text
+        self.threat_text = text
+        return True
+
+    def release_spaces(self):
+        """Simulate AppBar removal (once)"""
+        if self.spaces_released:
+            return
+        self.spaces_released = True
+        self.factory.appbar_removals += len(self.placements)
+
+    def destroy(self):
+        """Simulate AppBar removal and window destruction"""
+        if self.destroyed:
+            return
+        self.destroyed = True
+        self.factory.live.remove(self)
+        self.factory.destroyed += 1
+        self.release_spaces()
+        if self.overlay is not None:
+            self.overlay.destroy()
+        if self.factory.scheduler is not None:
+            self.factory.scheduler.cancel(self._timer_name)
+
+    def get_window(self):
+        """No Tk window behind a fake"""
+        return None
+
+
+class FakeWindowSource:
+    """Synthetic z-order for the visibility auditor
+
+    ``above`` holds other applications' windows stacked over the banners,
+    ``below`` the ones underneath; the factory's live banners sit between.
+    """
+
+    def __init__(self, factory: FakeWindowFactory,
+                 above: Optional[List[WindowRecord]] = None,
+                 below: Optional[List[WindowRecord]] = None):
+        self.factory = factory
+        self.above: List[WindowRecord] = list(above or [])
+        self.below: List[WindowRecord] = list(below or [])
+        self.enumerations = 0
+
+    def enumerate(self) -> List[WindowRecord]:
+        """Windows topmost first"""
+        self.enumerations += 1
+        banners = [
+            WindowRecord(hwnd, rect, True, True)
+            for w in self.factory.live
+            for hwnd, rect in zip(w.hwnds, w.rects)
+        ]
+        return self.above + banners + self.below
+
+    def root_of(self, hwnd: int) -> int:
+        """Fake handles are already top-level"""
+        return hwnd
+
+    def describe(self, hwnd: int) -> str:
+        """Synthetic window name"""
+        return f"FakeWindow ({hwnd:#x})"
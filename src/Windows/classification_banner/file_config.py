@@ -0,0 +1,209 @@
+"""
+File-based configuration source for platforms without a registry
+
+Reads the same value names as the registry from an INI file::
+
+    [ClassificationBanner]
+    Classification = SECRET
+    ShowHostname = 1
+    MarkingRules =
+        process:firefox=CUI
+        title:*SIPR*=SECRET
+
+The first file of ``CONFIG_PATHS`` that exists is used, the way the
+registry's machine key beats the user key. Values go through the same
+schema decoding and color schemes as registry data. With ``watch()`` the
+directories are watched with inotify: reads are served from a cache until a
+config file changes, and the banner is told at once instead of on its next
+poll.
+"""
+
+import configparser
+import ctypes
+import os
+import select
+import struct
+import sys
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from .constants import CONFIG_PATHS, CONFIG_SECTION
+from .registry_manager import ALL_VALUES, apply_color_schemes, decode_values
+from . import event_log
+
+# inotify(7)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+# Editors and config management replace files by rename; watch both paths
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+_EVENT_HEADER = struct.Struct("iIII")
+
+# Option names are matched case-insensitively, like registry value names
+_VALUE_NAMES = {name.lower(): name for name in ALL_VALUES}
+
+
+def read_config_file(path: str) -> Dict[str, str]:
+    """Raw values of the ``[ClassificationBanner]`` section of one file"""
+    parser = configparser.ConfigParser(interpolation=None, comment_prefixes=("#", ";"))
+    parser.optionxform = str
+    with open(path, encoding="utf-8") as f:
+        parser.read_file(f)
+    if not parser.has_section(CONFIG_SECTION):
+        return {}
+
+    raw: Dict[str, str] = {}
+    for option, value in parser.items(CONFIG_SECTION):
+        name = _VALUE_NAMES.get(option.lower())
+        if name is None:
+            event_log.warning("config", f"Ignoring unknown value {option!r} in {path}")
+            continue
+        raw[name] = value.strip()
+    return raw
+
+
+class FileConfigSource:
+    """Settings from config files; the counterpart of RegistryManager"""
+
+    def __init__(self, paths: Optional[List[str]] = None):
+        self.paths: List[str] = [os.path.expanduser(p) for p in (paths or CONFIG_PATHS)]
+        self.watcher: Optional["InotifyWatcher"] = None
+        self.reads = 0
+        self._callback: Optional[Callable[[], Any]] = None
+        self._dirty = True
+        self._cache: Dict[str, Any] = {}
+
+    def _read_first(self) -> Tuple[Optional[str], Dict[str, str]]:
+        for path in self.paths:
+            try:
+                return path, read_config_file(path)
+            except FileNotFoundError:
+                continue
+            except (OSError, UnicodeDecodeError, configparser.Error) as e:
+                event_log.error("config", f"Error reading {path}: {e}")
+                continue
+        return None, {}
+
+    def load_settings(self) -> Dict[str, Any]:
+        """Decoded values of the first config file, with color schemes applied"""
+        if self.watcher is not None and not self._dirty:
+            return dict(self._cache)
+        self._dirty = False
+        self.reads += 1
+
+        _, raw = self._read_first()
+        settings = apply_color_schemes(decode_values(raw))
+        self._cache = settings
+        return dict(settings)
+
+    def read_group_id(self) -> Optional[str]:
+        """GroupID from the first file that sets it"""
+        for path in self.paths:
+            try:
+                value = read_config_file(path).get("GroupID")
+            except (OSError, UnicodeDecodeError, configparser.Error):
+                continue
+            if value:
+                return value
+        return None
+
+    def watch(self, callback: Callable[[], Any]) -> None:
+        """Call ``callback`` (from a worker thread) when a config file changes
+
+        Raises OSError if inotify is unavailable or no config directory
+        exists; the banner then keeps polling.
+        """
+        self.stop()
+        self._callback = callback
+        watcher = InotifyWatcher([os.path.dirname(p) for p in self.paths], self._on_change)
+        watcher.start()
+        self.watcher = watcher
+        self._dirty = True
+
+    def stop(self) -> None:
+        """Stop watching"""
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+
+    def _on_change(self, path: str) -> None:
+        if path not in self.paths:
+            return
+        self._dirty = True
+        if self._callback is not None:
+            self._callback()
+
+
+class InotifyWatcher:
+    """Reports changed file paths in a set of directories from a thread"""
+
+    def __init__(self, directories: List[str], on_change: Callable[[str], Any]):
+        self.directories = list(dict.fromkeys(directories))
+        self.on_change = on_change
+        self.events = 0
+        self._fd: Optional[int] = None
+        self._wakeup: Optional[Tuple[int, int]] = None
+        self._watches: Dict[int, str] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Add the watches and start the reader thread"""
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        libc = ctypes.CDLL(None, use_errno=True)
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_init1: {os.strerror(errno)}")
+
+        for directory in self.directories:
+            if not os.path.isdir(directory):
+                continue
+            wd = libc.inotify_add_watch(fd, os.fsencode(directory), WATCH_MASK)
+            if wd >= 0:
+                self._watches[wd] = directory
+        if not self._watches:
+            os.close(fd)
+            raise OSError(f"none of {', '.join(self.directories)} exists")
+
+        self._fd = fd
+        self._wakeup = os.pipe()
+        self._thread = threading.Thread(target=self._run, name="config-watch", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the reader thread and close the descriptors"""
+        if self._thread is None:
+            return
+        os.write(self._wakeup[1], b"x")
+        self._thread.join(timeout=2)
+        self._thread = None
+        for fd in (self._fd, *self._wakeup):
+            os.close(fd)
+        self._fd = None
+        self._wakeup = None
+        self._watches = {}
+
+    def _run(self) -> None:
+        while True:
+            ready, _, _ = select.select([self._fd, self._wakeup[0]], [], [])
+            if self._wakeup[0] in ready:
+                return
+            try:
+                data = os.read(self._fd, 65536)
+            except BlockingIOError:
+                continue
+            offset = 0
+            while offset < len(data):
+                wd, _mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b"\0")
+                offset += length
+                directory = self._watches.get(wd)
+                if directory is not None and name:
+                    self.events += 1
+                    self.on_change(os.path.join(directory, os.fsdecode(name)))
@@ -0,0 +1,384 @@
+"""
+Per-application marking rules driven by the foreground window
+
+Rule evaluation is timed on synthetic rule sets against
+``FOREGROUND_RULE_BUDGET_MS``::
+
+    python -m classification_banner.foreground_rules --rules 100 1000 5000
+"""
+
+import argparse
+import ctypes
+import ntpath
+import os
+import random
+import re
+import sys
+import time
+from collections import OrderedDict
+from ctypes import wintypes
+from fnmatch import translate
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+from .constants import FOREGROUND_CACHE_SIZE, FOREGROUND_RULE_BUDGET_MS
+from .marking import render as render_marking
+from . import event_log, win32
+
+# Rule fields in precedence order
+RULE_FIELDS = ("process", "class", "title")
+
+
+class MarkingRule(NamedTuple):
+    """A single foreground rule, e.g. ``process:mstsc.exe=SECRET``"""
+
+    field: str
+    pattern: str
+    marking: str
+
+
+class Marking(NamedTuple):
+    """Resolved banner text and colors for a marking"""
+
+    text: str
+    bg: str
+    fg: str
+
+
+def parse_rules(lines: List[str]) -> List[MarkingRule]:
+    """Parse ``field:pattern=MARKING`` lines, skipping malformed entries"""
+    rules: List[MarkingRule] = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith(";"):
+            continue
+        try:
+            selector, marking = line.rsplit("=", 1)
+            field, pattern = selector.split(":", 1)
+        except ValueError:
+            event_log.warning("foreground", f"Ignoring malformed marking rule: {line}")
+            continue
+        field = field.strip().lower()
+        if field not in RULE_FIELDS or not pattern or not marking.strip():
+            event_log.warning("foreground", f"Ignoring malformed marking rule: {line}")
+            continue
+        marking = marking.strip().upper()
+        problems = render_marking(marking).problems
+        if problems:
+            # Still used; the banner shows the fail-safe marking
+            event_log.warning("foreground", f"Marking rule {line}: {'; '.join(problems)}")
+        rules.append(MarkingRule(field, pattern.strip(), marking))
+    return rules
+
+
+def resolve_marking(marking: str) -> Marking:
+    """Map a rule marking such as ``SECRET//NOFORN`` to banner text and colors"""
+    rendered = render_marking(marking)
+    return Marking(rendered.text, rendered.bg, rendered.fg)
+
+
+def _literals(pattern: str) -> List[str]:
+    """Runs of literal text in a glob: every match contains each of them"""
+    runs = re.split(r"\[!?\]?[^\]]*\]|[*?\[]", pattern)
+    return [run for run in runs if run]
+
+
+class _GlobIndex:
+    """Glob rules of one field, indexed by a three-character substring
+
+    Each glob is filed under one trigram of its literal text (the one
+    shared by the fewest globs so far). A lookup only tests the globs
+    filed under a trigram of the value, plus those too short to file;
+    ``tested`` counts the globs tested.
+    """
+
+    def __init__(self, rules: List[Tuple[int, MarkingRule]]):
+        # (position in the rule list, compiled glob, marking), in rule order
+        self.globs = [
+            (position, re.compile(translate(rule.pattern.lower()), re.DOTALL), rule.marking)
+            for position, rule in rules
+        ]
+        self.by_trigram: Dict[str, List[int]] = {}
+        self.unfiled: List[int] = []
+        self.tested = 0
+        for i, (_, rule) in enumerate(rules):
+            trigrams = [
+                run[j:j + 3]
+                for run in _literals(rule.pattern.lower())
+                for j in range(len(run) - 2)
+            ]
+            if not trigrams:
+                self.unfiled.append(i)
+                continue
+            trigram = min(trigrams, key=lambda t: len(self.by_trigram.get(t, ())))
+            self.by_trigram.setdefault(trigram, []).append(i)
+
+    def first_match(self, value: str, before: int) -> Optional[Tuple[int, str]]:
+        """``(position, marking)`` of the first glob matching ``value`` that
+        comes before rule ``before``"""
+        candidates = set(self.unfiled)
+        by_trigram = self.by_trigram
+        for j in range(len(value) - 2):
+            filed = by_trigram.get(value[j:j + 3])
+            if filed:
+                candidates.update(filed)
+        for i in sorted(candidates):
+            position, glob, marking = self.globs[i]
+            if position >= before:
+                break
+            self.tested += 1
+            if glob.match(value):
+                return position, marking
+        return None
+
+
+class RuleIndex:
+    """Compiled lookup structure for foreground marking rules
+
+    Process image names and window classes without wildcards are stored in
+    dictionaries. Globs (and all title rules) are indexed by a substring
+    their matches must contain, so a lookup only tests the few globs that
+    could match, however many rules there are. The first matching rule wins
+    within a field, whether exact or a glob (both keep the rule's position
+    in the list); process beats class beats title.
+    """
+
+    def __init__(self, rules: List[MarkingRule]):
+        self.rule_count = len(rules)
+        # (position in the rule list, marking)
+        self._exact: Dict[str, Dict[str, Tuple[int, str]]] = {f: {} for f in RULE_FIELDS}
+
+        globs: Dict[str, List[Tuple[int, MarkingRule]]] = {f: [] for f in RULE_FIELDS}
+        for position, rule in enumerate(rules):
+            key = rule.pattern.lower()
+            if rule.field != "title" and not any(c in key for c in "*?["):
+                # Keep the first definition: the first matching rule wins
+                self._exact[rule.field].setdefault(key, (position, rule.marking))
+            else:
+                globs[rule.field].append((position, rule))
+        self._globs = {field: _GlobIndex(field_rules) for field, field_rules in globs.items()}
+
+    def match_field(self, field: str, value: str) -> Optional[str]:
+        """Return the marking for the first rule matching one field"""
+        if not value:
+            return None
+        value = value.lower()
+        exact = self._exact[field].get(value)
+        # Only a glob listed before the exact rule can take precedence
+        best = self._globs[field].first_match(value, exact[0] if exact else self.rule_count) or exact
+        return best[1] if best is not None else None
+
+    def lookup(self, process: str, window_class: str, title: str) -> Optional[str]:
+        """Return the marking for a window, or None to use the machine default"""
+        return (
+            self.match_field("process", process)
+            or self.match_field("class", window_class)
+            or self.match_field("title", title)
+        )
+
+
+class _CacheEntry(NamedTuple):
+    process: str
+    window_class: str
+    title: str
+    marking: Optional[str]
+
+
+class ForegroundMarkingResolver:
+    """Resolves markings per window handle with a bounded per-HWND cache
+
+    Process image and window class never change for a live HWND, so they are
+    only queried on the first sighting. The title is re-read on every lookup
+    and the rules are re-evaluated only when it differs from the cached one.
+    """
+
+    def __init__(self, index: RuleIndex, window_info: "WindowInfoSource",
+                 cache_size: int = FOREGROUND_CACHE_SIZE):
+        self.index = index
+        self.window_info = window_info
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[int, _CacheEntry]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def resolve(self, hwnd: int) -> Optional[str]:
+        """Return the marking for the given foreground window"""
+        title = self.window_info.get_title(hwnd)
+        entry = self._cache.get(hwnd)
+        if entry is not None:
+            self._cache.move_to_end(hwnd)
+            if entry.title == title:
+                self.hits += 1
+                return entry.marking
+            process, window_class = entry.process, entry.window_class
+        else:
+            process = self.window_info.get_process_image(hwnd)
+            window_class = self.window_info.get_class_name(hwnd)
+
+        self.misses += 1
+        marking = self.index.lookup(process, window_class, title)
+        self._cache[hwnd] = _CacheEntry(process, window_class, title, marking)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return marking
+
+    def forget(self, hwnd: int) -> None:
+        """Drop a window from the cache (e.g. after it is destroyed)"""
+        self._cache.pop(hwnd, None)
+
+
+class WindowInfoSource:
+    """Reads process image, class name and title for a window via user32"""
+
+    PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+
+    def __init__(self):
+        self._win32 = win32.api()
+        self._buffer = ctypes.create_unicode_buffer(512)
+
+    def get_process_id(self, hwnd: int) -> int:
+        """Get the owning process id of a window"""
+        pid = wintypes.DWORD()
+        self._win32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
+        return pid.value
+
+    def get_process_image(self, hwnd: int) -> str:
+        """Get the executable file name (e.g. ``mstsc.exe``) of a window"""
+        handle = self._win32.OpenProcess(
+            self.PROCESS_QUERY_LIMITED_INFORMATION, False, self.get_process_id(hwnd))
+        if not handle:
+            return ""
+        try:
+            size = wintypes.DWORD(len(self._buffer))
+            if not self._win32.QueryFullProcessImageNameW(
+                    handle, 0, self._buffer, ctypes.byref(size)):
+                return ""
+            return ntpath.basename(self._buffer.value)
+        finally:
+            self._win32.CloseHandle(handle)
+
+    def get_class_name(self, hwnd: int) -> str:
+        """Get the window class name"""
+        length = self._win32.GetClassNameW(hwnd, self._buffer, len(self._buffer))
+        return self._buffer.value[:length]
+
+    def get_title(self, hwnd: int) -> str:
+        """Get the window title"""
+        length = self._win32.GetWindowTextW(hwnd, self._buffer, len(self._buffer))
+        return self._buffer.value[:length]
+
+
+class ForegroundTracker:
+    """Calls back with the resolved marking whenever the foreground changes
+
+    Uses an out-of-context WinEvent hook, which is delivered through the
+    thread's message queue and therefore runs inside the Tk mainloop.
+    """
+
+    EVENT_SYSTEM_FOREGROUND = 0x0003
+    EVENT_OBJECT_NAMECHANGE = 0x800C
+    EVENT_OBJECT_DESTROY = 0x8001
+    WINEVENT_OUTOFCONTEXT = 0x0000
+    OBJID_WINDOW = 0
+
+    def __init__(self, rules: List[MarkingRule], on_change: Callable[[Optional[str]], Any]):
+        self.window_info = WindowInfoSource()
+        self.resolver = ForegroundMarkingResolver(RuleIndex(rules), self.window_info)
+        self.on_change = on_change
+        self.current_marking: Optional[str] = None
+        self._foreground: int = 0
+        self._hooks: List[int] = []
+
+        # Keep a reference to the callback for as long as the hooks exist
+        self._proc = win32.WINEVENTPROC(self._on_event)
+        self._win32 = win32.api()
+
+    def start(self) -> None:
+        """Install the WinEvent hooks and evaluate the current foreground
+
+        Raises OSError, with no hook left installed, if any hook fails.
+        """
+        for event in (self.EVENT_SYSTEM_FOREGROUND, self.EVENT_OBJECT_NAMECHANGE,
+                      self.EVENT_OBJECT_DESTROY):
+            hook = self._win32.SetWinEventHook(
+                event, event, None, self._proc, 0, 0, self.WINEVENT_OUTOFCONTEXT)
+            if not hook:
+                error = win32.win_error()
+                self.stop()
+                raise error
+            self._hooks.append(hook)
+        self._evaluate(self._win32.GetForegroundWindow() or 0)
+
+    def stop(self) -> None:
+        """Remove the WinEvent hooks"""
+        for hook in self._hooks:
+            self._win32.UnhookWinEvent(hook)
+        self._hooks = []
+
+    def _on_event(self, _hook, event, hwnd, id_object, _id_child, _thread, _time):
+        if not hwnd or id_object != self.OBJID_WINDOW:
+            return
+        if event == self.EVENT_OBJECT_DESTROY:
+            self.resolver.forget(hwnd)
+        elif event == self.EVENT_SYSTEM_FOREGROUND:
+            self._evaluate(hwnd)
+        elif hwnd == self._foreground:
+            # Title of the foreground window changed (e.g. browser tab switch)
+            self._evaluate(hwnd)
+
+    def _evaluate(self, hwnd: int) -> None:
+        if not hwnd or self.window_info.get_process_id(hwnd) == os.getpid():
+            # Ignore focus moving onto the banner itself
+            return
+        self._foreground = hwnd
+        try:
+            marking = self.resolver.resolve(hwnd)
+        except OSError as e:
+            event_log.error("foreground", f"Error resolving foreground marking: {e}")
+            return
+        if marking != self.current_marking:
+            self.current_marking = marking
+            self.on_change(marking)
+
+
+def synthetic_rules(count: int, seed: int = 0) -> List[MarkingRule]:
+    """``count`` rules over all fields, a third of them globs"""
+    rng = random.Random(seed)
+    markings = ("UNCLASSIFIED", "CONFIDENTIAL", "SECRET", "TOP SECRET")
+    rules = []
+    for i in range(count):
+        field = RULE_FIELDS[i % len(RULE_FIELDS)]
+        if field == "title" or i % 3 == 0:
+            pattern = f"*{field}{i}-{rng.randrange(10**6)}*"
+        else:
+            pattern = f"{field}{i}.exe" if field == "process" else f"Class{i}"
+        rules.append(MarkingRule(field, pattern, rng.choice(markings)))
+    return rules
+
+
+def time_lookup(rules: List[MarkingRule], lookups: int = 2000) -> float:
+    """Milliseconds per uncached lookup that no rule matches (the slowest case)"""
+    index = RuleIndex(rules)
+    started = time.perf_counter()
+    for i in range(lookups):
+        index.lookup(f"unlisted{i}.exe", f"UnlistedClass{i}", f"Untitled document {i} - Editor")
+    return (time.perf_counter() - started) / lookups * 1000
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Time rule evaluation; exit status 1 when a lookup exceeds its budget"""
+    parser = argparse.ArgumentParser(description="Time foreground rule evaluation")
+    parser.add_argument("--rules", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    failures = 0
+    for count in args.rules:
+        per_lookup = time_lookup(synthetic_rules(count), args.lookups)
+        within = per_lookup <= FOREGROUND_RULE_BUDGET_MS
+        failures += not within
+        print(f"{count:>6} rules: {per_lookup:.4f} ms/lookup "
+              f"({'within' if within else 'OVER'} budget {FOREGROUND_RULE_BUDGET_MS:g} ms)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+"""
+Idle wakeup budget check on a virtual clock
+
+Runs ClassificationBanner against fake backends with nothing changing and
+counts, per simulated hour, the timer callbacks, registry reads, monitor
+enumerations and z-order (keep-on-top) calls. Any count above its budget in
+constants.py fails the check. Both raise paths are measured: occlusion
+auditing against a fake window source, and the blind keep-on-top timer used
+when the backend has no window source::
+
+    python -m classification_banner.idle_budget --monitors 1 2 4
+"""
+
+import argparse
+import sys
+from typing import Dict, List, NamedTuple, Optional
+from .banner import ClassificationBanner
+from .constants import (
+    IDLE_BUDGET_BLIND_RAISES,
+    IDLE_BUDGET_BLIND_ZORDER_CALLS_PER_MONITOR,
+    IDLE_BUDGET_MONITOR_ENUMERATIONS,
+    IDLE_BUDGET_OTHER_CALLBACKS,
+    IDLE_BUDGET_REGISTRY_READS,
+    IDLE_BUDGET_VISIBILITY_CHECKS,
+    IDLE_BUDGET_ZORDER_CALLS_PER_MONITOR,
+)
+from .fakes import (
+    FakeMonitorManager,
+    FakeRegistryManager,
+    FakeWindowFactory,
+    FakeWindowSource,
+    make_monitor_row,
+)
+from .scheduler import VirtualScheduler
+
+HOUR_MS = 3600 * 1000
+
+IDLE_SETTINGS = {
+    "Classification": "SECRET",
+    "BackgroundColor": "#FF0000",
+    "TextColor": "#000000",
+    "Enabled": 1,
+    "FPCON": "Alpha",
+    "CPCON": "1",
+}
+
+
+class WakeupReport(NamedTuple):
+    """Counts per simulated hour"""
+
+    monitors: int
+    callbacks: float
+    registry_reads: float
+    monitor_enumerations: float
+    zorder_calls: float
+    by_timer: Dict[str, float]
+    audited: bool = True
+
+
+def measure_idle(monitors: int = 1, hours: float = 1.0, warmup_ms: int = 10 * 60 * 1000,
+                 settings: Optional[Dict[str, object]] = None, audited: bool = True) -> WakeupReport:
+    """Run idle for ``hours`` after ``warmup_ms`` and return hourly rates
+
+    With ``audited`` false there is no window source, so the banner falls
+    back to the blind keep-on-top timer.
+    """
+    scheduler = VirtualScheduler()
+    factory = FakeWindowFactory(scheduler)
+    registry = FakeRegistryManager(settings or IDLE_SETTINGS)
+    monitor_manager = FakeMonitorManager(make_monitor_row(monitors))
+    ClassificationBanner(
+        registry_manager=registry,
+        monitor_manager=monitor_manager,
+        scheduler=scheduler,
+        window_factory=factory,
+        window_source=FakeWindowSource(factory) if audited else None,
+    )
+
+    scheduler.advance(warmup_ms)
+    fired = dict(scheduler.fired)
+    reads, enumerations, zorder = registry.calls, monitor_manager.calls, factory.keep_on_top_calls
+
+    duration = int(hours * HOUR_MS)
+    scheduler.advance(duration)
+    scale = HOUR_MS / duration
+    by_timer = {
+        name: (count - fired.get(name, 0)) * scale
+        for name, count in scheduler.fired.items()
+    }
+    return WakeupReport(
+        monitors=monitors,
+        callbacks=sum(by_timer.values()),
+        registry_reads=(registry.calls - reads) * scale,
+        monitor_enumerations=(monitor_manager.calls - enumerations) * scale,
+        zorder_calls=(factory.keep_on_top_calls - zorder) * scale,
+        by_timer=by_timer,
+        audited=audited,
+    )
+
+
+def budget_for(monitors: int, audited: bool = True) -> Dict[str, float]:
+    """Declared hourly budgets for a layout with ``monitors`` monitors"""
+    if audited:
+        zorder = IDLE_BUDGET_ZORDER_CALLS_PER_MONITOR * monitors
+        raises = IDLE_BUDGET_VISIBILITY_CHECKS + zorder
+    else:
+        # The z-order calls come from the one keep-on-top timer
+        zorder = IDLE_BUDGET_BLIND_ZORDER_CALLS_PER_MONITOR * monitors
+        raises = IDLE_BUDGET_BLIND_RAISES
+    return {
+        "registry_reads": IDLE_BUDGET_REGISTRY_READS,
+        "monitor_enumerations": IDLE_BUDGET_MONITOR_ENUMERATIONS,
+        "zorder_calls": zorder,
+        "callbacks": IDLE_BUDGET_REGISTRY_READS + IDLE_BUDGET_MONITOR_ENUMERATIONS
+        + raises + IDLE_BUDGET_OTHER_CALLBACKS,
+    }
+
+
+def check_budget(report: WakeupReport) -> List[str]:
+    """Return one message per counter above its budget"""
+    return [
+        f"{report.monitors} monitor(s){'' if report.audited else ' without a window source'}: "
+        f"{name} {getattr(report, name):.0f}/h exceeds budget {limit:.0f}/h"
+        for name, limit in budget_for(report.monitors, report.audited).items()
+        if getattr(report, name) > limit
+    ]
+
+
+def format_report(report: WakeupReport) -> str:
+    """One line of hourly rates for the command line"""
+    timers = ", ".join(f"{k}={v:.0f}" for k, v in sorted(report.by_timer.items()))
+    path = "audited" if report.audited else "blind"
+    return (f"{report.monitors} monitor(s), {path}: callbacks={report.callbacks:.0f}/h "
+            f"registry={report.registry_reads:.0f}/h "
+            f"monitors={report.monitor_enumerations:.0f}/h "
+            f"zorder={report.zorder_calls:.0f}/h ({timers})")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Check idle budgets; exit status 1 when any is exceeded"""
+    parser = argparse.ArgumentParser(description="Check idle wakeup budgets")
+    parser.add_argument("--monitors", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--hours", type=float, default=1.0)
+    args = parser.parse_args(argv)
+
+    failures: List[str] = []
+    for monitors in args.monitors:
+        for audited in (True, False):
+            report = measure_idle(monitors, args.hours, audited=audited)
+            print(format_report(report))
+            failures.extend(check_budget(report))
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
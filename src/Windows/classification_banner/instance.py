@@ -0,0 +1,345 @@
+"""
+Single-instance guard and local control channel
+
+A GPO logon script and a Run key can both start the banner; each copy would
+run every poll loop and register its own AppBars. ``InstanceLock`` holds an
+exclusive lock on a per-session lock file for the life of the process (the
+operating system drops it if the process dies), so one banner runs per
+logon session (per X display on Linux).
+
+The running instance listens on a local channel (a named pipe on Windows, a
+Unix socket elsewhere, via multiprocessing.connection). Its address and a
+random key are written to a channel file next to the lock, readable by the
+user only; a client without the key is refused. Each connection is served
+on its own short-lived thread, so a client that stalls in the handshake or
+never sends its request cannot hold up the others. Requests and replies are
+JSON. Commands run on the Tk thread:
+
+- ``reload``: check the settings now instead of at the next poll; a second
+  launch sends this and exits
+- ``status``: version, uptime, monitors, windows and the marking shown
+- ``metrics``: update bus, poller and rebuild counters, process resources
+
+From the command line::
+
+    ClassificationBanner.exe --reload | --status | --metrics
+"""
+
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from ctypes import byref, wintypes
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection, Listener, answer_challenge, deliver_challenge
+from typing import Any, Callable, Dict, Optional, TextIO
+from .constants import (
+    CONTROL_CONNECT_TIMEOUT,
+    CONTROL_MAX_CLIENTS,
+    CONTROL_REPLY_TIMEOUT,
+    CONTROL_REQUEST_TIMEOUT,
+    INSTANCE_NAME,
+)
+from . import event_log, win32
+
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
+
+COMMANDS = ("reload", "status", "metrics")
+
+
+def session_id() -> str:
+    """Logon session (Windows) or X display the lock is scoped to"""
+    if sys.platform == "win32":
+        session = wintypes.DWORD()
+        try:
+            win32.api().ProcessIdToSessionId(os.getpid(), byref(session))
+        except OSError:
+            return "0"
+        return str(session.value)
+    display = os.environ.get("DISPLAY", "")
+    return re.sub(r"[^A-Za-z0-9]+", "_", display).strip("_") or "0"
+
+
+def runtime_directory() -> str:
+    """Per-user directory for the lock and channel files"""
+    if sys.platform == "win32":
+        return event_log.log_directory()
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime and os.path.isdir(runtime):
+        return runtime
+    directory = os.path.join(tempfile.gettempdir(), f"{INSTANCE_NAME}-{os.getuid()}")
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    return directory
+
+
+def instance_path(suffix: str, directory: Optional[str] = None) -> str:
+    """``<directory>/ClassificationBanner-<session>.<suffix>``"""
+    return os.path.join(directory or runtime_directory(), f"{INSTANCE_NAME}-{session_id()}.{suffix}")
+
+
+class InstanceLock:
+    """Exclusive per-session lock, held until ``release()`` or process exit"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or instance_path("lock")
+        self._file: Optional[TextIO] = None
+
+    @property
+    def held(self) -> bool:
+        return self._file is not None
+
+    def acquire(self) -> bool:
+        """Take the lock; False if another instance holds it"""
+        if self._file is not None:
+            return True
+        lock_file = open(self.path, "a+")
+        try:
+            if sys.platform == "win32":
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._file = lock_file
+        return True
+
+    def release(self) -> None:
+        """Let another instance start"""
+        if self._file is None:
+            return
+        try:
+            if sys.platform == "win32":
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        except OSError:
+            pass
+        self._file.close()
+        self._file = None
+
+
+# Replies to each command, given the banner; run on the Tk thread
+
+def reload(banner: Any) -> Dict[str, Any]:
+    """Check the settings now"""
+    return banner.reload_settings()
+
+
+def status(banner: Any) -> Dict[str, Any]:
+    """What the banner is showing"""
+    from . import __version__
+    settings = banner.settings
+    return {
+        "version": __version__,
+        "pid": os.getpid(),
+        "backend": banner.backend.name,
+        "enabled": bool(settings.enabled),
+        "marking": settings.classification_text,
+        "threat_levels": banner.threat_text,
+        "edges": settings.edges,
+        "monitors": [
+            {"id": identity, "x": w.monitor.x, "y": w.monitor.y,
+             "width": w.monitor.width, "height": w.monitor.height}
+            for identity, w in banner.windows_by_id.items()
+        ],
+        "invalid_values": [name for name, _ in settings.invalid_values],
+    }
+
+
+def metrics(banner: Any) -> Dict[str, Any]:
+    """Counters since startup"""
+    from .leak_detector import ResourceSampler
+    return {
+        "update_bus": banner.update_bus.metrics(),
+        "registry_interval_ms": banner.registry_poller.current_interval,
+        "rebuilds": banner.rebuild_count,
+        "in_place_updates": banner.in_place_updates,
+        "monitor_updates": banner.monitor_updates,
+        "avoided_rebuilds": banner.avoided_rebuilds,
+        "config_events": banner.config_events,
+        "monitor_events": banner.monitor_events,
+        "threat_updates": banner.threat_updates,
+        "resources": ResourceSampler().sample(banner.roots())._asdict(),
+    }
+
+
+HANDLERS: Dict[str, Callable[[Any], Dict[str, Any]]] = {
+    "reload": reload,
+    "status": status,
+    "metrics": metrics,
+}
+
+
+class ControlServer:
+    """Serves control requests for ``banner`` on a daemon thread
+
+    ``call_idle`` runs a callback on the Tk thread (the banner scheduler's
+    by default) and returns False if it could not.
+    """
+
+    def __init__(self, banner: Any, channel_path: Optional[str] = None,
+                 call_idle: Optional[Callable[..., bool]] = None,
+                 reply_timeout: float = CONTROL_REPLY_TIMEOUT,
+                 request_timeout: float = CONTROL_REQUEST_TIMEOUT,
+                 max_clients: int = CONTROL_MAX_CLIENTS):
+        self.banner = banner
+        self.channel_path = channel_path or instance_path("channel")
+        self.call_idle = call_idle or banner.scheduler.call_idle
+        self.reply_timeout = reply_timeout
+        self.request_timeout = request_timeout
+        self.requests = 0
+        self.refused = 0
+        self.timed_out = 0
+        self._closed = False
+        self._counters = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_clients)
+
+        # The handshake runs on each client's thread, not in accept()
+        self._authkey = os.urandom(32)
+        self.listener = Listener(None)
+        self._write_channel(self.listener.address, self._authkey)
+        self._thread = threading.Thread(target=self._serve, name="control", daemon=True)
+        self._thread.start()
+
+    def _write_channel(self, address: str, authkey: bytes) -> None:
+        data = json.dumps({"pid": os.getpid(), "address": address, "authkey": authkey.hex()})
+        # Owner-only from the start: the key is the only credential
+        fd = os.open(self.channel_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as channel:
+            channel.write(data)
+
+    def _serve(self) -> None:
+        while not self._closed:
+            try:
+                conn = self.listener.accept()
+            except OSError:
+                if self._closed:
+                    return
+                continue
+            if self._closed:
+                conn.close()
+                return
+            if not self._slots.acquire(blocking=False):
+                event_log.warning("instance", "Too many control clients; dropping a connection")
+                conn.close()
+                continue
+            threading.Thread(target=self._serve_client, args=(conn,), name="control-client",
+                             daemon=True).start()
+
+    def _serve_client(self, conn: Connection) -> None:
+        """Authenticate one connection and answer its request"""
+        try:
+            with conn:
+                if self._authenticate(conn):
+                    self._handle(conn)
+        finally:
+            self._slots.release()
+
+    def _count(self, counter: str) -> None:
+        with self._counters:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _authenticate(self, conn: Connection) -> bool:
+        """The challenge/response Listener(authkey=...) would run in accept()"""
+        try:
+            deliver_challenge(conn, self._authkey)
+            answer_challenge(conn, self._authkey)
+        except AuthenticationError:
+            self._count("refused")
+            return False
+        except (EOFError, OSError):
+            # The client hung up during the handshake
+            return False
+        return True
+
+    def _handle(self, conn: Connection) -> None:
+        try:
+            if not conn.poll(self.request_timeout):
+                self._count("timed_out")
+                event_log.warning("instance", f"No control request within {self.request_timeout:g} s")
+                return
+            request = json.loads(conn.recv_bytes(4096))
+            command = request.get("command")
+            self._count("requests")
+            if command not in HANDLERS:
+                reply = {"ok": False, "error": f"unknown command {command!r}"}
+            else:
+                reply = self._run_on_ui(command)
+            conn.send_bytes(json.dumps(reply, default=str).encode("utf-8"))
+        except (EOFError, OSError, ValueError, AttributeError) as e:
+            event_log.warning("instance", f"Bad control request: {e}")
+
+    def _run_on_ui(self, command: str) -> Dict[str, Any]:
+        done = threading.Event()
+        reply: Dict[str, Any] = {"ok": False, "error": "banner is not running"}
+
+        def run():
+            try:
+                reply.update(ok=True, command=command, result=HANDLERS[command](self.banner))
+                reply.pop("error")
+            except Exception as e:
+                reply["error"] = f"{command} failed: {e}"
+                event_log.error("instance", reply["error"])
+            finally:
+                done.set()
+
+        if not self.call_idle(run):
+            return reply
+        if not done.wait(self.reply_timeout):
+            return {"ok": False, "error": f"no reply within {self.reply_timeout:g} s"}
+        event_log.info("instance", f"Control command {command!r} served")
+        return reply
+
+    def close(self) -> None:
+        """Stop listening and remove the channel file"""
+        if self._closed:
+            return
+        self._closed = True
+        # Closing the listener does not interrupt a blocked accept(); a
+        # connection does, and the thread then sees it is closed
+        try:
+            Client(self.listener.address).close()
+        except OSError:
+            pass
+        self.listener.close()
+        if threading.current_thread() is not self._thread:
+            self._thread.join(timeout=1.0)
+        try:
+            with open(self.channel_path) as channel:
+                mine = json.load(channel).get("pid") == os.getpid()
+            if mine:
+                os.remove(self.channel_path)
+        except (OSError, ValueError):
+            pass
+
+
+def send_command(command: str, channel_path: Optional[str] = None,
+                 timeout: float = CONTROL_CONNECT_TIMEOUT) -> Dict[str, Any]:
+    """Send ``command`` to the running instance and return its reply
+
+    Retries for up to ``timeout`` seconds while the instance is starting
+    (no channel file yet, or a stale one). Raises ConnectionError if no
+    instance answers.
+    """
+    channel_path = channel_path or instance_path("channel")
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with open(channel_path) as channel:
+                info = json.load(channel)
+            with Client(info["address"], authkey=bytes.fromhex(info["authkey"])) as conn:
+                conn.send_bytes(json.dumps({"command": command}).encode("utf-8"))
+                return json.loads(conn.recv_bytes())
+        except (OSError, EOFError, ValueError, KeyError, AuthenticationError) as e:
+            if time.monotonic() >= deadline:
+                raise ConnectionError(f"no running banner answered on {channel_path}: {e}") from e
+            time.sleep(0.1)
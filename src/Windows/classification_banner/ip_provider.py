@@ -0,0 +1,330 @@
+"""
+Event-driven IP address tracking for the system info panel
+"""
+
+import ctypes
+import socket
+import threading
+from ctypes import wintypes
+from fnmatch import fnmatch
+from typing import Any, Callable, List, NamedTuple, Optional
+from .constants import DEFAULT_IP_ADDRESS_ADAPTER, DEFAULT_IP_ADDRESS_FAMILY
+from . import event_log
+
+AF_UNSPEC = 0
+ERROR_BUFFER_OVERFLOW = 111
+IF_TYPE_SOFTWARE_LOOPBACK = 24
+IF_OPER_STATUS_UP = 1
+GAA_FLAGS = 0x0002 | 0x0004 | 0x0008 | 0x0080  # skip anycast/multicast/dns, include gateways
+
+
+class AdapterAddress(NamedTuple):
+    """One unicast address of a network adapter"""
+
+    adapter: str
+    family: str  # "ipv4" or "ipv6"
+    address: str
+    is_up: bool = True
+    is_loopback: bool = False
+    has_gateway: bool = False
+
+
+class AddressPolicy:
+    """Selects the address to display from all adapter addresses
+
+    ``family`` is ``ipv4``, ``ipv6`` or ``any``; ``adapter`` is a glob matched
+    against the adapter's friendly name (e.g. ``Ethernet*``). Adapters that
+    are up and have a default gateway are preferred, loopback is never shown,
+    and IPv6 link-local addresses are skipped.
+    """
+
+    def __init__(self, family: str = DEFAULT_IP_ADDRESS_FAMILY,
+                 adapter: str = DEFAULT_IP_ADDRESS_ADAPTER):
+        self.family = (family or DEFAULT_IP_ADDRESS_FAMILY).lower()
+        self.adapter = adapter or DEFAULT_IP_ADDRESS_ADAPTER
+
+    def select(self, addresses: List[AdapterAddress]) -> str:
+        """Return the preferred address, or an empty string"""
+        candidates = [
+            a for a in addresses
+            if a.is_up
+            and not a.is_loopback
+            and not a.address.lower().startswith("fe80:")
+            and (self.family == "any" or a.family == self.family)
+            and fnmatch(a.adapter.lower(), self.adapter.lower())
+        ]
+        if not candidates:
+            return ""
+        # Stable sort keeps the OS adapter order among equally ranked entries
+        candidates.sort(key=lambda a: (not a.has_gateway, a.family != "ipv4"))
+        return candidates[0].address
+
+
+class SocketAddressSource:
+    """Fallback source using the routing table's choice for an outbound socket"""
+
+    def enumerate(self) -> List[AdapterAddress]:
+        """Return the primary IPv4 address as a single entry"""
+        try:
+            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            s.settimeout(0.1)
+            try:
+                s.connect(("10.254.254.254", 1))
+                ip: str = s.getsockname()[0]
+            except OSError:
+                ip = socket.gethostbyname(socket.gethostname())
+            finally:
+                s.close()
+        except OSError:
+            return []
+        return [AdapterAddress("primary", "ipv4", ip, has_gateway=True)]
+
+
+class StaticAddressSource:
+    """Address source returning a fixed list, for tests and replays"""
+
+    def __init__(self, addresses: Optional[List[AdapterAddress]] = None):
+        self.addresses: List[AdapterAddress] = list(addresses or [])
+        self.calls = 0
+
+    def enumerate(self) -> List[AdapterAddress]:
+        """Return the configured addresses"""
+        self.calls += 1
+        return list(self.addresses)
+
+
+class _SOCKET_ADDRESS(ctypes.Structure):
+    _fields_ = [("lpSockaddr", ctypes.c_void_p), ("iSockaddrLength", ctypes.c_int)]
+
+
+class _IP_ADAPTER_UNICAST_ADDRESS(ctypes.Structure):
+    pass
+
+
+_IP_ADAPTER_UNICAST_ADDRESS._fields_ = [
+    ("Length", wintypes.ULONG),
+    ("Flags", wintypes.DWORD),
+    ("Next", ctypes.POINTER(_IP_ADAPTER_UNICAST_ADDRESS)),
+    ("Address", _SOCKET_ADDRESS),
+]
+
+
+class _IP_ADAPTER_ADDRESSES(ctypes.Structure):
+    """Leading fields of IP_ADAPTER_ADDRESSES_LH up to FirstGatewayAddress"""
+
+
+_IP_ADAPTER_ADDRESSES._fields_ = [
+    ("Length", wintypes.ULONG),
+    ("IfIndex", wintypes.DWORD),
+    ("Next", ctypes.POINTER(_IP_ADAPTER_ADDRESSES)),
+    ("AdapterName", ctypes.c_char_p),
+    ("FirstUnicastAddress", ctypes.POINTER(_IP_ADAPTER_UNICAST_ADDRESS)),
+    ("FirstAnycastAddress", ctypes.c_void_p),
+    ("FirstMulticastAddress", ctypes.c_void_p),
+    ("FirstDnsServerAddress", ctypes.c_void_p),
+    ("DnsSuffix", ctypes.c_wchar_p),
+    ("Description", ctypes.c_wchar_p),
+    ("FriendlyName", ctypes.c_wchar_p),
+    ("PhysicalAddress", ctypes.c_ubyte * 8),
+    ("PhysicalAddressLength", wintypes.ULONG),
+    ("Flags", wintypes.ULONG),
+    ("Mtu", wintypes.ULONG),
+    ("IfType", wintypes.DWORD),
+    ("OperStatus", ctypes.c_int),
+    ("Ipv6IfIndex", wintypes.DWORD),
+    ("ZoneIndices", wintypes.ULONG * 16),
+    ("FirstPrefix", ctypes.c_void_p),
+    ("TransmitLinkSpeed", ctypes.c_uint64),
+    ("ReceiveLinkSpeed", ctypes.c_uint64),
+    ("FirstWinsServerAddress", ctypes.c_void_p),
+    ("FirstGatewayAddress", ctypes.c_void_p),
+]
+
+
+def _sockaddr_to_text(address: _SOCKET_ADDRESS) -> Optional[tuple[str, str]]:
+    """Decode a SOCKADDR into (family, text)"""
+    raw = ctypes.string_at(address.lpSockaddr, address.iSockaddrLength)
+    family = int.from_bytes(raw[0:2], "little")
+    if family == socket.AF_INET:
+        return "ipv4", socket.inet_ntop(socket.AF_INET, raw[4:8])
+    if family == socket.AF_INET6:
+        return "ipv6", socket.inet_ntop(socket.AF_INET6, raw[8:24])
+    return None
+
+
+class Win32AddressSource:
+    """Enumerates adapter addresses with GetAdaptersAddresses"""
+
+    def __init__(self):
+        self._iphlpapi = ctypes.WinDLL("iphlpapi")
+        self._iphlpapi.GetAdaptersAddresses.argtypes = [
+            wintypes.ULONG, wintypes.ULONG, ctypes.c_void_p,
+            ctypes.c_void_p, ctypes.POINTER(wintypes.ULONG)]
+        self._iphlpapi.GetAdaptersAddresses.restype = wintypes.ULONG
+        self._buffer_size = 16 * 1024
+
+    def enumerate(self) -> List[AdapterAddress]:
+        """Return all unicast addresses of all adapters"""
+        size = wintypes.ULONG(self._buffer_size)
+        for _ in range(3):
+            buffer = ctypes.create_string_buffer(size.value)
+            result = self._iphlpapi.GetAdaptersAddresses(
+                AF_UNSPEC, GAA_FLAGS, None, buffer, ctypes.byref(size))
+            if result != ERROR_BUFFER_OVERFLOW:
+                break
+        else:
+            # Adapters kept appearing between calls; the provider logs this
+            # and keeps the previous address
+            raise OSError(result, f"GetAdaptersAddresses needed more than {size.value} bytes three times")
+        if result != 0:
+            raise OSError(result, "GetAdaptersAddresses failed")
+        self._buffer_size = max(self._buffer_size, size.value)
+
+        addresses: List[AdapterAddress] = []
+        adapter = ctypes.cast(buffer, ctypes.POINTER(_IP_ADAPTER_ADDRESSES))
+        while adapter:
+            entry = adapter.contents
+            unicast = entry.FirstUnicastAddress
+            while unicast:
+                decoded = _sockaddr_to_text(unicast.contents.Address)
+                if decoded is not None:
+                    addresses.append(AdapterAddress(
+                        adapter=entry.FriendlyName or "",
+                        family=decoded[0],
+                        address=decoded[1],
+                        is_up=entry.OperStatus == IF_OPER_STATUS_UP,
+                        is_loopback=entry.IfType == IF_TYPE_SOFTWARE_LOOPBACK,
+                        has_gateway=bool(entry.FirstGatewayAddress),
+                    ))
+                unicast = unicast.contents.Next
+            adapter = entry.Next
+        return addresses
+
+
+class Win32AddressNotifier:
+    """Subscribes to interface and unicast address change notifications
+
+    Callbacks arrive on a system thread pool thread.
+    """
+
+    def __init__(self):
+        self._iphlpapi = ctypes.WinDLL("iphlpapi")
+        self._handles: List[wintypes.HANDLE] = []
+        self._callback: Optional[Callable[[], Any]] = None
+
+        callback_type = ctypes.WINFUNCTYPE(None, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_int)
+        self._proc = callback_type(self._on_notify)
+        for name in ("NotifyIpInterfaceChange", "NotifyUnicastIpAddressChange"):
+            function = getattr(self._iphlpapi, name)
+            function.argtypes = [wintypes.USHORT, callback_type, ctypes.c_void_p,
+                                 wintypes.BOOLEAN, ctypes.POINTER(wintypes.HANDLE)]
+            function.restype = wintypes.ULONG
+        self._iphlpapi.CancelMibChangeNotify2.argtypes = [wintypes.HANDLE]
+
+    def _on_notify(self, _context, _row, _notification_type):
+        if self._callback is not None:
+            self._callback()
+
+    def subscribe(self, callback: Callable[[], Any]) -> None:
+        """Start delivering change notifications to ``callback``"""
+        self._callback = callback
+        for name in ("NotifyIpInterfaceChange", "NotifyUnicastIpAddressChange"):
+            handle = wintypes.HANDLE()
+            result = getattr(self._iphlpapi, name)(
+                AF_UNSPEC, self._proc, None, False, ctypes.byref(handle))
+            if result != 0:
+                raise OSError(result, f"{name} failed")
+            self._handles.append(handle)
+
+    def unsubscribe(self) -> None:
+        """Cancel all notifications"""
+        for handle in self._handles:
+            self._iphlpapi.CancelMibChangeNotify2(handle)
+        self._handles = []
+        self._callback = None
+
+
+class FakeAddressNotifier:
+    """Notifier driven by hand, for tests on platforms without iphlpapi"""
+
+    def __init__(self):
+        self._callback: Optional[Callable[[], Any]] = None
+
+    def subscribe(self, callback: Callable[[], Any]) -> None:
+        """Remember the callback"""
+        self._callback = callback
+
+    def unsubscribe(self) -> None:
+        """Forget the callback"""
+        self._callback = None
+
+    def notify(self) -> None:
+        """Simulate an interface or address change"""
+        if self._callback is not None:
+            self._callback()
+
+
+class AddressProvider:
+    """Caches the displayed IP address and reports changes
+
+    Adapters are enumerated once at start and again only when the notifier
+    reports a change. ``on_change`` receives the newly selected address and
+    is called on the notifier's thread.
+    """
+
+    def __init__(self, source: Any = None, notifier: Any = None,
+                 policy: Optional[AddressPolicy] = None):
+        self.source = source
+        self.notifier = notifier
+        self.policy = policy or AddressPolicy()
+        self.current: str = ""
+        self.refreshes = 0
+        self._on_change: Optional[Callable[[str], Any]] = None
+        self._lock = threading.Lock()
+
+        if self.source is None:
+            try:
+                self.source = Win32AddressSource()
+            except (AttributeError, OSError):
+                self.source = SocketAddressSource()
+
+    def start(self, on_change: Optional[Callable[[str], Any]] = None) -> str:
+        """Enumerate once, subscribe to changes and return the current address"""
+        self.refresh()
+        self._on_change = on_change
+        if self.notifier is None:
+            try:
+                self.notifier = Win32AddressNotifier()
+            except (AttributeError, OSError) as e:
+                event_log.warning("ip_provider", f"Address change notifications unavailable: {e}")
+        if self.notifier is not None:
+            try:
+                self.notifier.subscribe(self.refresh)
+            except OSError as e:
+                event_log.error("ip_provider", f"Error subscribing to address changes: {e}")
+        return self.current
+
+    def stop(self) -> None:
+        """Unsubscribe from change notifications"""
+        if self.notifier is not None:
+            self.notifier.unsubscribe()
+        self._on_change = None
+
+    def refresh(self) -> None:
+        """Re-enumerate adapters and report if the selected address changed"""
+        try:
+            addresses = self.source.enumerate()
+        except OSError as e:
+            event_log.error("ip_provider", f"Error enumerating adapter addresses: {e}")
+            return
+
+        with self._lock:
+            self.refreshes += 1
+            selected = self.policy.select(addresses)
+            if selected == self.current:
+                return
+            self.current = selected
+            on_change = self._on_change
+
+        if on_change is not None:
+            on_change(selected)
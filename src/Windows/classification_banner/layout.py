@@ -0,0 +1,51 @@
+"""
+Banner placement on the edges of a monitor
+
+``plan_banners`` computes, once per monitor, the rectangle of every banner
+the ``Edges`` setting asks for: the top edge, the bottom edge or both. The
+window, its space reservation (one AppBar transaction for all edges) and
+``--dry-run`` all read the same plan, so the top and bottom banners of a
+monitor cannot disagree about their geometry.
+"""
+
+from typing import Any, Dict, NamedTuple, Tuple
+from .constants import ABE_BOTTOM, ABE_LEFT, ABE_RIGHT, ABE_TOP, DEFAULT_EDGES
+from .visibility import Rect
+
+EDGE_NAMES = {ABE_LEFT: "left", ABE_TOP: "top", ABE_RIGHT: "right", ABE_BOTTOM: "bottom"}
+
+# Values of the Edges setting, top first so the top banner hosts the Tk root
+EDGES: Dict[str, Tuple[int, ...]] = {
+    "top": (ABE_TOP,),
+    "bottom": (ABE_BOTTOM,),
+    "both": (ABE_TOP, ABE_BOTTOM),
+}
+
+
+class Placement(NamedTuple):
+    """One banner on one edge; unpacks as ``reserve_space`` arguments"""
+
+    x: int
+    y: int
+    width: int
+    height: int
+    edge: int
+
+    @property
+    def rect(self) -> Rect:
+        """Screen rectangle"""
+        return Rect(self.x, self.y, self.x + self.width, self.y + self.height)
+
+    @property
+    def geometry(self) -> str:
+        """Tk geometry string"""
+        return f"{self.width}x{self.height}+{self.x}+{self.y}"
+
+
+def plan_banners(monitor: Any, height: int, edges: str = DEFAULT_EDGES) -> Tuple[Placement, ...]:
+    """Placements of a monitor's banners, top first"""
+    placements = []
+    for edge in EDGES.get(edges, EDGES[DEFAULT_EDGES]):
+        y = monitor.y if edge == ABE_TOP else monitor.y + monitor.height - height
+        placements.append(Placement(monitor.x, y, monitor.width, height, edge))
+    return tuple(placements)
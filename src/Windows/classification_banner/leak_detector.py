@@ -0,0 +1,187 @@
+"""
+Resource growth tracking for repeated banner rebuilds
+"""
+
+import ctypes
+import gc
+import os
+import sys
+import tracemalloc
+from ctypes import wintypes
+from typing import Any, Iterable, List, NamedTuple, Optional
+from .constants import (
+    LEAK_BUDGET_GDI_HANDLES,
+    LEAK_BUDGET_GC_OBJECTS,
+    LEAK_BUDGET_HANDLES,
+    LEAK_BUDGET_PYTHON_BYTES,
+    LEAK_BUDGET_RSS_BYTES,
+    LEAK_BUDGET_TK_FONTS,
+    LEAK_BUDGET_TK_WIDGETS,
+    LEAK_BUDGET_USER_HANDLES,
+)
+from .win32 import PROCESS_MEMORY_COUNTERS
+
+
+class ResourceSnapshot(NamedTuple):
+    """Process resource counters at one point in time (-1 when unavailable)"""
+
+    rss_bytes: int
+    python_bytes: int
+    gc_objects: int
+    tk_widgets: int
+    tk_fonts: int
+    gdi_handles: int
+    user_handles: int
+    handles: int
+
+
+class LeakBudget(NamedTuple):
+    """Maximum allowed growth per counter between baseline and check"""
+
+    rss_bytes: int = LEAK_BUDGET_RSS_BYTES
+    python_bytes: int = LEAK_BUDGET_PYTHON_BYTES
+    gc_objects: int = LEAK_BUDGET_GC_OBJECTS
+    tk_widgets: int = LEAK_BUDGET_TK_WIDGETS
+    tk_fonts: int = LEAK_BUDGET_TK_FONTS
+    gdi_handles: int = LEAK_BUDGET_GDI_HANDLES
+    user_handles: int = LEAK_BUDGET_USER_HANDLES
+    handles: int = LEAK_BUDGET_HANDLES
+
+
+class ResourceSampler:
+    """Reads RSS, handle, Python heap and Tk object counters"""
+
+    GR_GDIOBJECTS = 0
+    GR_USEROBJECTS = 1
+
+    def __init__(self):
+        self._kernel32: Any = None
+        self._user32: Any = None
+        if sys.platform == "win32":
+            self._kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+            self._user32 = ctypes.WinDLL("user32", use_last_error=True)
+            self._kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+            self._kernel32.K32GetProcessMemoryInfo.argtypes = [
+                wintypes.HANDLE, ctypes.POINTER(PROCESS_MEMORY_COUNTERS), wintypes.DWORD]
+            self._kernel32.GetProcessHandleCount.argtypes = [
+                wintypes.HANDLE, ctypes.POINTER(wintypes.DWORD)]
+            self._user32.GetGuiResources.argtypes = [wintypes.HANDLE, wintypes.DWORD]
+            self._user32.GetGuiResources.restype = wintypes.DWORD
+
+    def sample(self, roots: Iterable[Any] = ()) -> ResourceSnapshot:
+        """Take a snapshot; ``roots`` are the live Tk root windows"""
+        gc.collect()
+        widgets = 0
+        fonts = 0
+        for root in roots:
+            try:
+                widgets += self._count_widgets(root)
+                fonts += len(root.tk.call("font", "names"))
+            except Exception:
+                # Root already destroyed
+                continue
+
+        python_bytes = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else -1
+        gdi, user, handles = self._handle_counts()
+        return ResourceSnapshot(
+            rss_bytes=self._rss(),
+            python_bytes=python_bytes,
+            gc_objects=len(gc.get_objects()),
+            tk_widgets=widgets,
+            tk_fonts=fonts,
+            gdi_handles=gdi,
+            user_handles=user,
+            handles=handles,
+        )
+
+    def _count_widgets(self, widget: Any) -> int:
+        return 1 + sum(self._count_widgets(child) for child in widget.winfo_children())
+
+    def _rss(self) -> int:
+        if self._kernel32 is not None:
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(counters)
+            if self._kernel32.K32GetProcessMemoryInfo(
+                    self._kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+                return counters.WorkingSetSize
+            return -1
+        try:
+            with open("/proc/self/statm") as statm:
+                return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError):
+            return -1
+
+    def _handle_counts(self) -> tuple[int, int, int]:
+        if self._kernel32 is None:
+            try:
+                return -1, -1, len(os.listdir("/proc/self/fd"))
+            except OSError:
+                return -1, -1, -1
+        process = self._kernel32.GetCurrentProcess()
+        count = wintypes.DWORD()
+        handles = count.value if self._kernel32.GetProcessHandleCount(
+            process, ctypes.byref(count)) else -1
+        return (
+            self._user32.GetGuiResources(process, self.GR_GDIOBJECTS),
+            self._user32.GetGuiResources(process, self.GR_USEROBJECTS),
+            handles,
+        )
+
+
+class LeakDetector:
+    """Compares resource snapshots against a baseline and a growth budget"""
+
+    def __init__(self, budget: Optional[LeakBudget] = None,
+                 sampler: Optional[ResourceSampler] = None, trace_python: bool = True):
+        self.budget = budget or LeakBudget()
+        self.sampler = sampler or ResourceSampler()
+        self.baseline_snapshot: Optional[ResourceSnapshot] = None
+        self.last_snapshot: Optional[ResourceSnapshot] = None
+        self.samples = 0
+        if trace_python and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def baseline(self, roots: Iterable[Any] = ()) -> ResourceSnapshot:
+        """Record the snapshot growth is measured from"""
+        self.baseline_snapshot = self.sampler.sample(roots)
+        self.last_snapshot = self.baseline_snapshot
+        return self.baseline_snapshot
+
+    def record(self, roots: Iterable[Any] = ()) -> List[str]:
+        """Take a snapshot and return budget violations (baseline on first call)"""
+        if self.baseline_snapshot is None:
+            self.baseline(roots)
+            return []
+        self.last_snapshot = self.sampler.sample(roots)
+        self.samples += 1
+        return self.violations()
+
+    def growth(self) -> dict[str, int]:
+        """Growth of each available counter since the baseline"""
+        if self.baseline_snapshot is None or self.last_snapshot is None:
+            return {}
+        return {
+            name: current - base
+            for name, base, current in zip(
+                ResourceSnapshot._fields, self.baseline_snapshot, self.last_snapshot)
+            if base >= 0 and current >= 0
+        }
+
+    def violations(self) -> List[str]:
+        """Counters whose growth exceeds the budget"""
+        return [
+            f"{name} grew by {delta} (budget {getattr(self.budget, name)})"
+            for name, delta in self.growth().items()
+            if delta > getattr(self.budget, name)
+        ]
+
+    def report(self) -> str:
+        """One-line summary of the latest snapshot and growth"""
+        if self.last_snapshot is None:
+            return "Leak report: no samples"
+        growth = self.growth()
+        parts = [
+            f"{name}={value}({growth[name]:+d})" if name in growth else f"{name}=n/a"
+            for name, value in zip(ResourceSnapshot._fields, self.last_snapshot)
+        ]
+        return f"Leak report after {self.samples} samples: " + " ".join(parts)
@@ -0,0 +1,339 @@
+"""
+Classification marking engine
+
+Renders the banner marking (``LEVEL//CAVEATS//DISSEMINATION``) from the
+configured classification, caveats and dissemination controls, and checks
+each caveat and control against the lowest level it may appear at. The level
+table comes from ``COLOR_SCHEMES`` (banner text, colors and the default
+caveats/controls of a scheme such as SCI); the caveat and control tables are
+below. All three are compiled into dictionaries at import, and ``render`` is
+memoized on its input tuple, so the settings, foreground and policy validator
+paths pay one cache lookup for a marking they have seen before.
+
+Invalid combinations fail safe: a token that needs a higher level than
+configured raises the marking to the highest level any token requires, an
+unknown classification is marked as the highest level in the table, and of
+two conflicting controls the more restrictive one is kept. Tokens missing
+from the tables are shown as entered and reported, but not checked.
+
+Usage::
+
+    python -m classification_banner.marking --bench
+"""
+
+import argparse
+import functools
+import random
+import re
+import sys
+import time
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+from .constants import COLOR_SCHEMES, MARKING_CACHE_SIZE
+
+# Classification levels, least to most restrictive
+LEVEL_ORDER = ("UNCLASSIFIED", "CUI", "CONFIDENTIAL", "SECRET", "TOP SECRET")
+
+# Abbreviations accepted for a COLOR_SCHEMES key
+LEVEL_ALIASES = {
+    "U": "UNCLASSIFIED",
+    "C": "CONFIDENTIAL",
+    "S": "SECRET",
+    "TS": "TOP SECRET",
+}
+
+# Caveats (control systems and special access markings) and the lowest level
+# each may appear at. Sub-compartments (HCS-P, SI-G ABCD) use their base entry.
+CAVEAT_LEVELS = {
+    "SP": "CUI",  # CUI specified categories, e.g. SP-PRVCY
+    "SI": "CONFIDENTIAL",
+    "RD": "CONFIDENTIAL",
+    "FRD": "CONFIDENTIAL",
+    "SAR": "CONFIDENTIAL",
+    "TK": "SECRET",
+    "HCS": "SECRET",
+    "G": "TOP SECRET",
+}
+
+# Dissemination controls and the lowest level each may appear at
+CONTROL_LEVELS = {
+    "FOUO": "UNCLASSIFIED",
+    "NOFORN": "CUI",
+    "REL TO": "CUI",
+    "FEDCON": "CUI",
+    "NOCON": "CUI",
+    "DL ONLY": "CUI",
+    "FED ONLY": "CUI",
+    "DISPLAY ONLY": "CUI",
+    "ORCON": "CONFIDENTIAL",
+    "PROPIN": "CONFIDENTIAL",
+    "RELIDO": "CONFIDENTIAL",
+    "FISA": "CONFIDENTIAL",
+    "IMCON": "SECRET",
+}
+
+# Controls that exclude others; the key is the more restrictive one and kept
+CONTROL_CONFLICTS = {
+    "NOFORN": ("REL TO", "RELIDO", "DISPLAY ONLY"),
+}
+
+
+class RenderedMarking(NamedTuple):
+    """Banner text and colors for a marking, with what had to be corrected"""
+
+    text: str
+    # COLOR_SCHEMES key the colors come from ("CUSTOM" for custom text)
+    level: str
+    bg: str
+    fg: str
+    # Invalid combinations; each one raised or trimmed the marking
+    problems: Tuple[str, ...] = ()
+    # Tokens not in the tables, shown as entered
+    unknown: Tuple[str, ...] = ()
+
+    @property
+    def valid(self) -> bool:
+        """True if the marking was rendered as configured"""
+        return not self.problems
+
+
+class _Level(NamedTuple):
+    key: str
+    rank: int
+    text: str
+    caveats: Tuple[str, ...]
+    controls: Tuple[str, ...]
+
+
+def _split(value: Optional[str]) -> Tuple[str, ...]:
+    """Tokens of a ``/``-separated caveat or control string"""
+    if not value:
+        return ()
+    return tuple(token for token in (t.strip() for t in value.split("/")) if token)
+
+
+# ---------------------------------------------------------------------------
+# Compiled tables
+# ---------------------------------------------------------------------------
+
+
+def _compile_levels() -> Dict[str, _Level]:
+    levels: Dict[str, _Level] = {}
+    for key, scheme in COLOR_SCHEMES.items():
+        # UNCONFIGURED ranks below every level, so any token raises it
+        rank = LEVEL_ORDER.index(scheme["text"]) if scheme["text"] in LEVEL_ORDER else -1
+        levels[key] = _Level(key, rank, scheme["text"], _split(scheme["caveats"]), _split(scheme["dc"]))
+    for alias, key in LEVEL_ALIASES.items():
+        levels[alias] = levels[key]
+    return levels
+
+
+_LEVELS: Dict[str, _Level] = _compile_levels()
+_BY_RANK: Dict[int, _Level] = {rank: _LEVELS[text] for rank, text in enumerate(LEVEL_ORDER)}
+_HIGHEST = _BY_RANK[len(LEVEL_ORDER) - 1]
+_TOKEN_RANKS: Dict[str, int] = {
+    token: LEVEL_ORDER.index(level)
+    for table in (CAVEAT_LEVELS, CONTROL_LEVELS)
+    for token, level in table.items()
+}
+_CONTROLS: FrozenSet[str] = frozenset(CONTROL_LEVELS)
+_SUBCOMPARTMENT = re.compile(r"[-\s]")
+
+
+def _base(token: str) -> str:
+    """Table entry for a token: HCS-P -> HCS, REL TO USA, GBR -> REL TO"""
+    key = token.upper()
+    if key in _TOKEN_RANKS:
+        return key
+    if key.startswith("REL TO"):
+        return "REL TO"
+    return _SUBCOMPARTMENT.split(key, 1)[0]
+
+
+def _dedupe(tokens: Iterable[str]) -> List[str]:
+    seen = set()
+    out = []
+    for token in tokens:
+        if token.upper() not in seen:
+            seen.add(token.upper())
+            out.append(token)
+    return out
+
+
+def _positional(parts: List[str]) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """Caveats and controls written after the level, e.g. in ``SECRET//SI//NOFORN``"""
+    if not parts:
+        return (), ()
+    first = _split(parts[0])
+    if len(parts) == 1 and all(_base(token) in _CONTROLS for token in first):
+        return (), first
+    return first, tuple(token for part in parts[1:] for token in _split(part))
+
+
+def _join(level: str, caveats: Iterable[str], controls: Iterable[str]) -> str:
+    text = level
+    caveats = "/".join(caveats)
+    controls = "/".join(controls)
+    if caveats:
+        text += "//" + caveats
+    if controls:
+        text += "//" + controls
+    return text
+
+
+def _drop_conflicts(controls: List[str], problems: List[str]) -> List[str]:
+    """Controls without those excluded by another, e.g. REL TO next to NOFORN"""
+    bases = [_base(token) for token in controls]
+    for keep, excluded in CONTROL_CONFLICTS.items():
+        if keep in bases:
+            dropped = [t for t, b in zip(controls, bases) if b in excluded]
+            for token in dropped:
+                problems.append(f"{token} conflicts with {keep}; {keep} is kept")
+            controls = [t for t, b in zip(controls, bases) if b not in excluded]
+            bases = [b for b in bases if b not in excluded]
+    return controls
+
+
+def _required_level(level: _Level, tokens: List[str], problems: List[str]) -> Tuple[_Level, List[str]]:
+    """Level raised to the highest one ``tokens`` need, and the tokens not in the tables"""
+    required = level.rank
+    unknown: List[str] = []
+    for token in tokens:
+        rank = _TOKEN_RANKS.get(_base(token))
+        if rank is None:
+            unknown.append(token)
+        elif rank > level.rank:
+            problems.append(f"{token} is not allowed below {LEVEL_ORDER[rank]}")
+            required = max(required, rank)
+    if required > level.rank:
+        problems.append(f"marked {LEVEL_ORDER[required]} instead of {level.text}")
+        level = _BY_RANK[required]
+    return level, unknown
+
+
+# ---------------------------------------------------------------------------
+# Rendering
+# ---------------------------------------------------------------------------
+
+
+@functools.lru_cache(maxsize=MARKING_CACHE_SIZE)
+def render(classification: Optional[str], caveats: Optional[str] = None,
+           dissemination: Optional[str] = None, custom: Optional[str] = None) -> RenderedMarking:
+    """Banner text and colors for a configured marking
+
+    ``classification`` is a level (``SECRET``, ``TS``, ``SCI``) or a full
+    marking (``TOP SECRET//SI//NOFORN``); ``caveats`` and ``dissemination``
+    are ``/``-separated and added to what the classification carries. The
+    ``CUSTOM`` level shows ``custom`` as entered, without checks.
+    """
+    parts = (classification or "").split("//")
+    name = parts[0].strip().upper() or "UNCONFIGURED"
+    extra_caveats, extra_controls = _positional(parts[1:])
+    caveat_tokens = extra_caveats + _split(caveats)
+    control_tokens = extra_controls + _split(dissemination)
+
+    unconfigured = COLOR_SCHEMES["UNCONFIGURED"]
+    if name == "CUSTOM" and custom:
+        # Group Policy's CUSTOM choice carries its own text
+        text = _join(custom, caveat_tokens, control_tokens)
+        return RenderedMarking(text, "CUSTOM", unconfigured["bg"], unconfigured["fg"])
+
+    problems: List[str] = []
+    level = _LEVELS.get(name)
+    if level is None:
+        if name == "CUSTOM":
+            problems.append("CUSTOM classification without custom text")
+        else:
+            problems.append(f"unknown classification {parts[0].strip()!r}")
+        level = _HIGHEST
+
+    # Schemes such as SCI supply caveats and controls that are not configured
+    caveat_list = _dedupe(caveat_tokens or level.caveats)
+    control_list = _dedupe(control_tokens or level.controls)
+
+    control_list = _drop_conflicts(control_list, problems)
+    level, unknown = _required_level(level, caveat_list + control_list, problems)
+
+    scheme = COLOR_SCHEMES[level.key]
+    return RenderedMarking(
+        _join(level.text, caveat_list, control_list),
+        level.key,
+        scheme["bg"],
+        scheme["fg"],
+        tuple(problems),
+        tuple(unknown),
+    )
+
+
+def validate(markings: Iterable[Tuple[Optional[str], ...]]) -> Dict[Tuple[Optional[str], ...], RenderedMarking]:
+    """Render many ``(classification, caveats, dissemination)`` tuples and
+    return the ones that are invalid, keyed by input"""
+    invalid = {}
+    for key in markings:
+        rendered = render(*key)
+        if rendered.problems:
+            invalid[key] = rendered
+    return invalid
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+
+def _workload(count: int, distinct: int, seed: int = 1) -> List[Tuple[str, str, str]]:
+    """``count`` draws from ``distinct`` random level/caveat/control tuples"""
+    rng = random.Random(seed)
+    levels = list(LEVEL_ORDER) + ["SCI", "TS", "S"]
+    caveats = list(CAVEAT_LEVELS) + ["HCS-P", "SI-G ABCD"]
+    controls = list(CONTROL_LEVELS) + ["REL TO USA, GBR"]
+    pool = [
+        (
+            rng.choice(levels),
+            "/".join(rng.sample(caveats, rng.randint(0, 3))),
+            "/".join(rng.sample(controls, rng.randint(0, 2))),
+        )
+        for _ in range(distinct)
+    ]
+    return [rng.choice(pool) for _ in range(count)]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Micro-benchmark: cold and cached renders, and bulk validation"""
+    parser = argparse.ArgumentParser(description="Marking engine micro-benchmark")
+    parser.add_argument("--bench", action="store_true", help="run the benchmark")
+    parser.add_argument("--calls", type=int, default=100000)
+    parser.add_argument("--distinct", type=int, default=1000, help="distinct markings in the workload")
+    args = parser.parse_args(argv)
+    if not args.bench:
+        parser.print_help()
+        return 0
+
+    workload = _workload(args.calls, args.distinct)
+    invalid = len(validate(set(workload)))
+
+    def per_second(function) -> float:
+        started = time.perf_counter()
+        function()
+        return args.calls / (time.perf_counter() - started)
+
+    def uncached():
+        for key in workload:
+            render.__wrapped__(*key)
+
+    def cached():
+        for key in workload:
+            render(*key)
+
+    render.cache_clear()
+    cold = per_second(cached)
+    warm = per_second(cached)
+    print(f"{len(set(workload))} distinct markings ({invalid} invalid) in {args.calls} evaluations")
+    print(f"{'uncached':<10} {per_second(uncached):12,.0f} /s")
+    print(f"{'cold':<10} {cold:12,.0f} /s   (cache of {MARKING_CACHE_SIZE})")
+    print(f"{'cached':<10} {warm:12,.0f} /s")
+    print(f"{'validate':<10} {per_second(lambda: validate(workload)):12,.0f} /s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
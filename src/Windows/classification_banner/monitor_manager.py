@@ -2,8 +2,77 @@
 Monitor detection and management
 """
 
-from typing import Any
-from screeninfo import get_monitors
+from typing import Any, Dict, Iterable, List, NamedTuple, Tuple
+from screeninfo import Monitor, ScreenInfoError, get_monitors
+from .constants import FALLBACK_MONITOR_SIZE
+from . import event_log
+
+Geometry = Tuple[int, int, int, int]
+
+
+def monitor_geometry(monitor: Any) -> Geometry:
+    """(x, y, width, height) of a monitor"""
+    return (monitor.x, monitor.y, monitor.width, monitor.height)
+
+
+def monitor_identity(monitor: Any) -> str:
+    """Stable key for a monitor: its device name, or its geometry as a fallback"""
+    name = getattr(monitor, "name", None)
+    if name:
+        return f"name:{name}"
+    return "geom:{},{},{},{}".format(*monitor_geometry(monitor))
+
+
+class LayoutDiff(NamedTuple):
+    """Order-insensitive difference between two monitor layouts"""
+
+    added: List[str]
+    removed: List[str]
+    moved: List[str]
+    unchanged: List[str]
+
+    @property
+    def changed(self) -> bool:
+        """True if any monitor was added, removed, moved or resized"""
+        return bool(self.added or self.removed or self.moved)
+
+
+class MonitorIndex:
+    """Monitors keyed by stable identity"""
+
+    def __init__(self, monitors: Iterable[Any]):
+        self.monitors: Dict[str, Any] = {}
+        for monitor in monitors:
+            identity = monitor_identity(monitor)
+            # Mirrored/cloned outputs can share a name; keep them distinct
+            suffix = 1
+            key = identity
+            while key in self.monitors:
+                suffix += 1
+                key = f"{identity}#{suffix}"
+            self.monitors[key] = monitor
+
+    def __len__(self) -> int:
+        return len(self.monitors)
+
+    def geometry(self, identity: str) -> Geometry:
+        """Geometry of one monitor"""
+        return monitor_geometry(self.monitors[identity])
+
+    def diff(self, new: "MonitorIndex") -> LayoutDiff:
+        """Classify each monitor of ``new`` relative to this layout"""
+        added: List[str] = []
+        moved: List[str] = []
+        unchanged: List[str] = []
+        for identity in new.monitors:
+            if identity not in self.monitors:
+                added.append(identity)
+            elif new.geometry(identity) != self.geometry(identity):
+                moved.append(identity)
+            else:
+                unchanged.append(identity)
+        removed = [i for i in self.monitors if i not in new.monitors]
+        return LayoutDiff(added, removed, moved, unchanged)
 
 
 class MonitorManager:
@@ -14,12 +83,23 @@ class MonitorManager:
         """Get all connected monitors"""
         try:
             return get_monitors()
-        except SystemError as e:
-            print(f"Error detecting monitors: {e}")
+        except (SystemError, ScreenInfoError) as e:
+            event_log.error("monitors", f"Error detecting monitors: {e}")
             # Fallback to single monitor
             return [MonitorManager._create_fallback_monitor()]
 
+    def get_monitor_index(self) -> MonitorIndex:
+        """Get all connected monitors keyed by stable identity"""
+        return MonitorIndex(self.get_all_monitors())
+
     @staticmethod
-    def _create_fallback_monitor():
-        """Create a fallback monitor object"""
-        return type("Monitor", (), {"x": 0, "y": 0, "width": 1920, "height": 1080})()
+    def _create_fallback_monitor() -> Monitor:
+        """The primary screen, or a FALLBACK_MONITOR_SIZE monitor if its size is unknown"""
+        from . import backend
+        try:
+            size = backend.current().screen_size()
+        except OSError as e:
+            event_log.warning("monitors", f"Error reading the screen size: {e}")
+            size = None
+        width, height = size or FALLBACK_MONITOR_SIZE
+        return Monitor(x=0, y=0, width=width, height=height, is_primary=True)
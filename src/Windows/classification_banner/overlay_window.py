@@ -0,0 +1,105 @@
+"""
+Click-through layered window for the watermark overlay on Windows
+
+The window is a topmost ``WS_EX_LAYERED | WS_EX_TRANSPARENT`` popup: mouse
+input passes through to the windows below, it never takes focus and it has
+no taskbar button. Its content is set with ``UpdateLayeredWindow`` from a
+32-bit premultiplied DIB section; the window keeps its own copy of the
+bitmap and DWM composes it, so nothing is painted again until the next
+upload and the DIB is freed straight after it.
+"""
+
+import ctypes
+from ctypes import wintypes
+from typing import Any, Optional
+from .win32 import BITMAPINFO, BLENDFUNCTION, api
+from . import event_log
+
+WS_POPUP = 0x80000000
+WS_EX_TOPMOST = 0x00000008
+WS_EX_TRANSPARENT = 0x00000020
+WS_EX_TOOLWINDOW = 0x00000080
+WS_EX_LAYERED = 0x00080000
+WS_EX_NOACTIVATE = 0x08000000
+OVERLAY_EX_STYLE = WS_EX_LAYERED | WS_EX_TRANSPARENT | WS_EX_TOPMOST | WS_EX_TOOLWINDOW | WS_EX_NOACTIVATE
+SW_SHOWNOACTIVATE = 4
+ULW_ALPHA = 0x00000002
+AC_SRC_OVER = 0x00
+AC_SRC_ALPHA = 0x01
+BI_RGB = 0
+DIB_RGB_COLORS = 0
+
+
+class LayeredOverlay:
+    """One overlay window covering a monitor"""
+
+    def __init__(self, x: int, y: int, width: int, height: int):
+        self.shown = False
+        # "STATIC" is registered by the system, so no window class is needed
+        self.hwnd = api().CreateWindowExW(
+            OVERLAY_EX_STYLE, "STATIC", None, WS_POPUP, x, y, width, height,
+            None, None, None, None)
+        self._blend = BLENDFUNCTION(AC_SRC_OVER, 0, 255, AC_SRC_ALPHA)
+
+    def update(self, x: int, y: int, watermark: Any) -> None:
+        """Upload ``watermark`` (see watermark.Watermark) at ``(x, y)``"""
+        win32 = api()
+        width, height = watermark.width, watermark.height
+
+        info = BITMAPINFO()
+        info.bmiHeader.biSize = ctypes.sizeof(info.bmiHeader)
+        info.bmiHeader.biWidth = width
+        # Negative height: rows run top-down, as rendered
+        info.bmiHeader.biHeight = -height
+        info.bmiHeader.biPlanes = 1
+        info.bmiHeader.biBitCount = 32
+        info.bmiHeader.biCompression = BI_RGB
+
+        screen_dc = win32.GetDC(None)
+        memory_dc = win32.CreateCompatibleDC(screen_dc)
+        bits = ctypes.c_void_p()
+        bitmap = win32.CreateDIBSection(memory_dc, ctypes.byref(info), DIB_RGB_COLORS,
+                                        ctypes.byref(bits), None, 0)
+        try:
+            if not bitmap:
+                raise OSError("CreateDIBSection failed")
+            previous = win32.SelectObject(memory_dc, bitmap)
+            if bits.value:
+                ctypes.memmove(bits.value, watermark.pixels, len(watermark.pixels))
+            win32.UpdateLayeredWindow(
+                self.hwnd, screen_dc, ctypes.byref(wintypes.POINT(x, y)),
+                ctypes.byref(wintypes.SIZE(width, height)), memory_dc,
+                ctypes.byref(wintypes.POINT(0, 0)), 0, ctypes.byref(self._blend), ULW_ALPHA)
+            win32.SelectObject(memory_dc, previous)
+        finally:
+            if bitmap:
+                win32.DeleteObject(bitmap)
+            win32.DeleteDC(memory_dc)
+            win32.ReleaseDC(None, screen_dc)
+
+        if not self.shown:
+            win32.ShowWindow(self.hwnd, SW_SHOWNOACTIVATE)
+            self.shown = True
+
+    def destroy(self) -> None:
+        """Destroy the window"""
+        if self.hwnd:
+            api().DestroyWindow(self.hwnd)
+            self.hwnd = None
+
+
+def create_overlay(x: int, y: int, width: int, height: int) -> Optional[LayeredOverlay]:
+    """New overlay window, or None if it could not be created"""
+    try:
+        return LayeredOverlay(x, y, width, height)
+    except OSError as e:
+        event_log.warning("overlay", f"Error creating watermark overlay: {e}")
+        return None
+
+
+def update_overlay(overlay: LayeredOverlay, x: int, y: int, watermark: Any) -> None:
+    """Upload a new bitmap; errors are logged, the old content stays"""
+    try:
+        overlay.update(x, y, watermark)
+    except OSError as e:
+        event_log.warning("overlay", f"Error updating watermark overlay: {e}")
@@ -0,0 +1,123 @@
+"""
+Spanned display surfaces (video walls)
+
+NVIDIA Mosaic and AMD Eyefinity join several physical panels into one
+surface, which Windows and X11 report as a single monitor. By default the
+banner follows the monitors the OS reports (``SpannedSurfaces=surface``: one
+banner across the top of the whole wall). With ``SpannedSurfaces=panel``
+each spanned surface is split into its panels, and every panel gets its own
+banner.
+
+Neither OS lists the panels behind such a surface, so they are found from
+its geometry: the surface must be a grid of ``PanelSize`` panels, allowing
+for bezel compensation (the hidden pixels the driver puts between panels).
+Without ``PanelSize`` the largest of ``COMMON_PANEL_SIZES`` that tiles the
+surface is used; a monitor that is itself one of those sizes (a 4K or a
+32:9 monitor) is a single display and is never split.
+"""
+
+import re
+from typing import Any, Iterable, List, NamedTuple, Optional, Tuple
+from screeninfo import Monitor
+from .constants import COMMON_PANEL_SIZES, MAX_BEZEL_FRACTION
+
+SURFACE = "surface"
+PANEL = "panel"
+
+_SIZE = re.compile(r"^\s*(\d+)\s*[xX]\s*(\d+)\s*$")
+
+
+class Grid(NamedTuple):
+    """Panels of a spanned surface: columns by rows, with bezel gaps"""
+
+    columns: int
+    rows: int
+    width: int
+    height: int
+    gap_x: int
+    gap_y: int
+
+
+def parse_size(text: Optional[str]) -> Optional[Tuple[int, int]]:
+    """``(width, height)`` from ``WIDTHxHEIGHT``, None if empty or invalid"""
+    match = _SIZE.match(text or "")
+    if not match:
+        return None
+    width, height = int(match.group(1)), int(match.group(2))
+    return (width, height) if width and height else None
+
+
+def _axis(total: int, panel: int) -> Optional[Tuple[int, int]]:
+    """Panels along one axis and the gap between them, if they fill it"""
+    count = total // panel
+    if count == 0:
+        return None
+    extra = total - count * panel
+    if count == 1:
+        return (1, 0) if extra == 0 else None
+    gap, uneven = divmod(extra, count - 1)
+    if uneven or gap > panel * MAX_BEZEL_FRACTION:
+        return None
+    return count, gap
+
+
+def panel_grid(monitor: Any, size: Tuple[int, int]) -> Optional[Grid]:
+    """Grid of ``size`` panels covering ``monitor``; None unless 2+ panels fit"""
+    width, height = size
+    columns = _axis(monitor.width, width)
+    rows = _axis(monitor.height, height)
+    if columns is None or rows is None or columns[0] * rows[0] < 2:
+        return None
+    return Grid(columns[0], rows[0], width, height, columns[1], rows[1])
+
+
+def detect_grid(monitor: Any, size: Optional[Tuple[int, int]] = None) -> Optional[Grid]:
+    """Panels of a spanned surface, or None for a single display"""
+    if size is not None:
+        return panel_grid(monitor, size)
+    dimensions = (monitor.width, monitor.height)
+    candidates = COMMON_PANEL_SIZES + tuple((h, w) for w, h in COMMON_PANEL_SIZES if w != h)
+    if dimensions in candidates:
+        return None
+    for candidate in sorted(candidates, key=lambda s: s[0] * s[1], reverse=True):
+        grid = panel_grid(monitor, candidate)
+        if grid is not None:
+            return grid
+    return None
+
+
+def split(monitor: Any, grid: Grid) -> List[Monitor]:
+    """One monitor per panel, left to right and top to bottom
+
+    Panels are named after the surface (``<name>/<column>,<row>``) so their
+    identities stay stable; the physical size is shared out evenly.
+    """
+    name = getattr(monitor, "name", None)
+    width_mm = getattr(monitor, "width_mm", None)
+    height_mm = getattr(monitor, "height_mm", None)
+    panels = []
+    for row in range(grid.rows):
+        for column in range(grid.columns):
+            panels.append(Monitor(
+                x=monitor.x + column * (grid.width + grid.gap_x),
+                y=monitor.y + row * (grid.height + grid.gap_y),
+                width=grid.width,
+                height=grid.height,
+                width_mm=width_mm * grid.width // monitor.width if width_mm else None,
+                height_mm=height_mm * grid.height // monitor.height if height_mm else None,
+                name=f"{name}/{column},{row}" if name else None,
+                is_primary=bool(getattr(monitor, "is_primary", False)) and row == column == 0,
+            ))
+    return panels
+
+
+def expand(monitors: Iterable[Any], mode: str = SURFACE, panel_size: str = "") -> List[Any]:
+    """The monitors to put banners on: spanned surfaces split in ``panel`` mode"""
+    if (mode or SURFACE).lower() != PANEL:
+        return list(monitors)
+    size = parse_size(panel_size)
+    expanded: List[Any] = []
+    for monitor in monitors:
+        grid = detect_grid(monitor, size)
+        expanded.extend(split(monitor, grid) if grid is not None else [monitor])
+    return expanded
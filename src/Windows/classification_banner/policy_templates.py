@@ -0,0 +1,690 @@
+"""
+Group Policy templates (ADMX/ADML) generated from the settings schema
+
+Each policy lists the registry values it sets; value types, ranges and
+defaults come from ``settings_schema.FIELDS``, so the templates cannot drift
+from what the banner reads. Policy and element ids of the original templates
+are kept, so existing GPOs stay valid. ``build.ps1`` regenerates the files
+under ``Group Policy`` before packaging::
+
+    python -m classification_banner.policy_templates --output "Group Policy"
+    python -m classification_banner.policy_templates --check "Group Policy"
+"""
+
+import argparse
+import os
+import sys
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from xml.sax.saxutils import escape, quoteattr
+from . import __version__
+from .constants import REGISTRY_PATHS
+from .settings_schema import BOOL, BY_VALUE_NAME, INT, MULTI_STRING, STRING
+
+ADMX_NAME = "ClassificationBanner.admx"
+ADML_NAME = "ClassificationBanner.adml"
+LANGUAGE = "en-us"
+NAMESPACE = "ClassificationBanner.Policies.ClassificationBanner"
+SUPPORTED_ON = "windows:SUPPORTED_Windows10"
+POLICY_KEY = REGISTRY_PATHS[0][1]
+
+
+class Category(NamedTuple):
+    id: str
+    display_name: str
+    parent: str = ""
+
+
+class Element(NamedTuple):
+    """One registry value set by a policy's options"""
+
+    value_name: str
+    label: str
+    # Text shown in an empty box (text elements)
+    default: Optional[str] = None
+    # (value, string id suffix, display name) for dropdowns
+    items: Tuple[Tuple[str, str, str], ...] = ()
+    required: bool = False
+    max_length: Optional[int] = None
+    # Element id when it differs from the generated one
+    id: str = ""
+
+
+class Policy(NamedTuple):
+    name: str
+    category: str
+    display_name: str
+    help: str
+    # BOOL value written by Enabled (1) and Disabled (0)
+    toggle: str = ""
+    elements: Tuple[Element, ...] = ()
+
+
+def _help(*paragraphs: str) -> str:
+    return "\n\n".join(paragraphs)
+
+
+_SCHEME_LIST = (
+    "- UNCLASSIFIED: Green background (#00FF00), Black text (#000000)\n"
+    "- CUI: Purple background (#502B85), White text (#FFFFFF)\n"
+    "- CONFIDENTIAL: Blue background (#0000FF), White text (#FFFFFF)\n"
+    "- SECRET: Red background (#FF0000), Black text (#000000)\n"
+    "- TOP SECRET: Orange background (#FF8C00), Black text (#000000)\n"
+    "- TOP SECRET//SCI: Yellow background (#FFFF00), Black text (#000000)"
+)
+
+CATEGORIES: Tuple[Category, ...] = (
+    Category("CAT_ClassificationBanner", "Classification Banner"),
+    Category("CAT_ClassificationBanner_Display", "Display Settings", "CAT_ClassificationBanner"),
+    Category("CAT_ClassificationBanner_SystemInfo", "System Information", "CAT_ClassificationBanner"),
+    Category("CAT_ClassificationBanner_ThreatLevels", "Threat Levels (FPCON/CPCON)", "CAT_ClassificationBanner"),
+    Category("CAT_ClassificationBanner_Appearance", "Appearance", "CAT_ClassificationBanner"),
+    Category("CAT_ClassificationBanner_Performance", "Performance", "CAT_ClassificationBanner"),
+    Category("CAT_ClassificationBanner_Diagnostics", "Diagnostics", "CAT_ClassificationBanner"),
+)
+
+POLICIES: Tuple[Policy, ...] = (
+    Policy(
+        "POL_BannerEnabled", "CAT_ClassificationBanner_Display", "Enable Classification Banner",
+        _help(
+            "This policy setting controls whether the Classification Banner is displayed.",
+            "If you enable this policy setting, the Classification Banner will be displayed at the top "
+            "of all monitors.",
+            "If you disable this policy setting, the Classification Banner will not be displayed.",
+            "If you do not configure this policy setting, the banner will be enabled by default.",
+        ),
+        toggle="Enabled",
+    ),
+    Policy(
+        "POL_Classification", "CAT_ClassificationBanner_Display", "Set Classification Level",
+        _help(
+            "This policy setting specifies the security classification level to display on the banner.",
+            "Select a predefined classification level:\n"
+            "- UNCLASSIFIED (Green background, Black text)\n"
+            "- CUI (Purple background, White text)\n"
+            "- CONFIDENTIAL (Blue background, White text)\n"
+            "- SECRET (Red background, Black text)\n"
+            "- TOP SECRET (Orange background, Black text)\n"
+            "- SCI (Yellow background, Black text)\n"
+            "- CUSTOM (Use custom text from the field below)",
+            "If CUSTOM is selected, enter the custom classification text in the \"Custom "
+            "Classification Text\" field.",
+            "If you do not configure this policy setting, the banner will display \"UNCONFIGURED\".",
+        ),
+        elements=(
+            Element("Classification", "Classification Level:", required=True, id="ENUM_ClassificationLevel",
+                    items=(
+                        ("UNCLASSIFIED", "Unclassified", "UNCLASSIFIED"),
+                        ("CUI", "CUI", "CUI (Controlled Unclassified Information)"),
+                        ("CONFIDENTIAL", "Confidential", "CONFIDENTIAL"),
+                        ("SECRET", "Secret", "SECRET"),
+                        ("TOP SECRET", "TopSecret", "TOP SECRET"),
+                        ("SCI", "TopSecretSCI", "SCI"),
+                        ("CUSTOM", "Custom", "CUSTOM (specify below)"),
+                    )),
+            Element("CustomClassification", "Custom Classification Text (if CUSTOM selected above):",
+                    default="CUSTOM CLASSIFICATION", max_length=50),
+        ),
+    ),
+    Policy(
+        "POL_Caveats", "CAT_ClassificationBanner_Display", "Set Caveats",
+        _help(
+            "This policy setting specifies the Caveats to display on the banner.",
+            "Enter the Caveats text in the \"Caveats Text\" field.",
+            "If you do not configure this policy setting, the banner will not display Caveats.",
+        ),
+        elements=(Element("Caveats", "Caveats:", default="HCS/SI/TK", max_length=50),),
+    ),
+    Policy(
+        "POL_DisseminationControls", "CAT_ClassificationBanner_Display", "Set Dissemination Controls",
+        _help(
+            "This policy setting specifies the Dissemination Controls to display on the banner.",
+            "Enter the Dissemination Controls text in the \"Dissemination Controls Text\" field.",
+            "If you do not configure this policy setting, the banner will not display Dissemination "
+            "Controls.",
+        ),
+        elements=(Element("DisseminationControls", "DisseminationControls:", default="NOFORN",
+                          max_length=50),),
+    ),
+    Policy(
+        "POL_MarkingRules", "CAT_ClassificationBanner_Display", "Per-Application Markings",
+        _help(
+            "This policy setting changes the banner marking while a matching application is in the "
+            "foreground.",
+            "Enter one rule per line as field:pattern=MARKING, where field is process, class or title "
+            "and pattern is a wildcard pattern. Process rules take precedence over class rules, and "
+            "class rules over title rules.",
+            "Example: process:excel.exe=CUI",
+            "If you do not configure this policy setting, the banner always shows the configured "
+            "classification.",
+        ),
+        elements=(Element("MarkingRules", "Marking rules (one per line):"),),
+    ),
+    Policy(
+        "POL_FPCON", "CAT_ClassificationBanner_ThreatLevels", "Set Force Protection Condition (FPCON)",
+        _help(
+            "This policy setting specifies the Force Protection Condition (FPCON) level to display on "
+            "the banner.",
+            "FPCON Levels:\n"
+            "- Alpha: Increased general threat of possible terrorist activity\n"
+            "- Bravo: Increased or more predictable threat of terrorist activity\n"
+            "- Charlie: Incident has occurred or intelligence indicates imminent action\n"
+            "- Delta: Terrorist attack has occurred or intelligence indicates imminent attack",
+            "The FPCON level will be displayed in the right corner of the banner as \"FPCON: [LEVEL]\".",
+            "If you do not configure this policy setting, FPCON will not be displayed.",
+        ),
+        elements=(Element("FPCON", "FPCON Level:", items=(
+            ("Alpha", "Alpha", "Alpha"),
+            ("Bravo", "Bravo", "Bravo"),
+            ("Charlie", "Charlie", "Charlie"),
+            ("Delta", "Delta", "Delta"),
+        )),),
+    ),
+    Policy(
+        "POL_CPCON", "CAT_ClassificationBanner_ThreatLevels", "Set Cyber Condition (CPCON)",
+        _help(
+            "This policy setting specifies the Cyberspace Protection Condition (CPCON) level to display "
+            "on the banner.",
+            "CPCON Levels:\n"
+            "- 1: Normal - Routine network operations\n"
+            "- 2: Guarded - Increased awareness, minor threats detected\n"
+            "- 3: Elevated - Heightened alert, specific threats identified\n"
+            "- 4: Severe - Significant cyber threat or attack in progress\n"
+            "- 5: Critical - Major cyber attack, severe network compromise",
+            "The CPCON level will be displayed in the right corner of the banner as \"CPCON: [LEVEL]\".",
+            "If you do not configure this policy setting, CPCON will not be displayed.",
+        ),
+        elements=(Element("CPCON", "CPCON Level:", items=(
+            ("1", "1", "1 - Normal"),
+            ("2", "2", "2 - Guarded"),
+            ("3", "3", "3 - Elevated"),
+            ("4", "4", "4 - Severe"),
+            ("5", "5", "5 - Critical"),
+        )),),
+    ),
+    Policy(
+        "POL_ThreatLevelSource", "CAT_ClassificationBanner_ThreatLevels", "Threat Level Source",
+        _help(
+            "This policy setting reads FPCON and CPCON from a live source instead of the values above.",
+            "The source is a file path, an http:// URL or a tcp:// address on the loopback interface. "
+            "The values above are shown until the first update arrives.",
+            "If no update arrives for the configured number of seconds, the levels are marked STALE.",
+            "If you do not configure this policy setting, the FPCON and CPCON policy values are shown.",
+        ),
+        elements=(
+            Element("ThreatLevelSource", "Source (file path, http:// or tcp:// URL):", max_length=255),
+            Element("ThreatLevelStaleAfter", "Seconds before the levels are marked stale:"),
+        ),
+    ),
+    Policy(
+        "POL_ShowHostname", "CAT_ClassificationBanner_SystemInfo", "Display Hostname",
+        _help(
+            "This policy setting controls whether the computer's hostname is displayed on the banner.",
+            "If you enable this policy setting, the hostname will be displayed on the left side of the "
+            "banner.",
+            "Example: \"DESKTOP-ABC123\"",
+            "If you disable or do not configure this policy setting, the hostname will not be displayed.",
+        ),
+        toggle="ShowHostname",
+    ),
+    Policy(
+        "POL_ShowUsername", "CAT_ClassificationBanner_SystemInfo", "Display Username",
+        _help(
+            "This policy setting controls whether the current user's domain and username are displayed "
+            "on the banner.",
+            "If you enable this policy setting, the username will be displayed on the left side of the "
+            "banner.",
+            "Example: \"john.e.doe.mil\"",
+            "Note: This displays the currently logged-in user, which may have privacy implications.",
+            "If you disable or do not configure this policy setting, the domain\\username will not be "
+            "displayed.",
+        ),
+        toggle="ShowUsername",
+    ),
+    Policy(
+        "POL_ShowWindowsVersion", "CAT_ClassificationBanner_SystemInfo", "Display Windows Version",
+        _help(
+            "This policy setting controls whether the Windows version and build number are displayed on "
+            "the banner.",
+            "If you enable this policy setting, the Windows version will be displayed on the left side "
+            "of the banner.",
+            "Example: \"Windows 11 (10.0.22621)\"",
+            "If you disable or do not configure this policy setting, the Windows version will not be "
+            "displayed.",
+        ),
+        toggle="ShowWindowsVersion",
+    ),
+    Policy(
+        "POL_ShowIPAddress", "CAT_ClassificationBanner_SystemInfo", "Display IP Address",
+        _help(
+            "This policy setting controls whether the computer's primary IP address is displayed on the "
+            "banner.",
+            "If you enable this policy setting, the IP address will be displayed on the left side of the "
+            "banner.",
+            "Example: \"192.168.1.100\"",
+            "Note: This displays the primary network interface IP address used for outbound "
+            "connections. Use \"IP Address Selection\" to pick the address family or adapter.",
+            "If you disable or do not configure this policy setting, the IP address will not be "
+            "displayed.",
+        ),
+        toggle="ShowIPAddress",
+    ),
+    Policy(
+        "POL_IPAddressSelection", "CAT_ClassificationBanner_SystemInfo", "IP Address Selection",
+        _help(
+            "This policy setting selects which address \"Display IP Address\" shows.",
+            "The address family is ipv4, ipv6 or any. The adapter is a wildcard pattern matched against "
+            "the adapter's name, for example \"Ethernet*\".",
+            "If you do not configure this policy setting, an IPv4 address of any adapter is shown, "
+            "preferring adapters with a default gateway.",
+        ),
+        elements=(
+            Element("IPAddressFamily", "Address family:", items=(
+                ("ipv4", "IPv4", "IPv4"),
+                ("ipv6", "IPv6", "IPv6"),
+                ("any", "Any", "Any"),
+            )),
+            Element("IPAddressAdapter", "Adapter name pattern:", default="*", max_length=255),
+        ),
+    ),
+    Policy(
+        "POL_ShowGroupID", "CAT_ClassificationBanner_SystemInfo", "Display Group ID",
+        _help(
+            "This policy setting controls whether a custom organizational group identifier is displayed "
+            "on the banner.",
+            "If you enable this policy setting, the Group ID will be displayed on the left side of the "
+            "banner, and you can specify the Group ID text in the field below.",
+            "Example: \"Group: IT-DEPT-001\"",
+            "Use this to identify departments, teams, or organizational units. Common uses:\n"
+            "- Department identification (IT-DEPT, FINANCE, HR)\n"
+            "- Location identification (BLDG-A, FLOOR-3)\n"
+            "- Security zone (DMZ-1, SECURE-ZONE)",
+            "If you disable or do not configure this policy setting, the Group ID will not be displayed.",
+        ),
+        toggle="ShowGroupID",
+        elements=(Element("GroupID", "Group ID:", default="GROUP-001", max_length=50),),
+    ),
+    Policy(
+        "POL_CustomColors", "CAT_ClassificationBanner_Appearance", "Custom Banner Colors",
+        _help(
+            "This policy setting allows you to override the default colors for the banner.",
+            "Specify colors in hexadecimal format: #RRGGBB",
+            "Examples:\n"
+            "- Red: #FF0000\n"
+            "- Green: #00FF00\n"
+            "- Blue: #0000FF\n"
+            "- White: #FFFFFF\n"
+            "- Black: #000000",
+            "Note: Custom colors override the predefined color schemes for classification levels. Use "
+            "this only if you need colors different from the standard classification colors.",
+            "If you do not configure this policy setting, colors will be determined by the "
+            "classification level:\n" + _SCHEME_LIST,
+        ),
+        elements=(
+            Element("BackgroundColor", "Background Color (hex, e.g., #FF0000):", default="#00FF00",
+                    max_length=7),
+            Element("TextColor", "Text Color (hex, e.g., #000000):", default="#000000", max_length=7),
+        ),
+    ),
+    Policy(
+        "POL_BannerLayout", "CAT_ClassificationBanner_Appearance", "Banner Size and Font",
+        _help(
+            "This policy setting sets the banner height in pixels and the font of its text.",
+            "Changes are applied to the running banner without recreating it.",
+            "If you do not configure this policy setting, the banner is 20 pixels high and uses 6 point "
+            "Arial.",
+        ),
+        elements=(
+            Element("BannerHeight", "Banner height (pixels):"),
+            Element("FontSize", "Font size (points):"),
+            Element("FontFamily", "Font family:", default="Arial", max_length=64),
+        ),
+    ),
+    Policy(
+        "POL_BannerEdges", "CAT_ClassificationBanner_Appearance", "Banner Edges",
+        _help(
+            "This policy setting selects the screen edges that show a banner on every monitor.",
+            "Marking policies that require the classification at the top and the bottom of the screen "
+            "use \"Top and bottom\". Both banners of a monitor share one layout, font and timer, and "
+            "reserve their screen space together.",
+            "If you do not configure this policy setting, the banner is shown at the top only.",
+        ),
+        elements=(
+            Element("Edges", "Edges:", items=(
+                ("top", "Top", "Top"),
+                ("bottom", "Bottom", "Bottom"),
+                ("both", "Both", "Top and bottom"),
+            )),
+        ),
+    ),
+    Policy(
+        "POL_Watermark", "CAT_ClassificationBanner_Appearance", "Watermark Overlay",
+        _help(
+            "This policy setting controls whether the classification is also shown as a faint watermark "
+            "across every monitor.",
+            "If you enable this policy setting, the marking is tiled over the whole screen in the banner "
+            "color at the selected opacity (1 to 50 percent). The watermark does not take mouse input "
+            "or focus. It is drawn again only when the marking, the opacity or a monitor's size "
+            "changes.",
+            "The watermark is available on Windows only.",
+            "If you disable or do not configure this policy setting, no watermark is shown.",
+        ),
+        toggle="Watermark",
+        elements=(
+            Element("WatermarkOpacity", "Opacity (percent):"),
+        ),
+    ),
+    Policy(
+        "POL_SpannedSurfaces", "CAT_ClassificationBanner_Appearance", "Video Wall Panels",
+        _help(
+            "This policy setting controls where banners are shown on video walls driven as one spanned "
+            "surface (NVIDIA Mosaic, AMD Eyefinity), which Windows reports as a single monitor.",
+            "If you select \"One banner per panel\", each spanned surface is split into its panels and "
+            "every panel shows its own banner. Panels are found from the surface's size: set the "
+            "panel size (for example 1920x1080) or leave it empty to detect a common panel "
+            "resolution. Bezel compensation between panels is allowed for. A monitor that is itself "
+            "a common resolution is not split unless a panel size is set.",
+            "Changes are applied to the running banner; only the banners of the affected monitors "
+            "are recreated.",
+            "If you do not configure this policy setting, one banner is shown per monitor that Windows "
+            "reports.",
+        ),
+        elements=(
+            Element("SpannedSurfaces", "Banners:", items=(
+                ("surface", "Surface", "One banner per monitor"),
+                ("panel", "Panel", "One banner per panel"),
+            )),
+            Element("PanelSize", "Panel size (WIDTHxHEIGHT, empty to detect):", max_length=11),
+        ),
+    ),
+    Policy(
+        "POL_CheckInterval", "CAT_ClassificationBanner_Performance", "Settings Check Interval",
+        _help(
+            "This policy setting controls how often the banner checks for changed settings, in "
+            "milliseconds.",
+            "The interval starts at the check interval, backs off towards the maximum while nothing "
+            "changes, and drops to the minimum for a few minutes after a change.",
+            "If you do not configure this policy setting, the banner checks every 15 seconds, between 2 "
+            "seconds and 5 minutes.",
+        ),
+        elements=(
+            Element("CheckInterval", "Check interval (ms):"),
+            Element("MinCheckInterval", "Minimum interval after a change (ms):"),
+            Element("MaxCheckInterval", "Maximum interval while idle (ms):"),
+        ),
+    ),
+    Policy(
+        "POL_ResourceUsage", "CAT_ClassificationBanner_Performance", "Resource Usage",
+        _help(
+            "This policy setting controls how the banner lowers its resource use after it is displayed.",
+            "Each option can be turned off separately: EcoQoS power throttling, below-normal CPU "
+            "priority, low I/O priority, low memory priority, and trimming the working set after "
+            "startup and after each rebuild.",
+            "If you do not configure this policy setting, all options are on.",
+        ),
+        elements=(
+            Element("EcoQoS", "Power throttling (EcoQoS)"),
+            Element("LowCpuPriority", "Below-normal CPU priority"),
+            Element("LowIoPriority", "Low I/O priority"),
+            Element("LowMemoryPriority", "Low memory priority"),
+            Element("TrimWorkingSet", "Trim the working set"),
+        ),
+    ),
+    Policy(
+        "POL_Diagnostics", "CAT_ClassificationBanner_Diagnostics", "Diagnostics",
+        _help(
+            "This policy setting controls the banner's diagnostic output.",
+            "Log target: file writes to the user's local application data folder, eventlog writes "
+            "warnings and errors to the Application log, both does both and none keeps records in "
+            "memory only. The log target is read at startup.",
+            "Leak report: 1 logs resource counters after each rebuild, 2 also traces Python "
+            "allocations.",
+            "Profile seconds: a new non-zero value profiles the banner for that many seconds.",
+            "If you do not configure this policy setting, the banner logs to a file and does not "
+            "report or profile.",
+        ),
+        elements=(
+            Element("LogTarget", "Log target:", items=(
+                ("file", "File", "File"),
+                ("eventlog", "EventLog", "Event log"),
+                ("both", "Both", "File and event log"),
+                ("none", "None", "None"),
+            )),
+            Element("LeakReport", "Leak report (0-2):"),
+            Element("ProfileSeconds", "Profile for (seconds):"),
+        ),
+    ),
+)
+
+
+def element_id(element: Element) -> str:
+    """Id of an element: explicit, or from its registry type"""
+    if element.id:
+        return element.id
+    kind = BY_VALUE_NAME[element.value_name].kind
+    if element.items:
+        prefix = "ENUM"
+    else:
+        prefix = {STRING: "TXT", INT: "DEC", BOOL: "CHK", MULTI_STRING: "MTXT"}[kind]
+    return f"{prefix}_{element.value_name}"
+
+
+def _item_string_id(element: Element, suffix: str) -> str:
+    return f"ENUM_{element.value_name}_{suffix}"
+
+
+def _admx_element(element: Element) -> List[str]:
+    field = BY_VALUE_NAME[element.value_name]
+    attrs = f"id={quoteattr(element_id(element))} valueName={quoteattr(element.value_name)}"
+    if element.required:
+        attrs += ' required="true"'
+    if element.items:
+        lines = [f"<enum {attrs}>"]
+        for value, suffix, _display in element.items:
+            lines += [
+                f'  <item displayName="$(string.{_item_string_id(element, suffix)})">',
+                "    <value>",
+                f"      <string>{escape(value)}</string>",
+                "    </value>",
+                "  </item>",
+            ]
+        return lines + ["</enum>"]
+    if field.kind == STRING:
+        if element.max_length:
+            attrs += f' maxLength="{element.max_length}"'
+        return [f"<text {attrs} />"]
+    if field.kind == INT:
+        check = field.check
+        if check is not None and check.low is not None:
+            attrs += f' minValue="{check.low}" maxValue="{check.high}"'
+        return [f"<decimal {attrs} />"]
+    if field.kind == BOOL:
+        return [
+            f"<boolean {attrs}>",
+            "  <trueValue>",
+            '    <decimal value="1" />',
+            "  </trueValue>",
+            "  <falseValue>",
+            '    <decimal value="0" />',
+            "  </falseValue>",
+            "</boolean>",
+        ]
+    return [f"<multiText {attrs} />"]
+
+
+def render_admx() -> str:
+    """The ADMX file for every policy"""
+    major, minor = __version__.split(".")[:2]
+    lines = [
+        '<?xml version="1.0" encoding="utf-8"?>',
+        "<!-- Generated by classification_banner.policy_templates; do not edit -->",
+        '<policyDefinitions xmlns:xsd="http://www.w3.org/2001/XMLSchema"',
+        f'  xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" revision="{major}.{minor}" schemaVersion="1.0"',
+        '  xmlns="http://schemas.microsoft.com/GroupPolicy/2006/07/PolicyDefinitions">',
+        "  <policyNamespaces>",
+        f'    <target prefix="classificationbanner" namespace="{NAMESPACE}" />',
+        '    <using prefix="windows" namespace="Microsoft.Policies.Windows" />',
+        "  </policyNamespaces>",
+        '  <resources minRequiredRevision="1.0" />',
+        "  <categories>",
+    ]
+    for category in CATEGORIES:
+        head = f'    <category name="{category.id}" displayName="$(string.{category.id})"'
+        if category.parent:
+            lines += [head + ">", f'      <parentCategory ref="{category.parent}" />', "    </category>"]
+        else:
+            lines.append(head + " />")
+    lines += ["  </categories>", "  <policies>"]
+
+    for policy in POLICIES:
+        attrs = (
+            f'name="{policy.name}" class="Machine" displayName="$(string.{policy.name})"'
+            f' explainText="$(string.{policy.name}_Help)"'
+        )
+        if policy.elements:
+            attrs += f' presentation="$(presentation.{policy.name})"'
+        attrs += f" key={quoteattr(POLICY_KEY)}"
+        if policy.toggle:
+            attrs += f" valueName={quoteattr(policy.toggle)}"
+        lines += [
+            f"    <policy {attrs}>",
+            f'      <parentCategory ref="{policy.category}" />',
+            f'      <supportedOn ref="{SUPPORTED_ON}" />',
+        ]
+        if policy.toggle:
+            lines += [
+                "      <enabledValue>",
+                '        <decimal value="1" />',
+                "      </enabledValue>",
+                "      <disabledValue>",
+                '        <decimal value="0" />',
+                "      </disabledValue>",
+            ]
+        if policy.elements:
+            lines.append("      <elements>")
+            for element in policy.elements:
+                lines += [f"        {line}" for line in _admx_element(element)]
+            lines.append("      </elements>")
+        lines.append("    </policy>")
+
+    lines += ["  </policies>", "</policyDefinitions>", ""]
+    return "\n".join(lines)
+
+
+def _presentation(element: Element) -> List[str]:
+    field = BY_VALUE_NAME[element.value_name]
+    ref = f'refId="{element_id(element)}"'
+    label = escape(element.label)
+    if element.items:
+        default = 0
+        for index, (value, _suffix, _display) in enumerate(element.items):
+            if value == field.default:
+                default = index
+        return [f'<dropdownList {ref} defaultItem="{default}">{label}</dropdownList>']
+    if field.kind == STRING:
+        lines = [f"<textBox {ref}>", f"  <label>{label}</label>"]
+        if element.default is not None:
+            lines.append(f"  <defaultValue>{escape(element.default)}</defaultValue>")
+        return lines + ["</textBox>"]
+    if field.kind == INT:
+        return [f'<decimalTextBox {ref} defaultValue="{field.default}">{label}</decimalTextBox>']
+    if field.kind == BOOL:
+        checked = "true" if field.default else "false"
+        return [f'<checkBox {ref} defaultChecked="{checked}">{label}</checkBox>']
+    return [f"<multiTextBox {ref}>{label}</multiTextBox>"]
+
+
+def render_adml() -> str:
+    """The en-US resource file for ``render_admx``"""
+    major, minor = __version__.split(".")[:2]
+    lines = [
+        '<?xml version="1.0" encoding="utf-8"?>',
+        "<!-- Generated by classification_banner.policy_templates; do not edit -->",
+        '<policyDefinitionResources xmlns:xsd="http://www.w3.org/2001/XMLSchema"',
+        f'  xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" revision="{major}.{minor}" schemaVersion="1.0"',
+        '  xmlns="http://schemas.microsoft.com/GroupPolicy/2006/07/PolicyDefinitions">',
+        "  <displayName>Classification Banner Language Resources</displayName>",
+        "  <description>Language resources for Classification Banner Group Policy settings</description>",
+        "  <resources>",
+        "    <stringTable>",
+    ]
+
+    def string(string_id: str, text: str) -> None:
+        lines.append(f'      <string id="{string_id}">{escape(text)}</string>')
+
+    for category in CATEGORIES:
+        string(category.id, category.display_name)
+    for policy in POLICIES:
+        string(policy.name, policy.display_name)
+        string(f"{policy.name}_Help", policy.help)
+        for element in policy.elements:
+            for _value, suffix, display in element.items:
+                string(_item_string_id(element, suffix), display)
+    lines += ["    </stringTable>", "    <presentationTable>"]
+
+    for policy in POLICIES:
+        if not policy.elements:
+            continue
+        lines.append(f'      <presentation id="{policy.name}">')
+        for element in policy.elements:
+            lines += [f"        {line}" for line in _presentation(element)]
+        lines.append("      </presentation>")
+
+    lines += ["    </presentationTable>", "  </resources>", "</policyDefinitionResources>", ""]
+    return "\n".join(lines)
+
+
+def render() -> Dict[str, str]:
+    """Relative path -> contents of every template file"""
+    return {
+        ADMX_NAME: render_admx(),
+        os.path.join(LANGUAGE, ADML_NAME): render_adml(),
+    }
+
+
+def stale_files(directory: str) -> List[str]:
+    """Template files under ``directory`` that differ from the generated ones"""
+    stale = []
+    for name, contents in render().items():
+        path = os.path.join(directory, name)
+        try:
+            with open(path, encoding="utf-8") as f:
+                current: Any = f.read()
+        except OSError:
+            current = None
+        if current != contents:
+            stale.append(path)
+    return stale
+
+
+def write(directory: str) -> List[str]:
+    """Write the templates under ``directory``; returns the paths written"""
+    written = []
+    for name, contents in render().items():
+        path = os.path.join(directory, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8", newline="\n") as f:
+            f.write(contents)
+        written.append(path)
+    return written
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate the Classification Banner ADMX/ADML templates")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--output", metavar="DIR", help="write the templates under DIR")
+    group.add_argument("--check", metavar="DIR", help="exit 1 if the templates under DIR are out of date")
+    args = parser.parse_args(argv)
+
+    if args.check:
+        stale = stale_files(args.check)
+        for path in stale:
+            print(f"out of date: {path}")
+        return 1 if stale else 0
+
+    for path in write(args.output):
+        print(f"wrote {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
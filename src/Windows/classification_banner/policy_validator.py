@@ -0,0 +1,416 @@
+"""
+Offline validation of exported .reg and Registry.pol policy files
+
+Parses the files without winreg, so it also runs on Linux build hosts, and
+sends the ClassificationBanner values through the same decoding the banner
+uses (``registry_manager.decode_values``, the settings schema checks,
+``apply_color_schemes`` and the marking engine). Files are memory-mapped, and
+large batches are spread across a process pool::
+
+    python -m classification_banner.policy_validator "exports/**/*.reg" gpo/
+"""
+
+import argparse
+import codecs
+import glob
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+from .registry_manager import ALL_VALUES, apply_color_schemes, decode_values
+from .settings import BannerSettings
+from .settings_schema import invalid_values
+from . import marking
+
+BANNER_KEY = r"SOFTWARE\ClassificationBanner"
+POL_SIGNATURE = b"PReg\x01\x00\x00\x00"
+
+# Same precedence as RegistryManager.registry_locations
+HIVES = ("HKEY_LOCAL_MACHINE", "HKEY_CURRENT_USER")
+HIVE_ALIASES = {"HKLM": "HKEY_LOCAL_MACHINE", "HKCU": "HKEY_CURRENT_USER"}
+
+REG_SZ = 1
+REG_EXPAND_SZ = 2
+REG_BINARY = 3
+REG_DWORD = 4
+REG_DWORD_BIG_ENDIAN = 5
+REG_MULTI_SZ = 7
+REG_QWORD = 11
+
+_REG_VALUE = re.compile(r'^(@|"(?:[^"\\]|\\.)*")\s*=\s*(.*)$', re.DOTALL)
+_REG_HEX = re.compile(r"^hex(?:\(([0-9a-fA-F]+)\))?:(.*)$", re.DOTALL)
+
+
+class PolicyParseError(ValueError):
+    """The file is not a well-formed .reg or Registry.pol file"""
+
+
+class ValidationResult(NamedTuple):
+    """What the banner would show for one policy file"""
+
+    path: str
+    valid: bool
+    errors: List[str]
+    warnings: List[str]
+    # Hive the values were taken from (``.pol`` files have none)
+    hive: Optional[str] = None
+    enabled: Optional[int] = None
+    classification_text: Optional[str] = None
+    bg_color: Optional[str] = None
+    fg_color: Optional[str] = None
+    caveats: Optional[str] = None
+    dissemination_controls: Optional[str] = None
+
+
+@contextmanager
+def _mapped(path: str) -> Iterator[Any]:
+    """The file's contents as a read-only memory map"""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # Empty files cannot be mapped
+            yield b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
+
+
+def _convert(kind: int, data: bytes) -> Any:
+    """Registry data as winreg.QueryValueEx would return it"""
+    if kind in (REG_SZ, REG_EXPAND_SZ):
+        return data.decode("utf-16-le", "replace").split("\x00", 1)[0]
+    if kind == REG_MULTI_SZ:
+        text = data.decode("utf-16-le", "replace").rstrip("\x00")
+        return text.split("\x00") if text else []
+    if kind == REG_DWORD and len(data) == 4:
+        return struct.unpack("<I", data)[0]
+    if kind == REG_DWORD_BIG_ENDIAN and len(data) == 4:
+        return struct.unpack(">I", data)[0]
+    if kind == REG_QWORD and len(data) == 8:
+        return struct.unpack("<Q", data)[0]
+    return bytes(data)
+
+
+# ---------------------------------------------------------------------------
+# .reg files
+# ---------------------------------------------------------------------------
+
+
+def _decode_reg_text(buf: Any) -> str:
+    """Regedit writes UTF-16 (version 5) or ANSI (REGEDIT4)"""
+    head = bytes(buf[:4])
+    if head[:2] in (codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE):
+        return codecs.decode(buf, "utf-16")
+    if head[:3] == codecs.BOM_UTF8:
+        return codecs.decode(buf, "utf-8-sig")
+    try:
+        return codecs.decode(buf, "utf-8")
+    except UnicodeDecodeError:
+        return codecs.decode(buf, "latin-1")
+
+
+def _logical_lines(text: str) -> Iterator[Tuple[int, str]]:
+    """Join hex data continued with a trailing backslash"""
+    pending = ""
+    start = 0
+    for number, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+        if not pending:
+            start = number
+        if line.endswith("\\") and ("=hex" in line or pending):
+            pending += line[:-1]
+            continue
+        yield start, pending + line
+        pending = ""
+    if pending:
+        yield start, pending
+
+
+def _unquote(text: str) -> str:
+    """Undo .reg string escaping"""
+    return re.sub(r"\\(.)", r"\1", text[1:-1])
+
+
+def _parse_reg_data(data: str) -> Any:
+    """One value's data in .reg syntax"""
+    if data.startswith('"') and data.endswith('"') and len(data) >= 2:
+        return _unquote(data)
+    if data.lower().startswith("dword:"):
+        return int(data[6:], 16)
+    match = _REG_HEX.match(data)
+    if match:
+        kind = int(match.group(1), 16) if match.group(1) else REG_BINARY
+        digits = [d for d in re.split(r"[,\s]+", match.group(2)) if d]
+        return _convert(kind, bytes(int(d, 16) for d in digits))
+    raise ValueError(f"unsupported data {data[:40]!r}")
+
+
+def _enter_reg_key(hives: Dict[str, Dict[str, Any]], number: int, line: str) -> Optional[Dict[str, Any]]:
+    """Handle a ``[key]`` line; returns the banner values it opens, if any"""
+    if not line.endswith("]"):
+        raise PolicyParseError(f"line {number}: unterminated key")
+    path_text = line[1:-1]
+    deleted = path_text.startswith("-")
+    hive, _, subkey = path_text.lstrip("-").partition("\\")
+    hive = HIVE_ALIASES.get(hive.upper(), hive.upper())
+    if subkey.lower() != BANNER_KEY.lower() or hive not in HIVES:
+        return None
+    if deleted:
+        hives.pop(hive, None)
+        return None
+    return hives.setdefault(hive, {})
+
+
+def _set_reg_value(current: Optional[Dict[str, Any]], number: int, line: str) -> None:
+    """Handle a ``"name"=data`` line, storing it when under the banner key"""
+    match = _REG_VALUE.match(line)
+    if not match:
+        raise PolicyParseError(f"line {number}: cannot parse {line[:40]!r}")
+    if current is None:
+        return
+    name = "" if match.group(1) == "@" else _unquote(match.group(1))
+    data = match.group(2).strip()
+    if data == "-":
+        current.pop(name, None)
+        return
+    try:
+        current[name] = _parse_reg_data(data)
+    except ValueError as e:
+        raise PolicyParseError(f"line {number}: {name}: {e}") from None
+
+
+def parse_reg(path: str) -> Dict[str, Dict[str, Any]]:
+    """Values under the banner key of each hive in a .reg export"""
+    with _mapped(path) as buf:
+        text = _decode_reg_text(buf)
+
+    lines = _logical_lines(text)
+    first = next(lines, (0, ""))[1]
+    if first not in ("Windows Registry Editor Version 5.00", "REGEDIT4"):
+        raise PolicyParseError("missing 'Windows Registry Editor' header")
+
+    hives: Dict[str, Dict[str, Any]] = {}
+    current: Optional[Dict[str, Any]] = None
+    for number, line in lines:
+        if not line or line.startswith(";"):
+            continue
+        if line.startswith("["):
+            current = _enter_reg_key(hives, number, line)
+        else:
+            _set_reg_value(current, number, line)
+
+    return hives
+
+
+# ---------------------------------------------------------------------------
+# Registry.pol files
+# ---------------------------------------------------------------------------
+
+
+def _read_utf16z(buf: Any, pos: int) -> Tuple[str, int]:
+    """A NUL-terminated UTF-16LE string; returns it and the offset past it"""
+    end = pos
+    while True:
+        end = buf.find(b"\x00\x00", end)
+        if end < 0:
+            raise PolicyParseError(f"offset {pos}: unterminated string")
+        if (end - pos) % 2 == 0:
+            break
+        end += 1
+    return bytes(buf[pos:end]).decode("utf-16-le", "replace"), end + 2
+
+
+def _expect(buf: Any, pos: int, char: str) -> int:
+    """Skip one UTF-16LE delimiter"""
+    if bytes(buf[pos:pos + 2]) != char.encode("utf-16-le"):
+        raise PolicyParseError(f"offset {pos}: expected {char!r}")
+    return pos + 2
+
+
+def parse_pol(path: str) -> Dict[str, Dict[str, Any]]:
+    """Values under the banner key in a Registry.pol file
+
+    Entries are ``[key;value;type;size;data]`` in UTF-16LE after the PReg
+    header. ``**del.`` and ``**delvals.`` entries remove values, as they do
+    when the policy is applied.
+    """
+    values: Dict[str, Any] = {}
+    with _mapped(path) as buf:
+        if bytes(buf[:8]) != POL_SIGNATURE:
+            raise PolicyParseError("missing PReg header")
+        pos = 8
+        size = len(buf)
+        while pos < size:
+            pos = _expect(buf, pos, "[")
+            key, pos = _read_utf16z(buf, pos)
+            pos = _expect(buf, pos, ";")
+            name, pos = _read_utf16z(buf, pos)
+            pos = _expect(buf, pos, ";")
+            if pos + 10 > size:
+                raise PolicyParseError(f"offset {pos}: truncated entry")
+            kind, = struct.unpack_from("<I", buf, pos)
+            pos = _expect(buf, pos + 4, ";")
+            length, = struct.unpack_from("<I", buf, pos)
+            pos = _expect(buf, pos + 4, ";")
+            if pos + length > size:
+                raise PolicyParseError(f"offset {pos}: data runs past end of file")
+            data = bytes(buf[pos:pos + length])
+            pos = _expect(buf, pos + length, "]")
+
+            if key.lower() != BANNER_KEY.lower():
+                continue
+            lowered = name.lower()
+            if lowered.startswith("**delvals"):
+                values.clear()
+            elif lowered.startswith("**del."):
+                values.pop(name[6:], None)
+            elif not name.startswith("**"):
+                values[name] = _convert(kind, data)
+
+    # Registry.pol has no hive; the folder it sits in (Machine/User) decides
+    return {"": values} if values else {}
+
+
+# ---------------------------------------------------------------------------
+# Validation
+# ---------------------------------------------------------------------------
+
+
+def parse_file(path: str) -> Dict[str, Dict[str, Any]]:
+    """Banner values by hive, for either file format"""
+    with open(path, "rb") as f:
+        signature = f.read(len(POL_SIGNATURE))
+    if signature == POL_SIGNATURE or path.lower().endswith(".pol"):
+        return parse_pol(path)
+    return parse_reg(path)
+
+
+def _pick_hive(hives: Dict[str, Dict[str, Any]]) -> Tuple[Optional[str], Dict[str, Any]]:
+    """The hive the banner would read, HKLM before HKCU"""
+    for hive in HIVES:
+        if hive in hives:
+            return hive, hives[hive]
+    if "" in hives:
+        return None, hives[""]
+    return None, {}
+
+
+def validate_file(path: str) -> ValidationResult:
+    """Parse one file and resolve the banner it would produce"""
+    try:
+        hives = parse_file(path)
+    except (OSError, PolicyParseError, UnicodeDecodeError) as e:
+        return ValidationResult(path, False, [str(e)], [])
+
+    if not hives:
+        return ValidationResult(path, False, [f"no {BANNER_KEY} values"], [])
+
+    hive, raw = _pick_hive(hives)
+    warnings = [f"unknown value {name!r}" for name in sorted(raw) if name not in ALL_VALUES]
+    if len(hives) > 1:
+        warnings.append(f"values for several hives; the banner reads {hive}")
+    decoded = apply_color_schemes(decode_values(raw))
+
+    settings = BannerSettings()
+    settings.update_from_registry(decoded)
+    settings.get_classification_text()
+
+    rendered = marking.render(settings.classification, settings.caveats,
+                              settings.dissemination_controls, settings.custom_classification)
+    # Invalid markings are shown raised to a safe level, so they fail validation
+    errors = invalid_values(decoded) + list(rendered.problems)
+    warnings.extend(f"{token!r} is not in the marking tables and is not checked" for token in rendered.unknown)
+    if rendered.level == "CUSTOM" and not (raw.get("BackgroundColor") and raw.get("TextColor")):
+        warnings.append("custom classification has no color scheme; default colors are used")
+
+    return ValidationResult(
+        path,
+        not errors,
+        errors,
+        warnings,
+        hive,
+        settings.enabled,
+        settings.classification_text,
+        settings.bg_color,
+        settings.fg_color,
+        settings.caveats,
+        settings.dissemination_controls,
+    )
+
+
+def expand_paths(patterns: List[str]) -> List[str]:
+    """Files named by paths, globs or directories (searched recursively)"""
+    paths: List[str] = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for root, _, files in os.walk(pattern):
+                paths.extend(
+                    os.path.join(root, name) for name in sorted(files)
+                    if name.lower().endswith((".reg", ".pol"))
+                )
+        elif glob.has_magic(pattern):
+            paths.extend(sorted(glob.glob(pattern, recursive=True)))
+        else:
+            paths.append(pattern)
+    return paths
+
+
+def validate_files(paths: List[str], jobs: Optional[int] = None) -> List[ValidationResult]:
+    """Validate files in parallel, keeping their order"""
+    if jobs == 1 or len(paths) < 2:
+        return [validate_file(path) for path in paths]
+    workers = jobs or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunksize = max(1, len(paths) // (workers * 4))
+        return list(executor.map(validate_file, paths, chunksize=chunksize))
+
+
+def format_result(result: ValidationResult) -> str:
+    """One report line, followed by its errors and warnings"""
+    if result.classification_text is None:
+        state = "INVALID"
+    else:
+        state = "enabled" if result.enabled else "disabled"
+        state = f"{state:<8} {result.classification_text!r} {result.bg_color}/{result.fg_color}"
+        if not result.valid:
+            state = f"INVALID  {state}"
+    lines = [f"{result.path}: {state}"]
+    lines.extend(f"  error: {e}" for e in result.errors)
+    lines.extend(f"  warning: {w}" for w in result.warnings)
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Validate policy files; exits 1 if any is invalid"""
+    parser = argparse.ArgumentParser(description="Validate exported banner policy files")
+    parser.add_argument("paths", nargs="+", help=".reg/Registry.pol files, globs or directories")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes")
+    parser.add_argument("--json", action="store_true", help="one JSON object per line")
+    args = parser.parse_args(argv)
+
+    results = validate_files(expand_paths(args.paths), args.jobs)
+    invalid = 0
+    produced: Dict[str, int] = {}
+    for result in results:
+        invalid += not result.valid
+        if result.valid:
+            key = result.classification_text if result.enabled else "(disabled)"
+            produced[key] = produced.get(key, 0) + 1
+        if args.json:
+            print(json.dumps(result._asdict()))
+        else:
+            print(format_result(result))
+
+    if not args.json:
+        print(f"\n{len(results)} files, {invalid} invalid")
+        for text, count in sorted(produced.items(), key=lambda item: -item[1]):
+            print(f"{count:>6}  {text}")
+    return 1 if invalid else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""
+Adaptive polling interval for registry change detection
+"""
+
+import time
+from collections import deque
+from typing import Callable, Deque
+from .constants import (
+    CHECK_BACKOFF_FACTOR,
+    CHECK_BURST_DURATION,
+    DEFAULT_CHECK_INTERVAL,
+    DEFAULT_MAX_CHECK_INTERVAL,
+    DEFAULT_MIN_CHECK_INTERVAL,
+)
+
+HOUR_MS = 3600 * 1000
+
+
+class AdaptivePoller:
+    """Chooses the delay before the next registry poll
+
+    While the configuration is stable the interval backs off from the base
+    ``check_interval`` toward ``max_interval``. A detected change switches to
+    burst mode: polls run every ``min_interval`` for ``burst_duration`` so
+    follow-up edits are picked up quickly, then the backoff starts over.
+
+    All times are milliseconds; ``clock`` returns seconds and can be replaced
+    with a virtual clock.
+    """
+
+    def __init__(
+        self,
+        base_interval: int = DEFAULT_CHECK_INTERVAL,
+        min_interval: int = DEFAULT_MIN_CHECK_INTERVAL,
+        max_interval: int = DEFAULT_MAX_CHECK_INTERVAL,
+        backoff: float = CHECK_BACKOFF_FACTOR,
+        burst_duration: int = CHECK_BURST_DURATION,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.backoff = backoff
+        self.burst_duration = burst_duration
+        self.clock = clock
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.current_interval: int = base_interval
+        self.configure(base_interval, min_interval, max_interval)
+
+        self._burst_until: float = 0.0
+        self._started: float = self._now()
+        self._polls: Deque[float] = deque()
+
+    def _now(self) -> float:
+        return self.clock() * 1000
+
+    def configure(self, base_interval: int, min_interval: int, max_interval: int) -> None:
+        """Apply interval bounds, e.g. after they were changed in the registry"""
+        min_interval = max(1, int(min_interval))
+        max_interval = max(min_interval, int(max_interval))
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.base_interval = min(max(int(base_interval), min_interval), max_interval)
+        self.current_interval = min(max(self.current_interval, min_interval), max_interval)
+
+    @property
+    def in_burst(self) -> bool:
+        """True while polling fast after a recent change"""
+        return self._now() < self._burst_until
+
+    def record(self, changed: bool) -> int:
+        """Record a completed poll and return the delay before the next one"""
+        now = self._now()
+        self._polls.append(now)
+        while self._polls and self._polls[0] <= now - HOUR_MS:
+            self._polls.popleft()
+
+        if changed:
+            self._burst_until = now + self.burst_duration
+            self.current_interval = self.min_interval
+        elif now < self._burst_until:
+            self.current_interval = self.min_interval
+        elif self.current_interval < self.base_interval:
+            # Burst just ended
+            self.current_interval = self.base_interval
+        else:
+            self.current_interval = min(
+                int(self.current_interval * self.backoff), self.max_interval
+            )
+
+        return self.current_interval
+
+    def wakeups_per_hour(self) -> float:
+        """Polls during the last hour, extrapolated while uptime is shorter"""
+        elapsed = self._now() - self._started
+        if elapsed <= 0:
+            return 0.0
+        if elapsed < HOUR_MS:
+            return len(self._polls) * HOUR_MS / elapsed
+        return float(len(self._polls))
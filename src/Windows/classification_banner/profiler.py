@@ -0,0 +1,144 @@
+"""
+On-demand profiling of the running banner
+"""
+
+import ctypes
+import io
+import os
+import sys
+import tempfile
+import time
+from ctypes import wintypes
+from typing import Any, Optional
+from .constants import DEFAULT_PROFILE_SECONDS, PROFILE_EVENT_NAME, PROFILE_MAX_SECONDS
+from . import event_log
+
+WAIT_OBJECT_0 = 0
+
+
+def default_output_dir() -> str:
+    """Directory next to the executable (or main script)"""
+    if getattr(sys, "frozen", False):
+        return os.path.dirname(sys.executable)
+    return os.path.dirname(os.path.abspath(sys.argv[0] or "."))
+
+
+class ProfileController:
+    """Runs cProfile and tracemalloc for a bounded window when triggered
+
+    Triggers are checked from the existing registry poll, so there is no
+    extra timer: a new non-zero ``ProfileSeconds`` registry value, or the
+    named event ``Local\\ClassificationBannerProfile`` being set. Nothing is
+    imported or enabled until a trigger fires.
+    """
+
+    def __init__(self, scheduler: Any, output_dir: Optional[str] = None,
+                 event_name: Optional[str] = PROFILE_EVENT_NAME, initial_seconds: int = 0):
+        self.scheduler = scheduler
+        self.output_dir = output_dir or default_output_dir()
+        self.active = False
+        self.last_report: Optional[str] = None
+        self._profile: Any = None
+        self._started: float = 0.0
+        # A value already present at startup is not a new request
+        self._last_seconds = initial_seconds or 0
+        self._event: Optional[int] = None
+        self._kernel32: Any = None
+        self._owns_tracemalloc = False
+
+        if event_name and sys.platform == "win32":
+            self._open_event(event_name)
+
+    def _open_event(self, event_name: str) -> None:
+        """Create the auto-reset trigger event"""
+        self._kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        self._kernel32.CreateEventW.argtypes = [
+            ctypes.c_void_p, wintypes.BOOL, wintypes.BOOL, wintypes.LPCWSTR]
+        self._kernel32.CreateEventW.restype = wintypes.HANDLE
+        self._kernel32.WaitForSingleObject.argtypes = [wintypes.HANDLE, wintypes.DWORD]
+        self._kernel32.WaitForSingleObject.restype = wintypes.DWORD
+        self._kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+        handle = self._kernel32.CreateEventW(None, False, False, event_name)
+        if handle:
+            self._event = handle
+        else:
+            event_log.error("profiler", f"Error creating profile event: {ctypes.get_last_error()}")
+
+    def check(self, profile_seconds: int = 0) -> bool:
+        """Start profiling if a trigger fired; returns True when started"""
+        seconds = 0
+        if profile_seconds and profile_seconds != self._last_seconds:
+            seconds = profile_seconds
+        self._last_seconds = profile_seconds or 0
+
+        if self._event is not None and \
+                self._kernel32.WaitForSingleObject(self._event, 0) == WAIT_OBJECT_0:
+            seconds = seconds or DEFAULT_PROFILE_SECONDS
+
+        if seconds and not self.active:
+            self.start(seconds)
+            return True
+        return False
+
+    def start(self, seconds: int) -> None:
+        """Profile the Tk thread and Python allocations for ``seconds``"""
+        import cProfile
+        import tracemalloc
+
+        seconds = max(1, min(int(seconds), PROFILE_MAX_SECONDS))
+        event_log.info("profiler", f"Profiling for {seconds} seconds...")
+        self.active = True
+        self._started = time.monotonic()
+        self._owns_tracemalloc = not tracemalloc.is_tracing()
+        if self._owns_tracemalloc:
+            tracemalloc.start()
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+        self.scheduler.schedule("profile_stop", seconds * 1000, self.stop)
+
+    def stop(self) -> Optional[str]:
+        """Stop profiling and write the results; returns the report path"""
+        if not self.active:
+            return None
+        import pstats
+        import tracemalloc
+
+        self._profile.disable()
+        snapshot = tracemalloc.take_snapshot()
+        if self._owns_tracemalloc:
+            # Leave tracing on if LeakReport=2 started it
+            tracemalloc.stop()
+        self.active = False
+
+        elapsed = time.monotonic() - self._started
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        base = self._writable_base(f"ClassificationBanner-profile-{stamp}")
+        self._profile.dump_stats(base + ".prof")
+
+        report = io.StringIO()
+        report.write(f"Profile window: {elapsed:.1f} s\n\n")
+        stats = pstats.Stats(self._profile, stream=report)
+        stats.sort_stats("cumulative").print_stats(40)
+        report.write("\nTop allocations by line:\n")
+        for stat in snapshot.statistics("lineno")[:40]:
+            report.write(f"{stat}\n")
+        with open(base + ".txt", "w", encoding="utf-8") as text:
+            text.write(report.getvalue())
+
+        self._profile = None
+        self.last_report = base + ".txt"
+        event_log.info("profiler", f"Profile written to {self.last_report}")
+        return self.last_report
+
+    def _writable_base(self, name: str) -> str:
+        """Output path prefix, falling back to the temp dir (e.g. Program Files)"""
+        for directory in (self.output_dir, tempfile.gettempdir()):
+            if os.access(directory, os.W_OK):
+                return os.path.join(directory, name)
+        return os.path.join(tempfile.gettempdir(), name)
+
+    def close(self) -> None:
+        """Release the trigger event"""
+        if self._event is not None:
+            self._kernel32.CloseHandle(self._event)
+            self._event = None
@@ -3,8 +3,49 @@ Windows Registry management for Classification Banner
 """
 
 from typing import Dict, Any, Optional, List, Tuple
-import winreg
 from .constants import COLOR_SCHEMES
+from . import event_log, marking, settings_schema
+
+try:
+    import winreg
+except ImportError:
+    # Offline tools (policy_validator) only need the decoding below
+    winreg = None
+
+# Every value the banner reads, in schema order
+ALL_VALUES = list(settings_schema.VALUE_NAMES)
+
+
+def decode_values(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn raw registry data (as winreg returns it) into settings values
+
+    ``raw`` maps value names to data; absent names decode to None and data
+    that cannot be converted to ``settings_schema.Malformed``.
+    """
+    return settings_schema.decode(raw)
+
+
+def apply_color_schemes(settings: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply predefined color schemes based on classification"""
+    if not settings.get("Classification"):
+        return settings
+
+    # The marking engine resolves aliases, full markings and fail-safe levels
+    rendered = marking.render(
+        settings.get("Classification"),
+        settings.get("Caveats"),
+        settings.get("DisseminationControls"),
+        settings.get("CustomClassification"),
+    )
+    if rendered.level in COLOR_SCHEMES:
+        scheme = COLOR_SCHEMES[rendered.level]
+        # Only apply if custom colors not set
+        if not settings.get("BackgroundColor"):
+            settings["BackgroundColor"] = scheme["bg"]
+        if not settings.get("TextColor"):
+            settings["TextColor"] = scheme["fg"]
+
+    return settings
 
 
 class RegistryManager:
@@ -29,81 +70,24 @@ class RegistryManager:
             except FileNotFoundError:
                 continue
             except SystemError as e:
-                print(f"Error reading registry at {hkey}\\{subkey}: {e}")
+                event_log.error("registry", f"Error reading registry at {hkey}\\{subkey}: {e}")
                 continue
 
         return self._apply_color_schemes(settings)
 
-    def _read_all_values(self, key: winreg.HKEYType) -> Dict[str, Any]:
+    def _read_all_values(self, key: "winreg.HKEYType") -> Dict[str, Any]:
         """Read all registry values from an open key"""
-        settings: Dict[str, Any] = {}
-
-        # String values
-        for name in [
-            "Classification",
-            "BackgroundColor",
-            "TextColor",
-            "Caveats",
-            "DisseminationControls",
-            "FPCON",
-            "CPCON",
-            "GroupID",
-        ]:
-            settings[name] = self._read_string(key, name)
-
-        # Integer values
-        for name in ["Enabled"]:
-            settings[name] = self._read_int(key, name)
-
-        # Boolean values (stored as DWORD)
-        for name in [
-            "ShowHostname",
-            "ShowUsername",
-            "ShowWindowsVersion",
-            "ShowIPAddress",
-            "ShowGroupID",
-        ]:
-            settings[name] = self._read_bool(key, name)
-
-        return settings
-
-    def _read_string(self, key: winreg.HKEYType, name: str) -> Optional[str]:
-        """Read a string value from registry"""
-        try:
-            value, _ = winreg.QueryValueEx(key, name)
-            return value if value else None
-        except FileNotFoundError:
-            return None
-
-    def _read_int(self, key: winreg.HKEYType, name: str) -> Optional[int]:
-        """Read an integer value from registry"""
-        try:
-            value, _ = winreg.QueryValueEx(key, name)
-            return int(value)
-        except FileNotFoundError:
-            return None
-
-    def _read_bool(self, key: winreg.HKEYType, name: str) -> Optional[bool]:
-        """Read a boolean value from registry (stored as DWORD)"""
-        try:
-            value, _ = winreg.QueryValueEx(key, name)
-            return bool(int(value))
-        except FileNotFoundError:
-            return None
+        raw: Dict[str, Any] = {}
+        for name in ALL_VALUES:
+            try:
+                raw[name], _ = winreg.QueryValueEx(key, name)
+            except FileNotFoundError:
+                continue
+        return decode_values(raw)
 
     def _apply_color_schemes(self, settings: Dict[str, Any]) -> Dict[str, Any]:
         """Apply predefined color schemes based on classification"""
-        classification = settings.get("Classification", "").upper()
-
-        if classification in COLOR_SCHEMES:
-            scheme = COLOR_SCHEMES[classification]
-            # Only apply if custom colors not set
-            if not settings.get("BackgroundColor"):
-                settings["BackgroundColor"] = scheme["bg"]
-            if not settings.get("TextColor"):
-                settings["TextColor"] = scheme["fg"]
-
-        return settings
+        return apply_color_schemes(settings)
 
     def read_group_id(self) -> Optional[str]:
         """Read GroupID from registry"""
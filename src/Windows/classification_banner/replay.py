@@ -0,0 +1,254 @@
+"""
+Record and replay of the external inputs the banner consumes
+
+A trace is a JSON-lines file of ``[time_ms, kind, data]`` records. Every
+registry read and monitor enumeration is one record; ``data`` is null when
+the snapshot is identical to the previous one of the same kind, so the
+record doubles as a timer tick. Session events (lock, DPI change, ...) can
+be added with ``EventRecorder.record``.
+
+Replay a trace against fake backends on a virtual clock::
+
+    python -m classification_banner.replay trace.jsonl
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Any, Callable, Dict, IO, List, NamedTuple, Optional
+from .banner import ClassificationBanner
+from .fakes import FakeMonitor, FakeMonitorManager, FakeRegistryManager, FakeWindowFactory
+from .scheduler import VirtualScheduler
+
+# Longest virtual time to wait for the app to consume an input
+REPLAY_MAX_LATENCY = 3600 * 1000
+
+
+class TraceEvent(NamedTuple):
+    """One recorded input"""
+
+    time_ms: int
+    kind: str
+    data: Any
+
+
+class EventRecorder:
+    """Appends input snapshots to a compact trace file"""
+
+    def __init__(self, path: str, clock: Callable[[], float] = time.monotonic):
+        self.path = path
+        self.clock = clock
+        self._file: IO[str] = open(path, "w", encoding="utf-8")
+        self._start = clock()
+        self._last: Dict[str, Any] = {}
+
+    def record(self, kind: str, data: Any = None) -> None:
+        """Write one event"""
+        elapsed = int((self.clock() - self._start) * 1000)
+        self._file.write(json.dumps([elapsed, kind, data], separators=(",", ":")) + "\n")
+        self._file.flush()
+
+    def snapshot(self, kind: str, data: Any) -> None:
+        """Write a snapshot, or a bare tick if it equals the previous one"""
+        if kind in self._last and self._last[kind] == data:
+            self.record(kind)
+        else:
+            self._last[kind] = data
+            self.record(kind, data)
+
+    def close(self) -> None:
+        """Close the trace file"""
+        self._file.close()
+
+
+class RecordingRegistryManager:
+    """Registry backend wrapper that records every load"""
+
+    def __init__(self, inner: Any, recorder: EventRecorder):
+        self.inner = inner
+        self.recorder = recorder
+
+    def load_settings(self) -> Dict[str, Any]:
+        """Load from the wrapped backend and record the result"""
+        values = self.inner.load_settings()
+        self.recorder.snapshot("registry", values)
+        return values
+
+    def read_group_id(self) -> Optional[str]:
+        """Pass through to the wrapped backend"""
+        return self.inner.read_group_id()
+
+
+class RecordingMonitorManager:
+    """Monitor backend wrapper that records every enumeration"""
+
+    def __init__(self, inner: Any, recorder: EventRecorder):
+        self.inner = inner
+        self.recorder = recorder
+
+    def get_all_monitors(self) -> Any:
+        """Enumerate through the wrapped backend and record the layout"""
+        monitors = self.inner.get_all_monitors()
+        self.recorder.snapshot("monitors", [
+            [m.x, m.y, m.width, m.height, getattr(m, "name", None)] for m in monitors
+        ])
+        return monitors
+
+
+def load_trace(path: str) -> List[TraceEvent]:
+    """Read a trace file"""
+    events: List[TraceEvent] = []
+    with open(path, encoding="utf-8") as trace:
+        for line in trace:
+            if line.strip():
+                time_ms, kind, data = json.loads(line)
+                events.append(TraceEvent(int(time_ms), kind, data))
+    events.sort(key=lambda e: e.time_ms)
+    return events
+
+
+class EventResult(NamedTuple):
+    """What the app did in response to one changed input"""
+
+    time_ms: int
+    kind: str
+    rebuilds: int
+    appbar_registrations: int
+    latency_ms: Optional[int]
+    cpu_ms: float
+
+
+class Replayer:
+    """Feeds a trace into ClassificationBanner through fake backends"""
+
+    def __init__(self, events: List[TraceEvent]):
+        self.events = events
+        self.results: List[EventResult] = []
+        self.scheduler = VirtualScheduler()
+        self.factory = FakeWindowFactory(self.scheduler)
+        self.registry = FakeRegistryManager(self._initial("registry") or {})
+        self.monitors = FakeMonitorManager(self._to_monitors(self._initial("monitors")))
+        self.banner: Optional[ClassificationBanner] = None
+        self.exited = False
+        self._pending: Dict[str, "_Pending"] = {}
+
+    def _initial(self, kind: str) -> Any:
+        return next((e.data for e in self.events if e.kind == kind and e.data is not None), None)
+
+    @staticmethod
+    def _to_monitors(data: Any) -> Optional[List[FakeMonitor]]:
+        if data is None:
+            return None
+        return [FakeMonitor(x, y, w, h, name=name) for x, y, w, h, name in data]
+
+    def _reads(self, kind: str) -> int:
+        return self.registry.calls if kind == "registry" else self.monitors.calls
+
+    def run(self) -> List[EventResult]:
+        """Replay every event and return one result per changed input"""
+        self.banner = ClassificationBanner(
+            registry_manager=self.registry,
+            monitor_manager=self.monitors,
+            scheduler=self.scheduler,
+            window_factory=self.factory,
+        )
+        initial = {"registry": False, "monitors": False}
+        for event in self.events:
+            self._advance_to(event.time_ms)
+            if self.exited:
+                break
+            if event.data is None or event.kind not in initial:
+                continue
+            if not initial[event.kind]:
+                # Already used to construct the banner
+                initial[event.kind] = True
+                continue
+
+            if event.kind in self._pending:
+                # Overwritten before the app read it
+                self._finish(event.kind, None)
+            if event.kind == "registry":
+                self.registry.values = dict(event.data)
+            else:
+                self.monitors.monitors = self._to_monitors(event.data) or []
+            self._pending[event.kind] = _Pending(
+                event, self._reads(event.kind), self.banner.rebuild_count,
+                self.factory.appbar_registrations)
+
+        # Let the app consume whatever changed last
+        if self.events and not self.exited:
+            self._advance_to(self.events[-1].time_ms + REPLAY_MAX_LATENCY, until_idle=True)
+        for kind in list(self._pending):
+            self._finish(kind, None)
+        self.results.sort(key=lambda r: r.time_ms)
+        return self.results
+
+    def _advance_to(self, deadline_ms: int, until_idle: bool = False) -> None:
+        """Fire timers one at a time up to ``deadline_ms``, closing measurements"""
+        while not self.exited:
+            if until_idle and not self._pending:
+                return
+            due = self.scheduler.next_due()
+            if due is None or due > deadline_ms:
+                break
+            started = time.perf_counter()
+            self.scheduler.run_until(due)
+            # Banner disabled in the trace
+            self.exited = self.banner.shutdown.started
+            elapsed = (time.perf_counter() - started) * 1000
+            for kind, pending in list(self._pending.items()):
+                pending.cpu_ms += elapsed
+                if self._reads(kind) != pending.reads:
+                    self._finish(kind, self.scheduler.now_ms - pending.event.time_ms)
+        if not until_idle:
+            self.scheduler.run_until(max(self.scheduler.now_ms, deadline_ms))
+
+    def _finish(self, kind: str, latency: Optional[int]) -> None:
+        pending = self._pending.pop(kind)
+        self.results.append(EventResult(
+            time_ms=pending.event.time_ms,
+            kind=kind,
+            rebuilds=self.banner.rebuild_count - pending.rebuilds,
+            appbar_registrations=self.factory.appbar_registrations - pending.registrations,
+            latency_ms=latency,
+            cpu_ms=pending.cpu_ms,
+        ))
+
+
+class _Pending:
+    """Measurement for an input the app has not read yet"""
+
+    def __init__(self, event: TraceEvent, reads: int, rebuilds: int, registrations: int):
+        self.event = event
+        self.reads = reads
+        self.rebuilds = rebuilds
+        self.registrations = registrations
+        self.cpu_ms = 0.0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Replay a trace and print per-event results"""
+    parser = argparse.ArgumentParser(description="Replay a banner input trace")
+    parser.add_argument("trace")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    replayer = Replayer(load_trace(args.trace))
+    results = replayer.run()
+
+    if args.json:
+        print(json.dumps([r._asdict() for r in results], indent=2))
+    else:
+        for r in results:
+            latency = "n/a" if r.latency_ms is None else f"{r.latency_ms} ms"
+            print(f"{r.time_ms:>10} {r.kind:<9} rebuilds={r.rebuilds} "
+                  f"appbars={r.appbar_registrations} latency={latency} cpu={r.cpu_ms:.2f} ms")
+    print(f"total rebuilds={replayer.banner.rebuild_count} "
+          f"appbar registrations={replayer.factory.appbar_registrations} "
+          f"timers fired={dict(replayer.scheduler.fired)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""
+Background resource policy: EcoQoS, low priorities and working-set trims
+
+The banner is idle nearly all the time, so once the first banners are
+painted it opts into power throttling (EcoQoS), drops its CPU, I/O and
+memory priority, and hands the startup working set (Tk, screeninfo) back to
+the OS. The trim is repeated after each rebuild. Every step has its own
+registry switch and can be turned back off at runtime.
+
+The OS calls sit behind a small interface: Win32ResourceOS on Windows,
+NullResourceOS elsewhere or when the banner runs against fake backends.
+"""
+
+import ctypes
+from ctypes import wintypes
+from typing import Any, Dict, List, Optional, Tuple
+from . import event_log, win32
+
+# SetProcessInformation classes
+PROCESS_MEMORY_PRIORITY = 0
+PROCESS_POWER_THROTTLING = 4
+PROCESS_POWER_THROTTLING_CURRENT_VERSION = 1
+PROCESS_POWER_THROTTLING_EXECUTION_SPEED = 0x1
+MEMORY_PRIORITY_LOW = 2
+MEMORY_PRIORITY_NORMAL = 5
+
+# SetPriorityClass
+NORMAL_PRIORITY_CLASS = 0x00000020
+BELOW_NORMAL_PRIORITY_CLASS = 0x00004000
+
+# NtSetInformationProcess(ProcessIoPriority)
+PROCESS_IO_PRIORITY = 33
+IO_PRIORITY_LOW = 1
+IO_PRIORITY_NORMAL = 2
+
+# Settings attribute -> interface method, in the order they are applied
+STEPS = {
+    "eco_qos": "set_power_throttling",
+    "low_cpu_priority": "set_cpu_priority",
+    "low_io_priority": "set_io_priority",
+    "low_memory_priority": "set_memory_priority",
+}
+
+
+class _PROCESS_POWER_THROTTLING_STATE(ctypes.Structure):
+    _fields_ = [
+        ("Version", wintypes.ULONG),
+        ("ControlMask", wintypes.ULONG),
+        ("StateMask", wintypes.ULONG),
+    ]
+
+
+class _MEMORY_PRIORITY_INFORMATION(ctypes.Structure):
+    _fields_ = [("MemoryPriority", wintypes.ULONG)]
+
+
+class NullResourceOS:
+    """Process controls that do nothing
+
+    Also the interface: each ``set_*`` call turns one step on (True) or back
+    to the process default (False) and raises OSError if the OS refuses.
+    """
+
+    def set_power_throttling(self, enabled: bool) -> None:
+        """Opt in to (or out of) EcoQoS execution-speed throttling"""
+
+    def set_cpu_priority(self, low: bool) -> None:
+        """Below-normal or normal priority class"""
+
+    def set_io_priority(self, low: bool) -> None:
+        """Low or normal I/O priority"""
+
+    def set_memory_priority(self, low: bool) -> None:
+        """Low or normal page priority"""
+
+    def trim_working_set(self) -> None:
+        """Release the process working set"""
+
+    def working_set(self) -> int:
+        """Working set size in bytes, -1 if unknown"""
+        return -1
+
+
+class Win32ResourceOS(NullResourceOS):
+    """Process controls through the typed Win32 bindings"""
+
+    def __init__(self):
+        self._win32 = win32.api()
+        self._process = self._win32.GetCurrentProcess()
+        # Preallocated arguments
+        self._throttling = _PROCESS_POWER_THROTTLING_STATE(
+            PROCESS_POWER_THROTTLING_CURRENT_VERSION, PROCESS_POWER_THROTTLING_EXECUTION_SPEED, 0)
+        self._memory_priority = _MEMORY_PRIORITY_INFORMATION()
+        self._io_priority = wintypes.ULONG()
+        self._counters = win32.PROCESS_MEMORY_COUNTERS()
+        self._counters.cb = ctypes.sizeof(self._counters)
+
+    def set_power_throttling(self, enabled: bool) -> None:
+        self._throttling.StateMask = PROCESS_POWER_THROTTLING_EXECUTION_SPEED if enabled else 0
+        self._win32.SetProcessInformation(
+            self._process, PROCESS_POWER_THROTTLING,
+            ctypes.byref(self._throttling), ctypes.sizeof(self._throttling))
+
+    def set_cpu_priority(self, low: bool) -> None:
+        self._win32.SetPriorityClass(
+            self._process, BELOW_NORMAL_PRIORITY_CLASS if low else NORMAL_PRIORITY_CLASS)
+
+    def set_io_priority(self, low: bool) -> None:
+        self._io_priority.value = IO_PRIORITY_LOW if low else IO_PRIORITY_NORMAL
+        self._win32.NtSetInformationProcess(
+            self._process, PROCESS_IO_PRIORITY,
+            ctypes.byref(self._io_priority), ctypes.sizeof(self._io_priority))
+
+    def set_memory_priority(self, low: bool) -> None:
+        priority = MEMORY_PRIORITY_LOW if low else MEMORY_PRIORITY_NORMAL
+        self._memory_priority.MemoryPriority = priority
+        self._win32.SetProcessInformation(
+            self._process, PROCESS_MEMORY_PRIORITY,
+            ctypes.byref(self._memory_priority), ctypes.sizeof(self._memory_priority))
+
+    def trim_working_set(self) -> None:
+        self._win32.K32EmptyWorkingSet(self._process)
+
+    def working_set(self) -> int:
+        try:
+            self._win32.K32GetProcessMemoryInfo(
+                self._process, ctypes.byref(self._counters), self._counters.cb)
+        except OSError:
+            return -1
+        return self._counters.WorkingSetSize
+
+
+class ResourcePolicy:
+    """Applies the configured steps and trims the working set
+
+    ``configure`` is cheap to call on every registry check: only steps whose
+    setting changed reach the OS, and a step the OS refused is not retried
+    until its setting changes again.
+    """
+
+    def __init__(self, os_interface: Optional[NullResourceOS] = None):
+        self.os = os_interface or NullResourceOS()
+        self.configured = False
+        # Last requested state per step, and what happened
+        self.requested: Dict[str, bool] = {}
+        self.status: Dict[str, str] = {}
+        self.trims = 0
+        # (reason, bytes before, bytes after) of the latest trim
+        self.last_trim: Optional[Tuple[str, int, int]] = None
+
+    def configure(self, settings: Any) -> List[str]:
+        """Bring each step in line with ``settings``; returns the steps changed"""
+        changed = []
+        for field, method in STEPS.items():
+            wanted = bool(getattr(settings, field))
+            if self.requested.get(field) == wanted:
+                continue
+            first = field not in self.requested
+            self.requested[field] = wanted
+            if first and not wanted:
+                # The process already runs with the default
+                self.status[field] = "off"
+                continue
+            try:
+                getattr(self.os, method)(wanted)
+                self.status[field] = "on" if wanted else "off"
+                changed.append(field)
+            except OSError as e:
+                self.status[field] = f"failed: {e}"
+                event_log.warning("resource_policy", f"Error applying {field}: {e}")
+        self.configured = True
+        if changed:
+            event_log.info("resource_policy", self.report())
+        return changed
+
+    def trim(self, settings: Any, reason: str) -> bool:
+        """Release the working set if enabled; returns True if trimmed"""
+        if not settings.trim_working_set:
+            return False
+        before = self.os.working_set()
+        try:
+            self.os.trim_working_set()
+        except OSError as e:
+            event_log.warning("resource_policy", f"Error trimming working set: {e}")
+            return False
+        after = self.os.working_set()
+        self.trims += 1
+        self.last_trim = (reason, before, after)
+        if before >= 0 and after >= 0:
+            event_log.info("resource_policy", f"Trimmed working set after {reason}: "
+                           f"{before / 2**20:.1f} MB -> {after / 2**20:.1f} MB")
+        return True
+
+    def report(self) -> str:
+        """One line: the state of every step"""
+        return "Resource policy: " + ", ".join(
+            f"{field}={self.status.get(field, 'pending')}" for field in STEPS)
@@ -0,0 +1,188 @@
+"""
+Scaling with the number of monitors (video walls)
+
+Builds ClassificationBanner on fake monitors and windows for a wall of each
+monitor count and checks that its own work grows no faster than the wall:
+
+- milliseconds per monitor, medians over the repeats: startup, a marking
+  change (repainted in place), a monitor check with nothing changed and an
+  occlusion check
+- counts that must not grow with the wall: pending timers, and the windows
+  and AppBar transactions a hot-plugged monitor costs; startup takes one
+  AppBar transaction per ``BANNER_BATCH_SIZE`` monitors
+- idle timer callbacks per hour, against the idle_budget.py budget
+
+Each is checked against its budget in constants.py::
+
+    python -m classification_banner.scaling --monitors 1 16 64
+"""
+
+import argparse
+import math
+import statistics
+import sys
+import time
+from typing import Dict, List, NamedTuple, Optional
+from .banner import ClassificationBanner
+from .constants import (
+    BANNER_BATCH_SIZE,
+    SCALING_BUDGET_MARKING_MS,
+    SCALING_BUDGET_MONITOR_CHECK_MS,
+    SCALING_BUDGET_STARTUP_MS,
+    SCALING_BUDGET_TIMERS,
+    SCALING_BUDGET_VISIBILITY_MS,
+    SCALING_TARGET_MONITORS,
+)
+from .fakes import (
+    FakeMonitor,
+    FakeMonitorManager,
+    FakeRegistryManager,
+    FakeWindowFactory,
+    FakeWindowSource,
+    make_monitor_grid,
+)
+from .idle_budget import IDLE_SETTINGS, budget_for, measure_idle
+from .scheduler import VirtualScheduler
+
+# Monitors per row of the fake wall
+WALL_COLUMNS = 8
+
+WALL_SETTINGS = {**IDLE_SETTINGS, "Edges": "both"}
+
+
+class ScalingReport(NamedTuple):
+    """Banner costs for a wall of ``monitors`` monitors"""
+
+    monitors: int
+    # Milliseconds per monitor
+    startup_ms: float
+    marking_ms: float
+    monitor_check_ms: float
+    visibility_ms: float
+    # Counts
+    timers: int
+    startup_transactions: int
+    hotplug_windows: int
+    hotplug_transactions: int
+    # Per simulated hour
+    idle_callbacks: float
+
+
+def make_wall(monitors: int) -> List[object]:
+    """``monitors`` 1920x1080 monitors, ``WALL_COLUMNS`` to a row"""
+    rows = math.ceil(monitors / WALL_COLUMNS)
+    return make_monitor_grid(min(monitors, WALL_COLUMNS), rows)[:monitors]
+
+
+def _elapsed_ms(action) -> float:
+    started = time.perf_counter()
+    action()
+    return (time.perf_counter() - started) * 1000
+
+
+def _measure_once(monitors: int) -> Dict[str, float]:
+    """One fresh banner: timings and counts"""
+    scheduler = VirtualScheduler()
+    factory = FakeWindowFactory(scheduler)
+    registry = FakeRegistryManager(WALL_SETTINGS)
+    monitor_manager = FakeMonitorManager(make_wall(monitors))
+    started = time.perf_counter()
+    banner = ClassificationBanner(
+        registry_manager=registry,
+        monitor_manager=monitor_manager,
+        scheduler=scheduler,
+        window_factory=factory,
+        window_source=FakeWindowSource(factory),
+    )
+    startup_ms = (time.perf_counter() - started) * 1000
+    counts = {"timers": scheduler.pending(), "startup_transactions": factory.appbar_transactions}
+
+    registry.values["Classification"] = "TOP SECRET"
+    marking_ms = _elapsed_ms(banner._check_registry_changes)
+
+    def check_monitors():
+        banner._monitors_dirty = True
+        banner._check_monitor_changes()
+
+    monitor_check_ms = _elapsed_ms(check_monitors)
+    visibility_ms = _elapsed_ms(banner._check_visibility)
+
+    # One more monitor above the wall
+    created, transactions = factory.created, factory.appbar_transactions
+    monitor_manager.monitors.append(FakeMonitor(0, -1080, 1920, 1080, name="\\\\.\\DISPLAYHOTPLUG"))
+    check_monitors()
+    counts.update(hotplug_windows=factory.created - created,
+                  hotplug_transactions=factory.appbar_transactions - transactions)
+
+    return {
+        "startup_ms": startup_ms / monitors,
+        "marking_ms": marking_ms / monitors,
+        "monitor_check_ms": monitor_check_ms / monitors,
+        "visibility_ms": visibility_ms / monitors,
+        **counts,
+    }
+
+
+def measure(monitors: int, repeat: int = 5, hours: float = 0.1) -> ScalingReport:
+    """Medians over ``repeat`` fresh banners, plus the idle callback rate"""
+    samples: Dict[str, List[float]] = {}
+    for _ in range(repeat):
+        for name, value in _measure_once(monitors).items():
+            samples.setdefault(name, []).append(value)
+    values = {name: statistics.median(values) for name, values in samples.items()}
+    # Counts are exact; the medians only smooth the timings
+    for name in ("timers", "startup_transactions", "hotplug_windows", "hotplug_transactions"):
+        values[name] = max(samples[name])
+    idle = measure_idle(monitors, hours, settings=WALL_SETTINGS)
+    return ScalingReport(monitors=monitors, idle_callbacks=idle.callbacks, **values)
+
+
+def budget_for_wall(monitors: int) -> Dict[str, float]:
+    """Declared budgets for a wall of ``monitors`` monitors"""
+    return {
+        "startup_ms": SCALING_BUDGET_STARTUP_MS,
+        "marking_ms": SCALING_BUDGET_MARKING_MS,
+        "monitor_check_ms": SCALING_BUDGET_MONITOR_CHECK_MS,
+        "visibility_ms": SCALING_BUDGET_VISIBILITY_MS,
+        "timers": SCALING_BUDGET_TIMERS,
+        "startup_transactions": math.ceil(monitors / BANNER_BATCH_SIZE),
+        "hotplug_windows": 1,
+        "hotplug_transactions": 1,
+        "idle_callbacks": budget_for(monitors)["callbacks"],
+    }
+
+
+def check_budget(report: ScalingReport) -> List[str]:
+    """Return one message per measurement above its budget"""
+    return [
+        f"{report.monitors} monitor(s): {name} {getattr(report, name):g} exceeds budget {limit:g}"
+        for name, limit in budget_for_wall(report.monitors).items()
+        if getattr(report, name) > limit
+    ]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Check scaling budgets; exit status 1 when any is exceeded"""
+    parser = argparse.ArgumentParser(description="Check how the banner scales with the monitor count")
+    parser.add_argument("--monitors", type=int, nargs="+", default=[1, 16, SCALING_TARGET_MONITORS])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    failures: List[str] = []
+    for monitors in args.monitors:
+        report = measure(monitors, args.repeat)
+        print(f"{monitors} monitor(s): per monitor startup={report.startup_ms:.3f} ms "
+              f"marking={report.marking_ms:.3f} ms monitor_check={report.monitor_check_ms:.3f} ms "
+              f"visibility={report.visibility_ms:.3f} ms; timers={report.timers} "
+              f"appbar_transactions={report.startup_transactions} "
+              f"hotplug={report.hotplug_windows} window(s)/{report.hotplug_transactions} transaction(s) "
+              f"idle={report.idle_callbacks:.0f}/h")
+        failures.extend(check_budget(report))
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
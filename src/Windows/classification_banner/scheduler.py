@@ -0,0 +1,170 @@
+"""
+Timer scheduling for the banner: Tk-backed and virtual-clock implementations
+"""
+
+import heapq
+import itertools
+import time
+import tkinter as tk
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from . import event_log
+
+
+class TkScheduler:
+    """Named timers on the banners' Tk root
+
+    ``get_root`` returns the root to schedule on: the application's shared
+    root, or the first banner's own root, which changes whenever the banners
+    are rebuilt, so pending timers remember their own root.
+    """
+
+    def __init__(self, get_root: Callable[[], Optional[tk.Tk]]):
+        self.get_root = get_root
+        self._timers: Dict[str, Tuple[tk.Tk, str]] = {}
+        # Due time and callback of each pending timer, for rehome()
+        self._calls: Dict[str, Tuple[float, Callable[..., Any], Tuple[Any, ...]]] = {}
+
+    def clock(self) -> float:
+        """Monotonic time in seconds"""
+        return time.monotonic()
+
+    def schedule(self, name: str, delay: int, callback: Callable[..., Any], *args: Any) -> None:
+        """Run ``callback`` after ``delay`` ms, replacing a pending timer of that name"""
+        self.cancel(name)
+        root = self.get_root()
+        if root is not None:
+            self._timers[name] = (root, root.after(delay, self._fire, name, callback, *args))
+            self._calls[name] = (self.clock() + delay / 1000, callback, args)
+
+    def _fire(self, name: str, callback: Callable[..., Any], *args: Any) -> None:
+        self._timers.pop(name, None)
+        self._calls.pop(name, None)
+        callback(*args)
+
+    def rehome(self) -> None:
+        """Move pending timers to the current root after the banners were rebuilt"""
+        now = self.clock()
+        for name, (due, callback, args) in list(self._calls.items()):
+            self.schedule(name, max(0, int((due - now) * 1000)), callback, *args)
+
+    def cancel(self, name: str) -> None:
+        """Cancel a named timer if it is still pending"""
+        self._calls.pop(name, None)
+        timer = self._timers.pop(name, None)
+        if timer is not None:
+            root, after_id = timer
+            try:
+                root.after_cancel(after_id)
+            except tk.TclError:
+                # Root already destroyed along with the timer
+                pass
+
+    def cancel_all(self) -> None:
+        """Cancel every pending timer (shutdown)"""
+        for name in list(self._timers):
+            self.cancel(name)
+
+    def call_soon(self, callback: Callable[..., Any], *args: Any) -> None:
+        """Run ``callback`` on the Tk thread as soon as possible
+
+        Tcl is built threaded, so ``after`` called from another thread is
+        marshalled to the interpreter's thread.
+        """
+        root = self.get_root()
+        if root is not None:
+            try:
+                root.after(0, callback, *args)
+            except RuntimeError as e:
+                event_log.error("scheduler", f"Error posting update to UI thread: {e}")
+
+    def call_idle(self, callback: Callable[..., Any], *args: Any) -> bool:
+        """Run ``callback`` when the Tk thread next goes idle
+
+        Thread-safe like ``call_soon``. Returns False if there is no root to
+        post to or the post failed.
+        """
+        root = self.get_root()
+        if root is None:
+            return False
+        try:
+            root.after_idle(callback, *args)
+            return True
+        except (RuntimeError, tk.TclError) as e:
+            event_log.error("scheduler", f"Error posting update to UI thread: {e}")
+            return False
+
+
+class VirtualScheduler:
+    """Deterministic scheduler driven by a virtual millisecond clock
+
+    Nothing runs until ``advance`` or ``run_until`` is called. Every fired
+    callback is counted by timer name (up to the first ``:``) in ``fired``.
+    """
+
+    def __init__(self, start_ms: int = 0):
+        self.now_ms: int = start_ms
+        self.fired: Counter[str] = Counter()
+        self._queue: List[Tuple[int, int, str, Callable[..., Any], Tuple[Any, ...]]] = []
+        self._pending: Dict[str, int] = {}
+        self._sequence = itertools.count()
+
+    def clock(self) -> float:
+        """Virtual time in seconds"""
+        return self.now_ms / 1000
+
+    def schedule(self, name: str, delay: int, callback: Callable[..., Any], *args: Any) -> None:
+        """Run ``callback`` at now + ``delay`` ms, replacing a pending timer of that name"""
+        sequence = next(self._sequence)
+        self._pending[name] = sequence
+        heapq.heappush(self._queue, (self.now_ms + max(0, int(delay)), sequence, name, callback, args))
+
+    def cancel(self, name: str) -> None:
+        """Cancel a named timer; the stale queue entry is skipped when reached"""
+        self._pending.pop(name, None)
+
+    def cancel_all(self) -> None:
+        """Cancel every pending timer"""
+        self._pending.clear()
+
+    def call_soon(self, callback: Callable[..., Any], *args: Any) -> None:
+        """Run ``callback`` at the current virtual time"""
+        self.schedule(f"call_soon:{next(self._sequence)}", 0, callback, *args)
+
+    def call_idle(self, callback: Callable[..., Any], *args: Any) -> bool:
+        """Run ``callback`` at the current virtual time"""
+        self.schedule(f"call_idle:{next(self._sequence)}", 0, callback, *args)
+        return True
+
+    def rehome(self) -> None:
+        """Timers do not belong to a window here; nothing to move"""
+
+    def pending(self) -> int:
+        """Number of live timers"""
+        return len(self._pending)
+
+    def next_due(self) -> Optional[int]:
+        """Virtual time of the next live timer"""
+        while self._queue and self._pending.get(self._queue[0][2]) != self._queue[0][1]:
+            heapq.heappop(self._queue)
+        return self._queue[0][0] if self._queue else None
+
+    def run_until(self, deadline_ms: int) -> int:
+        """Fire every timer due up to ``deadline_ms``; return how many fired"""
+        count = 0
+        while True:
+            due = self.next_due()
+            if due is None or due > deadline_ms:
+                break
+            _, _, name, callback, args = heapq.heappop(self._queue)
+            del self._pending[name]
+            self.now_ms = max(self.now_ms, due)
+            self.fired[name.split(":", 1)[0]] += 1
+            count += 1
+            callback(*args)
+        self.now_ms = max(self.now_ms, deadline_ms)
+        return count
+
+    def advance(self, delta_ms: int) -> int:
+        """Move the clock forward by ``delta_ms``, firing due timers"""
+        return self.run_until(self.now_ms + delta_ms)
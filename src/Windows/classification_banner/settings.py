@@ -2,145 +2,61 @@
 Settings management for Classification Banner
 """
 
-from typing import Dict, Any
-from .constants import (
-    DEFAULT_CLASSIFICATION,
-    DEFAULT_BG_COLOR,
-    DEFAULT_FG_COLOR,
-    DEFAULT_BANNER_HEIGHT,
-    DEFAULT_FONT_SIZE,
-    DEFAULT_FONT_FAMILY,
-    DEFAULT_ENABLED,
-    DEFAULT_FPCON,
-    DEFAULT_CPCON,
-    DEFAULT_CHECK_INTERVAL,
-    DEFAULT_CAVEATS,
-    DEFAULT_DISSEMINATION_CONTROLS,
-)
+from typing import Any, Dict, List, Set, Tuple
+from .constants import DEFAULT_CLASSIFICATION
+from . import event_log, marking, settings_schema
 
 
 class BannerSettings:
-    """Manages banner configuration settings"""
+    """Manages banner configuration settings
 
-    def __init__(self):
-        # Display settings
-        self.classification: str = DEFAULT_CLASSIFICATION
-        self.bg_color: str = DEFAULT_BG_COLOR
-        self.fg_color: str = DEFAULT_FG_COLOR
-        self.banner_height: int = DEFAULT_BANNER_HEIGHT
-        self.font_size: int = DEFAULT_FONT_SIZE
-        self.font_family: str = DEFAULT_FONT_FAMILY
-        self.enabled: int = DEFAULT_ENABLED
-        self.caveats: str | None = DEFAULT_CAVEATS
-        self.dissemination_controls: str | None = DEFAULT_DISSEMINATION_CONTROLS
-        self.classification_text: str = DEFAULT_CLASSIFICATION
+    The registry-backed attributes (``classification``, ``bg_color``,
+    ``show_hostname``, ...) are declared in ``settings_schema.FIELDS``.
+    """
 
-        # Threat levels
-        self.fpcon: str = DEFAULT_FPCON
-        self.cpcon: str = DEFAULT_CPCON
-
-        # System info flags
-        self.show_hostname: bool = False
-        self.show_username: bool = False
-        self.show_windows_version: bool = False
-        self.show_ip_address: bool = False
-        self.show_group_id: bool = False
+    def __init__(self):
+        settings_schema.apply_defaults(self)
 
-        # Group ID value
-        self.group_id: str = ""
+        # Center panel text built from classification, caveats and controls
+        self.classification_text: str = DEFAULT_CLASSIFICATION
 
-        # Monitoring
-        self.check_interval: int = DEFAULT_CHECK_INTERVAL
+        # Registry values skipped on the last update because they failed
+        # their check, as (value name, value)
+        self.invalid_values: List[Tuple[str, Any]] = []
 
-        # Storage for change detection
-        self.previous_settings: Dict[str, str | bool | int] = {}
+        # Storage for change detection (``settings_schema.state``)
+        self.previous_settings: Tuple = ()
 
     def update_from_registry(self, registry_settings: Dict[str, Any]) -> None:
         """Update settings from registry values"""
-        # String values
-        if registry_settings.get("Classification") is not None:
-            self.classification = registry_settings["Classification"]
-
-        if registry_settings.get("BackgroundColor") is not None:
-            self.bg_color = registry_settings["BackgroundColor"]
-
-        if registry_settings.get("TextColor") is not None:
-            self.fg_color = registry_settings["TextColor"]
-
-        if registry_settings.get("FPCON") is not None:
-            self.fpcon = registry_settings["FPCON"]
+        rejected = settings_schema.apply(self, registry_settings)
+        if rejected != self.invalid_values:
+            # Logged once per change, not on every poll
+            for name, value in rejected:
+                if (name, value) not in self.invalid_values:
+                    event_log.warning("settings", "Ignoring registry value "
+                                      + settings_schema.describe_invalid(name, value))
+            self.invalid_values = rejected
 
-        if registry_settings.get("CPCON") is not None:
-            self.cpcon = str(registry_settings["CPCON"])
-
-        if registry_settings.get("GroupID") is not None:
-            self.group_id = registry_settings["GroupID"]
-
-        if registry_settings.get("Caveats") is not None:
-            self.caveats = registry_settings["Caveats"]
-
-        if registry_settings.get("DisseminationControls") is not None:
-            self.dissemination_controls = registry_settings["DisseminationControls"]
-
-        # Integer values
-        if registry_settings.get("Enabled") is not None:
-            self.enabled = registry_settings["Enabled"]
-
-        # Boolean values
-        if registry_settings.get("ShowHostname") is not None:
-            self.show_hostname = registry_settings["ShowHostname"]
-
-        if registry_settings.get("ShowUsername") is not None:
-            self.show_username = registry_settings["ShowUsername"]
-
-        if registry_settings.get("ShowWindowsVersion") is not None:
-            self.show_windows_version = registry_settings["ShowWindowsVersion"]
+    def store_current_state(self) -> None:
+        """Store current settings for change detection"""
+        self.previous_settings = settings_schema.state(self)
 
-        if registry_settings.get("ShowIPAddress") is not None:
-            self.show_ip_address = registry_settings["ShowIPAddress"]
+    def changes(self) -> Dict[str, str]:
+        """Settings that differ from the last store, with their effect
 
-        if registry_settings.get("ShowGroupID") is not None:
-            self.show_group_id = registry_settings["ShowGroupID"]
+        Effects are ``repaint``, ``relayout`` or ``rebuild`` (see
+        settings_schema).
+        """
+        return settings_schema.changes(self.previous_settings, settings_schema.state(self))
 
-    def store_current_state(self) -> None:
-        """Store current settings for change detection"""
-        self.previous_settings: Dict[str, str | bool | int] = {
-            "classification": self.classification,
-            "bg_color": self.bg_color,
-            "fg_color": self.fg_color,
-            "enabled": self.enabled,
-            "fpcon": self.fpcon,
-            "cpcon": self.cpcon,
-            "caveats": self.caveats,
-            "dissemination_controls": self.dissemination_controls,
-            "show_hostname": self.show_hostname,
-            "show_username": self.show_username,
-            "show_windows_version": self.show_windows_version,
-            "show_ip_address": self.show_ip_address,
-            "show_group_id": self.show_group_id,
-            "group_id": self.group_id,
-        }
+    def changed_fields(self) -> Set[str]:
+        """Names of the settings that differ from the last store"""
+        return set(self.changes())
 
     def has_changed(self) -> bool:
         """Check if settings have changed since last store"""
-        current: Dict[str, str | bool | int | None] = {
-            "classification": self.classification,
-            "bg_color": self.bg_color,
-            "fg_color": self.fg_color,
-            "caveats": self.caveats,
-            "dissemination_controls": self.dissemination_controls,
-            "enabled": self.enabled,
-            "fpcon": self.fpcon,
-            "cpcon": self.cpcon,
-            "show_hostname": self.show_hostname,
-            "show_username": self.show_username,
-            "show_windows_version": self.show_windows_version,
-            "show_ip_address": self.show_ip_address,
-            "show_group_id": self.show_group_id,
-            "group_id": self.group_id,
-        }
-
-        return current != self.previous_settings
+        return self.previous_settings != settings_schema.state(self)
 
     def needs_system_info(self) -> bool:
         """Check if any system info should be displayed"""
@@ -166,16 +82,9 @@ class BannerSettings:
 
     def get_classification_text(self) -> None:
         """Generates the classification text for the center banner"""
-        classification = ""
-        if self.classification == "SCI":
-            classification = classification + "TOP SECRET"
-        else:
-            classification = classification + f"{self.classification}"
-
-        if self.caveats:
-            classification = classification + fr"//{self.caveats}"
-        if self.dissemination_controls:
-            classification = classification + \
-                fr"//{self.dissemination_controls}"
-
-        self.classification_text = classification
+        self.classification_text = marking.render(
+            self.classification,
+            self.caveats,
+            self.dissemination_controls,
+            self.custom_classification,
+        ).text
@@ -0,0 +1,182 @@
+"""
+Hand-written settings path from before settings_schema
+
+A copy of the registry decoding, ``BannerSettings.update_from_registry`` and
+``has_changed`` as they were written field by field, kept only as the
+baseline for ``python -m classification_banner.settings_schema --bench``.
+It covers the 30 values read at the time; nothing else imports it.
+"""
+
+from typing import Any, Dict, Set
+
+STRING_VALUES = [
+    "Classification",
+    "BackgroundColor",
+    "TextColor",
+    "Caveats",
+    "DisseminationControls",
+    "FPCON",
+    "CPCON",
+    "GroupID",
+    "IPAddressFamily",
+    "IPAddressAdapter",
+    "ThreatLevelSource",
+    "LogTarget",
+]
+
+INT_VALUES = [
+    "Enabled",
+    "CheckInterval",
+    "MinCheckInterval",
+    "MaxCheckInterval",
+    "LeakReport",
+    "ProfileSeconds",
+    "ThreatLevelStaleAfter",
+]
+
+BOOL_VALUES = [
+    "ShowHostname",
+    "ShowUsername",
+    "ShowWindowsVersion",
+    "ShowIPAddress",
+    "ShowGroupID",
+    "EcoQoS",
+    "LowCpuPriority",
+    "LowIoPriority",
+    "LowMemoryPriority",
+    "TrimWorkingSet",
+]
+
+MULTI_STRING_VALUES = ["MarkingRules"]
+
+
+def decode_values(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn raw registry data into settings values, list by list"""
+    settings: Dict[str, Any] = {}
+
+    for name in STRING_VALUES:
+        value = raw.get(name)
+        settings[name] = value if value else None
+
+    for name in INT_VALUES:
+        value = raw.get(name)
+        settings[name] = None if value is None else int(value)
+
+    for name in BOOL_VALUES:
+        value = raw.get(name)
+        settings[name] = None if value is None else bool(int(value))
+
+    for name in MULTI_STRING_VALUES:
+        value = raw.get(name)
+        if isinstance(value, str):
+            value = value.splitlines()
+        settings[name] = list(value) if value else None
+
+    return settings
+
+
+def update_from_registry(target: Any, registry_settings: Dict[str, Any]) -> None:  # noqa: C901 (kept as written)
+    """Copy decoded values onto a BannerSettings, one statement per value"""
+    # String values
+    if registry_settings.get("Classification") is not None:
+        target.classification = registry_settings["Classification"]
+    if registry_settings.get("BackgroundColor") is not None:
+        target.bg_color = registry_settings["BackgroundColor"]
+    if registry_settings.get("TextColor") is not None:
+        target.fg_color = registry_settings["TextColor"]
+    if registry_settings.get("FPCON") is not None:
+        target.fpcon = registry_settings["FPCON"]
+    if registry_settings.get("CPCON") is not None:
+        target.cpcon = str(registry_settings["CPCON"])
+    if registry_settings.get("ThreatLevelSource") is not None:
+        target.threat_level_source = registry_settings["ThreatLevelSource"]
+    if registry_settings.get("LogTarget") is not None:
+        target.log_target = registry_settings["LogTarget"]
+    if registry_settings.get("GroupID") is not None:
+        target.group_id = registry_settings["GroupID"]
+    if registry_settings.get("Caveats") is not None:
+        target.caveats = registry_settings["Caveats"]
+    if registry_settings.get("DisseminationControls") is not None:
+        target.dissemination_controls = registry_settings["DisseminationControls"]
+    if registry_settings.get("IPAddressFamily") is not None:
+        target.ip_address_family = registry_settings["IPAddressFamily"]
+    if registry_settings.get("IPAddressAdapter") is not None:
+        target.ip_address_adapter = registry_settings["IPAddressAdapter"]
+    if registry_settings.get("MarkingRules") is not None:
+        target.marking_rules = registry_settings["MarkingRules"]
+
+    # Integer values
+    if registry_settings.get("Enabled") is not None:
+        target.enabled = registry_settings["Enabled"]
+    if registry_settings.get("CheckInterval") is not None:
+        target.check_interval = registry_settings["CheckInterval"]
+    if registry_settings.get("MinCheckInterval") is not None:
+        target.min_check_interval = registry_settings["MinCheckInterval"]
+    if registry_settings.get("MaxCheckInterval") is not None:
+        target.max_check_interval = registry_settings["MaxCheckInterval"]
+    if registry_settings.get("LeakReport") is not None:
+        target.leak_report = registry_settings["LeakReport"]
+    if registry_settings.get("ProfileSeconds") is not None:
+        target.profile_seconds = registry_settings["ProfileSeconds"]
+    if registry_settings.get("ThreatLevelStaleAfter") is not None:
+        target.threat_level_stale_after = registry_settings["ThreatLevelStaleAfter"]
+
+    # Boolean values
+    if registry_settings.get("ShowHostname") is not None:
+        target.show_hostname = registry_settings["ShowHostname"]
+    if registry_settings.get("ShowUsername") is not None:
+        target.show_username = registry_settings["ShowUsername"]
+    if registry_settings.get("ShowWindowsVersion") is not None:
+        target.show_windows_version = registry_settings["ShowWindowsVersion"]
+    if registry_settings.get("ShowIPAddress") is not None:
+        target.show_ip_address = registry_settings["ShowIPAddress"]
+    if registry_settings.get("ShowGroupID") is not None:
+        target.show_group_id = registry_settings["ShowGroupID"]
+    if registry_settings.get("EcoQoS") is not None:
+        target.eco_qos = registry_settings["EcoQoS"]
+    if registry_settings.get("LowCpuPriority") is not None:
+        target.low_cpu_priority = registry_settings["LowCpuPriority"]
+    if registry_settings.get("LowIoPriority") is not None:
+        target.low_io_priority = registry_settings["LowIoPriority"]
+    if registry_settings.get("LowMemoryPriority") is not None:
+        target.low_memory_priority = registry_settings["LowMemoryPriority"]
+    if registry_settings.get("TrimWorkingSet") is not None:
+        target.trim_working_set = registry_settings["TrimWorkingSet"]
+
+
+def current_state(target: Any) -> Dict[str, Any]:
+    """Settings that took effect on the banner, as a dict"""
+    return {
+        "classification": target.classification,
+        "bg_color": target.bg_color,
+        "fg_color": target.fg_color,
+        "caveats": target.caveats,
+        "dissemination_controls": target.dissemination_controls,
+        "enabled": target.enabled,
+        "fpcon": target.fpcon,
+        "cpcon": target.cpcon,
+        "threat_level_source": target.threat_level_source,
+        "show_hostname": target.show_hostname,
+        "show_username": target.show_username,
+        "show_windows_version": target.show_windows_version,
+        "show_ip_address": target.show_ip_address,
+        "show_group_id": target.show_group_id,
+        "group_id": target.group_id,
+        "ip_address_family": target.ip_address_family,
+        "ip_address_adapter": target.ip_address_adapter,
+        "marking_rules": target.marking_rules,
+    }
+
+
+def changed_fields(previous: Dict[str, Any], target: Any) -> Set[str]:
+    """Names of the settings that differ from ``previous``"""
+    current = current_state(target)
+    return {
+        name for name, value in current.items()
+        if name not in previous or previous[name] != value
+    }
+
+
+def has_changed(previous: Dict[str, Any], target: Any) -> bool:
+    """Check if settings have changed since ``previous`` was stored"""
+    return bool(changed_fields(previous, target))
@@ -0,0 +1,400 @@
+"""
+Declarative settings schema for Classification Banner
+
+Every registry setting is declared once in ``FIELDS``: attribute name,
+registry value name and type, default, an optional check, and what a change
+does to the banners. The per-poll functions loop over tables resolved from
+it once at import time:
+
+- ``decode``: raw registry data (as winreg returns it) to typed values;
+  data that cannot be converted becomes ``Malformed``
+- ``apply``: typed values onto a BannerSettings, skipping absent values and
+  returning the ones that are malformed or fail their check
+- ``state``: tuple of the settings that affect the banners, for diffing
+
+``changes`` compares two states and classifies each difference as a repaint
+(text or colors in place), a relayout (geometry or font in place) or a
+rebuild (windows recreated). Settings with effect ``none`` are read by their
+consumer on every registry check and are not diffed.
+"""
+
+import argparse
+import re
+import sys
+import time
+from operator import attrgetter
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+from .constants import (
+    DEFAULT_CLASSIFICATION,
+    DEFAULT_BG_COLOR,
+    DEFAULT_FG_COLOR,
+    DEFAULT_BANNER_HEIGHT,
+    DEFAULT_FONT_SIZE,
+    DEFAULT_FONT_FAMILY,
+    DEFAULT_EDGES,
+    DEFAULT_WATERMARK,
+    DEFAULT_WATERMARK_OPACITY,
+    DEFAULT_SPANNED_SURFACES,
+    DEFAULT_PANEL_SIZE,
+    DEFAULT_ENABLED,
+    DEFAULT_FPCON,
+    DEFAULT_CPCON,
+    DEFAULT_CHECK_INTERVAL,
+    DEFAULT_MIN_CHECK_INTERVAL,
+    DEFAULT_MAX_CHECK_INTERVAL,
+    DEFAULT_CAVEATS,
+    DEFAULT_DISSEMINATION_CONTROLS,
+    DEFAULT_MARKING_RULES,
+    DEFAULT_LEAK_REPORT,
+    DEFAULT_IP_ADDRESS_FAMILY,
+    DEFAULT_IP_ADDRESS_ADAPTER,
+    DEFAULT_THREAT_LEVEL_SOURCE,
+    DEFAULT_THREAT_LEVEL_STALE_AFTER,
+    DEFAULT_LOG_TARGET,
+    DEFAULT_ECO_QOS,
+    DEFAULT_LOW_CPU_PRIORITY,
+    DEFAULT_LOW_IO_PRIORITY,
+    DEFAULT_LOW_MEMORY_PRIORITY,
+    DEFAULT_TRIM_WORKING_SET,
+    PROFILE_MAX_SECONDS,
+)
+
+# Registry types
+STRING = "string"
+INT = "int"
+BOOL = "bool"
+MULTI_STRING = "multi_string"
+
+# What a change does to the banners, cheapest first
+NONE = "none"
+REPAINT = "repaint"
+RELAYOUT = "relayout"
+REBUILD = "rebuild"
+EFFECTS = (NONE, REPAINT, RELAYOUT, REBUILD)
+
+# Parts of the banner a repaint or relayout touches
+MARKING = "marking"
+SYSTEM_INFO = "system_info"
+THREAT_LEVEL = "threat_level"
+LAYOUT = "layout"
+MONITORS = "monitors"
+
+_SIZE = re.compile(r"^[1-9][0-9]{0,4}[xX][1-9][0-9]{0,4}$")
+_COLOR = re.compile(r"^(#[0-9a-fA-F]{3}|#[0-9a-fA-F]{6}|#[0-9a-fA-F]{12}|[A-Za-z][A-Za-z0-9 ]*)$")
+
+
+class Check(NamedTuple):
+    """Predicate a decoded value must pass, and what it expects in words"""
+
+    test: Callable[[Any], bool]
+    expected: str
+    # Bounds of a numeric range, for the policy templates
+    low: Optional[int] = None
+    high: Optional[int] = None
+
+
+def in_range(low: int, high: int) -> Check:
+    """Integer between ``low`` and ``high`` inclusive"""
+    return Check(lambda value: low <= value <= high, f"between {low} and {high}", low, high)
+
+
+def one_of(*choices: str) -> Check:
+    """One of ``choices``, ignoring case"""
+    allowed = {choice.lower() for choice in choices}
+    return Check(lambda value: value.lower() in allowed, "one of " + ", ".join(choices))
+
+
+COLOR = Check(lambda value: bool(_COLOR.match(value)), "a color (#RRGGBB or a Tk color name)")
+SIZE = Check(lambda value: not value or bool(_SIZE.match(value)), "WIDTHxHEIGHT in pixels, or empty")
+
+
+class Field(NamedTuple):
+    """One registry setting"""
+
+    attr: str
+    value_name: str
+    kind: str
+    default: Any
+    effect: str
+    # Part of the banner a repaint/relayout updates
+    group: str = ""
+    check: Optional[Check] = None
+
+
+FIELDS: Tuple[Field, ...] = (
+    # Center panel and colors
+    Field("classification", "Classification", STRING, DEFAULT_CLASSIFICATION, REPAINT, MARKING),
+    Field("custom_classification", "CustomClassification", STRING, "", REPAINT, MARKING),
+    Field("bg_color", "BackgroundColor", STRING, DEFAULT_BG_COLOR, REPAINT, MARKING, COLOR),
+    Field("fg_color", "TextColor", STRING, DEFAULT_FG_COLOR, REPAINT, MARKING, COLOR),
+    Field("caveats", "Caveats", STRING, DEFAULT_CAVEATS, REPAINT, MARKING),
+    Field("dissemination_controls", "DisseminationControls", STRING,
+          DEFAULT_DISSEMINATION_CONTROLS, REPAINT, MARKING),
+    # Foreground marking rules (field:pattern=MARKING)
+    Field("marking_rules", "MarkingRules", MULTI_STRING, DEFAULT_MARKING_RULES, REPAINT, MARKING),
+    # Right panel
+    Field("fpcon", "FPCON", STRING, DEFAULT_FPCON, REPAINT, THREAT_LEVEL),
+    Field("cpcon", "CPCON", STRING, DEFAULT_CPCON, REPAINT, THREAT_LEVEL),
+    Field("threat_level_source", "ThreatLevelSource", STRING, DEFAULT_THREAT_LEVEL_SOURCE,
+          REPAINT, THREAT_LEVEL),
+    Field("threat_level_stale_after", "ThreatLevelStaleAfter", INT,
+          DEFAULT_THREAT_LEVEL_STALE_AFTER, NONE, check=in_range(1, 7 * 24 * 3600)),
+    # Left panel
+    Field("show_hostname", "ShowHostname", BOOL, False, REPAINT, SYSTEM_INFO),
+    Field("show_username", "ShowUsername", BOOL, False, REPAINT, SYSTEM_INFO),
+    Field("show_windows_version", "ShowWindowsVersion", BOOL, False, REPAINT, SYSTEM_INFO),
+    Field("show_ip_address", "ShowIPAddress", BOOL, False, REPAINT, SYSTEM_INFO),
+    Field("show_group_id", "ShowGroupID", BOOL, False, REPAINT, SYSTEM_INFO),
+    Field("group_id", "GroupID", STRING, "", REPAINT, SYSTEM_INFO),
+    Field("ip_address_family", "IPAddressFamily", STRING, DEFAULT_IP_ADDRESS_FAMILY,
+          REPAINT, SYSTEM_INFO, one_of("ipv4", "ipv6", "any")),
+    Field("ip_address_adapter", "IPAddressAdapter", STRING, DEFAULT_IP_ADDRESS_ADAPTER,
+          REPAINT, SYSTEM_INFO),
+    # Geometry and font
+    Field("banner_height", "BannerHeight", INT, DEFAULT_BANNER_HEIGHT, RELAYOUT, LAYOUT,
+          in_range(8, 200)),
+    Field("font_size", "FontSize", INT, DEFAULT_FONT_SIZE, RELAYOUT, LAYOUT, in_range(4, 72)),
+    Field("font_family", "FontFamily", STRING, DEFAULT_FONT_FAMILY, RELAYOUT, LAYOUT),
+    # Banners share one window, font and timer; adding or removing an edge rebuilds
+    Field("edges", "Edges", STRING, DEFAULT_EDGES, REBUILD, check=one_of("top", "bottom", "both")),
+    # Full-screen overlay window per monitor; the bitmap follows the marking
+    Field("watermark", "Watermark", BOOL, DEFAULT_WATERMARK, REBUILD),
+    Field("watermark_opacity", "WatermarkOpacity", INT, DEFAULT_WATERMARK_OPACITY, REPAINT, MARKING,
+          in_range(1, 50)),
+    # Video walls: banners per panel of a spanned surface; only the affected
+    # monitors' banners change
+    Field("spanned_surfaces", "SpannedSurfaces", STRING, DEFAULT_SPANNED_SURFACES, RELAYOUT, MONITORS,
+          one_of("surface", "panel")),
+    Field("panel_size", "PanelSize", STRING, DEFAULT_PANEL_SIZE, RELAYOUT, MONITORS, SIZE),
+    Field("enabled", "Enabled", INT, DEFAULT_ENABLED, REBUILD),
+    # Registry polling (milliseconds)
+    Field("check_interval", "CheckInterval", INT, DEFAULT_CHECK_INTERVAL, NONE,
+          check=in_range(500, 86_400_000)),
+    Field("min_check_interval", "MinCheckInterval", INT, DEFAULT_MIN_CHECK_INTERVAL, NONE,
+          check=in_range(500, 86_400_000)),
+    Field("max_check_interval", "MaxCheckInterval", INT, DEFAULT_MAX_CHECK_INTERVAL, NONE,
+          check=in_range(500, 86_400_000)),
+    # Diagnostics
+    Field("leak_report", "LeakReport", INT, DEFAULT_LEAK_REPORT, NONE, check=in_range(0, 2)),
+    # A new non-zero value starts a profile window
+    Field("profile_seconds", "ProfileSeconds", INT, 0, NONE,
+          check=in_range(0, PROFILE_MAX_SECONDS)),
+    # Read at startup
+    Field("log_target", "LogTarget", STRING, DEFAULT_LOG_TARGET, NONE,
+          check=one_of("file", "eventlog", "both", "none")),
+    # Resource policy steps (resource_policy.py), applied by the registry check
+    Field("eco_qos", "EcoQoS", BOOL, DEFAULT_ECO_QOS, NONE),
+    Field("low_cpu_priority", "LowCpuPriority", BOOL, DEFAULT_LOW_CPU_PRIORITY, NONE),
+    Field("low_io_priority", "LowIoPriority", BOOL, DEFAULT_LOW_IO_PRIORITY, NONE),
+    Field("low_memory_priority", "LowMemoryPriority", BOOL, DEFAULT_LOW_MEMORY_PRIORITY, NONE),
+    Field("trim_working_set", "TrimWorkingSet", BOOL, DEFAULT_TRIM_WORKING_SET, NONE),
+)
+
+BY_ATTR: Dict[str, Field] = {field.attr: field for field in FIELDS}
+BY_VALUE_NAME: Dict[str, Field] = {field.value_name: field for field in FIELDS}
+VALUE_NAMES: Tuple[str, ...] = tuple(BY_VALUE_NAME)
+
+# Fields whose changes reach the banners, in ``state`` order
+DIFFED: Tuple[Field, ...] = tuple(field for field in FIELDS if field.effect != NONE)
+
+
+class Malformed(NamedTuple):
+    """Registry data that cannot be converted to its field's type"""
+
+    raw: Any
+
+
+def _decode_string(value: Any) -> Optional[str]:
+    # REG_DWORD data in a string value still reads as text
+    return (value if value.__class__ is str else str(value)) if value else None
+
+
+def _decode_bool(value: Any) -> bool:
+    return bool(int(value))
+
+
+def _decode_multi_string(value: Any) -> Optional[List[str]]:
+    if isinstance(value, str):
+        value = value.splitlines()
+    return list(value) if value else None
+
+
+DECODERS: Dict[str, Callable[[Any], Any]] = {
+    STRING: _decode_string,
+    INT: int,
+    BOOL: _decode_bool,
+    MULTI_STRING: _decode_multi_string,
+}
+
+# What a value that cannot be decoded should have been, by registry type
+KIND_EXPECTED = {INT: "a number", BOOL: "a number (0 or 1)"}
+
+# Per field, resolved once so a poll does no lookups by name:
+# (value name, decoder) and (value name, attribute, check test, default)
+_DECODE_TABLE = tuple((field.value_name, DECODERS[field.kind]) for field in FIELDS)
+_APPLY_TABLE = tuple(
+    (field.value_name, field.attr, field.check.test if field.check else None, field.default)
+    for field in FIELDS
+)
+_state = attrgetter(*(field.attr for field in DIFFED))
+
+
+def decode(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn raw registry data into typed values
+
+    ``raw`` maps value names to data; absent names decode to None. Data that
+    cannot be converted (``"yes"`` in a DWORD setting) decodes to
+    ``Malformed``, which ``apply`` rejects, instead of failing the whole read.
+    """
+    get = raw.get
+    out: Dict[str, Any] = {}
+    for name, decoder in _DECODE_TABLE:
+        value = get(name)
+        if value is None:
+            out[name] = None
+            continue
+        try:
+            out[name] = decoder(value)
+        except (TypeError, ValueError):
+            out[name] = Malformed(value)
+    return out
+
+
+def apply(target: Any, values: Dict[str, Any]) -> List[Tuple[str, Any]]:
+    """Set the attributes of ``target`` for every non-None value
+
+    Values that fail their check are skipped, malformed values reset the
+    setting to its default; both are returned as (name, value).
+    """
+    get = values.get
+    rejected = []
+    for name, attr, test, default in _APPLY_TABLE:
+        value = get(name)
+        # Unchanged values (the common case on a poll) skip the check
+        if value is None or value == getattr(target, attr):
+            continue
+        if value.__class__ is Malformed:
+            setattr(target, attr, default)
+            rejected.append((name, value.raw))
+        elif test is None or test(value):
+            setattr(target, attr, value)
+        else:
+            rejected.append((name, value))
+    return rejected
+
+
+def state(target: Any) -> Tuple:
+    """Tuple of the settings in ``DIFFED``, for change detection"""
+    return _state(target)
+
+
+def apply_defaults(target: Any) -> None:
+    """Set every schema attribute of ``target`` to its default"""
+    for field in FIELDS:
+        setattr(target, field.attr, field.default)
+
+
+def changes(previous: Tuple, current: Tuple) -> Dict[str, str]:
+    """Attribute -> effect for every setting that differs between two states"""
+    if previous == current:
+        return {}
+    if len(previous) != len(current):
+        # Nothing stored yet: everything is new
+        return {field.attr: field.effect for field in DIFFED}
+    return {
+        field.attr: field.effect
+        for field, old, new in zip(DIFFED, previous, current)
+        if old != new
+    }
+
+
+def impact(changed: Dict[str, str]) -> str:
+    """The most expensive effect among ``changed``"""
+    return max(changed.values(), key=EFFECTS.index, default=NONE)
+
+
+def groups(changed: Dict[str, str]) -> Set[str]:
+    """Parts of the banner touched by ``changed``"""
+    return {BY_ATTR[attr].group for attr in changed}
+
+
+def describe_invalid(value_name: str, value: Any) -> str:
+    """Message for a value rejected by ``apply``"""
+    field = BY_VALUE_NAME[value_name]
+    try:
+        DECODERS[field.kind](value)
+    except (TypeError, ValueError):
+        return f"cannot decode {value_name} {value!r}: expected {KIND_EXPECTED[field.kind]}"
+    return f"{value_name} {value!r} is not {field.check.expected}"
+
+
+def invalid_values(values: Dict[str, Any]) -> List[str]:
+    """Messages for the decoded values that are malformed or fail their check"""
+    messages = []
+    for field in FIELDS:
+        value = values.get(field.value_name)
+        if value.__class__ is Malformed:
+            messages.append(describe_invalid(field.value_name, value.raw))
+        elif value is not None and field.check is not None and not field.check.test(value):
+            messages.append(describe_invalid(field.value_name, value))
+    return messages
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Micro-benchmark: per-poll cost against the hand-written reference path"""
+    parser = argparse.ArgumentParser(description="Settings schema micro-benchmark")
+    parser.add_argument("--bench", action="store_true", help="run the benchmark")
+    parser.add_argument("--calls", type=int, default=100000)
+    args = parser.parse_args(argv)
+    if not args.bench:
+        parser.print_help()
+        return 0
+
+    from . import settings_reference as reference
+    from .settings import BannerSettings
+
+    def per_call(function, *call_args) -> float:
+        started = time.perf_counter()
+        for _ in range(args.calls):
+            function(*call_args)
+        return (time.perf_counter() - started) / args.calls * 1e6
+
+    # A typical configured machine
+    raw = {
+        "Classification": "SECRET", "BackgroundColor": "#FF0000", "TextColor": "#000000",
+        "Enabled": 1, "CheckInterval": 15000, "ShowHostname": 1, "ShowIPAddress": 1,
+        "FPCON": "Bravo", "CPCON": "3", "MarkingRules": ["process:excel.exe=CUI"], "EcoQoS": 1,
+    }
+    values = decode(raw)
+    settings = BannerSettings()
+    apply(settings, values)
+    # Unchanged registry: the common case for a poll
+    previous = state(settings)
+
+    old_values = reference.decode_values(raw)
+    old_settings = BannerSettings()
+    reference.update_from_registry(old_settings, old_values)
+    old_previous = reference.current_state(old_settings)
+
+    def old_poll():
+        reference.update_from_registry(old_settings, reference.decode_values(raw))
+        return reference.has_changed(old_previous, old_settings)
+
+    def new_poll():
+        apply(settings, decode(raw))
+        return changes(previous, state(settings))
+
+    print(f"{'':<8} {'before':>10} {'after':>10}")
+    for name, before, after in [
+        ("decode", (reference.decode_values, raw), (decode, raw)),
+        ("apply", (reference.update_from_registry, old_settings, old_values), (apply, settings, values)),
+        ("diff", (reference.has_changed, old_previous, old_settings), (lambda: changes(previous, state(settings)),)),
+        ("poll", (old_poll,), (new_poll,)),
+    ]:
+        print(f"{name:<8} {per_call(*before):7.2f} us {per_call(*after):7.2f} us")
+    print(f"before reads {len(reference.decode_values({}))} values, after {len(FIELDS)} with checks")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
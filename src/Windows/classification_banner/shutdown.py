@@ -0,0 +1,188 @@
+"""
+Fast, clean shutdown on logoff, session end, window close and signals
+
+When a session ends with the banner's AppBars still registered, Explorer
+keeps the reserved work area and stalls reconciling it, adding to logoff
+time. ``ShutdownCoordinator.run()`` releases everything in one ordered pass
+on the Tk thread, measured against ``SHUTDOWN_BUDGET_MS``:
+
+1. close the update bus and cancel every timer, so nothing else runs
+2. release the AppBars of every monitor (what Explorer waits for)
+3. destroy the windows and the shared Tk root, which ends the main loop
+4. stop the trackers, change watches and control channel, tell the
+   supervisor the exit was deliberate and flush the event log
+
+Steps 1-3 always run; step 4 is skipped once the budget is spent, since the
+process exit tears those down anyway. The pass runs once, whichever
+trigger comes first:
+
+- ``WM_SAVE_YOURSELF`` / ``WM_DELETE_WINDOW`` on a banner: Tk reports
+  ``WM_QUERYENDSESSION`` as the former and ``taskkill`` sends ``WM_CLOSE``.
+  This is how logoff and shutdown reach the ``--noconsole`` build, which
+  has no console and so never gets console control events.
+- SIGTERM, SIGINT, SIGHUP and SIGBREAK; Python runs signal handlers between
+  Tk events, so at the latest with the next two-second monitor check
+
+``install()`` registers the signal handlers; ``main.py`` calls it for the
+real banner only.
+"""
+
+import signal
+import threading
+import time
+from typing import Any, Callable, List, NamedTuple, Optional, Tuple
+from .constants import SHUTDOWN_BUDGET_MS
+from . import event_log
+
+SIGNALS = ("SIGTERM", "SIGINT", "SIGHUP", "SIGBREAK")
+
+
+class ShutdownReport(NamedTuple):
+    """Outcome of the release pass"""
+
+    reason: str
+    elapsed_ms: float
+    budget_ms: float
+    # (step, milliseconds) in the order they ran
+    steps: Tuple[Tuple[str, float], ...]
+    skipped: Tuple[str, ...]
+    errors: Tuple[str, ...]
+
+    @property
+    def over_budget(self) -> bool:
+        return self.elapsed_ms > self.budget_ms
+
+
+class ShutdownCoordinator:
+    """Runs the banner's release pass once, within a time budget"""
+
+    def __init__(self, banner: Any, budget_ms: float = SHUTDOWN_BUDGET_MS,
+                 clock: Callable[[], float] = time.perf_counter):
+        self.banner = banner
+        self.budget_ms = budget_ms
+        self.clock = clock
+        self.report: Optional[ShutdownReport] = None
+        self.started = False
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+
+    def _steps(self, reason: str) -> List[Tuple[str, Callable[[], Any], bool]]:
+        """(name, action, required) in release order"""
+        banner = self.banner
+
+        def release_spaces():
+            for window in list(banner.windows):
+                window.release_spaces()
+
+        def close_windows():
+            banner._close_all_windows()
+            banner._close_root()
+
+        def stop_trackers():
+            banner._stop_foreground_tracking()
+            banner._stop_address_tracking()
+            banner._stop_threat_tracking()
+
+        def close_control():
+            if banner.control_server is not None:
+                banner.control_server.close()
+
+        def close_heartbeat():
+            if banner.heartbeat is not None:
+                banner.heartbeat.close(reason)
+
+        return [
+            ("update_bus", banner.update_bus.close, True),
+            ("timers", banner.scheduler.cancel_all, True),
+            ("appbars", release_spaces, True),
+            ("windows", close_windows, True),
+            ("trackers", stop_trackers, False),
+            ("watches", banner._stop_change_watches, False),
+            ("control", close_control, False),
+            ("heartbeat", close_heartbeat, False),
+            ("event_log", event_log.EVENT_LOG.flush, False),
+        ]
+
+    def run(self, reason: str) -> Optional[ShutdownReport]:
+        """Release everything; on the Tk thread
+
+        Later calls do nothing and return the first pass's report (None
+        while it is still running).
+        """
+        with self._lock:
+            if self.started:
+                return self.report
+            self.started = True
+
+        started = self.clock()
+        deadline = started + self.budget_ms / 1000
+        steps: List[Tuple[str, float]] = []
+        skipped: List[str] = []
+        errors: List[str] = []
+        for name, action, required in self._steps(reason):
+            step_started = self.clock()
+            if not required and step_started > deadline:
+                skipped.append(name)
+                continue
+            try:
+                action()
+            except Exception as e:
+                # Keep going: a failed step must not keep the AppBars registered
+                errors.append(f"{name}: {e}")
+            steps.append((name, (self.clock() - step_started) * 1000))
+
+        elapsed_ms = (self.clock() - started) * 1000
+        self.report = ShutdownReport(reason, elapsed_ms, self.budget_ms, tuple(steps),
+                                     tuple(skipped), tuple(errors))
+        self._log(self.report)
+        self._done.set()
+        return self.report
+
+    def _log(self, report: ShutdownReport) -> None:
+        timings = ", ".join(f"{name} {ms:.1f}" for name, ms in report.steps)
+        message = f"Shutdown ({report.reason}) in {report.elapsed_ms:.1f} ms: {timings}"
+        if report.skipped:
+            message += f"; skipped {', '.join(report.skipped)}"
+        if report.over_budget:
+            event_log.warning("shutdown", message + f" (budget {report.budget_ms:g} ms)")
+        else:
+            event_log.info("shutdown", message)
+        for error in report.errors:
+            event_log.error("shutdown", f"Error during shutdown: {error}")
+        # The flush step may have been skipped; this record should still reach disk
+        event_log.EVENT_LOG.flush()
+
+    def request(self, reason: str) -> None:
+        """Ask the Tk thread to run the pass; safe from any thread"""
+        if not self.banner.scheduler.call_idle(self.run, reason):
+            # No Tk root left to post to; nothing else can be running Tk
+            self.run(reason)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the pass to finish"""
+        return self._done.wait(timeout)
+
+
+def signal_handler(coordinator: ShutdownCoordinator) -> Callable[[int, Any], None]:
+    """Handler that runs the pass on SIGTERM, SIGINT and similar"""
+    def handler(signum: int, frame: Any) -> None:
+        coordinator.request(signal.Signals(signum).name)
+
+    return handler
+
+
+def install(coordinator: ShutdownCoordinator) -> List[str]:
+    """Register the signal handlers; returns the signals handled"""
+    installed = []
+    handler = signal_handler(coordinator)
+    for name in SIGNALS:
+        signum = getattr(signal, name, None)
+        if signum is None:
+            continue
+        try:
+            signal.signal(signum, handler)
+            installed.append(name)
+        except (OSError, ValueError) as e:
+            # Not the main thread, or not catchable here
+            event_log.warning("shutdown", f"Cannot handle {name}: {e}")
+    return installed
@@ -0,0 +1,90 @@
+"""
+Soak harness driving repeated banner rebuilds against fake backends
+
+Usage::
+
+    python -m classification_banner.soak --cycles 5000 --monitors 3
+"""
+
+import argparse
+import sys
+from typing import Optional
+from .banner import ClassificationBanner
+from .fakes import FakeMonitorManager, FakeRegistryManager, make_monitor_row
+from .leak_detector import LeakBudget, LeakDetector
+
+SOAK_SETTINGS = {
+    "Classification": "SECRET",
+    "BackgroundColor": "#FF0000",
+    "TextColor": "#000000",
+    "Enabled": 1,
+    "FPCON": "Alpha",
+    "CPCON": "1",
+    "ShowHostname": True,
+    "ShowUsername": True,
+}
+
+
+def run_soak(cycles: int = 1000, monitors: int = 2, warmup: int = 20,
+             report_every: int = 100, budget: Optional[LeakBudget] = None) -> LeakDetector:
+    """Rebuild the banners ``cycles`` times and measure resource growth
+
+    Odd cycles dock/undock a monitor, every tenth cycle also changes a
+    registry value so both rebuild paths are exercised. The baseline is taken
+    after ``warmup`` cycles so one-time caches do not count as leaks.
+    """
+    registry = FakeRegistryManager(SOAK_SETTINGS)
+    monitor_manager = FakeMonitorManager(make_monitor_row(monitors))
+    layouts = [make_monitor_row(monitors), make_monitor_row(max(1, monitors - 1))]
+
+    banner = ClassificationBanner(registry_manager=registry, monitor_manager=monitor_manager)
+    detector = LeakDetector(budget)
+
+    for cycle in range(1, warmup + cycles + 1):
+        monitor_manager.monitors = layouts[cycle % 2]
+        if cycle % 10 == 0:
+            registry.values["FPCON"] = "Bravo" if registry.values["FPCON"] == "Alpha" else "Alpha"
+            banner._check_registry_changes()
+        else:
+            banner._check_monitor_changes()
+
+        for root in banner.roots():
+            root.update()
+
+        if cycle == warmup:
+            detector.baseline(banner.roots())
+        elif cycle > warmup and (cycle - warmup) % report_every == 0:
+            detector.record(banner.roots())
+            print(f"cycle {cycle - warmup}: {detector.report()}")
+
+    if detector.samples == 0:
+        detector.record(banner.roots())
+
+    errors = [e for w in banner.windows for e in w.cleanup_errors]
+    if errors:
+        print(f"{len(errors)} cleanup errors, first: {errors[0]}")
+
+    banner._close_all_windows()
+    banner._close_root()
+    return detector
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Run the soak harness; exit status 1 when a budget is exceeded"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cycles", type=int, default=1000)
+    parser.add_argument("--monitors", type=int, default=2)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--report-every", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    detector = run_soak(args.cycles, args.monitors, args.warmup, args.report_every)
+    print(detector.report())
+    violations = detector.violations()
+    for violation in violations:
+        print(f"FAIL: {violation}")
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,305 @@
+"""
+Watchdog supervisor that restarts the banner when it dies or hangs
+
+``main.py --supervise`` runs the banner as a child process. The child
+connects back over a local pipe (multiprocessing.connection) and sends a
+heartbeat from its monitor check, so a beat also proves the Tk thread is
+still running. The supervisor only blocks: one thread in ``Popen.wait`` and
+one in ``Connection.poll``. It never polls the process list.
+
+Measure restart latency against a deliberately crashing child::
+
+    python -m classification_banner.supervisor --selftest 5
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection, Listener
+from typing import List, NamedTuple, Optional
+from .constants import (
+    SUPERVISOR_ADDRESS_ENV,
+    SUPERVISOR_AUTHKEY_ENV,
+    SUPERVISOR_HEARTBEAT_TIMEOUT,
+    SUPERVISOR_RESTART_MAX_DELAY,
+    SUPERVISOR_RESTART_MIN_DELAY,
+    SUPERVISOR_STABLE_UPTIME,
+)
+from . import event_log
+
+EXIT_PREFIX = b"exit:"
+
+
+class RestartPolicy:
+    """Exponential backoff between restarts of a crash-looping child
+
+    The first failure after a healthy run restarts immediately; each further
+    failure doubles the delay up to ``max_delay``.
+    """
+
+    def __init__(
+        self,
+        min_delay: float = SUPERVISOR_RESTART_MIN_DELAY,
+        max_delay: float = SUPERVISOR_RESTART_MAX_DELAY,
+        stable_uptime: float = SUPERVISOR_STABLE_UPTIME,
+    ):
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.stable_uptime = stable_uptime
+        self.failures = 0
+
+    def next_delay(self, uptime: float) -> float:
+        """Seconds to wait before the next start, given the last child's uptime"""
+        if uptime >= self.stable_uptime:
+            self.failures = 0
+        delay = 0.0
+        if self.failures:
+            delay = min(self.max_delay, self.min_delay * 2 ** (self.failures - 1))
+        self.failures += 1
+        return delay
+
+
+class RestartRecord(NamedTuple):
+    """One restart: why the child went away and how long the banner was gone"""
+
+    exit_code: int
+    reason: str
+    uptime: float
+    delay: float
+    # Child exit to the replacement's first heartbeat, in seconds
+    downtime: Optional[float]
+
+
+class HeartbeatClient:
+    """Child side of the heartbeat pipe"""
+
+    def __init__(self, address: str, authkey: bytes):
+        self._conn: Optional[Connection] = Client(address, authkey=authkey)
+        # Identifies this child to the supervisor
+        self._conn.send(os.getpid())
+
+    @classmethod
+    def from_environment(cls) -> Optional["HeartbeatClient"]:
+        """Connect if this process was started by a supervisor"""
+        address = os.environ.get(SUPERVISOR_ADDRESS_ENV)
+        if not address:
+            return None
+        try:
+            return cls(address, bytes.fromhex(os.environ.get(SUPERVISOR_AUTHKEY_ENV, "")))
+        except (OSError, ValueError, AuthenticationError) as e:
+            event_log.error("supervisor", f"Error connecting to supervisor: {e}")
+            return None
+
+    def beat(self) -> None:
+        """Report that the process is alive"""
+        if self._conn is None:
+            return
+        try:
+            self._conn.send_bytes(b".")
+        except OSError as e:
+            # Supervisor gone; keep running unsupervised
+            event_log.error("supervisor", f"Error sending heartbeat: {e}")
+            self._conn = None
+
+    def close(self, reason: Optional[str] = None) -> None:
+        """Disconnect; a ``reason`` marks the exit as deliberate (no restart)"""
+        if self._conn is None:
+            return
+        try:
+            if reason:
+                self._conn.send_bytes(EXIT_PREFIX + reason.encode("utf-8"))
+            self._conn.close()
+        except OSError:
+            pass
+        self._conn = None
+
+
+class Supervisor:
+    """Starts the child, watches its heartbeat and restarts it when needed"""
+
+    def __init__(
+        self,
+        command: List[str],
+        policy: Optional[RestartPolicy] = None,
+        heartbeat_timeout: float = SUPERVISOR_HEARTBEAT_TIMEOUT,
+        max_restarts: Optional[int] = None,
+    ):
+        self.command = command
+        self.policy = policy or RestartPolicy()
+        self.heartbeat_timeout = heartbeat_timeout
+        self.max_restarts = max_restarts
+        self.restarts: List[RestartRecord] = []
+        self.authkey = os.urandom(32)
+        self.listener = Listener(self._address(), authkey=self.authkey)
+
+        self._lock = threading.Lock()
+        self._child: Optional[subprocess.Popen] = None
+        self._connected = threading.Event()
+        self._released = threading.Event()
+        self._exit_reason: Optional[str] = None
+        self._hung = False
+        self._last_exit: Optional[float] = None
+        self._closed = False
+
+    @staticmethod
+    def _address() -> Optional[str]:
+        """Named pipe on Windows; a socket file elsewhere
+
+        The address goes into an environment variable, so Linux abstract
+        socket names (which start with a NUL) cannot be used.
+        """
+        if sys.platform == "win32":
+            return None
+        return os.path.join(tempfile.mkdtemp(prefix="banner-supervisor-"), "heartbeat")
+
+    def run(self) -> int:
+        """Run the child until it exits deliberately; returns its exit code"""
+        threading.Thread(target=self._watch, name="heartbeat", daemon=True).start()
+        env = dict(os.environ)
+        env[SUPERVISOR_ADDRESS_ENV] = self.listener.address
+        env[SUPERVISOR_AUTHKEY_ENV] = self.authkey.hex()
+
+        code = 0
+        try:
+            while True:
+                self._exit_reason = None
+                self._hung = False
+                self._connected.clear()
+                self._released.clear()
+                started = time.monotonic()
+                with self._lock:
+                    self._child = subprocess.Popen(self.command, env=env)
+                code = self._child.wait()
+                exited = time.monotonic()
+                if self._connected.is_set():
+                    # Let the watcher read a final exit message
+                    self._released.wait(1.0)
+
+                if self._exit_reason is not None:
+                    event_log.info("supervisor", f"Banner exited ({self._exit_reason})")
+                    return code
+                if self.max_restarts is not None and len(self.restarts) >= self.max_restarts:
+                    return code
+
+                uptime = exited - started
+                delay = self.policy.next_delay(uptime)
+                reason = "hung" if self._hung else "exited"
+                with self._lock:
+                    self._last_exit = exited
+                    self.restarts.append(RestartRecord(code, reason, uptime, delay, None))
+                event_log.warning("supervisor", f"Banner {reason} with code {code} after "
+                                  f"{uptime:.1f}s; restarting in {delay:.2f}s")
+                if delay:
+                    time.sleep(delay)
+        except KeyboardInterrupt:
+            return code
+        finally:
+            self._closed = True
+            if self._child is not None and self._child.poll() is None:
+                self._child.terminate()
+            self.listener.close()
+
+    def _watch(self) -> None:
+        """Accept each child's connection in turn and serve its heartbeats"""
+        while not self._closed:
+            try:
+                conn = self.listener.accept()
+            except AuthenticationError:
+                continue
+            except OSError:
+                if self._closed:
+                    return
+                continue
+            with conn:
+                self._serve(conn)
+
+    def _serve(self, conn: Connection) -> None:
+        """Read heartbeats until EOF; kill the child if they stop"""
+        try:
+            pid = conn.recv()
+            with self._lock:
+                child = self._child
+                if child is None or pid != child.pid:
+                    # Stale connection from an earlier child
+                    return
+                if self._last_exit is not None and self.restarts:
+                    self.restarts[-1] = self.restarts[-1]._replace(
+                        downtime=time.monotonic() - self._last_exit)
+                    self._last_exit = None
+            self._connected.set()
+
+            while True:
+                if not conn.poll(self.heartbeat_timeout):
+                    event_log.warning(
+                        "supervisor", f"No heartbeat for {self.heartbeat_timeout}s - killing banner")
+                    self._hung = True
+                    child.kill()
+                    return
+                message = conn.recv_bytes()
+                if message.startswith(EXIT_PREFIX):
+                    self._exit_reason = message[len(EXIT_PREFIX):].decode("utf-8", "replace")
+        except (EOFError, OSError):
+            # Child exited or crashed
+            pass
+        finally:
+            self._released.set()
+
+
+def child_command(argv: Optional[List[str]] = None) -> List[str]:
+    """Command line that starts the banner itself, without ``--supervise``"""
+    args = [a for a in (sys.argv[1:] if argv is None else argv) if a != "--supervise"]
+    if getattr(sys, "frozen", False):
+        return [sys.executable, *args]
+    return [sys.executable, os.path.abspath(sys.argv[0]), *args]
+
+
+def _fake_child(beats: int, hang: bool) -> None:
+    """Beat a few times, then crash (or hang)"""
+    client = HeartbeatClient.from_environment()
+    for _ in range(beats):
+        if client is not None:
+            client.beat()
+        time.sleep(0.05)
+    if hang:
+        time.sleep(3600)
+    os._exit(3)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Measure restart latency with a crashing fake child"""
+    parser = argparse.ArgumentParser(description="Supervisor restart self-test")
+    parser.add_argument("--selftest", type=int, default=5, metavar="RESTARTS")
+    parser.add_argument("--hang", action="store_true", help="fake child hangs instead of crashing")
+    parser.add_argument("--timeout", type=float, default=1.0, help="heartbeat timeout (seconds)")
+    parser.add_argument("--fake-child", type=int, metavar="BEATS", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.fake_child is not None:
+        _fake_child(args.fake_child, args.hang)
+        return 0
+
+    command = [sys.executable, "-m", "classification_banner.supervisor", "--fake-child", "3"]
+    if args.hang:
+        command.append("--hang")
+    supervisor = Supervisor(
+        command,
+        policy=RestartPolicy(min_delay=0.05, max_delay=0.4),
+        heartbeat_timeout=args.timeout,
+        max_restarts=args.selftest,
+    )
+    supervisor.run()
+
+    for record in supervisor.restarts:
+        downtime = "n/a" if record.downtime is None else f"{record.downtime * 1000:.0f} ms"
+        print(f"{record.reason:<7} code={record.exit_code} uptime={record.uptime:.2f}s "
+              f"delay={record.delay:.2f}s downtime={downtime}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,516 @@
+"""
+Threat level (FPCON/CPCON) providers for the right panel
+
+``ThreatLevelSource`` selects where the levels come from:
+
+- empty or ``registry``: the FPCON/CPCON registry values, read by the
+  existing registry poll and applied in place
+- a file path (or ``file:<path>``): a status file, watched with change
+  notifications on Windows
+- ``http://127.0.0.1:<port>/<path>``: a local status service, polled
+- ``tcp://127.0.0.1:<port>``: a local service that pushes one status line
+  per change (and periodically as a keep-alive)
+
+A status is either JSON (``{"FPCON": "Bravo", "CPCON": "3"}``) or
+``FPCON=Bravo`` lines. Fetching runs on a background thread; data older than
+``ThreatLevelStaleAfter`` seconds is shown with a STALE indicator.
+
+Measure the latency from a source change to the update callback::
+
+    python -m classification_banner.threat_level --bench
+"""
+
+import abc
+import argparse
+import ctypes
+import http.server
+import ipaddress
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+import urllib.request
+from ctypes import wintypes
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+from .constants import (
+    DEFAULT_THREAT_LEVEL_STALE_AFTER,
+    THREAT_LEVEL_CONNECT_TIMEOUT,
+    THREAT_LEVEL_FILE_POLL_INTERVAL,
+    THREAT_LEVEL_POLL_INTERVAL,
+    THREAT_LEVEL_RETRY_MAX,
+    THREAT_LEVEL_RETRY_MIN,
+    THREAT_LEVEL_STALE_MARK,
+)
+from . import event_log
+
+THREAT_KEYS = ("FPCON", "CPCON")
+MAX_STATUS_BYTES = 65536
+
+FILE_NOTIFY_CHANGE_FILE_NAME = 0x0001
+FILE_NOTIFY_CHANGE_SIZE = 0x0008
+FILE_NOTIFY_CHANGE_LAST_WRITE = 0x0010
+INVALID_HANDLE_VALUE = ctypes.c_void_p(-1).value
+INFINITE = 0xFFFFFFFF
+WAIT_OBJECT_0 = 0
+
+# Parsed status and the wall-clock time it was current as of
+Fetched = Tuple[Dict[str, str], float]
+
+
+def format_threat_levels(fpcon: str, cpcon: str, stale: bool = False) -> str:
+    """Right panel text, e.g. ``FPCON: Alpha | CPCON: 1``"""
+    parts = []
+    if fpcon:
+        parts.append(f"FPCON: {fpcon}")
+    if cpcon:
+        parts.append(f"CPCON: {cpcon}")
+    text = " | ".join(parts)
+    if stale and text:
+        text += THREAT_LEVEL_STALE_MARK
+    return text
+
+
+def parse_threat_levels(text: str) -> Dict[str, str]:
+    """Parse a JSON or ``KEY=value`` status into FPCON/CPCON values"""
+    text = text.strip()
+    if text.startswith("{"):
+        data = json.loads(text)
+        if not isinstance(data, dict):
+            raise ValueError("status must be a JSON object")
+        items = data.items()
+    else:
+        items = (line.split("=", 1) for line in text.splitlines() if "=" in line)
+
+    values = {str(key).strip().upper(): str(value).strip() for key, value in items}
+    levels = {key: values[key] for key in THREAT_KEYS if values.get(key)}
+    if not levels:
+        raise ValueError("status has no FPCON or CPCON value")
+    return levels
+
+
+class ThreatLevels(NamedTuple):
+    """Levels currently displayed"""
+
+    fpcon: str
+    cpcon: str
+    stale: bool
+    as_of: float
+
+    def display_text(self) -> str:
+        """Right panel text including the staleness indicator"""
+        return format_threat_levels(self.fpcon, self.cpcon, self.stale)
+
+
+class ThreatSource(abc.ABC):
+    """Base class: ``fetch`` blocks up to ``timeout`` seconds for new data
+
+    ``fetch`` returns None when nothing changed and raises OSError or
+    ValueError on failure. ``close`` may be called from another thread and
+    must make a blocked ``fetch`` return promptly.
+    """
+
+    def __init__(self):
+        self.stop_event = threading.Event()
+
+    @abc.abstractmethod
+    def fetch(self, timeout: Optional[float]) -> Optional[Fetched]:
+        """Wait for new levels; None when nothing changed"""
+
+    def close(self) -> None:
+        """Interrupt ``fetch``; called from the UI thread"""
+        self.stop_event.set()
+
+    def release(self) -> None:
+        """Free OS resources; called on the fetch thread when it exits"""
+
+
+class FileThreatSource(ThreatSource):
+    """Status file; its modification time is the data's age"""
+
+    def __init__(self, path: str, poll_interval: float = THREAT_LEVEL_FILE_POLL_INTERVAL):
+        super().__init__()
+        self.path = os.path.abspath(path)
+        self.poll_interval = poll_interval
+        self._key: Optional[Tuple[int, int]] = None
+        self._kernel32: Any = None
+        self._notify: Optional[int] = None
+        self._stop_handle: Optional[int] = None
+        if sys.platform == "win32":
+            self._init_win32()
+
+    def _init_win32(self) -> None:
+        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        kernel32.FindFirstChangeNotificationW.argtypes = [
+            wintypes.LPCWSTR, wintypes.BOOL, wintypes.DWORD]
+        kernel32.FindFirstChangeNotificationW.restype = wintypes.HANDLE
+        kernel32.FindNextChangeNotification.argtypes = [wintypes.HANDLE]
+        kernel32.FindCloseChangeNotification.argtypes = [wintypes.HANDLE]
+        kernel32.CreateEventW.argtypes = [
+            ctypes.c_void_p, wintypes.BOOL, wintypes.BOOL, wintypes.LPCWSTR]
+        kernel32.CreateEventW.restype = wintypes.HANDLE
+        kernel32.SetEvent.argtypes = [wintypes.HANDLE]
+        kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+        kernel32.WaitForMultipleObjects.argtypes = [
+            wintypes.DWORD, ctypes.POINTER(wintypes.HANDLE), wintypes.BOOL, wintypes.DWORD]
+        kernel32.WaitForMultipleObjects.restype = wintypes.DWORD
+        self._kernel32 = kernel32
+        # Manual-reset event so close() wakes the waiting thread
+        self._stop_handle = kernel32.CreateEventW(None, True, False, None)
+
+    def fetch(self, timeout: Optional[float]) -> Optional[Fetched]:
+        """Read the file if it changed, otherwise wait for a change"""
+        fetched = self._read_if_changed()
+        if fetched is not None:
+            return fetched
+        self._wait(timeout)
+        return self._read_if_changed()
+
+    def _read_if_changed(self) -> Optional[Fetched]:
+        stat = os.stat(self.path)
+        key = (stat.st_mtime_ns, stat.st_size)
+        if key == self._key:
+            return None
+        with open(self.path, encoding="utf-8-sig") as status:
+            levels = parse_threat_levels(status.read(MAX_STATUS_BYTES))
+        # Only remembered once parsed, so a half-written file is read again
+        self._key = key
+        return levels, stat.st_mtime
+
+    def _wait(self, timeout: Optional[float]) -> None:
+        if self._kernel32 is None or not self._stop_handle:
+            wait = self.poll_interval if timeout is None else min(timeout, self.poll_interval)
+            self.stop_event.wait(wait)
+            return
+
+        if self._notify is None:
+            handle = self._kernel32.FindFirstChangeNotificationW(
+                os.path.dirname(self.path), False,
+                FILE_NOTIFY_CHANGE_FILE_NAME | FILE_NOTIFY_CHANGE_SIZE
+                | FILE_NOTIFY_CHANGE_LAST_WRITE,
+            )
+            if not handle or handle == INVALID_HANDLE_VALUE:
+                raise ctypes.WinError(ctypes.get_last_error())
+            self._notify = handle
+            # The file may have changed before the watch existed
+            return
+
+        handles = (wintypes.HANDLE * 2)(self._notify, self._stop_handle)
+        milliseconds = INFINITE if timeout is None else int(timeout * 1000)
+        if self._kernel32.WaitForMultipleObjects(2, handles, False, milliseconds) == WAIT_OBJECT_0:
+            self._kernel32.FindNextChangeNotification(self._notify)
+
+    def close(self) -> None:
+        super().close()
+        if self._stop_handle:
+            self._kernel32.SetEvent(self._stop_handle)
+
+    def release(self) -> None:
+        if self._notify is not None:
+            self._kernel32.FindCloseChangeNotification(self._notify)
+            self._notify = None
+        if self._stop_handle:
+            self._kernel32.CloseHandle(self._stop_handle)
+            self._stop_handle = None
+
+
+class HttpThreatSource(ThreatSource):
+    """Local HTTP status service, polled every ``poll_interval`` seconds"""
+
+    def __init__(self, url: str, poll_interval: float = THREAT_LEVEL_POLL_INTERVAL):
+        super().__init__()
+        self.url = url
+        self.poll_interval = poll_interval
+        self._next = 0.0
+        # Never route loopback requests through a configured proxy
+        self._opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+
+    def fetch(self, timeout: Optional[float]) -> Optional[Fetched]:
+        """GET the status when due, otherwise wait"""
+        wait = self._next - time.monotonic()
+        if wait > 0:
+            if timeout is not None and timeout < wait:
+                self.stop_event.wait(timeout)
+                return None
+            if self.stop_event.wait(wait):
+                return None
+
+        self._next = time.monotonic() + self.poll_interval
+        with self._opener.open(self.url, timeout=THREAT_LEVEL_CONNECT_TIMEOUT) as response:
+            charset = response.headers.get_content_charset() or "utf-8"
+            text = response.read(MAX_STATUS_BYTES).decode(charset, "replace")
+        return parse_threat_levels(text), time.time()
+
+
+class SocketThreatSource(ThreatSource):
+    """Local TCP service pushing newline-terminated status lines"""
+
+    def __init__(self, host: str, port: int):
+        super().__init__()
+        self.host = host
+        self.port = port
+        self._sock: Optional[socket.socket] = None
+        self._buffer = b""
+
+    def fetch(self, timeout: Optional[float]) -> Optional[Fetched]:
+        """Wait for the next line; the newest complete line wins"""
+        if self._sock is None:
+            self._sock = socket.create_connection(
+                (self.host, self.port), timeout=THREAT_LEVEL_CONNECT_TIMEOUT)
+            self._buffer = b""
+        self._sock.settimeout(timeout)
+        try:
+            chunk = self._sock.recv(4096)
+        except socket.timeout:
+            return None
+        except OSError:
+            self._disconnect()
+            raise
+        if not chunk:
+            self._disconnect()
+            raise ConnectionError("status service closed the connection")
+
+        *lines, self._buffer = (self._buffer + chunk).split(b"\n")
+        if len(self._buffer) > MAX_STATUS_BYTES:
+            self._disconnect()
+            raise ValueError("status line too long")
+        lines = [line for line in lines if line.strip()]
+        if not lines:
+            return None
+        return parse_threat_levels(lines[-1].decode("utf-8", "replace")), time.time()
+
+    def _disconnect(self) -> None:
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def close(self) -> None:
+        super().close()
+        sock = self._sock
+        if sock is not None:
+            try:
+                # Wakes the thread blocked in recv
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def release(self) -> None:
+        self._disconnect()
+
+
+def _require_loopback(host: Optional[str]) -> str:
+    if not host:
+        raise ValueError("status service URL has no host")
+    if host.lower() != "localhost" and not ipaddress.ip_address(host).is_loopback:
+        raise ValueError(f"status service must be on this machine, not {host}")
+    return host
+
+
+def make_source(spec: str) -> Optional[ThreatSource]:
+    """Build the source for a ``ThreatLevelSource`` value; None means registry"""
+    spec = (spec or "").strip()
+    lowered = spec.lower()
+    if not spec or lowered == "registry":
+        return None
+    if lowered.startswith("http://"):
+        _require_loopback(urllib.parse.urlsplit(spec).hostname)
+        return HttpThreatSource(spec)
+    if lowered.startswith("tcp://"):
+        parts = urllib.parse.urlsplit(spec)
+        if parts.port is None:
+            raise ValueError(f"no port in {spec}")
+        return SocketThreatSource(_require_loopback(parts.hostname), parts.port)
+    if lowered.startswith("file:"):
+        spec = spec[len("file:"):]
+    return FileThreatSource(spec)
+
+
+class ThreatLevelProvider:
+    """Fetches threat levels on a background thread and reports changes
+
+    ``on_change`` is called on the fetch thread with a ThreatLevels value
+    whenever the displayed text would change, including when the data goes
+    stale. Until the source delivers, the registry values passed in are
+    shown and age from the moment the provider starts.
+    """
+
+    def __init__(self, source: ThreatSource, fpcon: str = "", cpcon: str = "",
+                 stale_after: float = DEFAULT_THREAT_LEVEL_STALE_AFTER,
+                 clock: Callable[[], float] = time.time):
+        self.source = source
+        self.stale_after = stale_after
+        self.clock = clock
+        self.levels = ThreatLevels(fpcon, cpcon, False, clock())
+        self.last_error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._on_change: Optional[Callable[[ThreatLevels], None]] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, on_change: Callable[[ThreatLevels], None]) -> None:
+        """Start fetching on a daemon thread"""
+        self._on_change = on_change
+        self._thread = threading.Thread(target=self._run, name="threat-level", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop fetching; the thread exits on its own"""
+        self._on_change = None
+        self.source.close()
+
+    def current(self) -> ThreatLevels:
+        """Levels last reported"""
+        with self._lock:
+            return self.levels
+
+    def _time_to_stale(self) -> Optional[float]:
+        with self._lock:
+            if self.levels.stale:
+                return None
+            return max(0.05, self.levels.as_of + self.stale_after - self.clock())
+
+    def _run(self) -> None:
+        retry = THREAT_LEVEL_RETRY_MIN
+        try:
+            while not self.source.stop_event.is_set():
+                try:
+                    fetched = self.source.fetch(self._time_to_stale())
+                    retry = THREAT_LEVEL_RETRY_MIN
+                    self.last_error = None
+                except (OSError, ValueError) as e:
+                    if str(e) != self.last_error:
+                        event_log.error("threat_level", f"Error reading threat levels: {e}")
+                        self.last_error = str(e)
+                    fetched = None
+                    self._publish(None)
+                    self.source.stop_event.wait(retry)
+                    retry = min(retry * 2, THREAT_LEVEL_RETRY_MAX)
+                    continue
+                if not self.source.stop_event.is_set():
+                    self._publish(fetched)
+        finally:
+            self.source.release()
+
+    def _publish(self, fetched: Optional[Fetched]) -> None:
+        """Apply new data (if any), re-evaluate staleness, report a change"""
+        with self._lock:
+            fpcon, cpcon, _, as_of = self.levels
+            if fetched is not None:
+                values, as_of = fetched
+                fpcon = values.get("FPCON", fpcon)
+                cpcon = values.get("CPCON", cpcon)
+            stale = self.clock() - as_of > self.stale_after
+            levels = ThreatLevels(fpcon, cpcon, stale, as_of)
+            changed = levels[:3] != self.levels[:3]
+            self.levels = levels
+
+        on_change = self._on_change
+        if changed and on_change is not None:
+            on_change(levels)
+
+
+class _StandInHttpHandler(http.server.BaseHTTPRequestHandler):
+    """Serves the stand-in server's current status"""
+
+    def do_GET(self):
+        body = self.server.status.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _bench_source(name: str, source: ThreatSource, change: Callable[[str], None],
+                  rounds: int) -> None:
+    """Change the source ``rounds`` times and time each update callback"""
+    received: Dict[str, float] = {}
+    arrived = threading.Condition()
+
+    def on_change(levels: ThreatLevels) -> None:
+        with arrived:
+            received[levels.fpcon] = time.perf_counter()
+            arrived.notify_all()
+
+    provider = ThreatLevelProvider(source, "Alpha", "1")
+    provider.start(on_change)
+    latencies = []
+    try:
+        for i in range(rounds):
+            level = f"Level{i}"
+            started = time.perf_counter()
+            change(level)
+            with arrived:
+                if not arrived.wait_for(lambda: level in received, timeout=30):
+                    print(f"{name}: no update for {level} within 30 s")
+                    return
+            latencies.append((received[level] - started) * 1000)
+    finally:
+        provider.stop()
+
+    latencies.sort()
+    print(f"{name:<5} n={len(latencies)} min={latencies[0]:.1f} ms "
+          f"median={latencies[len(latencies) // 2]:.1f} ms max={latencies[-1]:.1f} ms")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Benchmark source-change-to-callback latency against local stand-ins"""
+    parser = argparse.ArgumentParser(description="Threat level provider benchmark")
+    parser.add_argument("--bench", action="store_true", help="run the latency benchmark")
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--poll", type=float, default=0.2,
+                        help="HTTP (and non-Windows file) poll interval in seconds")
+    args = parser.parse_args(argv)
+    if not args.bench:
+        parser.print_help()
+        return 0
+
+    def status(level: str) -> str:
+        return json.dumps({"FPCON": level, "CPCON": "1"})
+
+    # File
+    directory = tempfile.mkdtemp(prefix="threat-level-")
+    path = os.path.join(directory, "status.json")
+
+    def write_file(level: str) -> None:
+        with open(path, "w", encoding="utf-8") as status_file:
+            status_file.write(status(level))
+
+    write_file("Start")
+    _bench_source("file", FileThreatSource(path, poll_interval=args.poll), write_file, args.rounds)
+
+    # HTTP
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _StandInHttpHandler)
+    server.status = status("Start")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def set_http(level: str) -> None:
+        server.status = status(level)
+
+    url = f"http://127.0.0.1:{server.server_address[1]}/status"
+    _bench_source("http", HttpThreatSource(url, poll_interval=args.poll), set_http, args.rounds)
+    server.shutdown()
+
+    # TCP push
+    listener = socket.create_server(("127.0.0.1", 0))
+    clients = []
+    threading.Thread(target=lambda: clients.append(listener.accept()[0]), daemon=True).start()
+
+    def push(level: str) -> None:
+        while not clients:
+            time.sleep(0.01)
+        clients[0].sendall((status(level) + "\n").encode("utf-8"))
+
+    _bench_source("tcp", SocketThreatSource("127.0.0.1", listener.getsockname()[1]),
+                  push, args.rounds)
+    listener.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
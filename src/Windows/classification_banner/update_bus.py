@@ -0,0 +1,271 @@
+"""
+Coalescing update bus between worker threads and the Tk thread
+
+Producers (address notifications, threat level feeds, config and monitor
+watchers) call ``post(key, handler, *args)`` from any thread. Only the
+latest post per key is kept, so a burst of a thousand threat updates costs
+the UI one handler call. The first post after a drain wakes the Tk loop with
+a single ``after_idle``; later posts ride on that wake. The drain applies
+every pending update, then runs ``on_batch`` once so the banner can push the
+combined result to its windows in one pass.
+
+Backpressure is coalescing: producers never block, and the pending set is
+bounded by the number of keys however fast they post. ``metrics()`` reports
+posts, coalesced posts, wakes, batch sizes and the age of updates when they
+were applied.
+
+Stress run with a stand-in UI thread::
+
+    python -m classification_banner.update_bus --rate 20000 --seconds 2
+"""
+
+import argparse
+import collections
+import queue
+import sys
+import threading
+import time
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+from . import event_log
+
+# Recent update ages kept for the latency percentiles
+LATENCY_SAMPLES = 1024
+
+
+class UpdateBus:
+    """Keyed latest-wins updates, applied in batches on the UI thread
+
+    ``wake(callback)`` must run ``callback`` on the UI thread and return
+    False if it could not be posted (``TkScheduler.call_idle``).
+    """
+
+    def __init__(self, wake: Callable[[Callable[[], Any]], bool],
+                 on_batch: Optional[Callable[[], Any]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.wake = wake
+        self.on_batch = on_batch
+        self.clock = clock
+        self._lock = threading.Lock()
+        # key -> (handler, args, time of the first post since the last drain)
+        self._pending: Dict[str, Tuple[Callable[..., Any], Tuple[Any, ...], float]] = {}
+        self._wake_pending = False
+        # Set by close(); later posts are dropped
+        self.closed = False
+
+        self.posted = 0
+        self.coalesced = 0
+        self.applied = 0
+        self.wakes = 0
+        self.batches = 0
+        self.errors = 0
+        self.max_depth = 0
+        self.max_batch = 0
+        self.max_batch_ms = 0.0
+        self.max_latency_ms = 0.0
+        self._latencies: Deque[float] = collections.deque(maxlen=LATENCY_SAMPLES)
+
+    def post(self, key: str, handler: Callable[..., Any], *args: Any) -> None:
+        """Queue ``handler(*args)`` for the UI thread, replacing a pending ``key``"""
+        with self._lock:
+            if self.closed:
+                return
+            self.posted += 1
+            previous = self._pending.get(key)
+            if previous is not None:
+                self.coalesced += 1
+                # Latest wins, but the age counts from the first post
+                self._pending[key] = (handler, args, previous[2])
+            else:
+                self._pending[key] = (handler, args, self.clock())
+                self.max_depth = max(self.max_depth, len(self._pending))
+            if self._wake_pending:
+                return
+            self._wake_pending = True
+            self.wakes += 1
+        self._wake_ui()
+
+    def _wake_ui(self) -> None:
+        if not self.wake(self.drain):
+            # No UI to post to yet; the next post or rewake() tries again
+            with self._lock:
+                self._wake_pending = False
+
+    def rewake(self) -> None:
+        """Post a new wake, e.g. after the root holding the last one was destroyed"""
+        with self._lock:
+            if not self._pending:
+                self._wake_pending = False
+                return
+            self._wake_pending = True
+            self.wakes += 1
+        self._wake_ui()
+
+    def close(self) -> int:
+        """Drop pending updates and ignore later posts; returns how many were dropped"""
+        with self._lock:
+            self.closed = True
+            dropped, self._pending = len(self._pending), {}
+            self._wake_pending = False
+        return dropped
+
+    def pending(self) -> int:
+        """Number of keys waiting for the UI thread"""
+        with self._lock:
+            return len(self._pending)
+
+    def drain(self) -> int:
+        """Apply every pending update on the calling (UI) thread; returns how many"""
+        with self._lock:
+            batch, self._pending = self._pending, {}
+            self._wake_pending = False
+        if not batch:
+            return 0
+
+        started = self.clock()
+        for key, (handler, args, posted_at) in batch.items():
+            age_ms = (started - posted_at) * 1000
+            self._latencies.append(age_ms)
+            self.max_latency_ms = max(self.max_latency_ms, age_ms)
+            try:
+                handler(*args)
+            except Exception as e:
+                # One bad update must not drop the rest of the batch
+                self.errors += 1
+                event_log.error("update_bus", f"Error applying update {key!r}: {e}")
+        if self.on_batch is not None:
+            try:
+                self.on_batch()
+            except Exception as e:
+                self.errors += 1
+                event_log.error("update_bus", f"Error applying update batch: {e}")
+
+        self.applied += len(batch)
+        self.batches += 1
+        self.max_batch = max(self.max_batch, len(batch))
+        self.max_batch_ms = max(self.max_batch_ms, (self.clock() - started) * 1000)
+        return len(batch)
+
+    def metrics(self) -> Dict[str, float]:
+        """Counters and latency percentiles (ms) since the bus was created"""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            depth = len(self._pending)
+        p50 = latencies[len(latencies) // 2] if latencies else 0.0
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] if latencies else 0.0
+        return {
+            "posted": self.posted,
+            "coalesced": self.coalesced,
+            "applied": self.applied,
+            "wakes": self.wakes,
+            "batches": self.batches,
+            "errors": self.errors,
+            "depth": depth,
+            "max_depth": self.max_depth,
+            "max_batch": self.max_batch,
+            "max_batch_ms": self.max_batch_ms,
+            "latency_p50_ms": p50,
+            "latency_p99_ms": p99,
+            "latency_max_ms": self.max_latency_ms,
+        }
+
+
+class IdleLoop:
+    """Stand-in for the Tk thread: runs posted callbacks one at a time"""
+
+    def __init__(self):
+        self._queue: "queue.Queue[Optional[Callable[[], Any]]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="idle-loop", daemon=True)
+        self._thread.start()
+
+    def call_idle(self, callback: Callable[[], Any]) -> bool:
+        """Queue ``callback``; always succeeds"""
+        self._queue.put(callback)
+        return True
+
+    def _run(self) -> None:
+        while True:
+            callback = self._queue.get()
+            if callback is None:
+                return
+            callback()
+
+    def stop(self) -> None:
+        """Finish queued callbacks and stop the thread"""
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+
+def stress(rate: int = 5000, seconds: float = 1.0, producers: int = 4, keys: int = 8,
+           apply_ms: float = 0.05) -> Tuple[Dict[str, float], Dict[str, int], Dict[str, int]]:
+    """Post ``rate`` updates per second from ``producers`` threads
+
+    Each producer owns ``keys`` keys and posts increasing values to them in
+    turn; every applied update costs ``apply_ms`` of busy work on the loop
+    thread. Returns the bus metrics, the last value posted per key and the
+    last value applied per key.
+    """
+    loop = IdleLoop()
+    applied: Dict[str, int] = {}
+
+    def handler(key: str, value: int) -> None:
+        deadline = time.perf_counter() + apply_ms / 1000
+        while time.perf_counter() < deadline:
+            pass
+        applied[key] = value
+
+    bus = UpdateBus(loop.call_idle)
+    posted: Dict[str, int] = {}
+    interval = producers / rate
+    start = threading.Barrier(producers)
+
+    def produce(producer: int) -> None:
+        names = [f"{producer}:{k}" for k in range(keys)]
+        start.wait()
+        began = time.perf_counter()
+        value = 0
+        while time.perf_counter() - began < seconds:
+            value += 1
+            key = names[value % keys]
+            bus.post(key, handler, key, value)
+            posted[key] = value
+            # Pace to the rate, sleeping in slices of about a millisecond
+            lag = began + value * interval - time.perf_counter()
+            if lag > 0.001:
+                time.sleep(lag)
+
+    threads = [threading.Thread(target=produce, args=(p,)) for p in range(producers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # Applies the wake still queued for the last posts
+    loop.stop()
+    return bus.metrics(), posted, applied
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the stress harness; exit status 1 if an update was lost"""
+    parser = argparse.ArgumentParser(description="Stress the update bus")
+    parser.add_argument("--rate", type=int, default=20000, help="posts per second")
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument("--producers", type=int, default=4)
+    parser.add_argument("--keys", type=int, default=8, help="keys per producer")
+    parser.add_argument("--apply-ms", type=float, default=0.05, help="UI cost per update")
+    args = parser.parse_args(argv)
+
+    metrics, posted, applied = stress(args.rate, args.seconds, args.producers, args.keys,
+                                      args.apply_ms)
+    rate = metrics["posted"] / args.seconds
+    print(f"{rate:.0f} posts/s: " + ", ".join(
+        f"{name}={value:.2f}" if isinstance(value, float) else f"{name}={value}"
+        for name, value in metrics.items()))
+    if metrics["batches"]:
+        print(f"{metrics['applied'] / metrics['batches']:.1f} updates per wake")
+    lost = [key for key, value in posted.items() if applied.get(key) != value]
+    for key in lost:
+        print(f"FAIL: latest update of {key} not applied")
+    return 1 if lost else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,305 @@
+"""
+Full-screen marking watermark for an optional per-monitor overlay
+
+The marking is drawn with a built-in 5x7 bitmap font, scaled for the
+monitor's DPI, into one tile of staggered rows; the tile is repeated across
+the monitor into a premultiplied BGRA bitmap. Rendering is pure Python and
+needs no display, so tests and ``--bench`` run anywhere.
+
+``render_watermark`` is cached per (monitor size, DPI, marking, color,
+opacity). ``WatermarkOverlay`` hands the bitmap to the backend's
+click-through layered window and only renders or uploads again when one of
+those inputs changes: while idle there are no timers and no redraws, the
+compositor keeps showing the uploaded surface.
+
+Render times at 1080p and 4K, and the overlay's work during an idle hour
+on the virtual clock::
+
+    python -m classification_banner.watermark --bench
+"""
+
+import argparse
+import functools
+import sys
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from .constants import (
+    WATERMARK_CACHE_SIZE,
+    WATERMARK_GLYPH_SCALE,
+    WATERMARK_ROW_GAP,
+    WATERMARK_TEXT_GAP,
+)
+
+# 5x7 glyphs, one string of five columns per row ("#" is ink)
+FONT: Dict[str, Tuple[str, ...]] = {
+    " ": ("     ",) * 7,
+    "A": (" ### ", "#   #", "#   #", "#####", "#   #", "#   #", "#   #"),
+    "B": ("#### ", "#   #", "#   #", "#### ", "#   #", "#   #", "#### "),
+    "C": (" ### ", "#   #", "#    ", "#    ", "#    ", "#   #", " ### "),
+    "D": ("#### ", "#   #", "#   #", "#   #", "#   #", "#   #", "#### "),
+    "E": ("#####", "#    ", "#    ", "#### ", "#    ", "#    ", "#####"),
+    "F": ("#####", "#    ", "#    ", "#### ", "#    ", "#    ", "#    "),
+    "G": (" ### ", "#   #", "#    ", "# ###", "#   #", "#   #", " ####"),
+    "H": ("#   #", "#   #", "#   #", "#####", "#   #", "#   #", "#   #"),
+    "I": (" ### ", "  #  ", "  #  ", "  #  ", "  #  ", "  #  ", " ### "),
+    "J": ("  ###", "   # ", "   # ", "   # ", "   # ", "#  # ", " ##  "),
+    "K": ("#   #", "#  # ", "# #  ", "##   ", "# #  ", "#  # ", "#   #"),
+    "L": ("#    ", "#    ", "#    ", "#    ", "#    ", "#    ", "#####"),
+    "M": ("#   #", "## ##", "# # #", "# # #", "#   #", "#   #", "#   #"),
+    "N": ("#   #", "#   #", "##  #", "# # #", "#  ##", "#   #", "#   #"),
+    "O": (" ### ", "#   #", "#   #", "#   #", "#   #", "#   #", " ### "),
+    "P": ("#### ", "#   #", "#   #", "#### ", "#    ", "#    ", "#    "),
+    "Q": (" ### ", "#   #", "#   #", "#   #", "# # #", "#  # ", " ## #"),
+    "R": ("#### ", "#   #", "#   #", "#### ", "# #  ", "#  # ", "#   #"),
+    "S": (" ####", "#    ", "#    ", " ### ", "    #", "    #", "#### "),
+    "T": ("#####", "  #  ", "  #  ", "  #  ", "  #  ", "  #  ", "  #  "),
+    "U": ("#   #", "#   #", "#   #", "#   #", "#   #", "#   #", " ### "),
+    "V": ("#   #", "#   #", "#   #", "#   #", "#   #", " # # ", "  #  "),
+    "W": ("#   #", "#   #", "#   #", "# # #", "# # #", "# # #", " # # "),
+    "X": ("#   #", "#   #", " # # ", "  #  ", " # # ", "#   #", "#   #"),
+    "Y": ("#   #", "#   #", " # # ", "  #  ", "  #  ", "  #  ", "  #  "),
+    "Z": ("#####", "    #", "   # ", "  #  ", " #   ", "#    ", "#####"),
+    "0": (" ### ", "#   #", "#  ##", "# # #", "##  #", "#   #", " ### "),
+    "1": ("  #  ", " ##  ", "  #  ", "  #  ", "  #  ", "  #  ", " ### "),
+    "2": (" ### ", "#   #", "    #", "   # ", "  #  ", " #   ", "#####"),
+    "3": ("#####", "   # ", "  #  ", "   # ", "    #", "#   #", " ### "),
+    "4": ("   # ", "  ## ", " # # ", "#  # ", "#####", "   # ", "   # "),
+    "5": ("#####", "#    ", "#### ", "    #", "    #", "#   #", " ### "),
+    "6": ("  ## ", " #   ", "#    ", "#### ", "#   #", "#   #", " ### "),
+    "7": ("#####", "    #", "   # ", "  #  ", " #   ", " #   ", " #   "),
+    "8": (" ### ", "#   #", "#   #", " ### ", "#   #", "#   #", " ### "),
+    "9": (" ### ", "#   #", "#   #", " ####", "    #", "   # ", " ##  "),
+    "/": ("    #", "    #", "   # ", "  #  ", " #   ", "#    ", "#    "),
+    "-": ("     ", "     ", "     ", "#####", "     ", "     ", "     "),
+    ",": ("     ", "     ", "     ", "     ", "     ", "  #  ", " #   "),
+    ".": ("     ", "     ", "     ", "     ", "     ", "     ", "  #  "),
+    ":": ("     ", "  #  ", "     ", "     ", "     ", "  #  ", "     "),
+    "(": ("   # ", "  #  ", " #   ", " #   ", " #   ", "  #  ", "   # "),
+    ")": (" #   ", "  #  ", "   # ", "   # ", "   # ", "  #  ", " #   "),
+    "&": (" ##  ", "#  # ", "# #  ", " #   ", "# # #", "#  # ", " ## #"),
+}
+GLYPH_WIDTH = 5
+GLYPH_HEIGHT = 7
+# Glyph plus one column of spacing
+CELL_WIDTH = GLYPH_WIDTH + 1
+
+CLEAR = b"\0\0\0\0"
+
+
+class Watermark(NamedTuple):
+    """Premultiplied BGRA bitmap, top-down, ``width * 4`` bytes per row"""
+
+    width: int
+    height: int
+    pixels: bytes
+
+
+def glyph_scale(dpi: int) -> int:
+    """Pixels per font dot at ``dpi``"""
+    return max(1, round(WATERMARK_GLYPH_SCALE * dpi / 96))
+
+
+def monitor_dpi(monitor: Any) -> int:
+    """Horizontal DPI from the monitor's physical width, 96 when unknown"""
+    width_mm = getattr(monitor, "width_mm", None)
+    if not width_mm:
+        return 96
+    return max(48, min(480, round(monitor.width * 25.4 / width_mm)))
+
+
+def premultiply(color: str, opacity: int) -> bytes:
+    """One BGRA pixel of ``#RRGGBB`` at ``opacity`` percent"""
+    red, green, blue = (int(color[i:i + 2], 16) for i in (1, 3, 5))
+    alpha = round(255 * opacity / 100)
+    return bytes((blue * alpha // 255, green * alpha // 255, red * alpha // 255, alpha))
+
+
+def _text_rows(text: str, scale: int, ink: bytes) -> List[bytes]:
+    """Pixel rows of ``text``, each ``len(text) * CELL_WIDTH * scale`` pixels"""
+    on, off = ink * scale, CLEAR * scale
+    glyphs = [FONT.get(ch, FONT[" "]) for ch in text.upper()]
+    rows = []
+    for y in range(GLYPH_HEIGHT):
+        row = b"".join(
+            b"".join(on if dot == "#" else off for dot in glyph[y]) + off
+            for glyph in glyphs
+        )
+        rows.extend([row] * scale)
+    return rows
+
+
+def render_tile(text: str, scale: int, ink: bytes) -> Tuple[int, List[bytes]]:
+    """Width and rows of one tile: the text twice, the second row shifted by half"""
+    text_rows = _text_rows(text, scale, ink)
+    text_width = len(text_rows[0]) // 4
+    width = text_width + WATERMARK_TEXT_GAP * CELL_WIDTH * scale
+    gap = [CLEAR * width] * (WATERMARK_ROW_GAP * GLYPH_HEIGHT * scale)
+
+    padded = [row + CLEAR * (width - text_width) for row in text_rows]
+    half = (width // 2) * 4
+    shifted = [row[-half:] + row[:-half] for row in padded]
+    return width, padded + gap + shifted + gap
+
+
+@functools.lru_cache(maxsize=WATERMARK_CACHE_SIZE)
+def render_watermark(width: int, height: int, dpi: int, text: str, color: str,
+                     opacity: int) -> Watermark:
+    """Tiled watermark covering a ``width`` x ``height`` monitor"""
+    if not text.strip() or width <= 0 or height <= 0:
+        return Watermark(max(width, 0), max(height, 0), CLEAR * (max(width, 0) * max(height, 0)))
+
+    tile_width, tile_rows = render_tile(text, glyph_scale(dpi), premultiply(color, opacity))
+    # Each distinct tile row repeated across the monitor once, then reused
+    repeat = -(-width // tile_width)
+    full_rows = [(row * repeat)[:width * 4] for row in tile_rows]
+    count = len(full_rows)
+    pixels = b"".join(full_rows[y % count] for y in range(height))
+    return Watermark(width, height, pixels)
+
+
+class WatermarkOverlay:
+    """The watermark window of one monitor
+
+    ``backend`` provides ``create_overlay``, ``update_overlay`` and
+    ``destroy_overlay`` (see backend.Backend); a backend without overlay
+    support returns None from ``create_overlay`` and nothing is rendered.
+    """
+
+    def __init__(self, backend: Any, monitor: Any):
+        self.backend = backend
+        self.monitor = monitor
+        self.uploads = 0
+        self.skipped = 0
+        self._key: Optional[Tuple] = None
+        # (text, color, opacity) last asked for
+        self._marking: Optional[Tuple[str, str, int]] = None
+        self.handle = backend.create_overlay(monitor.x, monitor.y, monitor.width, monitor.height)
+
+    def key(self) -> Optional[Tuple]:
+        """Inputs of the bitmap to show, and its position"""
+        if self._marking is None:
+            return None
+        m = self.monitor
+        return (m.x, m.y, m.width, m.height, monitor_dpi(m), *self._marking)
+
+    def _refresh(self) -> bool:
+        key = self.key()
+        if self.handle is None or key is None:
+            return False
+        if key == self._key:
+            self.skipped += 1
+            return False
+        x, y, width, height, dpi, text, color, opacity = key
+        watermark = render_watermark(width, height, dpi, text, color, opacity)
+        self.backend.update_overlay(self.handle, x, y, watermark)
+        self._key = key
+        self.uploads += 1
+        return True
+
+    def update(self, text: str, color: str, opacity: int) -> bool:
+        """Show ``text`` in ``color`` at ``opacity`` percent
+
+        Returns True if a new bitmap was uploaded, False if nothing changed
+        (or there is no overlay window).
+        """
+        self._marking = (text, color, opacity)
+        return self._refresh()
+
+    def move_to(self, monitor: Any) -> bool:
+        """Follow a moved or resized monitor"""
+        self.monitor = monitor
+        return self._refresh()
+
+    def destroy(self) -> None:
+        """Remove the overlay window"""
+        if self.handle is not None:
+            self.backend.destroy_overlay(self.handle)
+            self.handle = None
+
+
+def bench(sizes: Tuple[Tuple[int, int, int], ...] = ((1920, 1080, 96), (3840, 2160, 96), (3840, 2160, 192)),
+          text: str = "SECRET//NOFORN", repeat: int = 5) -> List[Dict[str, float]]:
+    """Cold render and cache-hit times (ms) per (width, height, dpi)"""
+    results = []
+    for width, height, dpi in sizes:
+        cold = []
+        for _ in range(repeat):
+            render_watermark.cache_clear()
+            started = time.perf_counter()
+            render_watermark(width, height, dpi, text, "#FF0000", 8)
+            cold.append((time.perf_counter() - started) * 1000)
+        started = time.perf_counter()
+        for _ in range(1000):
+            render_watermark(width, height, dpi, text, "#FF0000", 8)
+        hit_us = (time.perf_counter() - started) * 1000
+        results.append({
+            "width": width, "height": height, "dpi": dpi,
+            "render_ms": min(cold), "cache_hit_us": hit_us,
+            "megabytes": width * height * 4 / 2**20,
+        })
+    return results
+
+
+def measure_idle_overlay(monitors: int = 2, hours: float = 1.0) -> Dict[str, float]:
+    """Overlay work during ``hours`` of idle, on the virtual clock
+
+    Builds banners with fake windows with and without ``Watermark`` and
+    returns the renders, uploads and extra timer callbacks (the
+    CPU-budgeted occlusion checks excluded) after startup; all should be 0.
+    """
+    from .banner import ClassificationBanner
+    from .fakes import FakeMonitorManager, FakeRegistryManager, FakeWindowFactory, make_monitor_row
+    from .idle_budget import HOUR_MS, IDLE_SETTINGS
+    from .scheduler import VirtualScheduler
+
+    callbacks = {}
+    for watermark in (False, True):
+        scheduler = VirtualScheduler()
+        factory = FakeWindowFactory(scheduler)
+        ClassificationBanner(
+            registry_manager=FakeRegistryManager({**IDLE_SETTINGS, "Watermark": int(watermark)}),
+            monitor_manager=FakeMonitorManager(make_monitor_row(monitors)),
+            scheduler=scheduler,
+            window_factory=factory,
+        )
+        scheduler.advance(10_000)
+        fired = dict(scheduler.fired)
+        uploads, renders = len(factory.overlays.uploads), render_watermark.cache_info().misses
+        scheduler.advance(int(hours * HOUR_MS))
+        callbacks[watermark] = sum(
+            count - fired.get(name, 0) for name, count in scheduler.fired.items() if name != "visibility")
+
+    return {
+        "overlays": factory.overlays.created,
+        "renders": render_watermark.cache_info().misses - renders,
+        "uploads": len(factory.overlays.uploads) - uploads,
+        "extra_callbacks": callbacks[True] - callbacks[False],
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Print render benchmarks; exit status 1 if the overlay does work while idle"""
+    parser = argparse.ArgumentParser(description="Watermark rendering")
+    parser.add_argument("--bench", action="store_true", help="time cold renders and cache hits")
+    parser.add_argument("--text", default="SECRET//NOFORN")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+    if not args.bench:
+        parser.print_help()
+        return 0
+
+    for r in bench(text=args.text, repeat=args.repeat):
+        print(f"{r['width']}x{r['height']} @ {r['dpi']} dpi: render {r['render_ms']:.1f} ms, "
+              f"cache hit {r['cache_hit_us']:.2f} us, {r['megabytes']:.1f} MiB")
+
+    idle = measure_idle_overlay()
+    print(f"idle hour, {idle['overlays']} overlays: {idle['renders']} renders, {idle['uploads']} uploads, "
+          f"{idle['extra_callbacks']:+d} timer callbacks")
+    busy = [name for name in ("renders", "uploads", "extra_callbacks") if idle[name]]
+    for name in busy:
+        print(f"FAIL: {name} while idle")
+    return 1 if busy else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,273 @@
+"""
+Typed ctypes bindings for the Win32 calls the banner makes
+
+Every function is prototyped once from ``PROTOTYPES`` (argtypes, restype,
+errcheck), so handles are passed pointer-sized instead of being truncated to
+a C int, and calls that fail raise OSError built from the thread's last-error
+value. Libraries are loaded with ``use_last_error`` on first use, so
+importing this module works on any platform.
+
+``api()`` returns the active implementation: the real DLLs, whose calls
+raise OSError off Windows. ``FakeWin32`` is only used once a test selects it
+with ``use_fake()``.
+"""
+
+import ctypes
+from ctypes import wintypes
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Callback prototypes; CFUNCTYPE stands in off Windows so the module imports
+_FUNCTYPE = getattr(ctypes, "WINFUNCTYPE", ctypes.CFUNCTYPE)
+WNDENUMPROC = _FUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
+WINEVENTPROC = _FUNCTYPE(
+    None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+    wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD)
+
+RECT = wintypes.RECT
+
+
+class APPBARDATA(ctypes.Structure):
+    _fields_ = [
+        ("cbSize", wintypes.DWORD),
+        ("hWnd", wintypes.HWND),
+        ("uCallbackMessage", wintypes.UINT),
+        ("uEdge", wintypes.UINT),
+        ("rc", RECT),
+        ("lParam", wintypes.LPARAM),
+    ]
+
+
+class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+    _fields_ = [
+        ("cb", wintypes.DWORD),
+        ("PageFaultCount", wintypes.DWORD),
+        ("PeakWorkingSetSize", ctypes.c_size_t),
+        ("WorkingSetSize", ctypes.c_size_t),
+        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+        ("QuotaPagedPoolUsage", ctypes.c_size_t),
+        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+        ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+        ("PagefileUsage", ctypes.c_size_t),
+        ("PeakPagefileUsage", ctypes.c_size_t),
+    ]
+
+
+class BITMAPINFOHEADER(ctypes.Structure):
+    _fields_ = [
+        ("biSize", wintypes.DWORD),
+        ("biWidth", wintypes.LONG),
+        ("biHeight", wintypes.LONG),
+        ("biPlanes", wintypes.WORD),
+        ("biBitCount", wintypes.WORD),
+        ("biCompression", wintypes.DWORD),
+        ("biSizeImage", wintypes.DWORD),
+        ("biXPelsPerMeter", wintypes.LONG),
+        ("biYPelsPerMeter", wintypes.LONG),
+        ("biClrUsed", wintypes.DWORD),
+        ("biClrImportant", wintypes.DWORD),
+    ]
+
+
+class BITMAPINFO(ctypes.Structure):
+    _fields_ = [
+        ("bmiHeader", BITMAPINFOHEADER),
+        ("bmiColors", wintypes.DWORD * 3),
+    ]
+
+
+class BLENDFUNCTION(ctypes.Structure):
+    _fields_ = [
+        ("BlendOp", ctypes.c_ubyte),
+        ("BlendFlags", ctypes.c_ubyte),
+        ("SourceConstantAlpha", ctypes.c_ubyte),
+        ("AlphaFormat", ctypes.c_ubyte),
+    ]
+
+
+def win_error(code: Optional[int] = None) -> OSError:
+    """OSError for a Win32 error code (the last error by default)"""
+    if code is None:
+        code = ctypes.get_last_error() if hasattr(ctypes, "get_last_error") else 0
+    if hasattr(ctypes, "WinError"):
+        return ctypes.WinError(code)
+    return OSError(code, f"Win32 error {code}")
+
+
+def _check_bool(result: Any, function: Any, args: Tuple) -> Any:
+    """errcheck for functions that return zero on failure"""
+    if not result:
+        raise win_error()
+    return result
+
+
+def _check_ntstatus(result: Any, function: Any, args: Tuple) -> Any:
+    """errcheck for ntdll functions, which return an NTSTATUS"""
+    if result < 0:
+        raise OSError(f"{function.__name__} failed: NTSTATUS {result & 0xFFFFFFFF:#010x}")
+    return result
+
+
+# name: (dll, restype, argtypes, errcheck)
+PROTOTYPES: Dict[str, Tuple[str, Any, List[Any], Optional[Callable]]] = {
+    # shell32: the return value is message specific, not an error flag
+    "SHAppBarMessage": ("shell32", ctypes.c_size_t, [
+        wintypes.DWORD, ctypes.POINTER(APPBARDATA)], None),
+    # user32
+    "MoveWindow": ("user32", wintypes.BOOL, [
+        wintypes.HWND, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int, wintypes.BOOL],
+        _check_bool),
+    # Moves several windows in one transaction; the handle changes with each call
+    "BeginDeferWindowPos": ("user32", wintypes.HANDLE, [ctypes.c_int], _check_bool),
+    "DeferWindowPos": ("user32", wintypes.HANDLE, [
+        wintypes.HANDLE, wintypes.HWND, wintypes.HWND, ctypes.c_int, ctypes.c_int,
+        ctypes.c_int, ctypes.c_int, wintypes.UINT], _check_bool),
+    "EndDeferWindowPos": ("user32", wintypes.BOOL, [wintypes.HANDLE], _check_bool),
+    "EnumWindows": ("user32", wintypes.BOOL, [WNDENUMPROC, wintypes.LPARAM], _check_bool),
+    "IsWindowVisible": ("user32", wintypes.BOOL, [wintypes.HWND], None),
+    "IsIconic": ("user32", wintypes.BOOL, [wintypes.HWND], None),
+    # Fails routinely for windows that vanish mid-enumeration
+    "GetWindowRect": ("user32", wintypes.BOOL, [wintypes.HWND, ctypes.POINTER(RECT)], None),
+    "GetWindowLongW": ("user32", wintypes.LONG, [wintypes.HWND, ctypes.c_int], None),
+    "GetWindowThreadProcessId": ("user32", wintypes.DWORD, [
+        wintypes.HWND, ctypes.POINTER(wintypes.DWORD)], None),
+    "GetAncestor": ("user32", wintypes.HWND, [wintypes.HWND, wintypes.UINT], None),
+    "GetClassNameW": ("user32", ctypes.c_int, [
+        wintypes.HWND, wintypes.LPWSTR, ctypes.c_int], None),
+    "GetWindowTextW": ("user32", ctypes.c_int, [
+        wintypes.HWND, wintypes.LPWSTR, ctypes.c_int], None),
+    "GetForegroundWindow": ("user32", wintypes.HWND, [], None),
+    "GetSystemMetrics": ("user32", ctypes.c_int, [ctypes.c_int], None),
+    # Watermark overlay: a layered popup fed a premultiplied bitmap
+    "CreateWindowExW": ("user32", wintypes.HWND, [
+        wintypes.DWORD, wintypes.LPCWSTR, wintypes.LPCWSTR, wintypes.DWORD, ctypes.c_int,
+        ctypes.c_int, ctypes.c_int, ctypes.c_int, wintypes.HWND, wintypes.HMENU,
+        wintypes.HINSTANCE, wintypes.LPVOID], _check_bool),
+    "DestroyWindow": ("user32", wintypes.BOOL, [wintypes.HWND], None),
+    "ShowWindow": ("user32", wintypes.BOOL, [wintypes.HWND, ctypes.c_int], None),
+    "UpdateLayeredWindow": ("user32", wintypes.BOOL, [
+        wintypes.HWND, wintypes.HDC, ctypes.POINTER(wintypes.POINT), ctypes.POINTER(wintypes.SIZE),
+        wintypes.HDC, ctypes.POINTER(wintypes.POINT), wintypes.DWORD,
+        ctypes.POINTER(BLENDFUNCTION), wintypes.DWORD], _check_bool),
+    "GetDC": ("user32", wintypes.HDC, [wintypes.HWND], None),
+    "ReleaseDC": ("user32", ctypes.c_int, [wintypes.HWND, wintypes.HDC], None),
+    "SetWinEventHook": ("user32", wintypes.HANDLE, [
+        wintypes.DWORD, wintypes.DWORD, wintypes.HMODULE, WINEVENTPROC,
+        wintypes.DWORD, wintypes.DWORD, wintypes.DWORD], None),
+    "UnhookWinEvent": ("user32", wintypes.BOOL, [wintypes.HANDLE], None),
+    # kernel32
+    "OpenProcess": ("kernel32", wintypes.HANDLE, [
+        wintypes.DWORD, wintypes.BOOL, wintypes.DWORD], None),
+    "QueryFullProcessImageNameW": ("kernel32", wintypes.BOOL, [
+        wintypes.HANDLE, wintypes.DWORD, wintypes.LPWSTR, ctypes.POINTER(wintypes.DWORD)], None),
+    "CloseHandle": ("kernel32", wintypes.BOOL, [wintypes.HANDLE], None),
+    "ProcessIdToSessionId": ("kernel32", wintypes.BOOL, [
+        wintypes.DWORD, ctypes.POINTER(wintypes.DWORD)], _check_bool),
+    "GetCurrentProcess": ("kernel32", wintypes.HANDLE, [], None),
+    "SetPriorityClass": ("kernel32", wintypes.BOOL, [wintypes.HANDLE, wintypes.DWORD], _check_bool),
+    "SetProcessInformation": ("kernel32", wintypes.BOOL, [
+        wintypes.HANDLE, ctypes.c_int, ctypes.c_void_p, wintypes.DWORD], _check_bool),
+    "K32EmptyWorkingSet": ("kernel32", wintypes.BOOL, [wintypes.HANDLE], _check_bool),
+    "K32GetProcessMemoryInfo": ("kernel32", wintypes.BOOL, [
+        wintypes.HANDLE, ctypes.POINTER(PROCESS_MEMORY_COUNTERS), wintypes.DWORD], _check_bool),
+    # ntdll: the only way to set a process's I/O priority on its own
+    "NtSetInformationProcess": ("ntdll", ctypes.c_long, [
+        wintypes.HANDLE, ctypes.c_int, ctypes.c_void_p, wintypes.ULONG], _check_ntstatus),
+    # gdi32
+    "CreateCompatibleDC": ("gdi32", wintypes.HDC, [wintypes.HDC], None),
+    "DeleteDC": ("gdi32", wintypes.BOOL, [wintypes.HDC], None),
+    "CreateDIBSection": ("gdi32", wintypes.HBITMAP, [
+        wintypes.HDC, ctypes.POINTER(BITMAPINFO), wintypes.UINT, ctypes.POINTER(ctypes.c_void_p),
+        wintypes.HANDLE, wintypes.DWORD], None),
+    "SelectObject": ("gdi32", wintypes.HGDIOBJ, [wintypes.HDC, wintypes.HGDIOBJ], None),
+    "DeleteObject": ("gdi32", wintypes.BOOL, [wintypes.HGDIOBJ], None),
+    # dwmapi: returns an HRESULT
+    "DwmGetWindowAttribute": ("dwmapi", ctypes.c_long, [
+        wintypes.HWND, wintypes.DWORD, ctypes.c_void_p, wintypes.DWORD], None),
+}
+
+
+class Win32Api:
+    """The real functions, prototyped and cached on first use"""
+
+    def __init__(self):
+        self._libraries: Dict[str, Any] = {}
+
+    def _library(self, name: str) -> Any:
+        library = self._libraries.get(name)
+        if library is None:
+            if not hasattr(ctypes, "WinDLL"):
+                raise OSError(f"{name}.dll is only available on Windows")
+            library = self._libraries[name] = ctypes.WinDLL(name, use_last_error=True)
+        return library
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            dll, restype, argtypes, errcheck = PROTOTYPES[name]
+        except KeyError:
+            raise AttributeError(name) from None
+        function = getattr(self._library(dll), name)
+        function.restype = restype
+        function.argtypes = argtypes
+        if errcheck is not None:
+            function.errcheck = errcheck
+        # Later lookups find the attribute without coming back here
+        setattr(self, name, function)
+        return function
+
+
+class FakeWin32:
+    """Records calls instead of making them
+
+    ``results`` maps a function name to its return value, an exception to
+    raise, or a callable given the call's arguments. Functions without an
+    entry return 1 if they return BOOL and 0 otherwise.
+    """
+
+    def __init__(self, results: Optional[Dict[str, Any]] = None):
+        self.results: Dict[str, Any] = dict(results or {})
+        self.calls: List[Tuple[str, Tuple]] = []
+
+    def __getattr__(self, name: str) -> Any:
+        if name not in PROTOTYPES:
+            raise AttributeError(name)
+
+        def function(*args):
+            self.calls.append((name, args))
+            result = self.results.get(name, 1 if PROTOTYPES[name][1] is wintypes.BOOL else 0)
+            if isinstance(result, BaseException):
+                raise result
+            if callable(result):
+                return result(*args)
+            return result
+
+        function.__name__ = name
+        setattr(self, name, function)
+        return function
+
+    def called(self, name: str) -> List[Tuple]:
+        """Arguments of each call to ``name``"""
+        return [args for called, args in self.calls if called == name]
+
+
+_api: Any = None
+
+
+def api() -> Any:
+    """Active bindings: the real DLLs unless a fake was selected"""
+    global _api
+    if _api is None:
+        _api = Win32Api()
+    return _api
+
+
+def use_fake(fake: Optional[FakeWin32] = None) -> FakeWin32:
+    """Route all calls through a fake; returns it"""
+    global _api
+    _api = fake if fake is not None else FakeWin32()
+    return _api
+
+
+def reset() -> None:
+    """Go back to the platform default"""
+    global _api
+    _api = None
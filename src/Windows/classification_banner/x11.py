@@ -0,0 +1,287 @@
+"""
+Typed ctypes bindings for the Xlib and XRandR calls of the X11 backend
+
+Mirrors ``win32``: every function is prototyped once from ``PROTOTYPES``,
+libraries are loaded on first use (so importing this module works on any
+platform), and ``api()`` returns the active implementation, the real
+libraries or a ``FakeX11`` that records calls.
+
+Xlib reports protocol errors (a window destroyed between two calls) through
+a process-wide handler whose default exits the process. The real bindings
+install a handler that records errors on the displays opened here and
+passes everything else on to the previous handler, which is Tk's.
+"""
+
+import ctypes
+import ctypes.util
+import sys
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+Window = ctypes.c_ulong
+Atom = ctypes.c_ulong
+
+# Predefined atoms and constants from X.h / Xatom.h / Xrandr.h
+XA_ATOM = 4
+XA_CARDINAL = 6
+XA_STRING = 31
+XA_WINDOW = 33
+PROP_MODE_REPLACE = 0
+IS_VIEWABLE = 2
+SUCCESS = 0
+RR_SCREEN_CHANGE_NOTIFY_MASK = 1 << 0
+RR_CRTC_CHANGE_NOTIFY_MASK = 1 << 1
+RR_OUTPUT_CHANGE_NOTIFY_MASK = 1 << 2
+
+
+class XRRMonitorInfo(ctypes.Structure):
+    _fields_ = [
+        ("name", Atom),
+        ("primary", ctypes.c_int),
+        ("automatic", ctypes.c_int),
+        ("noutput", ctypes.c_int),
+        ("x", ctypes.c_int),
+        ("y", ctypes.c_int),
+        ("width", ctypes.c_int),
+        ("height", ctypes.c_int),
+        ("mwidth", ctypes.c_int),
+        ("mheight", ctypes.c_int),
+        ("outputs", ctypes.POINTER(ctypes.c_ulong)),
+    ]
+
+
+class XWindowAttributes(ctypes.Structure):
+    _fields_ = [
+        ("x", ctypes.c_int),
+        ("y", ctypes.c_int),
+        ("width", ctypes.c_int),
+        ("height", ctypes.c_int),
+        ("border_width", ctypes.c_int),
+        ("depth", ctypes.c_int),
+        ("visual", ctypes.c_void_p),
+        ("root", Window),
+        ("class_", ctypes.c_int),
+        ("bit_gravity", ctypes.c_int),
+        ("win_gravity", ctypes.c_int),
+        ("backing_store", ctypes.c_int),
+        ("backing_planes", ctypes.c_ulong),
+        ("backing_pixel", ctypes.c_ulong),
+        ("save_under", ctypes.c_int),
+        ("colormap", ctypes.c_ulong),
+        ("map_installed", ctypes.c_int),
+        ("map_state", ctypes.c_int),
+        ("all_event_masks", ctypes.c_long),
+        ("your_event_mask", ctypes.c_long),
+        ("do_not_propagate_mask", ctypes.c_long),
+        ("override_redirect", ctypes.c_int),
+        ("screen", ctypes.c_void_p),
+    ]
+
+
+class XErrorEvent(ctypes.Structure):
+    _fields_ = [
+        ("type", ctypes.c_int),
+        ("display", ctypes.c_void_p),
+        ("resourceid", ctypes.c_ulong),
+        ("serial", ctypes.c_ulong),
+        ("error_code", ctypes.c_ubyte),
+        ("request_code", ctypes.c_ubyte),
+        ("minor_code", ctypes.c_ubyte),
+    ]
+
+
+class XEvent(ctypes.Union):
+    # Only the type is read; the padding matches the size of the C union
+    _fields_ = [("type", ctypes.c_int), ("pad", ctypes.c_long * 24)]
+
+
+XErrorHandler = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_void_p, ctypes.POINTER(XErrorEvent))
+
+_PDisplay = ctypes.c_void_p
+
+
+def _check_display(result: Any, function: Any, args: Tuple) -> Any:
+    """errcheck for XOpenDisplay, which returns NULL on failure"""
+    if not result:
+        raise OSError("cannot open X display (is DISPLAY set?)")
+    return result
+
+
+# name: (library, restype, argtypes, errcheck)
+PROTOTYPES: Dict[str, Tuple[str, Any, List[Any], Optional[Callable]]] = {
+    # X11
+    "XInitThreads": ("X11", ctypes.c_int, [], None),
+    "XOpenDisplay": ("X11", _PDisplay, [ctypes.c_char_p], _check_display),
+    "XCloseDisplay": ("X11", ctypes.c_int, [_PDisplay], None),
+    "XSetErrorHandler": ("X11", ctypes.c_void_p, [XErrorHandler], None),
+    "XDefaultRootWindow": ("X11", Window, [_PDisplay], None),
+    "XDefaultScreen": ("X11", ctypes.c_int, [_PDisplay], None),
+    "XDisplayWidth": ("X11", ctypes.c_int, [_PDisplay, ctypes.c_int], None),
+    "XDisplayHeight": ("X11", ctypes.c_int, [_PDisplay, ctypes.c_int], None),
+    "XConnectionNumber": ("X11", ctypes.c_int, [_PDisplay], None),
+    "XInternAtom": ("X11", Atom, [_PDisplay, ctypes.c_char_p, ctypes.c_int], None),
+    "XGetAtomName": ("X11", ctypes.c_void_p, [_PDisplay, Atom], None),
+    "XFree": ("X11", ctypes.c_int, [ctypes.c_void_p], None),
+    "XFlush": ("X11", ctypes.c_int, [_PDisplay], None),
+    "XSync": ("X11", ctypes.c_int, [_PDisplay, ctypes.c_int], None),
+    "XPending": ("X11", ctypes.c_int, [_PDisplay], None),
+    "XNextEvent": ("X11", ctypes.c_int, [_PDisplay, ctypes.POINTER(XEvent)], None),
+    "XChangeProperty": ("X11", ctypes.c_int, [
+        _PDisplay, Window, Atom, Atom, ctypes.c_int, ctypes.c_int, ctypes.c_void_p, ctypes.c_int], None),
+    "XDeleteProperty": ("X11", ctypes.c_int, [_PDisplay, Window, Atom], None),
+    "XGetWindowProperty": ("X11", ctypes.c_int, [
+        _PDisplay, Window, Atom, ctypes.c_long, ctypes.c_long, ctypes.c_int, Atom,
+        ctypes.POINTER(Atom), ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_ulong),
+        ctypes.POINTER(ctypes.c_ulong), ctypes.POINTER(ctypes.c_void_p)], None),
+    "XQueryTree": ("X11", ctypes.c_int, [
+        _PDisplay, Window, ctypes.POINTER(Window), ctypes.POINTER(Window),
+        ctypes.POINTER(ctypes.POINTER(Window)), ctypes.POINTER(ctypes.c_uint)], None),
+    "XGetWindowAttributes": ("X11", ctypes.c_int, [
+        _PDisplay, Window, ctypes.POINTER(XWindowAttributes)], None),
+    "XTranslateCoordinates": ("X11", ctypes.c_int, [
+        _PDisplay, Window, Window, ctypes.c_int, ctypes.c_int, ctypes.POINTER(ctypes.c_int),
+        ctypes.POINTER(ctypes.c_int), ctypes.POINTER(Window)], None),
+    # Xrandr
+    "XRRQueryExtension": ("Xrandr", ctypes.c_int, [
+        _PDisplay, ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int)], None),
+    "XRRGetMonitors": ("Xrandr", ctypes.POINTER(XRRMonitorInfo), [
+        _PDisplay, Window, ctypes.c_int, ctypes.POINTER(ctypes.c_int)], None),
+    "XRRFreeMonitors": ("Xrandr", None, [ctypes.POINTER(XRRMonitorInfo)], None),
+    "XRRSelectInput": ("Xrandr", None, [_PDisplay, Window, ctypes.c_int], None),
+    "XRRUpdateConfiguration": ("Xrandr", ctypes.c_int, [ctypes.POINTER(XEvent)], None),
+}
+
+
+class X11Api:
+    """The real functions, prototyped and cached on first use"""
+
+    def __init__(self):
+        self._libraries: Dict[str, Any] = {}
+        # Displays opened through these bindings, and their last error code
+        self.displays: Set[int] = set()
+        self.errors: Dict[int, int] = {}
+        self._previous_handler: Any = None
+        self._handler = XErrorHandler(self._on_error)
+
+    def _library(self, name: str) -> Any:
+        library = self._libraries.get(name)
+        if library is None:
+            path = ctypes.util.find_library(name)
+            if path is None:
+                raise OSError(f"lib{name} not found")
+            library = self._libraries[name] = ctypes.CDLL(path)
+            if name == "X11":
+                self._init_x11()
+        return library
+
+    def _init_x11(self) -> None:
+        # A no-op with libX11 1.8+, which initializes threads itself
+        self.XInitThreads()
+        previous = self.XSetErrorHandler(self._handler)
+        if previous:
+            self._previous_handler = XErrorHandler(previous)
+
+    def _on_error(self, display: int, event: Any) -> int:
+        if display in self.displays:
+            self.errors[display] = event.contents.error_code
+            return 0
+        if self._previous_handler is not None:
+            return self._previous_handler(display, event)
+        return 0
+
+    def open_display(self, name: Optional[str] = None) -> int:
+        """XOpenDisplay, with errors on the display recorded instead of fatal"""
+        display = self.XOpenDisplay(name.encode() if name else None)
+        self.displays.add(display)
+        return display
+
+    def close_display(self, display: int) -> None:
+        """XCloseDisplay for a display from ``open_display``"""
+        self.displays.discard(display)
+        self.errors.pop(display, None)
+        self.XCloseDisplay(display)
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            library, restype, argtypes, errcheck = PROTOTYPES[name]
+        except KeyError:
+            raise AttributeError(name) from None
+        function = getattr(self._library(library), name)
+        function.restype = restype
+        function.argtypes = argtypes
+        if errcheck is not None:
+            function.errcheck = errcheck
+        # Later lookups find the attribute without coming back here
+        setattr(self, name, function)
+        return function
+
+
+class FakeX11:
+    """Records calls instead of making them
+
+    ``results`` maps a function name to its return value, an exception to
+    raise, or a callable given the call's arguments. Functions without an
+    entry return 1 if they return int and 0 otherwise, so XOpenDisplay
+    hands out display 0 unless a result is given.
+    """
+
+    def __init__(self, results: Optional[Dict[str, Any]] = None):
+        self.results: Dict[str, Any] = dict(results or {})
+        self.calls: List[Tuple[str, Tuple]] = []
+        self.displays: Set[int] = set()
+        self.errors: Dict[int, int] = {}
+
+    def open_display(self, name: Optional[str] = None) -> int:
+        """Fake display handle"""
+        display = self.XOpenDisplay(name.encode() if name else None)
+        self.displays.add(display)
+        return display
+
+    def close_display(self, display: int) -> None:
+        """Forget a fake display"""
+        self.displays.discard(display)
+        self.XCloseDisplay(display)
+
+    def __getattr__(self, name: str) -> Any:
+        if name not in PROTOTYPES:
+            raise AttributeError(name)
+
+        def function(*args):
+            self.calls.append((name, args))
+            result = self.results.get(name, 1 if PROTOTYPES[name][1] is ctypes.c_int else 0)
+            if isinstance(result, BaseException):
+                raise result
+            if callable(result):
+                return result(*args)
+            return result
+
+        function.__name__ = name
+        setattr(self, name, function)
+        return function
+
+    def called(self, name: str) -> List[Tuple]:
+        """Arguments of each call to ``name``"""
+        return [args for called, args in self.calls if called == name]
+
+
+_api: Any = None
+
+
+def api() -> Any:
+    """Active bindings: libX11/libXrandr, or FakeX11 on Windows"""
+    global _api
+    if _api is None:
+        _api = FakeX11() if sys.platform == "win32" else X11Api()
+    return _api
+
+
+def use_fake(fake: Optional[FakeX11] = None) -> FakeX11:
+    """Route all calls through a fake; returns it"""
+    global _api
+    _api = fake if fake is not None else FakeX11()
+    return _api
+
+
+def reset() -> None:
+    """Go back to the platform default"""
+    global _api
+    _api = None
@@ -0,0 +1,347 @@
+"""
+X11/EWMH backend for Linux workstations
+
+- Settings come from ``FileConfigSource`` (INI files watched with inotify)
+- Banners are ``_NET_WM_WINDOW_TYPE_DOCK`` windows and reserve their rows
+  with ``_NET_WM_STRUT_PARTIAL`` (and ``_NET_WM_STRUT`` for older window
+  managers), the EWMH counterpart of an AppBar
+- Monitors are read with ``XRRGetMonitors``; a thread with its own display
+  connection listens for RandR notifications, so layout changes are pushed
+  instead of polled
+- Where the window manager publishes ``_NET_CLIENT_LIST_STACKING`` the
+  visibility auditor gets the z-order from it; otherwise banners fall back
+  to the keep-on-top loop
+
+Everything runs under a plain Xvfb, so the core can be tested and profiled
+on Linux CI::
+
+    xvfb-run -a python -m pytest tests/test_backend.py
+"""
+
+import ctypes
+import os
+import select
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from screeninfo import Monitor
+from .backend import Backend
+from .constants import ABE_BOTTOM, ABE_LEFT, ABE_RIGHT, ABE_TOP
+from .file_config import FileConfigSource
+from .monitor_manager import MonitorManager
+from .visibility import Rect, WindowRecord
+from . import event_log, x11
+
+RANDR_EVENTS = x11.RR_SCREEN_CHANGE_NOTIFY_MASK | x11.RR_CRTC_CHANGE_NOTIFY_MASK | x11.RR_OUTPUT_CHANGE_NOTIFY_MASK
+
+
+def strut_partial(edge: int, x: int, y: int, width: int, height: int,
+                  screen_width: int, screen_height: int) -> List[int]:
+    """``_NET_WM_STRUT_PARTIAL`` for a banner rectangle
+
+    Struts are measured from the edges of the whole X screen, and the start
+    and end coordinates limit the reservation to the banner's monitor.
+    """
+    # left, right, top, bottom, then start/end pairs in the same order
+    strut = [0] * 12
+    if edge == ABE_TOP:
+        strut[2], strut[8], strut[9] = y + height, x, x + width - 1
+    elif edge == ABE_BOTTOM:
+        strut[3], strut[10], strut[11] = screen_height - y, x, x + width - 1
+    elif edge == ABE_LEFT:
+        strut[0], strut[4], strut[5] = x + width, y, y + height - 1
+    elif edge == ABE_RIGHT:
+        strut[1], strut[6], strut[7] = screen_width - x, y, y + height - 1
+    return strut
+
+
+class X11Backend(Backend):
+    """Xlib/XRandR through ``x11``; the display is opened on first use"""
+
+    name = "x11"
+
+    def __init__(self, display_name: Optional[str] = None, config_paths: Optional[List[str]] = None):
+        self.display_name = display_name
+        self.config_paths = config_paths
+        self._display: Optional[int] = None
+        self._atoms: Dict[str, int] = {}
+
+    # -- connection helpers ------------------------------------------------
+
+    def display(self) -> int:
+        """Shared connection for calls from the Tk thread"""
+        if self._display is None:
+            self._display = x11.api().open_display(self.display_name)
+        return self._display
+
+    def root(self) -> int:
+        """Root window of the default screen"""
+        return x11.api().XDefaultRootWindow(self.display())
+
+    def atom(self, name: str) -> int:
+        """Interned atom, cached"""
+        atom = self._atoms.get(name)
+        if atom is None:
+            atom = self._atoms[name] = x11.api().XInternAtom(self.display(), name.encode(), False)
+        return atom
+
+    def get_property(self, window: int, name: str, kind: int, length: int = 1024) -> Any:
+        """List of 32-bit items, bytes for 8-bit properties, or None if unset"""
+        api = x11.api()
+        actual_type, actual_format = x11.Atom(), ctypes.c_int()
+        count, remaining, data = ctypes.c_ulong(), ctypes.c_ulong(), ctypes.c_void_p()
+        status = api.XGetWindowProperty(
+            self.display(), window, self.atom(name), 0, length, False, kind,
+            ctypes.byref(actual_type), ctypes.byref(actual_format), ctypes.byref(count),
+            ctypes.byref(remaining), ctypes.byref(data))
+        if status != x11.SUCCESS or not data.value:
+            return None
+        try:
+            if actual_format.value == 32:
+                # Format 32 items are C longs, whatever the width of long
+                return list((ctypes.c_ulong * count.value).from_address(data.value))
+            return ctypes.string_at(data.value, count.value * actual_format.value // 8)
+        finally:
+            api.XFree(data)
+
+    def client_window(self, hwnd: int) -> int:
+        """Top-level X window of a Tk ``winfo_id`` (its wrapper's client)"""
+        api = x11.api()
+        root, parent = x11.Window(), x11.Window()
+        children, count = ctypes.POINTER(x11.Window)(), ctypes.c_uint()
+        if not api.XQueryTree(self.display(), hwnd, ctypes.byref(root), ctypes.byref(parent),
+                              ctypes.byref(children), ctypes.byref(count)):
+            return hwnd
+        if children:
+            api.XFree(children)
+        # Tk's wrapper sits between the window and the root (or the WM frame)
+        return parent.value if parent.value and parent.value != root.value else hwnd
+
+    def screen_size(self) -> tuple:
+        """Width and height of the whole X screen"""
+        api = x11.api()
+        screen = api.XDefaultScreen(self.display())
+        return api.XDisplayWidth(self.display(), screen), api.XDisplayHeight(self.display(), screen)
+
+    # -- Backend -------------------------------------------------------------
+
+    def config_source(self) -> Any:
+        return FileConfigSource(self.config_paths)
+
+    def monitor_manager(self) -> Any:
+        return X11MonitorManager(self)
+
+    def window_source(self) -> Any:
+        supported = self.get_property(self.root(), "_NET_SUPPORTED", x11.XA_ATOM) or []
+        if self.atom("_NET_CLIENT_LIST_STACKING") not in supported:
+            return None
+        return X11WindowSource(self)
+
+    def prepare_window(self, window: Any) -> None:
+        # Managed, undecorated and kept above normal windows by EWMH window
+        # managers; override-redirect windows would not get their struts honored
+        window.attributes("-type", "dock")
+
+    def _set_struts(self, hwnd: Any, x: int, y: int, width: int, height: int, edge: int,
+                    screen: tuple) -> None:
+        api = x11.api()
+        window = self.client_window(hwnd)
+        strut = strut_partial(edge, x, y, width, height, *screen)
+        partial = (ctypes.c_ulong * 12)(*strut)
+        # Window managers without STRUT_PARTIAL reserve the whole screen width
+        legacy = (ctypes.c_ulong * 4)(*strut[:4])
+        api.XChangeProperty(self.display(), window, self.atom("_NET_WM_STRUT_PARTIAL"),
+                            x11.XA_CARDINAL, 32, x11.PROP_MODE_REPLACE, partial, 12)
+        api.XChangeProperty(self.display(), window, self.atom("_NET_WM_STRUT"),
+                            x11.XA_CARDINAL, 32, x11.PROP_MODE_REPLACE, legacy, 4)
+
+    def _clear_struts(self, hwnd: Any) -> None:
+        api = x11.api()
+        window = self.client_window(hwnd)
+        api.XDeleteProperty(self.display(), window, self.atom("_NET_WM_STRUT_PARTIAL"))
+        api.XDeleteProperty(self.display(), window, self.atom("_NET_WM_STRUT"))
+
+    def reserve_space(self, hwnd: Any, x: int, y: int, width: int, height: int,
+                      edge: int = ABE_TOP) -> None:
+        self._set_struts(hwnd, x, y, width, height, edge, self.screen_size())
+        x11.api().XFlush(self.display())
+
+    def release_space(self, hwnd: Any) -> None:
+        self._clear_struts(hwnd)
+        x11.api().XFlush(self.display())
+
+    def reserve_spaces(self, spaces: Sequence[Tuple[Any, Any]]) -> None:
+        # One flush, so the window manager sees all struts in one batch
+        screen = self.screen_size()
+        for hwnd, placement in spaces:
+            self._set_struts(hwnd, *placement, screen)
+        x11.api().XFlush(self.display())
+
+    def release_spaces(self, hwnds: Iterable[Any]) -> None:
+        for hwnd in hwnds:
+            self._clear_struts(hwnd)
+        x11.api().XFlush(self.display())
+
+    def monitors(self) -> List[Monitor]:
+        """Active RandR monitors, as screeninfo monitors"""
+        api = x11.api()
+        count = ctypes.c_int()
+        infos = api.XRRGetMonitors(self.display(), self.root(), True, ctypes.byref(count))
+        if not infos:
+            raise OSError("XRRGetMonitors failed")
+        try:
+            monitors = []
+            for info in infos[:count.value]:
+                name = api.XGetAtomName(self.display(), info.name)
+                try:
+                    label = ctypes.string_at(name).decode() if name else None
+                finally:
+                    if name:
+                        api.XFree(name)
+                monitors.append(Monitor(info.x, info.y, info.width, info.height,
+                                        info.mwidth, info.mheight, label, bool(info.primary)))
+            return monitors
+        finally:
+            api.XRRFreeMonitors(infos)
+
+
+class X11MonitorManager(MonitorManager):
+    """XRandR monitors, with change notifications from a worker thread"""
+
+    def __init__(self, backend: X11Backend):
+        self.backend = backend
+        self.watcher: Optional[RandrWatcher] = None
+
+    def get_all_monitors(self) -> Any:
+        """RandR monitors, or screeninfo's enumeration if RandR fails"""
+        try:
+            return self.backend.monitors()
+        except OSError as e:
+            event_log.error("monitors", f"Error reading RandR monitors: {e}")
+            return super().get_all_monitors()
+
+    def watch(self, callback: Callable[[], Any]) -> None:
+        """Call ``callback`` (from a worker thread) when the layout changes"""
+        self.stop()
+        watcher = RandrWatcher(self.backend.display_name, callback)
+        watcher.start()
+        self.watcher = watcher
+
+    def stop(self) -> None:
+        """Stop the notification thread"""
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+
+
+class RandrWatcher:
+    """RandR notifications on a private display connection"""
+
+    def __init__(self, display_name: Optional[str], on_change: Callable[[], Any]):
+        self.display_name = display_name
+        self.on_change = on_change
+        self.events = 0
+        self._display: Optional[int] = None
+        self._wakeup: Optional[tuple] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Open the connection, select RandR input and start the thread"""
+        api = x11.api()
+        display = api.open_display(self.display_name)
+        base, error = ctypes.c_int(), ctypes.c_int()
+        if not api.XRRQueryExtension(display, ctypes.byref(base), ctypes.byref(error)):
+            api.close_display(display)
+            raise OSError("the X server has no RandR extension")
+        api.XRRSelectInput(display, api.XDefaultRootWindow(display), RANDR_EVENTS)
+        api.XFlush(display)
+        self._display = display
+        self._wakeup = os.pipe()
+        self._thread = threading.Thread(target=self._run, name="randr-watch", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the thread and close the connection"""
+        if self._thread is None:
+            return
+        os.write(self._wakeup[1], b"x")
+        self._thread.join(timeout=2)
+        self._thread = None
+        for fd in self._wakeup:
+            os.close(fd)
+        self._wakeup = None
+        x11.api().close_display(self._display)
+        self._display = None
+
+    def _run(self) -> None:
+        api = x11.api()
+        connection = api.XConnectionNumber(self._display)
+        event = x11.XEvent()
+        while True:
+            ready, _, _ = select.select([connection, self._wakeup[0]], [], [])
+            if self._wakeup[0] in ready:
+                return
+            changed = False
+            while api.XPending(self._display):
+                api.XNextEvent(self._display, ctypes.byref(event))
+                api.XRRUpdateConfiguration(ctypes.byref(event))
+                changed = True
+            if changed:
+                # One callback per burst: a mode switch sends several events
+                self.events += 1
+                self.on_change()
+
+
+class X11WindowSource:
+    """Client windows in z-order from ``_NET_CLIENT_LIST_STACKING``"""
+
+    def __init__(self, backend: X11Backend):
+        self.backend = backend
+        self._pid = os.getpid()
+        self._attributes = x11.XWindowAttributes()
+
+    def enumerate(self) -> List[WindowRecord]:
+        """Viewable, non-hidden client windows, topmost first"""
+        backend = self.backend
+        stacking = backend.get_property(backend.root(), "_NET_CLIENT_LIST_STACKING", x11.XA_WINDOW)
+        if stacking is None:
+            raise OSError("_NET_CLIENT_LIST_STACKING is not set")
+        hidden = backend.atom("_NET_WM_STATE_HIDDEN")
+        above = backend.atom("_NET_WM_STATE_ABOVE")
+
+        windows = []
+        # The property lists windows bottom to top
+        for window in reversed(stacking):
+            rect = self._rect(window)
+            if rect is None:
+                continue
+            states = backend.get_property(window, "_NET_WM_STATE", x11.XA_ATOM) or []
+            if hidden in states:
+                continue
+            pid = backend.get_property(window, "_NET_WM_PID", x11.XA_CARDINAL)
+            windows.append(WindowRecord(window, rect, above in states, bool(pid) and pid[0] == self._pid))
+        return windows
+
+    def _rect(self, window: int) -> Optional[Rect]:
+        api = x11.api()
+        display = self.backend.display()
+        attributes = self._attributes
+        # Fails for windows destroyed since the stacking list was read
+        if not api.XGetWindowAttributes(display, window, ctypes.byref(attributes)):
+            return None
+        if attributes.map_state != x11.IS_VIEWABLE or not attributes.width or not attributes.height:
+            return None
+        x, y, child = ctypes.c_int(), ctypes.c_int(), x11.Window()
+        if not api.XTranslateCoordinates(display, window, self.backend.root(), 0, 0,
+                                         ctypes.byref(x), ctypes.byref(y), ctypes.byref(child)):
+            return None
+        return Rect(x.value, y.value, x.value + attributes.width, y.value + attributes.height)
+
+    def root_of(self, hwnd: int) -> int:
+        """Client window that contains a Tk ``winfo_id``"""
+        return self.backend.client_window(hwnd)
+
+    def describe(self, hwnd: int) -> str:
+        """WM_CLASS of a window, for the occlusion log"""
+        value = self.backend.get_property(hwnd, "WM_CLASS", x11.XA_STRING) or b""
+        name = value.split(b"\0")[-2 if value.endswith(b"\0") else -1].decode(errors="replace")
+        return f"{name or '?'} ({hwnd:#x})"
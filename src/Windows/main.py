@@ -1,21 +1,175 @@
 """
 Classification Banner - Main Entry Point
 """
+import argparse
+import json
 import sys
 import classification_banner as cb
 
 
-def main():
+def _parse_args(argv):
+    """Parse the command line"""
+    parser = argparse.ArgumentParser(description="Classification Banner")
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="print the resolved settings and layout plan as JSON and exit",
+    )
+    parser.add_argument(
+        "--record",
+        metavar="TRACE",
+        help="record registry and monitor inputs to a trace file for replay",
+    )
+    parser.add_argument(
+        "--supervise",
+        action="store_true",
+        help="run the banner as a child process and restart it if it dies or hangs",
+    )
+    control = parser.add_mutually_exclusive_group()
+    control.add_argument(
+        "--reload",
+        dest="command",
+        action="store_const",
+        const="reload",
+        help="make the running banner check its settings now",
+    )
+    control.add_argument(
+        "--status",
+        dest="command",
+        action="store_const",
+        const="status",
+        help="print the running banner's status as JSON",
+    )
+    control.add_argument(
+        "--metrics",
+        dest="command",
+        action="store_const",
+        const="metrics",
+        help="print the running banner's counters as JSON",
+    )
+    return parser.parse_args(argv)
+
+
+def _run_command(command):
+    """Send one command to the running instance and print its reply"""
+    # Client of the running instance: must not import tkinter
+    from classification_banner import instance
+    try:
+        reply = instance.send_command(command)
+    except ConnectionError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    print(json.dumps(reply, indent=2))
+    sys.exit(0 if reply.get("ok") else 1)
+
+
+def _supervise(argv):
+    """Run the banner as a supervised child process"""
+    # Watchdog only: must not import tkinter
+    from classification_banner import event_log, supervisor
+    event_log.EVENT_LOG.configure(name="supervisor")
+    event_log.install_crash_hooks()
+    sys.exit(supervisor.Supervisor(supervisor.child_command(argv)).run())
+
+
+def _dry_run():
+    """Print the layout plan and exit"""
+    # Headless: must not import tkinter
+    from classification_banner import dry_run
+    print(dry_run.render_plan())
+    sys.exit(0)
+
+
+def _already_running(lock):
+    """Take the single-instance lock; True if another banner holds it"""
+    from classification_banner import event_log
+    try:
+        return not lock.acquire()
+    except OSError as e:
+        event_log.warning("main", f"Single-instance check unavailable: {e}")
+        return False
+
+
+def _hand_over_to_running_instance():
+    """Ask the running banner to reload instead of starting a second one"""
+    from classification_banner import event_log, instance
+    from classification_banner.supervisor import HeartbeatClient
+    event_log.EVENT_LOG.configure()
+    event_log.info("main", "Classification Banner is already running; asking it to reload")
+    try:
+        instance.send_command("reload")
+    except ConnectionError as e:
+        event_log.warning("main", f"Running instance did not answer: {e}")
+    heartbeat = HeartbeatClient.from_environment()
+    if heartbeat is not None:
+        # Deliberate exit: a supervisor must not restart this copy
+        heartbeat.close("already running")
+    sys.exit(0)
+
+
+def _recording_managers(trace):
+    """Registry and monitor managers that record their inputs to ``trace``"""
+    from classification_banner import backend
+    from classification_banner import replay
+    recorder = replay.EventRecorder(trace)
+    registry_manager = replay.RecordingRegistryManager(
+        backend.current().config_source(), recorder
+    )
+    monitor_manager = replay.RecordingMonitorManager(
+        backend.current().monitor_manager(), recorder
+    )
+    return registry_manager, monitor_manager
+
+
+def _run_banner(banner):
+    """Serve the control channel and run the main loop until shutdown"""
+    from classification_banner import event_log, instance, shutdown
+    shutdown.install(banner.shutdown)
+    try:
+        banner.control_server = instance.ControlServer(banner)
+    except OSError as e:
+        event_log.warning("main", f"Control channel unavailable: {e}")
+    banner.run()
+
+
+def main(argv=None):
     """Main entry point"""
-    print(cb.__version__)
-    banner = cb.banner.ClassificationBanner()
-    
+    args = _parse_args(argv)
+
+    if args.command:
+        _run_command(args.command)
+    if args.supervise:
+        _supervise(argv)
+    if args.dry_run:
+        _dry_run()
+
+    from classification_banner import event_log, instance
+
+    event_log.install_crash_hooks()
+    # Held for the life of the process
+    lock = instance.InstanceLock()
+    if _already_running(lock):
+        _hand_over_to_running_instance()
+
+    from classification_banner import banner as banner_module
+
+    event_log.info("main", f"Classification Banner {cb.__version__}")
+    registry_manager = monitor_manager = None
+    if args.record:
+        registry_manager, monitor_manager = _recording_managers(args.record)
+
+    banner = banner_module.ClassificationBanner(registry_manager, monitor_manager)
+    # Records logged so far are buffered and written once the sinks exist
+    event_log.EVENT_LOG.configure(banner.settings.log_target)
+
     if banner.settings.enabled:
-        banner.run()
+        _run_banner(banner)
     else:
-        print("Classification banner is disabled in registry (Enabled=0)")
+        event_log.info("main", "Classification banner is disabled in registry (Enabled=0)")
+        if banner.heartbeat is not None:
+            banner.heartbeat.close("disabled")
         sys.exit(0)
-    
+
 
 if __name__ == "__main__":
     main()
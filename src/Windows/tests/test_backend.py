@@ -0,0 +1,226 @@
+# tests/test_backend.py
+#
+# Pytest coverage for the platform backends: backend selection, the EWMH
+# strut values and Xlib calls of the X11 backend (through FakeX11), the
+# file-based config source with inotify, and a smoke test of real banners
+# that runs when an X server (e.g. xvfb-run) is available.
+
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+from classification_banner import backend, event_log, x11
+from classification_banner.banner import ClassificationBanner
+from classification_banner.constants import ABE_BOTTOM, ABE_TOP, COLOR_SCHEMES
+from classification_banner.event_log import WARNING
+from classification_banner.fakes import FakeMonitorManager, FakeWindowFactory
+from classification_banner.file_config import FileConfigSource
+from classification_banner.scheduler import VirtualScheduler
+from classification_banner.x11_backend import X11Backend, strut_partial
+
+CONFIG = """\
+[ClassificationBanner]
+Classification = secret
+ShowHostname = 1
+BannerHeight = 28
+; comment
+MarkingRules =
+    process:firefox=CUI
+    title:*SIPR*=SECRET
+"""
+
+
+@pytest.fixture
+def fake_x11():
+    fake = x11.use_fake(x11.FakeX11({"XOpenDisplay": 7, "XDisplayWidth": 3840, "XDisplayHeight": 1080}))
+    yield fake
+    x11.reset()
+
+
+# ---------------------------------------------------------------------------
+# Selection
+# ---------------------------------------------------------------------------
+
+
+def test_backend_selection_honors_the_environment(monkeypatch):
+    monkeypatch.setenv(backend.BACKEND_VARIABLE, "x11")
+    backend.use(None)
+    try:
+        assert isinstance(backend.current(), X11Backend)
+        assert backend.create("windows").name == "windows"
+        with pytest.raises(ValueError):
+            backend.create("wayland")
+    finally:
+        backend.use(None)
+
+
+def test_backends_must_supply_a_config_source():
+    class NoConfig(backend.Backend):
+        pass
+
+    with pytest.raises(TypeError):
+        NoConfig()
+
+
+# ---------------------------------------------------------------------------
+# X11 space reservation
+# ---------------------------------------------------------------------------
+
+
+def test_strut_partial_limits_the_reservation_to_the_banner_monitor():
+    # Second monitor of two side by side
+    assert strut_partial(ABE_TOP, 1920, 0, 1920, 20, 3840, 1080) == [
+        0, 0, 20, 0, 0, 0, 0, 0, 1920, 3839, 0, 0]
+    assert strut_partial(ABE_BOTTOM, 0, 1060, 1920, 20, 3840, 1080) == [
+        0, 0, 0, 20, 0, 0, 0, 0, 0, 0, 0, 1919]
+
+
+def test_reserve_and_release_space_set_ewmh_struts(fake_x11):
+    x11_backend = X11Backend()
+    x11_backend.reserve_space(0x400001, 1920, 0, 1920, 24)
+
+    partial, legacy = fake_x11.called("XChangeProperty")
+    assert partial[0] == 7
+    assert list(partial[6]) == [0, 0, 24, 0, 0, 0, 0, 0, 1920, 3839, 0, 0]
+    assert list(legacy[6]) == [0, 0, 24, 0]
+
+    x11_backend.release_space(0x400001)
+    assert len(fake_x11.called("XDeleteProperty")) == 2
+    # Atoms are interned once
+    assert len(fake_x11.called("XInternAtom")) == 2
+
+
+# ---------------------------------------------------------------------------
+# File config source
+# ---------------------------------------------------------------------------
+
+
+def test_file_config_source_decodes_like_the_registry(tmp_path):
+    machine = tmp_path / "etc" / "banner.conf"
+    user = tmp_path / "home" / "banner.conf"
+    machine.parent.mkdir()
+    user.parent.mkdir()
+    user.write_text("[ClassificationBanner]\nClassification = UNCLASSIFIED\nGroupID = ops\n")
+
+    source = FileConfigSource([str(machine), str(user)])
+    assert source.load_settings()["Classification"] == "UNCLASSIFIED"
+
+    # The machine file wins once it exists
+    machine.write_text(CONFIG)
+    values = source.load_settings()
+    assert values["Classification"] == "secret"
+    assert values["ShowHostname"] is True
+    assert values["BannerHeight"] == 28
+    assert values["MarkingRules"] == ["process:firefox=CUI", "title:*SIPR*=SECRET"]
+    assert values["BackgroundColor"] == COLOR_SCHEMES["SECRET"]["bg"]
+    assert source.read_group_id() == "ops"
+
+
+def test_marking_rules_are_ignored_where_the_foreground_cannot_be_tracked(tmp_path):
+    # No Win32 fake installed: a WinEvent hook attempt would raise off Windows
+    path = tmp_path / "banner.conf"
+    path.write_text(CONFIG)
+    backend.use(X11Backend(config_paths=[str(path)]))
+    try:
+        scheduler = VirtualScheduler()
+        factory = FakeWindowFactory(scheduler)
+        banner = ClassificationBanner(
+            monitor_manager=FakeMonitorManager(),
+            scheduler=scheduler,
+            window_factory=factory,
+        )
+        try:
+            assert banner.settings.marking_rules == ["process:firefox=CUI", "title:*SIPR*=SECRET"]
+            assert banner.foreground_tracker is None
+            banner._recreate_banners()
+            assert banner.foreground_tracker is None
+            assert {window.marking[0] for window in factory.live} == {"SECRET"}
+            # Skipped on purpose rather than failed
+            logged = [(r[2], r[4]) for r in event_log.EVENT_LOG.records if r[3] == "banner"]
+            assert not any("foreground tracking" in message for _level, message in logged)
+            assert (WARNING, "MarkingRules ignored: the x11 backend cannot track the foreground window") in logged
+        finally:
+            banner._stop_change_watches()
+    finally:
+        backend.use(None)
+
+
+class _SignallingScheduler(VirtualScheduler):
+    """Virtual time, plus an event set when another thread posts a callback"""
+
+    def __init__(self):
+        super().__init__()
+        self.posted = threading.Event()
+
+    def call_idle(self, callback, *args):
+        super().call_idle(callback, *args)
+        self.posted.set()
+        return True
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux-only")
+def test_config_change_reaches_the_banner_without_waiting_for_a_poll(tmp_path):
+    path = tmp_path / "banner.conf"
+    path.write_text("[ClassificationBanner]\nClassification = SECRET\n")
+    source = FileConfigSource([str(path)])
+
+    scheduler = _SignallingScheduler()
+    factory = FakeWindowFactory(scheduler)
+    banner = ClassificationBanner(
+        registry_manager=source,
+        monitor_manager=FakeMonitorManager(),
+        scheduler=scheduler,
+        window_factory=factory,
+    )
+    try:
+        assert source.watcher is not None
+        # Polls are served from the cache while nothing changes
+        scheduler.advance(60_000)
+        reads = source.reads
+        scheduler.advance(300_000)
+        assert source.reads == reads
+
+        path.write_text("[ClassificationBanner]\nClassification = TOP SECRET\n")
+        assert scheduler.posted.wait(5)
+        scheduler.advance(0)
+        assert banner.config_events >= 1
+        assert factory.live[0].marking[0] == "TOP SECRET"
+    finally:
+        banner._stop_change_watches()
+
+
+# ---------------------------------------------------------------------------
+# Real banners under an X server
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.skipif(
+    not os.environ.get("DISPLAY") or sys.platform == "win32",
+    reason="needs an X server, e.g. xvfb-run -a python -m pytest",
+)
+def test_banners_reserve_space_on_x11(tmp_path):
+    pytest.importorskip("tkinter")
+    path = tmp_path / "banner.conf"
+    path.write_text("[ClassificationBanner]\nClassification = SECRET\nBannerHeight = 22\n")
+
+    x11_backend = backend.use(X11Backend(config_paths=[str(path)]))
+    try:
+        banner = ClassificationBanner(scheduler=None)
+        try:
+            window = banner.windows[0]
+            client = x11_backend.client_window(window.hwnd)
+            strut = x11_backend.get_property(client, "_NET_WM_STRUT_PARTIAL", x11.XA_CARDINAL)
+            monitor = window.monitor
+            assert strut[2] == monitor.y + 22
+            assert strut[8:10] == [monitor.x, monitor.x + monitor.width - 1]
+            assert banner.settings.classification_text == "SECRET"
+        finally:
+            banner._stop_change_watches()
+            banner._close_all_windows()
+    finally:
+        backend.use(None)
@@ -0,0 +1,51 @@
+# tests/test_dry_run.py
+#
+# Pytest coverage for ``main.py --dry-run`` as a login script would run it:
+# a separate process that prints the resolved plan as JSON, exits 0 and
+# never imports tkinter.
+#
+# There is no wall-clock comparison with the GUI's cold start: that needs a
+# display and is too noisy to assert on in CI. Not loading tkinter (and so
+# never creating a Tk root) is what keeps the dry run cheap, and that is
+# checked directly.
+
+import json
+import os
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+from classification_banner.constants import CONFIG_PATHS
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Runs main.py as __main__ and reports on stderr, at exit, whether tkinter was loaded
+RUN_MAIN = (
+    "import atexit, runpy, sys;"
+    "atexit.register(lambda: sys.stderr.write('tkinter loaded' if 'tkinter' in sys.modules else 'no tkinter'));"
+    "sys.argv = ['main.py', '--dry-run'];"
+    "runpy.run_path('main.py', run_name='__main__')"
+)
+
+
+def test_dry_run_prints_json_and_never_imports_tkinter(tmp_path):
+    # The user config file (under the fake HOME) stands in for the registry on X11
+    user_config = tmp_path / CONFIG_PATHS[-1].replace("~/", "", 1)
+    user_config.parent.mkdir(parents=True)
+    user_config.write_text("[ClassificationBanner]\nClassification = SECRET\n", encoding="utf-8")
+    env = dict(os.environ, HOME=str(tmp_path), LOCALAPPDATA=str(tmp_path))
+    if sys.platform != "win32":
+        env["CLASSIFICATION_BANNER_BACKEND"] = "x11"
+
+    result = subprocess.run([sys.executable, "-c", RUN_MAIN], cwd=ROOT, env=env,
+                            capture_output=True, text=True, timeout=60)
+
+    assert result.returncode == 0, result.stderr
+    assert result.stderr.endswith("no tkinter")
+    plan = json.loads(result.stdout)
+    assert plan["enabled"] is True
+    if sys.platform != "win32":
+        assert plan["classification_text"] == "SECRET"
+    assert isinstance(plan["monitors"], list)
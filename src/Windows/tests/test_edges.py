@@ -0,0 +1,188 @@
+# tests/test_edges.py
+#
+# Pytest coverage for banners on the top and bottom edges: the shared layout
+# plan, one AppBar transaction per monitor on every backend, occlusion of the
+# bottom banner, and the marginal cost of the second edge. Real windows are
+# checked when an X server (e.g. xvfb-run) is available.
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+from classification_banner import win32, x11
+from classification_banner.backend import WindowsBackend
+from classification_banner.banner import ClassificationBanner
+from classification_banner.constants import ABE_BOTTOM, ABE_TOP, ABM_NEW, ABM_SETPOS
+from classification_banner.dry_run import plan_monitors, resolve_settings
+from classification_banner.edge_cost import check_shared, marginal, measure_virtual
+from classification_banner.fakes import (
+    FakeMonitor,
+    FakeMonitorManager,
+    FakeRegistryManager,
+    FakeWindowFactory,
+    FakeWindowSource,
+    make_monitor_row,
+)
+from classification_banner.layout import Placement, plan_banners
+from classification_banner.scheduler import VirtualScheduler
+from classification_banner.visibility import Rect, WindowRecord
+from classification_banner.x11_backend import X11Backend
+
+BOTH = {"Classification": "SECRET", "Enabled": 1, "Edges": "both"}
+
+
+def make_banner(values, monitors=2, window_source=True):
+    scheduler = VirtualScheduler()
+    factory = FakeWindowFactory(scheduler)
+    source = FakeWindowSource(factory) if window_source else None
+    banner = ClassificationBanner(
+        registry_manager=FakeRegistryManager(values),
+        monitor_manager=FakeMonitorManager(make_monitor_row(monitors)),
+        scheduler=scheduler,
+        window_factory=factory,
+        window_source=source,
+    )
+    return banner, scheduler, factory, source
+
+
+# ---------------------------------------------------------------------------
+# Layout plan
+# ---------------------------------------------------------------------------
+
+
+def test_plan_places_banners_on_the_monitor_edges():
+    monitor = FakeMonitor(-1920, 120, 1920, 1080)
+
+    top, bottom = plan_banners(monitor, 24, "both")
+    assert top == Placement(-1920, 120, 1920, 24, ABE_TOP)
+    assert bottom == Placement(-1920, 1176, 1920, 24, ABE_BOTTOM)
+    assert bottom.rect == Rect(-1920, 1176, 0, 1200)
+    assert bottom.geometry == "1920x24+-1920+1176"
+
+    assert [p.edge for p in plan_banners(monitor, 24, "bottom")] == [ABE_BOTTOM]
+    # Unknown values never get here through the schema; fall back to the top
+    assert [p.edge for p in plan_banners(monitor, 24, "sideways")] == [ABE_TOP]
+
+
+def test_dry_run_lists_one_appbar_per_edge():
+    settings = resolve_settings(FakeRegistryManager(dict(BOTH, BannerHeight=30)))
+    (plan,) = plan_monitors(settings, FakeMonitorManager())
+
+    assert [b["edge"] for b in plan["banners"]] == ["top", "bottom"]
+    assert plan["banners"][1]["appbar"]["rect"] == [0, 1050, 1920, 1080]
+
+
+# ---------------------------------------------------------------------------
+# Banner with both edges
+# ---------------------------------------------------------------------------
+
+
+def test_both_edges_share_one_window_object_per_monitor():
+    banner, scheduler, factory, _ = make_banner(BOTH, window_source=False)
+
+    assert factory.created == 2
+    assert [len(w.hwnds) for w in banner.windows] == [2, 2]
+    # Both edges of both monitors are reserved in one batch
+    assert factory.appbar_transactions == 1
+    assert factory.appbar_registrations == 4
+
+    # One keep-on-top timer raises every edge of every monitor
+    _, top_only, _, _ = make_banner(dict(BOTH, Edges="top"), window_source=False)
+    assert scheduler.pending() == top_only.pending()
+
+    banner.registry_manager.values["Edges"] = "top"
+    banner._check_registry_changes()
+    assert banner.rebuild_count == 1
+    assert [len(w.hwnds) for w in banner.windows] == [1, 1]
+    assert factory.appbar_removals == 4
+
+
+def test_covered_bottom_banner_is_raised():
+    banner, scheduler, factory, source = make_banner(BOTH, monitors=1)
+    scheduler.advance(10_000)
+    assert factory.keep_on_top_calls == 0
+
+    # A topmost window over the bottom edge only
+    source.above.append(WindowRecord(900, Rect(0, 1000, 1920, 1080), topmost=True))
+    scheduler.advance(3_000)
+    assert factory.keep_on_top_calls > 0
+    (stats,) = banner.visibility_auditor.stats.values()
+    assert stats.max_fraction == 1.0
+
+
+@pytest.mark.parametrize("monitors", [1, 3])
+def test_second_edge_adds_no_timers_reads_or_transactions(monitors):
+    top = measure_virtual("top", monitors)
+    both = measure_virtual("both", monitors)
+
+    assert check_shared(top, both) == []
+    assert marginal(top, both)["appbar_registrations"] == top.appbar_registrations
+
+
+# ---------------------------------------------------------------------------
+# Space reservation
+# ---------------------------------------------------------------------------
+
+
+def test_windows_backend_moves_both_appbars_in_one_batch():
+    fake = win32.use_fake()
+    try:
+        top, bottom = plan_banners(FakeMonitor(0, 0, 1920, 1080), 20, "both")
+        WindowsBackend().reserve_spaces([(0x10, top), (0x20, bottom)])
+
+        assert [args[0] for args in fake.called("SHAppBarMessage")] == [
+            ABM_NEW, ABM_SETPOS, ABM_NEW, ABM_SETPOS]
+        assert len(fake.called("BeginDeferWindowPos")) == 1
+        assert [args[1:7] for args in fake.called("DeferWindowPos")] == [
+            (0x10, None, 0, 0, 1920, 20), (0x20, None, 0, 1060, 1920, 20)]
+        assert len(fake.called("EndDeferWindowPos")) == 1
+        assert fake.called("MoveWindow") == []
+    finally:
+        win32.reset()
+
+
+def test_x11_backend_sets_both_struts_with_one_flush():
+    fake = x11.use_fake(x11.FakeX11({"XOpenDisplay": 7, "XDisplayWidth": 1920, "XDisplayHeight": 1080}))
+    try:
+        top, bottom = plan_banners(FakeMonitor(0, 0, 1920, 1080), 20, "both")
+        X11Backend().reserve_spaces([(0x400001, top), (0x400002, bottom)])
+
+        partials = fake.called("XChangeProperty")[::2]
+        assert list(partials[0][6])[:4] == [0, 0, 20, 0]
+        assert list(partials[1][6])[:4] == [0, 0, 0, 20]
+        assert len(fake.called("XFlush")) == 1
+    finally:
+        x11.reset()
+
+
+# ---------------------------------------------------------------------------
+# Real windows under an X server
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.skipif(
+    not os.environ.get("DISPLAY") or sys.platform == "win32",
+    reason="needs an X server, e.g. xvfb-run -a python -m pytest",
+)
+def test_bottom_banner_is_a_toplevel_of_the_same_root():
+    pytest.importorskip("tkinter")
+    from classification_banner.banner_window import BannerWindow
+    from classification_banner.settings import BannerSettings
+
+    settings = BannerSettings()
+    settings.update_from_registry(BOTH)
+    settings.get_classification_text()
+    window = BannerWindow(FakeMonitor(0, 0, 1024, 768), settings, keep_on_top=False)
+    try:
+        root = window.get_window()
+        assert len(window.surfaces) == 2
+        assert window.surfaces[1].master is root
+        assert len(root.tk.call("font", "names")) == 1
+        root.update()
+        assert window.surfaces[1].winfo_y() == 768 - settings.banner_height
+    finally:
+        window.destroy()
@@ -0,0 +1,171 @@
+# tests/test_event_log.py
+#
+# Pytest coverage for the bounded event log: ring overflow and the dropped
+# count, file rotation, records logged before configure() reaching the
+# sinks, and the crash hooks dumping the buffer.
+
+import io
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+from classification_banner import event_log as event_log_module
+from classification_banner.event_log import (
+    CRITICAL,
+    INFO,
+    WARNING,
+    EventLog,
+    RotatingFileSink,
+    StreamSink,
+    format_record,
+    install_crash_hooks,
+)
+
+
+class ListSink:
+    """Keeps every batch it is given"""
+
+    def __init__(self):
+        self.batches = []
+        self.closed = False
+
+    def write(self, records):
+        self.batches.append(list(records))
+
+    def close(self):
+        self.closed = True
+
+
+def messages(batch):
+    return [record[4] for record in batch]
+
+
+# ---------------------------------------------------------------------------
+# Ring buffer
+# ---------------------------------------------------------------------------
+
+
+def test_records_overwritten_before_a_flush_are_counted_as_dropped():
+    log = EventLog(capacity=4)
+    sink = ListSink()
+    log.sinks = [sink]
+
+    for i in range(3):
+        log.log(INFO, "test", f"first {i}")
+    log.flush()
+    for i in range(10):
+        log.log(INFO, "test", f"second {i}")
+    log.flush()
+
+    assert messages(sink.batches[0]) == ["first 0", "first 1", "first 2"]
+    warning, *kept = sink.batches[1]
+    assert (warning[2], warning[4]) == (WARNING, "6 records overwritten before they were written")
+    assert messages(kept) == [f"second {i}" for i in range(6, 10)]
+    assert log.dropped == 6
+
+    # Nothing pending: no empty batch, and the count does not grow again
+    log.flush()
+    assert len(sink.batches) == 2 and log.dropped == 6
+
+
+def test_records_wait_in_the_ring_until_there_is_a_sink():
+    log = EventLog(capacity=8)
+    log.log(INFO, "test", "early")
+    log.flush()
+
+    assert messages(log.pending()) == ["early"]
+
+
+# ---------------------------------------------------------------------------
+# Sinks
+# ---------------------------------------------------------------------------
+
+
+def test_file_sink_rotates_and_keeps_the_configured_backups(tmp_path):
+    path = str(tmp_path / "banner.log")
+    sink = RotatingFileSink(path, max_bytes=100, backups=2)
+    record = (0, 0.0, INFO, "test", "x" * 80)
+
+    for _ in range(4):
+        sink.write([record])
+
+    assert sorted(os.listdir(tmp_path)) == ["banner.log.1", "banner.log.2"]
+    with open(path + ".1", encoding="utf-8") as rotated:
+        assert rotated.read() == format_record(record) + "\n"
+
+    RotatingFileSink(path, max_bytes=100, backups=0).write([record])
+    assert not os.path.exists(path)
+
+
+def test_stream_sink_ignores_a_closed_console():
+    stream = io.StringIO()
+    stream.close()
+
+    StreamSink(stream).write([(0, 0.0, INFO, "test", "lost")])
+
+
+def test_configure_writes_records_logged_before_it(tmp_path, monkeypatch):
+    monkeypatch.setenv("LOCALAPPDATA", str(tmp_path))
+    log = EventLog(flush_delay=0)
+    log.log(INFO, "banner", "before configure")
+
+    log.configure("file", name="test", echo=False)
+    log.log(INFO, "banner", "after configure")
+    log.close()
+
+    with open(tmp_path / "ClassificationBanner" / "ClassificationBanner-test.log", encoding="utf-8") as log_file:
+        lines = log_file.read().splitlines()
+    assert [line.split(": ", 1)[1] for line in lines] == ["before configure", "after configure"]
+    assert log.pending() == []
+
+
+def test_reconfigure_closes_the_old_sinks(tmp_path, monkeypatch):
+    monkeypatch.setenv("LOCALAPPDATA", str(tmp_path))
+    log = EventLog(flush_delay=0)
+    old = ListSink()
+    log.sinks = [old]
+
+    log.configure("none", echo=False)
+    log.close()
+
+    assert old.closed and log.sinks == []
+
+
+# ---------------------------------------------------------------------------
+# Crash hooks
+# ---------------------------------------------------------------------------
+
+
+def test_unhandled_exception_dumps_the_buffer(tmp_path, monkeypatch):
+    monkeypatch.setenv("LOCALAPPDATA", str(tmp_path))
+    # Keep faulthandler pointed where pytest put it
+    monkeypatch.setattr(event_log_module, "_fault_file", io.StringIO())
+    previous = []
+    monkeypatch.setattr(sys, "excepthook", lambda *args: previous.append(args[0]))
+    monkeypatch.setattr(threading, "excepthook", lambda args: previous.append(args.exc_type))
+    log = EventLog()
+    log.name = "test"
+    log.log(INFO, "banner", "last words")
+    install_crash_hooks(log)
+
+    try:
+        raise ValueError("boom")
+    except ValueError as e:
+        sys.excepthook(type(e), e, e.__traceback__)
+
+    crash_dir = tmp_path / "ClassificationBanner"
+    crash_file, = [name for name in os.listdir(crash_dir) if name.startswith("ClassificationBanner-test-crash-")]
+    with open(crash_dir / crash_file, encoding="utf-8") as dump:
+        contents = dump.read()
+    assert "INFO banner: last words" in contents
+    assert "CRITICAL crash: Traceback" in contents and "ValueError: boom" in contents
+    assert previous == [ValueError]
+
+    # A thread ending with SystemExit is not a crash
+    records = len(log.records)
+    threading.excepthook(threading.ExceptHookArgs((SystemExit, SystemExit(0), None, None)))
+    assert len(log.records) == records and previous == [ValueError, SystemExit]
+    assert log.records[-1][2] == CRITICAL
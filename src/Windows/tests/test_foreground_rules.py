@@ -0,0 +1,193 @@
+# tests/test_foreground_rules.py
+#
+# Pytest coverage for per-application marking rules: rule parsing, first-
+# match precedence across exact and glob rules, case-insensitivity, empty
+# values, the per-HWND cache, lookups that test only a handful of globs out
+# of thousands of rules, and WinEvent hook failures surfacing as OSError.
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+from classification_banner import win32
+from classification_banner.constants import FOREGROUND_RULE_BUDGET_MS
+from classification_banner.foreground_rules import (
+    ForegroundMarkingResolver,
+    ForegroundTracker,
+    MarkingRule,
+    RuleIndex,
+    parse_rules,
+    synthetic_rules,
+)
+
+
+class FakeWindowInfo:
+    """Window details by handle, counting the queries"""
+
+    def __init__(self, windows):
+        self.windows = windows
+        self.queries = 0
+
+    def get_process_image(self, hwnd):
+        self.queries += 1
+        return self.windows[hwnd][0]
+
+    def get_class_name(self, hwnd):
+        self.queries += 1
+        return self.windows[hwnd][1]
+
+    def get_title(self, hwnd):
+        return self.windows[hwnd][2]
+
+
+# ---------------------------------------------------------------------------
+# Parsing
+# ---------------------------------------------------------------------------
+
+
+def test_parse_rules_skips_comments_and_malformed_lines():
+    rules = parse_rules([
+        "; comment",
+        "",
+        "Process: mstsc.exe = secret",
+        "title:*=Dashboard*=CONFIDENTIAL",
+        "window:foo=SECRET",
+        "process:=SECRET",
+        "class:Chrome_WidgetWin_1",
+    ])
+
+    assert rules == [
+        MarkingRule("process", "mstsc.exe", "SECRET"),
+        MarkingRule("title", "*=Dashboard*", "CONFIDENTIAL"),
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Index
+# ---------------------------------------------------------------------------
+
+
+def test_first_matching_rule_wins_across_exact_and_glob_rules():
+    index = RuleIndex([
+        MarkingRule("process", "*.exe", "UNCLASSIFIED"),
+        MarkingRule("process", "mstsc.exe", "SECRET"),
+        MarkingRule("class", "TscShellContainerClass", "TOP SECRET"),
+        MarkingRule("class", "Tsc*", "CONFIDENTIAL"),
+        MarkingRule("class", "TscShellContainerClass", "SECRET"),
+    ])
+
+    # The earlier glob beats the later exact rule, and vice versa
+    assert index.match_field("process", "mstsc.exe") == "UNCLASSIFIED"
+    assert index.match_field("class", "TscShellContainerClass") == "TOP SECRET"
+    assert index.match_field("class", "TscOther") == "CONFIDENTIAL"
+    # Process beats class
+    assert index.lookup("mstsc.exe", "TscShellContainerClass", "") == "UNCLASSIFIED"
+
+
+def test_globs_match_the_whole_value_in_rule_order():
+    index = RuleIndex([
+        MarkingRule("title", "*- Remote Desktop Connection", "SECRET"),
+        MarkingRule("title", "jira - *", "CONFIDENTIAL"),
+        MarkingRule("title", "*", "UNCLASSIFIED"),
+        MarkingRule("process", "vm[0-9]?.exe", "TOP SECRET"),
+        MarkingRule("class", "[!]]*", "SECRET"),
+    ])
+
+    assert index.match_field("title", "host1 - Remote Desktop Connection") == "SECRET"
+    assert index.match_field("title", "Jira - Sprint board") == "CONFIDENTIAL"
+    assert index.match_field("title", "Remote Desktop Connection notes") == "UNCLASSIFIED"
+    assert index.match_field("process", "vm1a.exe") == "TOP SECRET"
+    assert index.match_field("process", "vm1.exe") is None
+    assert index.match_field("class", "]bracket") is None
+    assert index.match_field("class", "Notepad") == "SECRET"
+
+
+def test_matching_ignores_case():
+    index = RuleIndex(parse_rules(["process:MSTSC.EXE=SECRET", "title:*Classified*=TOP SECRET"]))
+
+    assert index.lookup("mstsc.exe", "", "") == "SECRET"
+    assert index.lookup("notepad.exe", "", "NOT CLASSIFIED.txt") == "TOP SECRET"
+
+
+def test_empty_values_and_no_rules_match_nothing():
+    index = RuleIndex([MarkingRule("title", "*", "SECRET"), MarkingRule("process", "*", "SECRET")])
+
+    assert index.lookup("", "", "") is None
+    assert RuleIndex([]).lookup("mstsc.exe", "Class", "Title") is None
+
+
+def test_lookup_tests_only_the_globs_that_could_match():
+    rules = synthetic_rules(5000)
+    index = RuleIndex(rules)
+    globs = index._globs["title"]
+
+    # Rules anywhere in the list are found
+    for rule in (rules[2], rules[2501], rules[-1]):
+        value = rule.pattern.replace("*", "x")
+        assert index.match_field(rule.field, value) == rule.marking
+    tested = globs.tested
+    assert index.lookup("unlisted.exe", "UnlistedClass", "Untitled document - Editor") is None
+    # Thousands of title globs, of which only those sharing a trigram are tried
+    assert len(globs.globs) > 1000 and globs.tested - tested <= 10
+
+
+def test_benchmark_flags_slow_lookups(monkeypatch):
+    from classification_banner import foreground_rules
+
+    assert foreground_rules.main(["--rules", "100", "--lookups", "10"]) == 0
+    monkeypatch.setattr(foreground_rules, "time_lookup", lambda rules, lookups: FOREGROUND_RULE_BUDGET_MS * 2)
+    assert foreground_rules.main(["--rules", "100"]) == 1
+
+
+# ---------------------------------------------------------------------------
+# Per-HWND cache
+# ---------------------------------------------------------------------------
+
+
+def test_resolver_queries_a_window_once_and_rechecks_only_changed_titles():
+    info = FakeWindowInfo({1: ("mstsc.exe", "TscShellContainerClass", "host1")})
+    index = RuleIndex(parse_rules(["title:*Secret*=SECRET", "process:mstsc.exe=CONFIDENTIAL"]))
+    resolver = ForegroundMarkingResolver(index, info, cache_size=1)
+
+    assert resolver.resolve(1) == "CONFIDENTIAL"
+    assert resolver.resolve(1) == "CONFIDENTIAL"
+    assert (resolver.hits, resolver.misses, info.queries) == (1, 1, 2)
+
+    # A new title is re-evaluated without querying the process again
+    info.windows[1] = ("mstsc.exe", "TscShellContainerClass", "Secret share")
+    assert resolver.resolve(1) == "CONFIDENTIAL"
+    assert (resolver.misses, info.queries) == (2, 2)
+
+    # The cache is bounded
+    info.windows[2] = ("notepad.exe", "Notepad", "Secret plan")
+    assert resolver.resolve(2) == "SECRET"
+    assert list(resolver._cache) == [2]
+
+
+# ---------------------------------------------------------------------------
+# WinEvent hooks
+# ---------------------------------------------------------------------------
+
+
+def test_failed_hook_raises_oserror_and_removes_the_others():
+    hooks = iter([0x11, 0x12, 0])
+    fake = win32.use_fake(win32.FakeWin32({"SetWinEventHook": lambda *args: next(hooks)}))
+    try:
+        tracker = ForegroundTracker(parse_rules(["process:firefox=CUI"]), print)
+        with pytest.raises(OSError):
+            tracker.start()
+        assert fake.called("UnhookWinEvent") == [(0x11,), (0x12,)]
+        assert fake.called("GetForegroundWindow") == []
+    finally:
+        win32.reset()
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="user32 is available on Windows")
+def test_tracker_without_user32_raises_oserror():
+    win32.reset()
+    with pytest.raises(OSError):
+        ForegroundTracker(parse_rules(["process:firefox=CUI"]), print).start()
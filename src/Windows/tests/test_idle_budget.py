@@ -0,0 +1,45 @@
+# tests/test_idle_budget.py
+#
+# Idle wakeup budgets: runs ClassificationBanner against the fake backends on
+# the virtual clock and fails if any hourly count exceeds its declared budget,
+# both with occlusion auditing and on the blind keep-on-top fallback.
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+from classification_banner.idle_budget import budget_for, check_budget, measure_idle
+
+
+@pytest.mark.parametrize("monitors", [1, 2, 4])
+def test_idle_banner_stays_within_wakeup_budget(monitors):
+    report = measure_idle(monitors, hours=0.25)
+
+    assert check_budget(report) == []
+    # Occlusion checks replace the per-monitor keep-on-top loop
+    assert report.zorder_calls == 0
+
+
+@pytest.mark.parametrize("monitors", [1, 2, 4])
+def test_blind_keep_on_top_stays_within_its_budget(monitors):
+    # No window source (e.g. X11 without _NET_CLIENT_LIST_STACKING)
+    report = measure_idle(monitors, hours=0.25, audited=False)
+
+    assert check_budget(report) == []
+    # One timer for every banner, however many monitors there are
+    assert report.by_timer["keep_on_top"] == budget_for(1, audited=False)["zorder_calls"]
+    assert "visibility" not in report.by_timer
+    assert report.zorder_calls == monitors * report.by_timer["keep_on_top"]
+
+
+def test_check_budget_reports_exceeded_counters():
+    report = measure_idle(1, hours=0.25)
+    over = report._replace(registry_reads=budget_for(1)["registry_reads"] + 1)
+
+    messages = check_budget(over)
+    assert len(messages) == 1
+    assert "registry_reads" in messages[0]
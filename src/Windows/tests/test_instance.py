@@ -0,0 +1,246 @@
+# tests/test_instance.py
+#
+# Pytest coverage for the single-instance guard and the control channel: the
+# lock excludes a second holder (also across processes, and is dropped when
+# the holder dies), reload/status/metrics round trips, refused keys, stalled
+# clients not holding up others, and a second main.py launch handing its
+# reload to the running instance.
+
+import json
+import os
+import subprocess
+import sys
+from multiprocessing.connection import Client
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+from classification_banner import instance
+from classification_banner.banner import ClassificationBanner
+from classification_banner.fakes import FakeMonitorManager, FakeRegistryManager, FakeWindowFactory, make_monitor_row
+from classification_banner.instance import ControlServer, InstanceLock, send_command
+from classification_banner.scheduler import VirtualScheduler
+from classification_banner.update_bus import IdleLoop
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def make_banner(monitors=2):
+    scheduler = VirtualScheduler()
+    banner = ClassificationBanner(
+        registry_manager=FakeRegistryManager({"Classification": "SECRET", "Enabled": 1}),
+        monitor_manager=FakeMonitorManager(make_monitor_row(monitors)),
+        scheduler=scheduler,
+        window_factory=FakeWindowFactory(scheduler),
+    )
+    return banner
+
+
+@pytest.fixture
+def served(tmp_path):
+    """Banner with a control server whose commands run on a stand-in Tk thread"""
+    loop = IdleLoop()
+    banner = make_banner()
+    server = ControlServer(banner, str(tmp_path / "banner.channel"), call_idle=loop.call_idle)
+    yield banner, server
+    server.close()
+    loop.stop()
+
+
+# ---------------------------------------------------------------------------
+# Instance lock
+# ---------------------------------------------------------------------------
+
+
+def test_lock_admits_one_holder(tmp_path):
+    path = str(tmp_path / "banner.lock")
+    first, second = InstanceLock(path), InstanceLock(path)
+
+    assert first.acquire() and first.held
+    assert not second.acquire()
+    first.release()
+    assert second.acquire()
+    second.release()
+
+
+def test_lock_is_dropped_when_the_holder_dies(tmp_path):
+    path = str(tmp_path / "banner.lock")
+    holder = subprocess.Popen(
+        [sys.executable, "-c",
+         "import sys, time; sys.path.insert(0, sys.argv[1]);"
+         "from classification_banner.instance import InstanceLock;"
+         "lock = InstanceLock(sys.argv[2]); assert lock.acquire(); print('locked', flush=True); time.sleep(60)",
+         ROOT, path],
+        stdout=subprocess.PIPE, text=True)
+    try:
+        assert holder.stdout.readline().strip() == "locked"
+        assert not InstanceLock(path).acquire()
+    finally:
+        holder.kill()
+        holder.wait()
+    assert InstanceLock(path).acquire()
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="X display sessions")
+def test_lock_is_scoped_to_the_display(monkeypatch, tmp_path):
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    monkeypatch.setenv("DISPLAY", ":1.0")
+    assert instance.instance_path("lock") == str(tmp_path / "ClassificationBanner-1_0.lock")
+    monkeypatch.setenv("DISPLAY", "")
+    assert instance.instance_path("lock") == str(tmp_path / "ClassificationBanner-0.lock")
+
+
+# ---------------------------------------------------------------------------
+# Control channel
+# ---------------------------------------------------------------------------
+
+
+def test_status_and_metrics_round_trip(served):
+    banner, server = served
+
+    status = send_command("status", server.channel_path)
+    assert status["ok"] and status["command"] == "status"
+    assert status["result"]["marking"] == "SECRET"
+    assert len(status["result"]["monitors"]) == 2
+
+    metrics = send_command("metrics", server.channel_path)["result"]
+    assert set(metrics["update_bus"]) >= {"posted", "coalesced", "latency_p99_ms"}
+    assert metrics["rebuilds"] == 0
+    assert metrics["resources"]["gc_objects"] > 0
+
+    reply = send_command("shutdown", server.channel_path)
+    assert not reply["ok"] and "unknown command" in reply["error"]
+    assert server.requests == 3
+
+
+def test_reload_applies_changed_settings_now(served):
+    banner, server = served
+    banner.registry_manager.values["Classification"] = "TOP SECRET"
+
+    reply = send_command("reload", server.channel_path)
+
+    assert reply["ok"] and reply["result"]["updated_in_place"]
+    assert {w.marking[0] for w in banner.windows} == {"TOP SECRET"}
+
+
+def test_reload_that_disables_replies_before_shutting_down(served):
+    banner, server = served
+    banner.registry_manager.values["Enabled"] = 0
+
+    reply = send_command("reload", server.channel_path)
+
+    assert reply["ok"] and reply["result"]["changed"] and reply["result"]["disabled"]
+    assert not banner.shutdown.started
+    banner.scheduler.advance(0)
+    assert banner.shutdown.report.reason == "disabled" and banner.roots() == []
+
+
+def test_client_without_the_key_is_refused(served, tmp_path):
+    banner, server = served
+    with open(server.channel_path) as channel:
+        info = json.load(channel)
+    forged = tmp_path / "forged.channel"
+    forged.write_text(json.dumps(dict(info, authkey=os.urandom(32).hex())))
+
+    with pytest.raises(ConnectionError):
+        send_command("status", str(forged), timeout=0.3)
+    assert server.refused >= 1
+    assert send_command("status", server.channel_path)["ok"]
+
+
+def test_stalled_clients_do_not_block_other_requests(served):
+    banner, server = served
+    with open(server.channel_path) as channel:
+        info = json.load(channel)
+    # Connected but never answering the challenge, and authenticated but
+    # never sending a request
+    in_handshake = Client(info["address"])
+    silent = Client(info["address"], authkey=bytes.fromhex(info["authkey"]))
+    try:
+        reply = send_command("status", server.channel_path, timeout=1.0)
+        assert reply["ok"] and reply["result"]["marking"] == "SECRET"
+        assert send_command("reload", server.channel_path, timeout=1.0)["ok"]
+    finally:
+        in_handshake.close()
+
+    # The silent client is dropped once its request is overdue
+    with pytest.raises(EOFError):
+        silent.recv_bytes()
+    silent.close()
+    assert server.timed_out == 1 and server.requests == 2
+
+
+def test_clients_beyond_the_limit_are_dropped(tmp_path):
+    loop = IdleLoop()
+    server = ControlServer(make_banner(), str(tmp_path / "banner.channel"), call_idle=loop.call_idle,
+                           max_clients=1)
+    with open(server.channel_path) as channel:
+        address = json.load(channel)["address"]
+    stalled = Client(address)
+    try:
+        with pytest.raises(ConnectionError):
+            send_command("status", server.channel_path, timeout=0.3)
+        stalled.close()
+        assert send_command("status", server.channel_path)["ok"]
+    finally:
+        server.close()
+        loop.stop()
+
+
+def test_no_instance_and_no_tk_thread(tmp_path):
+    with pytest.raises(ConnectionError):
+        send_command("status", str(tmp_path / "missing.channel"), timeout=0.2)
+
+    server = ControlServer(make_banner(), str(tmp_path / "banner.channel"), call_idle=lambda _: False)
+    try:
+        reply = send_command("status", server.channel_path)
+        assert not reply["ok"] and reply["error"] == "banner is not running"
+    finally:
+        server.close()
+    assert not os.path.exists(server.channel_path)
+
+
+def test_shutdown_closes_the_channel(served):
+    banner, server = served
+    banner.control_server = server
+
+    banner.shutdown.run("logoff")
+
+    assert not os.path.exists(server.channel_path)
+    assert not server._thread.is_alive()
+    with pytest.raises(ConnectionError):
+        send_command("status", server.channel_path, timeout=0.2)
+
+
+# ---------------------------------------------------------------------------
+# main.py
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="scopes the lock with XDG_RUNTIME_DIR")
+def test_second_launch_hands_over_to_the_running_instance(served, monkeypatch, tmp_path):
+    banner, server = served
+    runtime = tmp_path / "runtime"
+    runtime.mkdir()
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(runtime))
+    monkeypatch.setenv("DISPLAY", ":7")
+    lock = InstanceLock()
+    assert lock.acquire()
+    os.replace(server.channel_path, instance.instance_path("channel"))
+    server.channel_path = instance.instance_path("channel")
+    env = dict(os.environ, LOCALAPPDATA=str(tmp_path))
+
+    try:
+        second = subprocess.run([sys.executable, os.path.join(ROOT, "main.py")], env=env,
+                                capture_output=True, text=True, timeout=60)
+        assert second.returncode == 0, second.stderr
+        assert server.requests == 1
+
+        status = subprocess.run([sys.executable, os.path.join(ROOT, "main.py"), "--status"], env=env,
+                                capture_output=True, text=True, timeout=60)
+        assert status.returncode == 0, status.stderr
+        assert json.loads(status.stdout)["result"]["marking"] == "SECRET"
+    finally:
+        lock.release()
@@ -0,0 +1,119 @@
+# tests/test_ip_provider.py
+#
+# Pytest coverage for the displayed IP address: which adapter address the
+# policy selects, re-enumerating only on change notifications, a new address
+# replacing the cached one, and giving up on an adapter list that keeps
+# growing without losing the cached address.
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+from classification_banner import event_log
+from classification_banner.ip_provider import (
+    ERROR_BUFFER_OVERFLOW,
+    AdapterAddress,
+    AddressPolicy,
+    AddressProvider,
+    FakeAddressNotifier,
+    StaticAddressSource,
+    Win32AddressSource,
+)
+from classification_banner.system_info import SystemInfoGatherer
+
+WIFI = AdapterAddress("Wi-Fi", "ipv4", "192.168.1.20")
+ETHERNET = AdapterAddress("Ethernet", "ipv4", "10.1.2.3", has_gateway=True)
+ETHERNET6 = AdapterAddress("Ethernet", "ipv6", "2001:db8::3", has_gateway=True)
+LINK_LOCAL = AdapterAddress("Ethernet", "ipv6", "fe80::1", has_gateway=True)
+LOOPBACK = AdapterAddress("Loopback Pseudo-Interface 1", "ipv4", "127.0.0.1", is_loopback=True)
+VPN_DOWN = AdapterAddress("VPN", "ipv4", "172.16.0.9", is_up=False, has_gateway=True)
+
+
+# ---------------------------------------------------------------------------
+# Policy
+# ---------------------------------------------------------------------------
+
+
+def test_policy_prefers_ipv4_on_an_adapter_with_a_gateway():
+    addresses = [LOOPBACK, VPN_DOWN, WIFI, LINK_LOCAL, ETHERNET6, ETHERNET]
+
+    assert AddressPolicy().select(addresses) == "10.1.2.3"
+    assert AddressPolicy(family="any").select(addresses) == "10.1.2.3"
+    assert AddressPolicy(family="ipv6").select(addresses) == "2001:db8::3"
+    assert AddressPolicy(family="IPv4", adapter="wi-fi*").select(addresses) == "192.168.1.20"
+
+
+def test_policy_never_shows_loopback_link_local_or_down_adapters():
+    assert AddressPolicy(family="any").select([LOOPBACK, LINK_LOCAL, VPN_DOWN]) == ""
+    assert AddressPolicy().select([]) == ""
+
+
+# ---------------------------------------------------------------------------
+# Provider
+# ---------------------------------------------------------------------------
+
+
+def test_provider_enumerates_only_on_notification():
+    source = StaticAddressSource([WIFI])
+    notifier = FakeAddressNotifier()
+    changes = []
+    provider = AddressProvider(source, notifier)
+
+    assert provider.start(changes.append) == "192.168.1.20"
+    assert source.calls == 1
+
+    # Nothing changed: no callback
+    notifier.notify()
+    assert (source.calls, changes) == (2, [])
+
+    # A new address replaces the cached one and is reported once
+    source.addresses = [WIFI, ETHERNET]
+    notifier.notify()
+    notifier.notify()
+    assert provider.current == "10.1.2.3"
+    assert changes == ["10.1.2.3"]
+
+    provider.stop()
+    notifier.notify()
+    assert source.calls == 4
+
+
+def test_system_info_shows_the_cached_address():
+    provider = AddressProvider(StaticAddressSource([ETHERNET]), FakeAddressNotifier())
+    provider.start()
+
+    info = SystemInfoGatherer(address_provider=provider).gather_all({"show_ip_address": True})
+
+    assert info == {"ip_address": "10.1.2.3"}
+
+
+class GrowingAdapters:
+    """GetAdaptersAddresses whose adapter list outgrows every buffer"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def GetAdaptersAddresses(self, family, flags, reserved, buffer, size):
+        self.calls += 1
+        size._obj.value += 1024
+        return ERROR_BUFFER_OVERFLOW
+
+
+def test_adapter_list_that_keeps_growing_keeps_the_cached_address():
+    source = StaticAddressSource([ETHERNET])
+    provider = AddressProvider(source, FakeAddressNotifier())
+    provider.start()
+
+    win32 = Win32AddressSource.__new__(Win32AddressSource)
+    win32._iphlpapi = GrowingAdapters()
+    win32._buffer_size = 1024
+    provider.source = win32
+    provider.notifier.notify()
+
+    assert win32._iphlpapi.calls == 3
+    assert provider.current == "10.1.2.3"
+    _, _, level, source_name, message = event_log.EVENT_LOG.records[-1]
+    assert (level, source_name) == (event_log.ERROR, "ip_provider")
+    assert "GetAdaptersAddresses needed more than 4096 bytes" in message
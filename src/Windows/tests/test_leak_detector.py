@@ -0,0 +1,157 @@
+# tests/test_leak_detector.py
+#
+# Pytest coverage for the leak detector and the soak harness: growth against
+# the baseline, budgets, counters that are unavailable on this platform,
+# counting Tk widgets and fonts, the soak exit status, and (under an X
+# server) a short soak run.
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+from classification_banner.leak_detector import LeakBudget, LeakDetector, ResourceSampler, ResourceSnapshot
+
+
+def snapshot(**counters):
+    values = dict.fromkeys(ResourceSnapshot._fields, 0)
+    values.update(counters)
+    return ResourceSnapshot(**values)
+
+
+class FakeSampler:
+    """Returns the queued snapshots in order"""
+
+    def __init__(self, *snapshots):
+        self.snapshots = list(snapshots)
+        self.roots = []
+
+    def sample(self, roots=()):
+        self.roots.append(list(roots))
+        return self.snapshots.pop(0)
+
+
+class FakeTk:
+    def __init__(self, fonts):
+        self.fonts = fonts
+
+    def call(self, *args):
+        assert args == ("font", "names")
+        return self.fonts
+
+
+class FakeWidget:
+    def __init__(self, *children, fonts=()):
+        self.children = list(children)
+        self.tk = FakeTk(fonts)
+
+    def winfo_children(self):
+        return self.children
+
+
+class DestroyedRoot:
+    def winfo_children(self):
+        raise RuntimeError("application has been destroyed")
+
+
+# ---------------------------------------------------------------------------
+# Growth and budgets
+# ---------------------------------------------------------------------------
+
+
+def test_first_record_is_the_baseline():
+    sampler = FakeSampler(snapshot(gc_objects=100), snapshot(gc_objects=150))
+    detector = LeakDetector(sampler=sampler, trace_python=False)
+
+    assert detector.record(["root"]) == []
+    assert detector.samples == 0 and detector.baseline_snapshot.gc_objects == 100
+    assert detector.record() == []
+    assert detector.samples == 1
+    assert detector.growth()["gc_objects"] == 50
+    assert sampler.roots == [["root"], []]
+
+
+def test_growth_over_budget_is_reported():
+    detector = LeakDetector(
+        budget=LeakBudget(tk_widgets=0, gc_objects=1000),
+        sampler=FakeSampler(snapshot(tk_widgets=8, gc_objects=10), snapshot(tk_widgets=10, gc_objects=1010)),
+        trace_python=False,
+    )
+    detector.baseline()
+    detector.record()
+
+    assert detector.violations() == ["tk_widgets grew by 2 (budget 0)"]
+
+
+def test_unavailable_counters_are_skipped():
+    detector = LeakDetector(
+        budget=LeakBudget(gdi_handles=0),
+        sampler=FakeSampler(snapshot(gdi_handles=-1, rss_bytes=4096), snapshot(gdi_handles=-1, rss_bytes=8192)),
+        trace_python=False,
+    )
+    assert detector.report() == "Leak report: no samples"
+    detector.baseline()
+    detector.record()
+
+    assert "gdi_handles" not in detector.growth()
+    assert detector.violations() == []
+    report = detector.report()
+    assert report.startswith("Leak report after 1 samples: rss_bytes=8192(+4096)")
+    assert "gdi_handles=n/a" in report
+
+
+# ---------------------------------------------------------------------------
+# Sampler
+# ---------------------------------------------------------------------------
+
+
+def test_sampler_counts_widgets_and_fonts_of_live_roots():
+    root = FakeWidget(FakeWidget(FakeWidget()), FakeWidget(), fonts=("TkDefaultFont", "banner"))
+
+    counters = ResourceSampler().sample([root, DestroyedRoot()])
+
+    assert (counters.tk_widgets, counters.tk_fonts) == (4, 2)
+    assert counters.gc_objects > 0
+
+
+# ---------------------------------------------------------------------------
+# Soak harness
+# ---------------------------------------------------------------------------
+
+
+def test_soak_exit_status_reflects_the_budget(monkeypatch, capsys):
+    from classification_banner import soak
+
+    runs = []
+
+    def fake_soak(cycles, monitors, warmup, report_every):
+        runs.append((cycles, monitors, warmup, report_every))
+        detector = LeakDetector(budget=LeakBudget(user_handles=0), sampler=FakeSampler(
+            snapshot(user_handles=40), snapshot(user_handles=40 + cycles)), trace_python=False)
+        detector.record()
+        detector.record()
+        return detector
+
+    monkeypatch.setattr(soak, "run_soak", fake_soak)
+
+    assert soak.main(["--cycles", "0", "--monitors", "3"]) == 0
+    assert soak.main(["--cycles", "5"]) == 1
+    assert runs == [(0, 3, 20, 100), (5, 2, 20, 100)]
+    assert "FAIL: user_handles grew by 5 (budget 0)" in capsys.readouterr().out
+
+
+@pytest.mark.skipif(
+    not os.environ.get("DISPLAY") or sys.platform == "win32",
+    reason="needs an X server, e.g. xvfb-run -a python -m pytest",
+)
+def test_short_soak_stays_within_the_widget_budget():
+    pytest.importorskip("tkinter")
+    from classification_banner.soak import run_soak
+
+    detector = run_soak(cycles=40, monitors=2, warmup=10, report_every=20)
+
+    assert detector.samples == 2
+    assert detector.violations() == []
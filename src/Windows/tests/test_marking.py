@@ -0,0 +1,111 @@
+# tests/test_marking.py
+#
+# Pytest coverage for the marking engine: rendering from the compiled tables,
+# fail-safe handling of invalid combinations, and the callers that use it
+# (settings, foreground rules, the policy validator).
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+from classification_banner import marking
+from classification_banner.constants import COLOR_SCHEMES
+from classification_banner.foreground_rules import resolve_marking
+from classification_banner.policy_validator import validate_file
+from classification_banner.settings import BannerSettings
+
+
+# ---------------------------------------------------------------------------
+# Rendering
+# ---------------------------------------------------------------------------
+
+
+def test_valid_markings_render_as_configured():
+    rendered = marking.render("secret", "HCS-P / SI", "NOFORN")
+    assert rendered.text == "SECRET//HCS-P/SI//NOFORN"
+    assert (rendered.bg, rendered.fg) == (COLOR_SCHEMES["SECRET"]["bg"], COLOR_SCHEMES["SECRET"]["fg"])
+    assert rendered.valid and rendered.unknown == ()
+
+    # Aliases and full markings in the classification value
+    assert marking.render("TS").text == "TOP SECRET"
+    assert marking.render("TOP SECRET//HCS-P/SI/TK//NOFORN").level == "TOP SECRET"
+    assert marking.render("SECRET//NOFORN", "SI").text == "SECRET//SI//NOFORN"
+
+
+def test_sci_uses_its_color_scheme_defaults():
+    scheme = COLOR_SCHEMES["SCI"]
+    rendered = marking.render("SCI")
+    assert rendered.text == f"TOP SECRET//{scheme['caveats']}//{scheme['dc']}"
+    assert rendered.bg == scheme["bg"]
+    # Configured caveats replace the defaults
+    assert marking.render("SCI", "SI", "").text == "TOP SECRET//SI//NOFORN"
+
+
+def test_invalid_combinations_fail_safe_to_the_highest_applicable_level():
+    rendered = marking.render("CONFIDENTIAL", "SI/TK/G")
+    assert rendered.text == "TOP SECRET//SI/TK/G"
+    assert rendered.level == "TOP SECRET"
+    assert not rendered.valid
+    assert "G is not allowed below TOP SECRET" in rendered.problems
+
+    # Unknown levels get the highest marking in the table
+    assert marking.render("SECRT").text == "TOP SECRET"
+    assert marking.render("CUSTOM").problems == ("CUSTOM classification without custom text",)
+
+    # The more restrictive of two conflicting controls is kept
+    rendered = marking.render("SECRET", "", "REL TO USA, GBR/NOFORN")
+    assert rendered.text == "SECRET//NOFORN"
+    assert rendered.problems == ("REL TO USA, GBR conflicts with NOFORN; NOFORN is kept",)
+
+
+def test_unknown_tokens_are_shown_but_not_checked():
+    rendered = marking.render("SECRET", "ACME PROGRAM")
+    assert rendered.text == "SECRET//ACME PROGRAM"
+    assert rendered.valid
+    assert rendered.unknown == ("ACME PROGRAM",)
+
+
+def test_render_is_memoized_and_validate_returns_invalid_inputs():
+    marking.render.cache_clear()
+    inputs = [("SECRET", "SI", "NOFORN"), ("UNCLASSIFIED", "TK", ""), ("SECRET", "SI", "NOFORN")]
+    invalid = marking.validate(inputs)
+    assert list(invalid) == [("UNCLASSIFIED", "TK", "")]
+    assert invalid[("UNCLASSIFIED", "TK", "")].level == "SECRET"
+
+    info = marking.render.cache_info()
+    assert (info.hits, info.misses) == (1, 2)
+
+
+# ---------------------------------------------------------------------------
+# Callers
+# ---------------------------------------------------------------------------
+
+
+def test_settings_and_foreground_rules_use_the_engine():
+    settings = BannerSettings()
+    settings.classification = "SECRET"
+    settings.caveats = "G"
+    settings.get_classification_text()
+    assert settings.classification_text == "TOP SECRET//G"
+
+    assert resolve_marking("SCI//NOFORN") == ("TOP SECRET//HCS/SI/TK/G//NOFORN", "#FFFF00", "#000000")
+    assert resolve_marking("CUI").bg == COLOR_SCHEMES["CUI"]["bg"]
+
+
+def test_policy_validator_rejects_invalid_markings(tmp_path):
+    path = tmp_path / "bad.reg"
+    path.write_text(
+        "Windows Registry Editor Version 5.00\n\n"
+        "[HKEY_LOCAL_MACHINE\\SOFTWARE\\ClassificationBanner]\n"
+        "\"Classification\"=\"CONFIDENTIAL\"\n"
+        "\"Caveats\"=\"TK/ACME\"\n"
+    )
+    result = validate_file(str(path))
+    assert not result.valid
+    assert result.classification_text == "SECRET//TK/ACME"
+    # Colors follow the level the marking was raised to
+    assert result.bg_color == COLOR_SCHEMES["SECRET"]["bg"]
+    assert "TK is not allowed below SECRET" in result.errors
+    assert any("'ACME'" in w for w in result.warnings)
@@ -0,0 +1,86 @@
+# tests/test_monitor_layout.py
+#
+# Pytest coverage for incremental banner updates on monitor layout changes:
+# shuffled enumerations must not rebuild anything, and partial changes only
+# touch the affected banners.
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+from classification_banner.banner import ClassificationBanner
+from classification_banner.fakes import (
+    FakeMonitor,
+    FakeMonitorManager,
+    FakeRegistryManager,
+    FakeWindowFactory,
+    make_monitor_row,
+)
+from classification_banner.monitor_manager import MonitorIndex
+from classification_banner.scheduler import VirtualScheduler
+
+CHECK_MS = 2000
+
+
+def _banner(monitors):
+    scheduler = VirtualScheduler()
+    factory = FakeWindowFactory(scheduler)
+    monitor_manager = FakeMonitorManager(monitors)
+    banner = ClassificationBanner(
+        registry_manager=FakeRegistryManager({"Classification": "SECRET", "Enabled": 1}),
+        monitor_manager=monitor_manager,
+        scheduler=scheduler,
+        window_factory=factory,
+    )
+    scheduler.advance(CHECK_MS)
+    return banner, factory, monitor_manager, scheduler
+
+
+def test_monitor_index_diff_ignores_order():
+    row = make_monitor_row(4)
+    shuffled = list(reversed(row))
+
+    diff = MonitorIndex(row).diff(MonitorIndex(shuffled))
+    assert not diff.changed
+    assert sorted(diff.unchanged) == sorted(MonitorIndex(row).monitors)
+
+
+def test_shuffled_layouts_avoid_rebuilds():
+    banner, factory, monitor_manager, scheduler = _banner(make_monitor_row(4))
+    rng = random.Random(5)
+
+    shuffles = 0
+    for _ in range(20):
+        previous = list(monitor_manager.monitors)
+        while monitor_manager.monitors == previous:
+            rng.shuffle(monitor_manager.monitors)
+        shuffles += 1
+        scheduler.advance(CHECK_MS)
+
+    assert banner.avoided_rebuilds == shuffles
+    assert banner.monitor_updates == 0
+    assert factory.created == 4
+    assert factory.destroyed == 0
+
+
+def test_partial_layout_change_only_touches_affected_banners():
+    monitors = make_monitor_row(3)
+    banner, factory, monitor_manager, scheduler = _banner(monitors)
+    untouched = banner.windows_by_id[f"name:{monitors[0].name}"]
+
+    # Resize the second monitor, unplug the third, plug in a new one
+    resized = FakeMonitor(1920, 0, 2560, 1440, name=monitors[1].name)
+    added = FakeMonitor(4480, 0, 1920, 1080, name="\\\\.\\DISPLAY9")
+    monitor_manager.monitors = [added, monitors[0], resized]
+    scheduler.advance(CHECK_MS)
+
+    assert banner.monitor_updates == 1
+    assert factory.created == 4
+    assert factory.destroyed == 1
+    assert banner.windows_by_id[f"name:{monitors[0].name}"] is untouched
+    assert banner.windows_by_id[f"name:{monitors[1].name}"].monitor is resized
+    assert set(banner.windows_by_id) == {
+        f"name:{monitors[0].name}", f"name:{monitors[1].name}", f"name:{added.name}"}
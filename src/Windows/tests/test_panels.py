@@ -0,0 +1,109 @@
+# tests/test_panels.py
+#
+# Pytest coverage for spanned surfaces (Mosaic, Eyefinity): panel sizes and
+# bezel gaps, single large monitors left whole, stable panel identities, and
+# switching SpannedSurfaces in place so only the wall's banners change.
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+from classification_banner.banner import ClassificationBanner
+from classification_banner.dry_run import plan_monitors
+from classification_banner.fakes import FakeMonitor, FakeMonitorManager, FakeRegistryManager, FakeWindowFactory
+from classification_banner.panels import Grid, detect_grid, expand, parse_size
+from classification_banner.scheduler import VirtualScheduler
+from classification_banner.settings import BannerSettings
+
+WALL = FakeMonitor(0, 0, 5760, 2160, name="\\\\.\\DISPLAY1", is_primary=True)
+SIDE = FakeMonitor(5760, 0, 1920, 1080, name="\\\\.\\DISPLAY2")
+
+
+# ---------------------------------------------------------------------------
+# Grid detection
+# ---------------------------------------------------------------------------
+
+
+def test_parse_size():
+    assert parse_size("1920x1080") == (1920, 1080)
+    assert parse_size(" 3840 X 2160 ") == (3840, 2160)
+    assert parse_size("") is None
+    assert parse_size("0x1080") is None
+    assert parse_size("wide") is None
+
+
+def test_common_sizes_tile_a_wall_and_single_monitors_stay_whole():
+    # 3 x 2 full HD panels; the largest size that tiles the surface wins
+    assert detect_grid(WALL) == Grid(3, 2, 1920, 1080, 0, 0)
+    assert detect_grid(FakeMonitor(0, 0, 7680, 2160)) == Grid(2, 1, 3840, 2160, 0, 0)
+    assert detect_grid(FakeMonitor(0, 0, 3840, 2160)) is None
+    assert detect_grid(FakeMonitor(0, 0, 5120, 1440)) is None
+    assert detect_grid(FakeMonitor(0, 0, 1080, 1920)) is None
+    assert detect_grid(FakeMonitor(0, 0, 1000, 700)) is None
+
+
+def test_panel_size_forces_the_split_and_allows_for_bezels():
+    # A 4K monitor is two 1920x2160 panels if the administrator says so
+    assert detect_grid(FakeMonitor(0, 0, 3840, 2160), (1920, 2160)) == Grid(2, 1, 1920, 2160, 0, 0)
+    # Three panels with 60 px of bezel compensation between them
+    assert detect_grid(FakeMonitor(0, 0, 5880, 1080), (1920, 1080)) == Grid(3, 1, 1920, 1080, 60, 0)
+    # Gaps that are uneven or wider than a bezel are not a grid
+    assert detect_grid(FakeMonitor(0, 0, 5881, 1080), (1920, 1080)) is None
+    assert detect_grid(FakeMonitor(0, 0, 6500, 1080), (1920, 1080)) is None
+
+
+def test_panels_are_named_after_the_surface():
+    bezel = FakeMonitor(100, 0, 3900, 1080, name="\\\\.\\DISPLAY3", is_primary=True)
+
+    left, right = expand([bezel], "Panel", "1920x1080")
+
+    assert (left.x, left.width, left.name, left.is_primary) == (100, 1920, "\\\\.\\DISPLAY3/0,0", True)
+    assert (right.x, right.width, right.name, right.is_primary) == (2080, 1920, "\\\\.\\DISPLAY3/1,0", False)
+    assert expand([bezel], "surface", "1920x1080") == [bezel]
+
+
+def test_dry_run_plans_one_banner_per_panel():
+    settings = BannerSettings()
+    settings.update_from_registry({"SpannedSurfaces": "panel"})
+
+    plans = plan_monitors(settings, FakeMonitorManager([WALL, SIDE]))
+
+    assert len(plans) == 7
+
+
+# ---------------------------------------------------------------------------
+# Switching SpannedSurfaces
+# ---------------------------------------------------------------------------
+
+
+def test_switching_to_panels_only_replaces_the_wall_banner():
+    scheduler = VirtualScheduler()
+    factory = FakeWindowFactory(scheduler)
+    registry = FakeRegistryManager({"Classification": "SECRET", "Enabled": 1})
+    banner = ClassificationBanner(
+        registry_manager=registry,
+        monitor_manager=FakeMonitorManager([WALL, SIDE]),
+        scheduler=scheduler,
+        window_factory=factory,
+    )
+    side = banner.windows_by_id[f"name:{SIDE.name}"]
+    assert len(banner.windows) == 2
+
+    registry.values["SpannedSurfaces"] = "panel"
+    banner._check_registry_changes()
+
+    assert banner.rebuild_count == 0
+    assert (factory.created, factory.destroyed) == (2 + 6, 1)
+    assert banner.windows_by_id[f"name:{SIDE.name}"] is side
+    assert sorted(banner.windows_by_id)[:2] == ["name:\\\\.\\DISPLAY1/0,0", "name:\\\\.\\DISPLAY1/0,1"]
+    assert [w.monitor.width for w in banner.windows] == [1920] * 7
+    # The six new banners are reserved in one transaction
+    assert factory.appbar_transactions == 2
+
+    registry.values["SpannedSurfaces"] = "surface"
+    banner._check_registry_changes()
+
+    assert banner.rebuild_count == 0
+    assert len(banner.windows) == 2 and banner.windows_by_id[f"name:{SIDE.name}"] is side
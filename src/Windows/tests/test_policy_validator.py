@@ -0,0 +1,180 @@
+# tests/test_policy_validator.py
+#
+# Pytest coverage for the offline .reg / Registry.pol validator. Runs on any
+# platform: the validator never touches winreg.
+
+import os
+import struct
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+from classification_banner.constants import COLOR_SCHEMES
+from classification_banner.policy_validator import (
+    POL_SIGNATURE,
+    REG_DWORD,
+    REG_MULTI_SZ,
+    REG_SZ,
+    expand_paths,
+    main,
+    parse_pol,
+    parse_reg,
+    validate_file,
+    validate_files,
+)
+from classification_banner.registry_manager import apply_color_schemes, decode_values
+
+REGISTRY_FILES = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "Registry Files")
+)
+
+
+def _pol_entry(key, name, kind, data):
+    def text(s):
+        return (s + "\x00").encode("utf-16-le")
+
+    return (
+        "[".encode("utf-16-le") + text(key) + ";".encode("utf-16-le")
+        + text(name) + ";".encode("utf-16-le")
+        + struct.pack("<I", kind) + ";".encode("utf-16-le")
+        + struct.pack("<I", len(data)) + ";".encode("utf-16-le")
+        + data + "]".encode("utf-16-le")
+    )
+
+
+# ---------------------------------------------------------------------------
+# Shared decoding
+# ---------------------------------------------------------------------------
+
+
+def test_decode_values_matches_live_read_semantics():
+    decoded = decode_values({
+        "Classification": "SECRET",
+        "Caveats": "",
+        "Enabled": 1,
+        "ShowHostname": 0,
+        "MarkingRules": "a\nb",
+    })
+
+    assert decoded["Classification"] == "SECRET"
+    # Empty strings and absent values both decode to None
+    assert decoded["Caveats"] is None
+    assert decoded["FPCON"] is None
+    assert decoded["Enabled"] == 1
+    assert decoded["ShowHostname"] is False
+    assert decoded["ShowUsername"] is None
+    assert decoded["MarkingRules"] == ["a", "b"]
+
+
+def test_apply_color_schemes_tolerates_missing_classification():
+    assert apply_color_schemes(decode_values({})) == decode_values({})
+
+
+# ---------------------------------------------------------------------------
+# Parsers
+# ---------------------------------------------------------------------------
+
+
+def test_parse_reg_reads_shipped_files():
+    hives = parse_reg(os.path.join(REGISTRY_FILES, "SECRET.reg"))
+
+    values = hives["HKEY_CURRENT_USER"]
+    assert values["Classification"] == "SECRET"
+    assert values["Enabled"] == 1
+    assert values["ShowIPAddress"] == 1
+
+
+def test_parse_reg_handles_utf16_continuations_and_hklm_precedence(tmp_path):
+    path = tmp_path / "export.reg"
+    text = (
+        "Windows Registry Editor Version 5.00\r\n\r\n"
+        "[HKEY_CURRENT_USER\\SOFTWARE\\ClassificationBanner]\r\n"
+        "\"Classification\"=\"CUI\"\r\n\r\n"
+        "[HKEY_LOCAL_MACHINE\\SOFTWARE\\ClassificationBanner]\r\n"
+        "\"Classification\"=\"SECRET\"\r\n"
+        "\"Caveats\"=\"A \\\"quoted\\\" caveat\"\r\n"
+        "\"MarkingRules\"=hex(7):61,00,00,00,\\\r\n"
+        "  62,00,00,00,00,00\r\n"
+        "[HKEY_LOCAL_MACHINE\\SOFTWARE\\Other]\r\n"
+        "\"Classification\"=\"IGNORED\"\r\n"
+    )
+    path.write_bytes(b"\xff\xfe" + text.encode("utf-16-le"))
+
+    hives = parse_reg(str(path))
+    assert hives["HKEY_LOCAL_MACHINE"]["Caveats"] == 'A "quoted" caveat'
+    assert hives["HKEY_LOCAL_MACHINE"]["MarkingRules"] == ["a", "b"]
+
+    result = validate_file(str(path))
+    assert result.valid
+    assert result.hive == "HKEY_LOCAL_MACHINE"
+    assert result.classification_text == 'SECRET//A "quoted" caveat'
+    assert any("several hives" in w for w in result.warnings)
+
+
+def test_parse_pol_reads_entries_and_deletions(tmp_path):
+    key = r"Software\ClassificationBanner"
+    path = tmp_path / "Registry.pol"
+    path.write_bytes(
+        POL_SIGNATURE
+        + _pol_entry(r"Software\Policies\Other", "Classification", REG_SZ,
+                     "IGNORED\x00".encode("utf-16-le"))
+        + _pol_entry(key, "Classification", REG_SZ, "TOP SECRET\x00".encode("utf-16-le"))
+        + _pol_entry(key, "Enabled", REG_DWORD, struct.pack("<I", 1))
+        + _pol_entry(key, "FPCON", REG_SZ, "Alpha\x00".encode("utf-16-le"))
+        + _pol_entry(key, "MarkingRules", REG_MULTI_SZ, "x\x00y\x00\x00".encode("utf-16-le"))
+        + _pol_entry(key, "**del.FPCON", REG_SZ, b"\x00\x00")
+    )
+
+    values = parse_pol(str(path))[""]
+    assert values == {"Classification": "TOP SECRET", "Enabled": 1, "MarkingRules": ["x", "y"]}
+
+    result = validate_file(str(path))
+    assert result.valid
+    assert result.classification_text == "TOP SECRET"
+    assert result.bg_color == COLOR_SCHEMES["TOP SECRET"]["bg"]
+
+
+def test_truncated_pol_is_invalid(tmp_path):
+    path = tmp_path / "Registry.pol"
+    entry = _pol_entry(r"Software\ClassificationBanner", "Enabled", REG_DWORD,
+                       struct.pack("<I", 1))
+    path.write_bytes(POL_SIGNATURE + entry[:-6])
+
+    result = validate_file(str(path))
+    assert result.valid is False
+    assert result.errors
+
+
+# ---------------------------------------------------------------------------
+# Validation
+# ---------------------------------------------------------------------------
+
+
+def test_validate_file_reports_decoding_errors(tmp_path):
+    path = tmp_path / "bad.reg"
+    path.write_text(
+        "Windows Registry Editor Version 5.00\n\n"
+        "[HKEY_CURRENT_USER\\SOFTWARE\\ClassificationBanner]\n"
+        "\"Enabled\"=\"yes\"\n"
+    )
+
+    result = validate_file(str(path))
+    assert result.valid is False
+    assert "cannot decode" in result.errors[0]
+
+
+def test_validate_files_in_parallel_matches_serial():
+    paths = expand_paths([REGISTRY_FILES])
+    assert len(paths) >= 2
+
+    assert validate_files(paths, jobs=2) == validate_files(paths, jobs=1)
+
+
+def test_main_exit_code_reflects_invalid_files(tmp_path, capsys):
+    missing = tmp_path / "empty.reg"
+    missing.write_text("")
+
+    assert main([REGISTRY_FILES]) == 0
+    assert main([REGISTRY_FILES, str(missing), "--json"]) == 1
+    assert '"valid": false' in capsys.readouterr().out
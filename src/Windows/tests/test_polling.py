@@ -0,0 +1,141 @@
+# tests/test_polling.py
+#
+# Pytest coverage for the adaptive registry poll interval, driven by the
+# virtual scheduler: backoff up to the ceiling, the burst window after a
+# change, and the wake-up rate over an hour.
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+from classification_banner.banner import ClassificationBanner
+from classification_banner.constants import (
+    CHECK_BURST_DURATION,
+    DEFAULT_CHECK_INTERVAL,
+    DEFAULT_MAX_CHECK_INTERVAL,
+    DEFAULT_MIN_CHECK_INTERVAL,
+)
+from classification_banner.fakes import FakeMonitorManager, FakeRegistryManager, FakeWindowFactory, make_monitor_row
+from classification_banner.polling import HOUR_MS, AdaptivePoller
+from classification_banner.scheduler import VirtualScheduler
+
+
+class PollLoop:
+    """Polls on a virtual scheduler, reporting a change at chosen times"""
+
+    def __init__(self, change_at=()):
+        self.scheduler = VirtualScheduler()
+        self.poller = AdaptivePoller(clock=self.scheduler.clock)
+        self.change_at = sorted(change_at)
+        self.intervals = []
+        self.scheduler.schedule("registry", self.poller.current_interval, self.poll)
+
+    def poll(self):
+        changed = bool(self.change_at) and self.scheduler.now_ms >= self.change_at[0]
+        if changed:
+            self.change_at.pop(0)
+        self.intervals.append(self.poller.record(changed))
+        self.scheduler.schedule("registry", self.intervals[-1], self.poll)
+
+
+# ---------------------------------------------------------------------------
+# Backoff and burst mode
+# ---------------------------------------------------------------------------
+
+
+def test_stable_configuration_doubles_the_interval_up_to_the_cap():
+    loop = PollLoop()
+
+    loop.scheduler.advance(HOUR_MS)
+
+    assert loop.intervals[:6] == [30000, 60000, 120000, 240000, 300000, 300000]
+    assert set(loop.intervals[4:]) == {DEFAULT_MAX_CHECK_INTERVAL}
+
+
+def test_change_polls_at_the_minimum_for_the_burst_window_then_backs_off_again():
+    loop = PollLoop(change_at=[HOUR_MS])
+    loop.scheduler.advance(HOUR_MS)
+    stable = len(loop.intervals)
+
+    # The first poll after the change drops straight to the minimum
+    loop.scheduler.advance(DEFAULT_MAX_CHECK_INTERVAL)
+    assert loop.intervals[stable] == DEFAULT_MIN_CHECK_INTERVAL
+    assert loop.poller.in_burst
+    changed_ms = loop.scheduler.now_ms - (len(loop.intervals) - stable - 1) * DEFAULT_MIN_CHECK_INTERVAL
+
+    loop.scheduler.run_until(changed_ms + CHECK_BURST_DURATION + DEFAULT_MAX_CHECK_INTERVAL)
+
+    burst = loop.intervals[stable:]
+    fast = burst.index(DEFAULT_CHECK_INTERVAL)
+    # Every poll within the burst window, then the base interval and backoff
+    assert set(burst[:fast]) == {DEFAULT_MIN_CHECK_INTERVAL}
+    assert fast == CHECK_BURST_DURATION // DEFAULT_MIN_CHECK_INTERVAL
+    assert burst[fast:fast + 3] == [DEFAULT_CHECK_INTERVAL, 30000, 60000]
+    assert not loop.poller.in_burst
+
+
+def test_another_change_during_the_burst_extends_it():
+    scheduler = VirtualScheduler()
+    poller = AdaptivePoller(clock=scheduler.clock)
+
+    poller.record(True)
+    scheduler.advance(CHECK_BURST_DURATION // 2)
+    poller.record(True)
+    scheduler.advance(CHECK_BURST_DURATION // 2 + 1000)
+    assert poller.record(False) == DEFAULT_MIN_CHECK_INTERVAL
+
+    scheduler.advance(CHECK_BURST_DURATION // 2)
+    assert poller.record(False) == DEFAULT_CHECK_INTERVAL
+
+
+def test_configure_clamps_the_current_interval():
+    poller = AdaptivePoller(clock=lambda: 0)
+    for _ in range(10):
+        poller.record(False)
+    assert poller.current_interval == DEFAULT_MAX_CHECK_INTERVAL
+
+    poller.configure(base_interval=1000, min_interval=5000, max_interval=60000)
+
+    assert (poller.base_interval, poller.min_interval, poller.current_interval) == (5000, 5000, 60000)
+    assert poller.record(False) == 60000
+
+
+# ---------------------------------------------------------------------------
+# Wake-ups
+# ---------------------------------------------------------------------------
+
+
+def test_wakeups_per_hour_counts_the_last_hour():
+    loop = PollLoop()
+    assert loop.poller.wakeups_per_hour() == 0.0
+
+    # Within the first hour the rate is extrapolated from the uptime
+    loop.scheduler.advance(HOUR_MS // 2)
+    assert loop.poller.wakeups_per_hour() == len(loop.intervals) * 2
+
+    loop.scheduler.advance(5 * HOUR_MS)
+    # Twelve polls an hour at the five-minute cap
+    assert loop.poller.wakeups_per_hour() == HOUR_MS // DEFAULT_MAX_CHECK_INTERVAL
+
+
+def test_banner_registry_timer_follows_the_poller():
+    scheduler = VirtualScheduler()
+    registry = FakeRegistryManager({"Classification": "SECRET", "Enabled": 1})
+    ClassificationBanner(
+        registry_manager=registry,
+        monitor_manager=FakeMonitorManager(make_monitor_row(1)),
+        scheduler=scheduler,
+        window_factory=FakeWindowFactory(scheduler),
+    )
+
+    scheduler.advance(HOUR_MS)
+    stable = scheduler.fired["registry"]
+    registry.values["Classification"] = "TOP SECRET"
+    scheduler.advance(DEFAULT_MAX_CHECK_INTERVAL + CHECK_BURST_DURATION)
+
+    # Polls at 15, 45, 105, 225 and 465 s, then every 300 s
+    assert stable == 5 + (HOUR_MS - 465000) // DEFAULT_MAX_CHECK_INTERVAL
+    # The poll that sees the change, then one every 2 s for the burst window
+    assert scheduler.fired["registry"] - stable >= 1 + CHECK_BURST_DURATION // DEFAULT_MIN_CHECK_INTERVAL
@@ -0,0 +1,137 @@
+# tests/test_profiler.py
+#
+# Pytest coverage for on-demand profiling: which ProfileSeconds values and
+# named-event signals start a profile, the bounded window on the virtual
+# scheduler, the written reports, and the fallback when the output
+# directory is not writable.
+
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+from classification_banner.banner import ClassificationBanner
+from classification_banner.constants import DEFAULT_PROFILE_SECONDS, PROFILE_MAX_SECONDS
+from classification_banner.fakes import FakeMonitorManager, FakeRegistryManager, FakeWindowFactory, make_monitor_row
+from classification_banner.profiler import WAIT_OBJECT_0, ProfileController
+from classification_banner.scheduler import VirtualScheduler
+
+
+class FakeKernel32:
+    """Named event whose signalled state is set by hand"""
+
+    def __init__(self):
+        self.signalled = False
+        self.closed = []
+
+    def WaitForSingleObject(self, handle, timeout):
+        signalled, self.signalled = self.signalled, False
+        return WAIT_OBJECT_0 if signalled else 0x102
+
+    def CloseHandle(self, handle):
+        self.closed.append(handle)
+
+
+def make_controller(tmp_path, **kwargs):
+    scheduler = VirtualScheduler()
+    return scheduler, ProfileController(scheduler, output_dir=str(tmp_path), event_name=None, **kwargs)
+
+
+# ---------------------------------------------------------------------------
+# Triggers
+# ---------------------------------------------------------------------------
+
+
+def test_only_a_new_profile_seconds_value_starts_a_profile(tmp_path, monkeypatch):
+    scheduler, profiler = make_controller(tmp_path, initial_seconds=30)
+    started = []
+    monkeypatch.setattr(profiler, "start", started.append)
+
+    # Present at startup, unchanged, or cleared
+    assert not profiler.check(30)
+    assert not profiler.check(0)
+    # Set again after being cleared, then changed
+    assert profiler.check(30)
+    assert not profiler.check(30)
+    assert profiler.check(45)
+    assert started == [30, 45]
+
+
+def test_signalled_event_starts_the_default_window(tmp_path, monkeypatch):
+    scheduler, profiler = make_controller(tmp_path)
+    profiler._kernel32 = FakeKernel32()
+    profiler._event = 7
+    started = []
+    monkeypatch.setattr(profiler, "start", started.append)
+
+    assert not profiler.check()
+    profiler._kernel32.signalled = True
+    assert profiler.check()
+    assert started == [DEFAULT_PROFILE_SECONDS]
+
+    profiler.close()
+    assert profiler._kernel32.closed == [7] and profiler._event is None
+
+
+def test_no_second_profile_while_one_is_running(tmp_path):
+    scheduler, profiler = make_controller(tmp_path)
+
+    assert profiler.check(5)
+    assert not profiler.check(6)
+    profiler.stop()
+
+
+# ---------------------------------------------------------------------------
+# Profile window
+# ---------------------------------------------------------------------------
+
+
+def test_profile_stops_on_the_scheduler_and_writes_reports(tmp_path):
+    scheduler, profiler = make_controller(tmp_path)
+    tracing = tracemalloc.is_tracing()
+
+    profiler.start(PROFILE_MAX_SECONDS + 100)
+    assert profiler.active and tracemalloc.is_tracing()
+    scheduler.advance(PROFILE_MAX_SECONDS * 1000 - 1)
+    assert profiler.active
+
+    scheduler.advance(1)
+
+    assert not profiler.active
+    assert tracemalloc.is_tracing() == tracing
+    report = profiler.last_report
+    assert os.path.dirname(report) == str(tmp_path)
+    assert os.path.exists(report[:-len(".txt")] + ".prof")
+    with open(report, encoding="utf-8") as text:
+        contents = text.read()
+    assert contents.startswith("Profile window:")
+    assert "Top allocations by line:" in contents
+    assert profiler.stop() is None
+
+
+def test_unwritable_output_directory_falls_back_to_temp(tmp_path, monkeypatch):
+    scheduler, profiler = make_controller(tmp_path)
+    monkeypatch.setattr(os, "access", lambda path, mode: path != str(tmp_path))
+
+    assert profiler._writable_base("report") == os.path.join(tempfile.gettempdir(), "report")
+
+
+def test_registry_poll_triggers_the_profiler():
+    scheduler = VirtualScheduler()
+    registry = FakeRegistryManager({"Classification": "SECRET", "Enabled": 1})
+    banner = ClassificationBanner(
+        registry_manager=registry,
+        monitor_manager=FakeMonitorManager(make_monitor_row(1)),
+        scheduler=scheduler,
+        window_factory=FakeWindowFactory(scheduler),
+    )
+    started = []
+    banner.profiler.start = started.append
+
+    registry.values["ProfileSeconds"] = 20
+    banner._check_registry_changes()
+
+    assert started == [20]
@@ -0,0 +1,126 @@
+# tests/test_replay.py
+#
+# Pytest coverage for recording and replaying banner inputs: compact traces,
+# the per-event results of a replay, identical results from repeated replays
+# of one trace, and a trace that disables the banner.
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+from classification_banner.banner import ClassificationBanner
+from classification_banner.fakes import FakeMonitorManager, FakeRegistryManager, FakeWindowFactory, make_monitor_row
+from classification_banner.replay import (
+    EventRecorder,
+    RecordingMonitorManager,
+    RecordingRegistryManager,
+    Replayer,
+    TraceEvent,
+    load_trace,
+)
+from classification_banner.scheduler import VirtualScheduler
+
+SETTINGS = {"Classification": "SECRET", "Enabled": 1}
+
+
+def record_session(path):
+    """Run a banner on fake backends for a few minutes, recording its inputs"""
+    scheduler = VirtualScheduler()
+    recorder = EventRecorder(path, clock=scheduler.clock)
+    registry = FakeRegistryManager(SETTINGS)
+    monitors = FakeMonitorManager(make_monitor_row(2))
+    ClassificationBanner(
+        registry_manager=RecordingRegistryManager(registry, recorder),
+        monitor_manager=RecordingMonitorManager(monitors, recorder),
+        scheduler=scheduler,
+        window_factory=FakeWindowFactory(scheduler),
+    )
+    scheduler.advance(60000)
+    registry.values["Classification"] = "TOP SECRET"
+    scheduler.advance(60000)
+    monitors.monitors = make_monitor_row(3)
+    scheduler.advance(60000)
+    recorder.close()
+
+
+def comparable(replayer):
+    """Everything a replay reports except the host CPU time"""
+    return [result._replace(cpu_ms=0.0) for result in replayer.results], dict(replayer.scheduler.fired)
+
+
+# ---------------------------------------------------------------------------
+# Recording
+# ---------------------------------------------------------------------------
+
+
+def test_unchanged_snapshots_are_recorded_as_ticks(tmp_path):
+    path = str(tmp_path / "trace.jsonl")
+    record_session(path)
+
+    events = load_trace(path)
+
+    assert events[:2] == [
+        TraceEvent(0, "registry", SETTINGS),
+        TraceEvent(0, "monitors", [[0, 0, 1920, 1080, "\\\\.\\DISPLAY1"], [1920, 0, 1920, 1080, "\\\\.\\DISPLAY2"]]),
+    ]
+    changed = [(e.kind, e.data) for e in events[2:] if e.data is not None]
+    assert [kind for kind, _ in changed] == ["registry", "monitors"]
+    assert changed[0][1]["Classification"] == "TOP SECRET"
+    assert [e.time_ms for e in events] == sorted(e.time_ms for e in events)
+
+
+def test_load_trace_orders_events_and_skips_blank_lines(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    path.write_text("\n".join(json.dumps(record) for record in [
+        [500, "registry", None], [0, "registry", SETTINGS], [250, "session", "lock"],
+    ]) + "\n\n", encoding="utf-8")
+
+    assert [(e.time_ms, e.kind) for e in load_trace(str(path))] == [(0, "registry"), (250, "session"), (500, "registry")]
+
+
+# ---------------------------------------------------------------------------
+# Replay
+# ---------------------------------------------------------------------------
+
+
+def test_replay_measures_each_changed_input():
+    events = [
+        TraceEvent(0, "registry", SETTINGS),
+        TraceEvent(0, "monitors", [[0, 0, 1920, 1080, "A"]]),
+        TraceEvent(31000, "monitors", [[0, 0, 1920, 1080, "A"], [1920, 0, 1920, 1080, "B"]]),
+    ]
+
+    result, = Replayer(events).run()
+
+    assert (result.time_ms, result.kind, result.appbar_registrations) == (31000, "monitors", 1)
+    # Read by the next two-second monitor check
+    assert result.latency_ms == 1000
+
+
+def test_replaying_a_trace_twice_gives_the_same_results(tmp_path):
+    path = str(tmp_path / "trace.jsonl")
+    record_session(path)
+
+    first = Replayer(load_trace(path))
+    first.run()
+    second = Replayer(load_trace(path))
+    second.run()
+
+    assert first.results and comparable(first) == comparable(second)
+
+
+def test_trace_that_disables_the_banner_ends_the_replay():
+    events = [
+        TraceEvent(0, "registry", SETTINGS),
+        TraceEvent(20000, "registry", {**SETTINGS, "Enabled": 0}),
+        TraceEvent(900000, "registry", {**SETTINGS, "Classification": "TOP SECRET"}),
+    ]
+    replayer = Replayer(events)
+
+    results = replayer.run()
+
+    assert replayer.exited
+    assert [(r.time_ms, r.latency_ms is not None) for r in results] == [(20000, True)]
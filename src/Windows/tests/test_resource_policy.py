@@ -0,0 +1,158 @@
+# tests/test_resource_policy.py
+#
+# Pytest coverage for the background resource policy. The Win32 calls go
+# through FakeWin32, so the policy logic runs on any platform.
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+from classification_banner import win32
+from classification_banner.banner import ClassificationBanner
+from classification_banner.constants import RESOURCE_POLICY_DELAY
+from classification_banner.fakes import (
+    FakeMonitorManager,
+    FakeRegistryManager,
+    FakeWindowFactory,
+)
+from classification_banner.resource_policy import (
+    BELOW_NORMAL_PRIORITY_CLASS,
+    NORMAL_PRIORITY_CLASS,
+    NullResourceOS,
+    ResourcePolicy,
+    Win32ResourceOS,
+)
+from classification_banner.scheduler import VirtualScheduler
+from classification_banner.settings import BannerSettings
+
+
+class RecordingResourceOS(NullResourceOS):
+    def __init__(self):
+        self.calls = []
+
+    def set_power_throttling(self, enabled):
+        self.calls.append(("eco_qos", enabled))
+
+    def set_cpu_priority(self, low):
+        self.calls.append(("cpu", low))
+
+    def set_io_priority(self, low):
+        self.calls.append(("io", low))
+
+    def set_memory_priority(self, low):
+        self.calls.append(("memory", low))
+
+    def trim_working_set(self):
+        self.calls.append(("trim", None))
+
+
+@pytest.fixture
+def fake():
+    fake = win32.use_fake()
+    yield fake
+    win32.reset()
+
+
+# ---------------------------------------------------------------------------
+# ResourcePolicy
+# ---------------------------------------------------------------------------
+
+
+def test_policy_applies_each_step_once_and_reverts_on_change():
+    resource_os = RecordingResourceOS()
+    policy = ResourcePolicy(resource_os)
+    settings = BannerSettings()
+
+    assert policy.configure(settings) == [
+        "eco_qos", "low_cpu_priority", "low_io_priority", "low_memory_priority"]
+    # Unchanged settings do not reach the OS again
+    assert policy.configure(settings) == []
+    assert len(resource_os.calls) == 4
+
+    settings.low_io_priority = False
+    assert policy.configure(settings) == ["low_io_priority"]
+    assert resource_os.calls[-1] == ("io", False)
+    assert "low_io_priority=off" in policy.report()
+
+
+def test_disabled_steps_are_never_called():
+    resource_os = RecordingResourceOS()
+    settings = BannerSettings()
+    settings.eco_qos = False
+    settings.trim_working_set = False
+
+    policy = ResourcePolicy(resource_os)
+    policy.configure(settings)
+
+    assert ("eco_qos", True) not in resource_os.calls
+    assert policy.status["eco_qos"] == "off"
+    assert policy.trim(settings, "startup") is False
+
+
+def test_refused_step_is_reported_and_not_retried(fake):
+    fake.results["SetPriorityClass"] = OSError(5, "Access is denied")
+    policy = ResourcePolicy(Win32ResourceOS())
+    settings = BannerSettings()
+
+    policy.configure(settings)
+    policy.configure(settings)
+
+    assert len(fake.called("SetPriorityClass")) == 1
+    assert policy.status["low_cpu_priority"].startswith("failed")
+    assert policy.status["eco_qos"] == "on"
+
+
+def test_win32_interface_passes_expected_arguments(fake):
+    resource_os = Win32ResourceOS()
+
+    resource_os.set_cpu_priority(True)
+    resource_os.set_cpu_priority(False)
+    assert [args[1] for args in fake.called("SetPriorityClass")] == [
+        BELOW_NORMAL_PRIORITY_CLASS, NORMAL_PRIORITY_CLASS]
+
+    resource_os.set_power_throttling(True)
+    state = fake.called("SetProcessInformation")[-1][2]._obj
+    assert (state.Version, state.ControlMask, state.StateMask) == (1, 1, 1)
+
+    resource_os.trim_working_set()
+    assert len(fake.called("K32EmptyWorkingSet")) == 1
+
+
+# ---------------------------------------------------------------------------
+# Banner integration
+# ---------------------------------------------------------------------------
+
+
+def test_banner_applies_policy_after_first_paint_and_trims_after_rebuild():
+    scheduler = VirtualScheduler()
+    registry = FakeRegistryManager({"Classification": "SECRET", "Enabled": 1})
+    resource_os = RecordingResourceOS()
+    banner = ClassificationBanner(
+        registry_manager=registry,
+        monitor_manager=FakeMonitorManager(),
+        scheduler=scheduler,
+        window_factory=FakeWindowFactory(scheduler),
+        resource_os=resource_os,
+    )
+
+    assert resource_os.calls == []
+    scheduler.advance(RESOURCE_POLICY_DELAY)
+    assert resource_os.calls.count(("trim", None)) == 1
+    assert banner.resource_policy.configured
+
+    # A step switched off in the registry applies without a rebuild
+    registry.values["LowCpuPriority"] = 0
+    scheduler.advance(60_000)
+    assert ("cpu", False) in resource_os.calls
+    assert banner.rebuild_count == 0
+
+    # Showing the (missing) left panel rebuilds the windows
+    registry.values["ShowGroupID"] = 1
+    registry.values["GroupID"] = "GROUP-001"
+    scheduler.advance(60_000)
+    assert banner.rebuild_count == 1
+    assert resource_os.calls.count(("trim", None)) == 2
@@ -0,0 +1,144 @@
+# tests/test_scaling.py
+#
+# Scaling budgets for video walls: the banner's own work per monitor, its
+# timers and its AppBar transactions must not grow faster than the wall; plus
+# the one keep-on-top timer, the fallback monitor, and (under an X server)
+# every banner sharing one Tk interpreter.
+
+import math
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+from classification_banner import monitor_manager as monitor_module
+from classification_banner.banner import ClassificationBanner
+from classification_banner.constants import BANNER_BATCH_SIZE, FALLBACK_MONITOR_SIZE, KEEP_ON_TOP_INTERVAL
+from classification_banner.fakes import FakeMonitorManager, FakeRegistryManager, FakeWindowFactory
+from classification_banner.monitor_manager import MonitorManager
+from classification_banner.scaling import WALL_SETTINGS, budget_for_wall, check_budget, make_wall, measure
+from classification_banner.scheduler import VirtualScheduler
+from screeninfo import ScreenInfoError
+
+# ---------------------------------------------------------------------------
+# Budgets
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize("monitors", [1, 64])
+def test_wall_stays_within_scaling_budget(monitors):
+    report = measure(monitors, repeat=3, hours=0.05)
+
+    assert check_budget(report) == []
+    assert report.startup_transactions == math.ceil(monitors / BANNER_BATCH_SIZE)
+    assert (report.hotplug_windows, report.hotplug_transactions) == (1, 1)
+
+
+def test_timers_do_not_grow_with_the_wall():
+    assert measure(1, repeat=1, hours=0.01).timers == measure(64, repeat=1, hours=0.01).timers
+
+
+def test_check_budget_reports_exceeded_measurements():
+    report = measure(16, repeat=1, hours=0.01)
+    over = report._replace(startup_transactions=2, marking_ms=budget_for_wall(16)["marking_ms"] * 2)
+
+    messages = check_budget(over)
+    assert len(messages) == 2
+    assert "marking_ms" in messages[0] and "startup_transactions" in messages[1]
+
+
+# ---------------------------------------------------------------------------
+# Banner behaviour on a wall
+# ---------------------------------------------------------------------------
+
+
+def test_one_keep_on_top_timer_raises_every_banner():
+    scheduler = VirtualScheduler()
+    factory = FakeWindowFactory(scheduler)
+    banner = ClassificationBanner(
+        registry_manager=FakeRegistryManager(WALL_SETTINGS),
+        monitor_manager=FakeMonitorManager(make_wall(20)),
+        scheduler=scheduler,
+        window_factory=factory,
+    )
+    assert banner.visibility_auditor is None
+    assert factory.keep_on_top_calls == 0
+
+    scheduler.advance(KEEP_ON_TOP_INTERVAL)
+
+    assert scheduler.fired["keep_on_top"] == 1
+    # Both edges of all 20 monitors
+    assert factory.keep_on_top_calls == 40
+
+
+def test_marking_change_repaints_a_wall_without_a_rebuild():
+    scheduler = VirtualScheduler()
+    factory = FakeWindowFactory(scheduler)
+    registry = FakeRegistryManager(WALL_SETTINGS)
+    banner = ClassificationBanner(
+        registry_manager=registry,
+        monitor_manager=FakeMonitorManager(make_wall(64)),
+        scheduler=scheduler,
+        window_factory=factory,
+    )
+
+    registry.values["Classification"] = "TOP SECRET"
+    banner._check_registry_changes()
+
+    assert banner.rebuild_count == 0 and factory.created == 64
+    assert {w.marking[0] for w in banner.windows} == {"TOP SECRET"}
+
+
+def test_fallback_monitor_is_the_screen(monkeypatch):
+    def no_monitors():
+        raise ScreenInfoError("no enumerator")
+
+    class Screen:
+        size = (2560, 1440)
+
+        def screen_size(self):
+            return self.size
+
+    screen = Screen()
+    monkeypatch.setattr(monitor_module, "get_monitors", no_monitors)
+    monkeypatch.setattr("classification_banner.backend.current", lambda: screen)
+
+    monitor, = MonitorManager().get_all_monitors()
+    assert (monitor.x, monitor.y, monitor.width, monitor.height, monitor.is_primary) == (0, 0, 2560, 1440, True)
+
+    screen.size = None
+    monitor, = MonitorManager().get_all_monitors()
+    assert (monitor.width, monitor.height) == FALLBACK_MONITOR_SIZE
+
+
+# ---------------------------------------------------------------------------
+# Real windows under an X server
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.skipif(
+    not os.environ.get("DISPLAY") or sys.platform == "win32",
+    reason="needs an X server, e.g. xvfb-run -a python -m pytest",
+)
+def test_all_banners_share_one_tk_root():
+    tk = pytest.importorskip("tkinter")
+    from classification_banner.resource_policy import NullResourceOS
+
+    banner = ClassificationBanner(
+        registry_manager=FakeRegistryManager(WALL_SETTINGS),
+        monitor_manager=FakeMonitorManager(make_wall(3)),
+        resource_os=NullResourceOS(),
+    )
+    try:
+        assert banner.roots() == [banner.root]
+        surfaces = [surface for window in banner.windows for surface in window.surfaces]
+        assert len(surfaces) == 6
+        assert all(isinstance(surface, tk.Toplevel) for surface in surfaces)
+        assert {surface.tk for surface in surfaces} == {banner.root.tk}
+    finally:
+        banner._close_all_windows()
+        banner._close_root()
+    assert banner.root is None
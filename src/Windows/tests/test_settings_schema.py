@@ -0,0 +1,216 @@
+# tests/test_settings_schema.py
+#
+# Pytest coverage for the declarative settings schema: decoding, malformed
+# and out-of-range values, change classification, in-place updates of the
+# banner, and the ADMX/ADML templates generated from the schema.
+
+import os
+import re
+import sys
+import xml.etree.ElementTree as ET
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+from classification_banner import policy_templates, settings_reference, settings_schema
+from classification_banner.banner import ClassificationBanner
+from classification_banner.fakes import FakeMonitorManager, FakeRegistryManager, FakeWindowFactory
+from classification_banner.scheduler import VirtualScheduler
+from classification_banner.settings import BannerSettings
+from classification_banner.settings_schema import REBUILD, RELAYOUT, REPAINT
+
+PACKAGE_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+RAW = {
+    "Classification": "SECRET",
+    "BackgroundColor": "not a color!",
+    "CPCON": 3,
+    "BannerHeight": 28,
+    "FontSize": 500,
+    "ShowHostname": 1,
+    "MarkingRules": "process:excel.exe=CUI\ntitle:*Secret*=SECRET",
+    "LogTarget": "Both",
+}
+
+
+# ---------------------------------------------------------------------------
+# Generated functions
+# ---------------------------------------------------------------------------
+
+
+def test_decode_converts_by_registry_type():
+    values = settings_schema.decode({"Classification": 0, "FontSize": "12", "ShowHostname": "0", "MarkingRules": []})
+
+    assert values["Classification"] is None
+    assert values["FontSize"] == 12
+    assert values["ShowHostname"] is False
+    assert values["MarkingRules"] is None
+    assert values["Caveats"] is None
+
+
+def test_non_numeric_dword_falls_back_to_the_default():
+    values = settings_schema.decode({"BannerHeight": "tall", "ShowHostname": "yes", "FontSize": 12})
+    assert values["BannerHeight"] == settings_schema.Malformed("tall")
+
+    settings = BannerSettings()
+    settings.banner_height = 40
+    settings.update_from_registry(values)
+
+    assert settings.banner_height == settings_schema.BY_ATTR["banner_height"].default
+    assert settings.show_hostname is False
+    assert settings.font_size == 12
+    assert settings.invalid_values == [("ShowHostname", "yes"), ("BannerHeight", "tall")]
+    assert settings_schema.invalid_values(values) == [
+        "cannot decode ShowHostname 'yes': expected a number (0 or 1)",
+        "cannot decode BannerHeight 'tall': expected a number",
+    ]
+
+
+def test_decode_covers_every_field_and_applies_checks():
+    values = settings_schema.decode(RAW)
+    assert set(values) == set(settings_schema.VALUE_NAMES)
+    assert values["CPCON"] == "3"
+    assert values["MarkingRules"] == ["process:excel.exe=CUI", "title:*Secret*=SECRET"]
+
+    settings = BannerSettings()
+    settings.update_from_registry(values)
+
+    # Layout values are read from the registry now
+    assert settings.banner_height == 28
+    assert settings.log_target == "Both"
+    # Out-of-range and malformed values keep the default
+    assert settings.font_size == settings_schema.BY_ATTR["font_size"].default
+    assert settings.bg_color == settings_schema.BY_ATTR["bg_color"].default
+    assert [name for name, _ in settings.invalid_values] == ["BackgroundColor", "FontSize"]
+    assert settings_schema.invalid_values(values) == [
+        "BackgroundColor 'not a color!' is not a color (#RRGGBB or a Tk color name)",
+        "FontSize 500 is not between 4 and 72",
+    ]
+
+
+def test_changes_are_classified_by_effect():
+    settings = BannerSettings()
+    settings.store_current_state()
+    assert settings.changes() == {}
+
+    settings.classification = "SECRET"
+    settings.fpcon = "Delta"
+    assert settings.changes() == {"classification": REPAINT, "fpcon": REPAINT}
+
+    settings.font_family = "Consolas"
+    assert settings_schema.impact(settings.changes()) == RELAYOUT
+
+    settings.enabled = 0
+    assert settings_schema.impact(settings.changes()) == REBUILD
+
+    # Settings read by their consumer are not diffed
+    settings.store_current_state()
+    settings.check_interval = 1000
+    settings.trim_working_set = False
+    assert settings.has_changed() is False
+
+
+def test_custom_classification_text():
+    settings = BannerSettings()
+    settings.update_from_registry({"Classification": "CUSTOM", "CustomClassification": "PROPRIETARY"})
+    settings.get_classification_text()
+    assert settings.classification_text == "PROPRIETARY"
+
+
+def test_bench_compares_with_the_hand_written_path(capsys):
+    # The reference copy reads the same values the schema does
+    raw = {"Classification": "SECRET", "CPCON": "3", "ShowHostname": 1, "MarkingRules": ["process:a=CUI"]}
+    before, after = BannerSettings(), BannerSettings()
+    settings_reference.update_from_registry(before, settings_reference.decode_values(raw))
+    settings_schema.apply(after, settings_schema.decode(raw))
+    assert settings_reference.current_state(before) == {
+        name: getattr(after, name) for name in settings_reference.current_state(before)
+    }
+
+    assert settings_schema.main(["--bench", "--calls", "10"]) == 0
+    header, *rows, _summary = capsys.readouterr().out.splitlines()
+    assert header.split() == ["before", "after"]
+    assert [row.split()[0] for row in rows] == ["decode", "apply", "diff", "poll"]
+
+
+# ---------------------------------------------------------------------------
+# Banner integration
+# ---------------------------------------------------------------------------
+
+
+def _banner(values):
+    scheduler = VirtualScheduler()
+    registry = FakeRegistryManager(values)
+    factory = FakeWindowFactory(scheduler)
+    banner = ClassificationBanner(
+        registry_manager=registry,
+        monitor_manager=FakeMonitorManager(),
+        scheduler=scheduler,
+        window_factory=factory,
+    )
+    return banner, registry, factory, scheduler
+
+
+def test_malformed_value_does_not_stop_the_registry_poll():
+    banner, registry, factory, scheduler = _banner({"Classification": "SECRET", "Enabled": 1})
+    polls = scheduler.fired["registry"]
+
+    # As RegistryManager decodes text in a DWORD value
+    registry.values.update(settings_schema.decode({"FontSize": "large"}))
+    registry.values["Classification"] = "TOP SECRET"
+    scheduler.advance(60_000)
+
+    assert scheduler.fired["registry"] > polls
+    assert [w.marking[0] for w in factory.live] == ["TOP SECRET"]
+    assert banner.settings.invalid_values == [("FontSize", "large")]
+
+
+def test_repaint_and_relayout_do_not_recreate_windows():
+    banner, registry, factory, scheduler = _banner({"Classification": "SECRET", "Enabled": 1})
+    created = factory.created
+
+    registry.values["Classification"] = "TOP SECRET"
+    registry.values["Caveats"] = "HCS"
+    registry.values["BackgroundColor"] = "#FF8C00"
+    scheduler.advance(60_000)
+    assert [w.marking for w in factory.live] == [("TOP SECRET//HCS", "#FF8C00", "#000000")]
+
+    registry.values["BannerHeight"] = 30
+    scheduler.advance(60_000)
+    window = factory.live[0]
+    assert window.relayouts == 1
+    assert window.rect.bottom - window.rect.top == 30
+
+    assert factory.created == created
+    assert banner.rebuild_count == 0
+    assert banner.in_place_updates == 2
+
+
+# ---------------------------------------------------------------------------
+# Policy templates
+# ---------------------------------------------------------------------------
+
+
+def test_templates_cover_schema_and_resolve_every_reference():
+    admx = policy_templates.render_admx()
+    adml = policy_templates.render_adml()
+    ET.fromstring(admx)
+    resources = ET.fromstring(adml)
+
+    configured = set()
+    for policy in policy_templates.POLICIES:
+        if policy.toggle:
+            configured.add(policy.toggle)
+        configured.update(element.value_name for element in policy.elements)
+    assert configured == set(settings_schema.VALUE_NAMES)
+
+    ns = {"p": "http://schemas.microsoft.com/GroupPolicy/2006/07/PolicyDefinitions"}
+    strings = {s.get("id") for s in resources.iterfind(".//p:string", ns)}
+    presentations = {p.get("id") for p in resources.iterfind(".//p:presentation", ns)}
+    assert set(re.findall(r"\$\(string\.(\w+)\)", admx)) <= strings
+    assert set(re.findall(r"\$\(presentation\.(\w+)\)", admx)) <= presentations
+
+
+def test_checked_in_templates_are_up_to_date():
+    # Regenerate with: python -m classification_banner.policy_templates --output "Group Policy"
+    assert policy_templates.stale_files(os.path.join(PACKAGE_ROOT, "Group Policy")) == []
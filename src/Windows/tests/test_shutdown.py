@@ -0,0 +1,176 @@
+# tests/test_shutdown.py
+#
+# Pytest coverage for the shutdown coordinator: one pass that releases every
+# AppBar and window within the time budget, skipping only the optional steps
+# when the budget is spent; the session-end, disable and signal triggers.
+
+import os
+import signal
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+from classification_banner.banner import ClassificationBanner
+from classification_banner.constants import SHUTDOWN_BUDGET_MS
+from classification_banner.fakes import FakeMonitorManager, FakeRegistryManager, FakeWindowFactory, make_monitor_row
+from classification_banner.scheduler import VirtualScheduler
+from classification_banner.shutdown import ShutdownCoordinator, signal_handler
+
+SETTINGS = {"Classification": "SECRET", "Enabled": 1, "Edges": "both"}
+
+
+def make_banner(monitors=4, values=SETTINGS):
+    scheduler = VirtualScheduler()
+    factory = FakeWindowFactory(scheduler)
+    banner = ClassificationBanner(
+        registry_manager=FakeRegistryManager(values),
+        monitor_manager=FakeMonitorManager(make_monitor_row(monitors)),
+        scheduler=scheduler,
+        window_factory=factory,
+    )
+    return banner, scheduler, factory
+
+
+# ---------------------------------------------------------------------------
+# Release pass
+# ---------------------------------------------------------------------------
+
+
+def test_pass_releases_every_appbar_and_window_within_budget():
+    banner, scheduler, factory = make_banner()
+    assert factory.appbar_registrations == 8
+
+    started = time.perf_counter()
+    report = banner.shutdown.run("logoff")
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    assert factory.appbar_removals == 8
+    assert factory.live == []
+    assert scheduler.pending() == 0
+    assert [name for name, _ in report.steps] == [
+        "update_bus", "timers", "appbars", "windows", "trackers", "watches", "control", "heartbeat",
+        "event_log"]
+    assert report.skipped == () and report.errors == ()
+    assert not report.over_budget
+    assert elapsed_ms < SHUTDOWN_BUDGET_MS
+
+    # Late updates from worker threads go nowhere
+    banner.update_bus.post("ip_address", banner._update_ip_address, "10.0.0.1")
+    assert banner.update_bus.pending() == 0
+
+
+def test_pass_runs_once_whatever_triggers_it():
+    banner, scheduler, factory = make_banner(monitors=2)
+    window = banner.windows[1]
+
+    # WM_SAVE_YOURSELF on any banner shuts the whole process down
+    report = window.on_session_end("session end")
+    assert report.reason == "session end"
+    assert (factory.live, factory.appbar_removals) == ([], 4)
+
+    assert window.on_session_end("close") is report
+    assert banner.shutdown.run("exit") is report
+    assert signal_handler(banner.shutdown)(signal.SIGTERM, None) is None
+    scheduler.advance(0)
+    assert factory.appbar_removals == 4
+
+
+def test_optional_steps_are_skipped_once_the_budget_is_spent():
+    banner, scheduler, factory = make_banner()
+    banner.shutdown = ShutdownCoordinator(banner, budget_ms=20)
+    stop_foreground = banner._stop_foreground_tracking
+
+    def slow_stop():
+        time.sleep(0.05)
+        stop_foreground()
+
+    banner._stop_foreground_tracking = slow_stop
+
+    started = time.perf_counter()
+    report = banner.shutdown.run("logoff")
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    assert factory.appbar_removals == 8 and factory.live == []
+    assert report.skipped == ("watches", "control", "heartbeat", "event_log")
+    assert report.over_budget
+    # The slow step plus the required ones; nothing after it ran
+    assert 50 <= elapsed_ms < 50 + SHUTDOWN_BUDGET_MS
+
+
+def test_failed_step_does_not_keep_appbars_registered():
+    banner, scheduler, factory = make_banner(monitors=2)
+
+    def broken():
+        raise OSError("bus gone")
+
+    banner.update_bus.close = broken
+    report = banner.shutdown.run("logoff")
+
+    assert report.errors == ("update_bus: bus gone",)
+    assert factory.appbar_removals == 4 and factory.live == []
+
+
+def test_disabling_the_banner_uses_the_same_pass():
+    banner, scheduler, factory = make_banner(monitors=2)
+    banner.registry_manager.values["Enabled"] = 0
+
+    banner._check_registry_changes()
+    # The pass runs on the Tk thread once the poll has returned
+    assert not banner.shutdown.started
+    scheduler.advance(0)
+
+    assert banner.shutdown.report.reason == "disabled"
+    assert factory.appbar_removals == 4
+    # The main loop ends with the windows; nothing is left to run
+    assert banner.roots() == [] and scheduler.pending() == 0
+
+
+# ---------------------------------------------------------------------------
+# Signals
+# ---------------------------------------------------------------------------
+
+
+def test_signal_runs_the_pass_on_the_tk_thread():
+    banner, scheduler, factory = make_banner(monitors=1)
+
+    signal_handler(banner.shutdown)(signal.SIGTERM, None)
+    assert banner.shutdown.report is None
+    scheduler.advance(0)
+
+    assert banner.shutdown.report.reason == "SIGTERM"
+    assert factory.live == []
+
+
+# ---------------------------------------------------------------------------
+# Real windows under an X server
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.skipif(
+    not os.environ.get("DISPLAY") or sys.platform == "win32",
+    reason="needs an X server, e.g. xvfb-run -a python -m pytest",
+)
+def test_banner_window_handles_session_end_protocols():
+    pytest.importorskip("tkinter")
+    from classification_banner.banner_window import BannerWindow
+    from classification_banner.fakes import FakeMonitor
+    from classification_banner.settings import BannerSettings
+
+    settings = BannerSettings()
+    settings.update_from_registry(SETTINGS)
+    window = BannerWindow(FakeMonitor(0, 0, 1024, 768), settings, keep_on_top=False)
+    reasons = []
+    window.on_session_end = reasons.append
+    try:
+        for surface in window.surfaces:
+            assert surface.protocol("WM_SAVE_YOURSELF")
+            assert surface.protocol("WM_DELETE_WINDOW")
+        window._on_save_yourself()
+        window._on_close()
+        assert reasons == ["session end", "close"]
+    finally:
+        window.destroy()
@@ -0,0 +1,81 @@
+# tests/test_supervisor.py
+#
+# Pytest coverage for the --supervise watchdog. The child is the module's own
+# deliberately crashing (or hanging) fake child, started as a real process.
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+from classification_banner.supervisor import RestartPolicy, Supervisor, child_command
+
+PACKAGE_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def _fake_child(*args):
+    return [sys.executable, "-m", "classification_banner.supervisor", "--fake-child", "3", *args]
+
+
+def _run(command, restarts, timeout=5.0):
+    cwd = os.getcwd()
+    # The fake child imports the package from the working directory
+    os.chdir(PACKAGE_ROOT)
+    try:
+        supervisor = Supervisor(
+            command,
+            policy=RestartPolicy(min_delay=0.01, max_delay=0.04),
+            heartbeat_timeout=timeout,
+            max_restarts=restarts,
+        )
+        supervisor.run()
+    finally:
+        os.chdir(cwd)
+    return supervisor.restarts
+
+
+# ---------------------------------------------------------------------------
+# RestartPolicy tests
+# ---------------------------------------------------------------------------
+
+
+def test_restart_policy_backs_off_and_resets_after_stable_run():
+    policy = RestartPolicy(min_delay=1, max_delay=4, stable_uptime=60)
+
+    # First failure restarts immediately, then doubles up to the cap
+    assert [policy.next_delay(1) for _ in range(5)] == [0, 1, 2, 4, 4]
+
+    # A healthy run resets the backoff
+    assert policy.next_delay(120) == 0
+    assert policy.next_delay(1) == 1
+
+
+def test_child_command_drops_supervise_flag():
+    command = child_command(["--supervise", "--dry-run"])
+    assert "--supervise" not in command
+    assert command[-1] == "--dry-run"
+
+
+# ---------------------------------------------------------------------------
+# Supervisor tests
+# ---------------------------------------------------------------------------
+
+
+def test_supervisor_restarts_crashing_child_and_measures_downtime():
+    restarts = _run(_fake_child(), restarts=3)
+
+    assert len(restarts) == 3
+    assert all(r.reason == "exited" and r.exit_code == 3 for r in restarts)
+    # Every replacement connected; downtime is exit to first heartbeat
+    measured = [r.downtime for r in restarts[:-1]]
+    assert all(d is not None for d in measured)
+    assert max(measured) < 10
+
+
+def test_supervisor_kills_hung_child():
+    restarts = _run(_fake_child("--hang"), restarts=1, timeout=0.5)
+
+    assert len(restarts) == 1
+    assert restarts[0].reason == "hung"
+    assert restarts[0].exit_code != 0
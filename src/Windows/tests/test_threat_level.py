@@ -0,0 +1,172 @@
+# tests/test_threat_level.py
+#
+# Pytest coverage for the FPCON/CPCON providers, run against local stand-in
+# servers rather than mocks.
+
+import http.server
+import json
+import os
+import socket
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+from classification_banner.constants import THREAT_LEVEL_STALE_MARK
+from classification_banner.threat_level import (
+    FileThreatSource,
+    HttpThreatSource,
+    SocketThreatSource,
+    ThreatLevelProvider,
+    ThreatSource,
+    _StandInHttpHandler,
+    format_threat_levels,
+    make_source,
+    parse_threat_levels,
+)
+
+
+def _status(fpcon, cpcon="1"):
+    return json.dumps({"FPCON": fpcon, "CPCON": cpcon})
+
+
+def _wait_for(provider_source, change, expected, stale_after=60):
+    """Start a provider, apply ``change`` and wait for ``expected`` FPCON"""
+    seen = []
+    arrived = threading.Condition()
+
+    def on_change(levels):
+        with arrived:
+            seen.append(levels)
+            arrived.notify_all()
+
+    provider = ThreatLevelProvider(provider_source, "Alpha", "1", stale_after=stale_after)
+    provider.start(on_change)
+    try:
+        change()
+        with arrived:
+            assert arrived.wait_for(lambda: any(levels.fpcon == expected for levels in seen), timeout=10)
+    finally:
+        provider.stop()
+    return seen
+
+
+# ---------------------------------------------------------------------------
+# Parsing and formatting
+# ---------------------------------------------------------------------------
+
+
+def test_parse_threat_levels_accepts_json_and_key_value():
+    assert parse_threat_levels('{"fpcon": "Bravo", "CPCON": 3}') == {"FPCON": "Bravo", "CPCON": "3"}
+    assert parse_threat_levels("FPCON=Charlie\nother=x\n") == {"FPCON": "Charlie"}
+
+    with pytest.raises(ValueError):
+        parse_threat_levels("nothing useful")
+
+
+def test_format_threat_levels_marks_stale_text():
+    assert format_threat_levels("Alpha", "1") == "FPCON: Alpha | CPCON: 1"
+    assert format_threat_levels("", "2", stale=True) == "CPCON: 2" + THREAT_LEVEL_STALE_MARK
+    assert format_threat_levels("", "", stale=True) == ""
+
+
+def test_make_source_only_accepts_loopback_services():
+    assert make_source("") is None
+    assert make_source("registry") is None
+    assert isinstance(make_source("http://127.0.0.1:8080/status"), HttpThreatSource)
+    assert isinstance(make_source("tcp://localhost:9000"), SocketThreatSource)
+
+    with pytest.raises(ValueError):
+        make_source("http://192.0.2.10/status")
+    with pytest.raises(ValueError):
+        make_source("tcp://127.0.0.1")
+
+
+def test_sources_must_implement_fetch():
+    class NoFetch(ThreatSource):
+        pass
+
+    with pytest.raises(TypeError):
+        NoFetch()
+
+
+# ---------------------------------------------------------------------------
+# Providers against stand-in sources
+# ---------------------------------------------------------------------------
+
+
+def test_file_source_reports_rewritten_status(tmp_path):
+    path = tmp_path / "status.json"
+    path.write_text(_status("Start"))
+
+    seen = _wait_for(
+        FileThreatSource(str(path), poll_interval=0.05),
+        lambda: path.write_text(_status("Delta")),
+        "Delta",
+    )
+    assert seen[-1].display_text() == "FPCON: Delta | CPCON: 1"
+
+
+def test_http_source_reports_new_status_from_stand_in_server():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _StandInHttpHandler)
+    server.status = _status("Start")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/status"
+
+        def change():
+            server.status = _status("Bravo")
+
+        _wait_for(HttpThreatSource(url, poll_interval=0.05), change, "Bravo")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_socket_source_reports_pushed_status():
+    listener = socket.create_server(("127.0.0.1", 0))
+    clients = []
+    accepted = threading.Event()
+
+    def accept():
+        clients.append(listener.accept()[0])
+        accepted.set()
+
+    threading.Thread(target=accept, daemon=True).start()
+    try:
+        def push():
+            assert accepted.wait(10)
+            clients[0].sendall((_status("Charlie") + "\n").encode("utf-8"))
+
+        _wait_for(SocketThreatSource("127.0.0.1", listener.getsockname()[1]), push, "Charlie")
+    finally:
+        for client in clients:
+            client.close()
+        listener.close()
+
+
+def test_provider_marks_unreachable_source_stale():
+    # Nothing listens on this port; the registry values go stale
+    probe = socket.create_server(("127.0.0.1", 0))
+    port = probe.getsockname()[1]
+    probe.close()
+
+    seen = []
+    arrived = threading.Event()
+
+    def on_change(levels):
+        seen.append(levels)
+        if levels.stale:
+            arrived.set()
+
+    provider = ThreatLevelProvider(SocketThreatSource("127.0.0.1", port), "Alpha", "1",
+                                   stale_after=0.1)
+    provider.start(on_change)
+    try:
+        assert arrived.wait(10)
+    finally:
+        provider.stop()
+    assert seen[-1].display_text() == "FPCON: Alpha | CPCON: 1" + THREAT_LEVEL_STALE_MARK
@@ -0,0 +1,122 @@
+# tests/test_update_bus.py
+#
+# Pytest coverage for the coalescing update bus: latest-wins per key, one
+# idle wake per batch, error isolation, the banner's threat level path, and
+# a multi-threaded stress run at thousands of posts per second with bounded
+# UI-loop latency.
+
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+from classification_banner.banner import ClassificationBanner
+from classification_banner.fakes import FakeMonitorManager, FakeRegistryManager, FakeWindowFactory, make_monitor_row
+from classification_banner.scheduler import VirtualScheduler
+from classification_banner.threat_level import ThreatLevels
+from classification_banner.update_bus import UpdateBus, stress
+
+# ---------------------------------------------------------------------------
+# Coalescing
+# ---------------------------------------------------------------------------
+
+
+def test_latest_post_per_key_wins_with_one_wake():
+    scheduler = VirtualScheduler()
+    applied = []
+    batches = []
+    bus = UpdateBus(scheduler.call_idle, on_batch=lambda: batches.append(list(applied)))
+
+    for value in range(1000):
+        bus.post("threat", applied.append, ("threat", value))
+    for value in range(10):
+        bus.post("ip", applied.append, ("ip", value))
+    assert bus.pending() == 2
+
+    scheduler.advance(0)
+    assert scheduler.fired["call_idle"] == 1
+    assert applied == [("threat", 999), ("ip", 9)]
+    assert batches == [applied]
+
+    metrics = bus.metrics()
+    assert (metrics["posted"], metrics["coalesced"], metrics["applied"]) == (1010, 1008, 2)
+    assert (metrics["wakes"], metrics["batches"], metrics["max_depth"]) == (1, 1, 2)
+
+    # The next post wakes the loop again
+    bus.post("ip", applied.append, ("ip", 10))
+    scheduler.advance(0)
+    assert scheduler.fired["call_idle"] == 2
+
+
+def test_failed_wake_is_retried_and_errors_stay_isolated():
+    scheduler = VirtualScheduler()
+    ui = {"up": False}
+    bus = UpdateBus(lambda callback: ui["up"] and scheduler.call_idle(callback))
+    applied = []
+
+    def broken():
+        raise ValueError("bad update")
+
+    bus.post("a", broken)
+    ui["up"] = True
+    bus.rewake()
+    bus.post("b", applied.append, "b")
+    scheduler.advance(0)
+
+    assert applied == ["b"]
+    assert bus.errors == 1
+    assert bus.pending() == 0
+
+
+# ---------------------------------------------------------------------------
+# Banner
+# ---------------------------------------------------------------------------
+
+
+def test_threat_feed_bursts_reach_the_banners_once():
+    scheduler = VirtualScheduler()
+    factory = FakeWindowFactory(scheduler)
+    banner = ClassificationBanner(
+        registry_manager=FakeRegistryManager({"Classification": "SECRET", "Enabled": 1}),
+        monitor_manager=FakeMonitorManager(make_monitor_row(3)),
+        scheduler=scheduler,
+        window_factory=factory,
+    )
+    updates = banner.threat_updates
+
+    def feed():
+        for _ in range(200):
+            banner._on_threat_change(ThreatLevels("Bravo", "2", False, 0.0))
+
+    threads = [threading.Thread(target=feed) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    scheduler.advance(0)
+
+    assert banner.threat_updates == updates + 1
+    assert scheduler.fired["call_idle"] == 1
+    assert {w.threat_text for w in factory.live} == {ThreatLevels("Bravo", "2", False, 0.0).display_text()}
+
+
+# ---------------------------------------------------------------------------
+# Stress
+# ---------------------------------------------------------------------------
+
+
+def test_stress_keeps_ui_latency_and_queue_depth_bounded():
+    producers, keys = 4, 8
+    metrics, posted, applied = stress(rate=5000, seconds=0.5, producers=producers, keys=keys)
+
+    assert metrics["posted"] >= 1000
+    # Nothing is lost: the last value of every key is applied
+    assert applied == posted
+    # Pending work is bounded by the number of keys, not the post rate
+    assert metrics["max_depth"] <= producers * keys
+    assert metrics["max_batch"] <= producers * keys
+    assert metrics["wakes"] == metrics["batches"]
+    # Generous bound for loaded CI machines; typically well under 1 ms
+    assert metrics["latency_max_ms"] < 250
@@ -0,0 +1,147 @@
+# tests/test_visibility.py
+#
+# Pytest coverage for the occlusion geometry and the visibility auditor, on
+# synthetic window lists (no Windows APIs involved).
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+from classification_banner.banner import ClassificationBanner
+from classification_banner.constants import VISIBILITY_CHECK_INTERVAL, VISIBILITY_CPU_BUDGET, VISIBILITY_MAX_INTERVAL
+from classification_banner.fakes import (
+    FakeMonitorManager,
+    FakeRegistryManager,
+    FakeWindowFactory,
+    FakeWindowSource,
+    make_monitor_row,
+)
+from classification_banner.scheduler import VirtualScheduler
+from classification_banner.visibility import (
+    Rect,
+    WindowRecord,
+    _brute_force_coverage,
+    coverage,
+    occlusion,
+    union_area,
+)
+
+HOUR_MS = 3600 * 1000
+
+
+# ---------------------------------------------------------------------------
+# Geometry
+# ---------------------------------------------------------------------------
+
+
+def test_union_area_counts_overlap_once():
+    assert union_area([]) == 0
+    assert union_area([Rect(0, 0, 10, 10), Rect(5, 5, 15, 15)]) == 175
+    assert union_area([Rect(0, 0, 10, 10), Rect(2, 2, 4, 4)]) == 100
+
+
+def test_coverage_matches_brute_force_on_random_cases():
+    rng = random.Random(7)
+    target = Rect(0, 0, 40, 10)
+    for _ in range(200):
+        occluders = [
+            Rect(x, y, x + rng.randint(0, 30), y + rng.randint(0, 12))
+            for x, y in ((rng.randint(-10, 45), rng.randint(-5, 12))
+                         for _ in range(rng.randint(0, 8)))
+        ]
+        assert abs(coverage(target, occluders) - _brute_force_coverage(target, occluders)) < 1e-9
+
+
+def test_occlusion_only_counts_other_processes_above_the_banner():
+    banner = WindowRecord(1, Rect(0, 0, 100, 20), topmost=True, own_process=True)
+    windows = [
+        WindowRecord(2, Rect(0, 0, 50, 20), topmost=True),
+        WindowRecord(3, Rect(50, 0, 100, 20), topmost=True, own_process=True),
+        banner,
+        WindowRecord(4, Rect(0, 0, 100, 20), topmost=False),
+    ]
+
+    result = occlusion(windows, {1: "primary"})["primary"]
+    assert result.fraction == 0.5
+    assert result.occluders == [2]
+
+
+def test_expensive_checks_stretch_the_interval_to_the_cpu_budget():
+    scheduler = VirtualScheduler()
+    factory = FakeWindowFactory(scheduler)
+    source = FakeWindowSource(factory)
+    banner = ClassificationBanner(
+        registry_manager=FakeRegistryManager({"Classification": "SECRET", "Enabled": 1}),
+        monitor_manager=FakeMonitorManager(make_monitor_row(2)),
+        scheduler=scheduler,
+        window_factory=factory,
+        window_source=source,
+    )
+    auditor = banner.visibility_auditor
+    # Every enumeration costs about 4 ms of CPU on the auditor's cost clock
+    # (a binary fraction of a second, so the clock adds up exactly)
+    cpu = [0.0]
+    enumerate_windows = source.enumerate
+
+    def expensive_enumerate(cost=1 / 256):
+        cpu[0] += cost
+        return enumerate_windows()
+
+    source.enumerate = expensive_enumerate
+    auditor.cost_clock = lambda: cpu[0]
+
+    scheduler.advance(HOUR_MS)
+
+    assert auditor.next_interval == int(1000 / 256 / VISIBILITY_CPU_BUDGET)
+    assert auditor.stretched == auditor.checks > 0
+    # The first check runs before its cost is known
+    assert cpu[0] <= VISIBILITY_CPU_BUDGET * HOUR_MS / 1000 + 1 / 256
+
+    # A check costing more than the longest interval allows is capped there
+    source.enumerate = lambda: expensive_enumerate(cost=1 / 16)
+    scheduler.advance(VISIBILITY_MAX_INTERVAL * 10)
+    assert auditor.next_interval == VISIBILITY_MAX_INTERVAL
+
+
+# ---------------------------------------------------------------------------
+# Auditor driving the banner
+# ---------------------------------------------------------------------------
+
+
+def test_banner_is_raised_only_while_covered():
+    scheduler = VirtualScheduler()
+    factory = FakeWindowFactory(scheduler)
+    source = FakeWindowSource(factory)
+    banner = ClassificationBanner(
+        registry_manager=FakeRegistryManager({"Classification": "SECRET", "Enabled": 1}),
+        monitor_manager=FakeMonitorManager(make_monitor_row(2)),
+        scheduler=scheduler,
+        window_factory=factory,
+        window_source=source,
+    )
+    # Checks cost nothing on the cost clock, so they run every interval
+    banner.visibility_auditor.cost_clock = lambda: 0.0
+
+    scheduler.advance(10_000)
+    assert factory.keep_on_top_calls == 0
+    assert banner.visibility_auditor.checks == 10_000 // VISIBILITY_CHECK_INTERVAL
+
+    # Cover half of the first banner
+    first = factory.live[0]
+    source.above.append(WindowRecord(900, Rect(0, 0, 960, 200), topmost=True))
+    scheduler.advance(3_000)
+    raised = factory.keep_on_top_calls
+    assert raised > 0
+
+    stats = banner.visibility_auditor.stats
+    identity = next(i for i, w in banner.windows_by_id.items() if w is first)
+    assert stats[identity].max_fraction == 0.5
+    assert all(s.occluded_checks == 0 for i, s in stats.items() if i != identity)
+
+    source.above.clear()
+    scheduler.advance(10_000)
+    assert factory.keep_on_top_calls == raised
+    assert stats[identity].occluded_since is None
@@ -0,0 +1,224 @@
+# tests/test_watermark.py
+#
+# Pytest coverage for the watermark overlay: the headless renderer (pixels,
+# DPI scaling, caching), uploads only when the marking, opacity or monitor
+# changes, the banner integration on the virtual clock, and the layered
+# window calls on Windows through the Win32 fake.
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+from classification_banner import win32
+from classification_banner.backend import WindowsBackend
+from classification_banner.banner import ClassificationBanner
+from classification_banner.fakes import (
+    FakeMonitor,
+    FakeMonitorManager,
+    FakeOverlayBackend,
+    FakeRegistryManager,
+    FakeWindowFactory,
+    make_monitor_row,
+)
+from classification_banner.overlay_window import OVERLAY_EX_STYLE, ULW_ALPHA, WS_EX_TRANSPARENT
+from classification_banner.scheduler import VirtualScheduler
+from classification_banner.watermark import (
+    CLEAR,
+    WatermarkOverlay,
+    glyph_scale,
+    measure_idle_overlay,
+    monitor_dpi,
+    premultiply,
+    render_tile,
+    render_watermark,
+)
+
+WATERMARK = {"Classification": "SECRET", "BackgroundColor": "#FF0000", "Enabled": 1, "Watermark": 1}
+
+
+def pixels_of(watermark):
+    data = watermark.pixels
+    return {data[i:i + 4] for i in range(0, len(data), 4)}
+
+
+# ---------------------------------------------------------------------------
+# Rendering
+# ---------------------------------------------------------------------------
+
+
+def test_render_is_premultiplied_bgra_of_the_full_monitor():
+    watermark = render_watermark(640, 480, 96, "secret", "#FF8000", 50)
+
+    assert (watermark.width, watermark.height) == (640, 480)
+    assert len(watermark.pixels) == 640 * 480 * 4
+    ink = premultiply("#FF8000", 50)
+    assert ink == bytes((0, 64, 128, 128))
+    assert pixels_of(watermark) == {CLEAR, ink}
+
+    # Lowercase is drawn uppercase; unknown characters and blank text are clear
+    assert render_watermark(640, 480, 96, "SECRET", "#FF8000", 50).pixels == watermark.pixels
+    assert pixels_of(render_watermark(64, 48, 96, "~~", "#FF8000", 50)) == {CLEAR}
+    assert pixels_of(render_watermark(64, 48, 96, " ", "#FF8000", 50)) == {CLEAR}
+
+
+def test_render_scales_with_dpi_and_is_cached():
+    assert glyph_scale(192) == 2 * glyph_scale(96)
+    assert monitor_dpi(FakeMonitor(0, 0, 3840, 2160)) == 96
+    monitor = FakeMonitor(0, 0, 3840, 2160)
+    monitor.width_mm = 508
+    assert monitor_dpi(monitor) == 192
+
+    ink = premultiply("#FFFFFF", 10)
+    low_width, low_rows = render_tile("S", glyph_scale(96), ink)
+    high_width, high_rows = render_tile("S", glyph_scale(192), ink)
+    assert (high_width, len(high_rows)) == (2 * low_width, 2 * len(low_rows))
+
+    low = render_watermark(800, 600, 96, "S", "#FFFFFF", 10)
+    assert render_watermark(800, 600, 192, "S", "#FFFFFF", 10).pixels != low.pixels
+
+    misses = render_watermark.cache_info().misses
+    assert render_watermark(800, 600, 96, "S", "#FFFFFF", 10) is low
+    assert render_watermark.cache_info().misses == misses
+
+
+def test_4k_render_time():
+    render_watermark.cache_clear()
+    started = time.perf_counter()
+    watermark = render_watermark(3840, 2160, 144, "TOP SECRET//SCI", "#FFFF00", 8)
+    elapsed = time.perf_counter() - started
+
+    assert len(watermark.pixels) == 3840 * 2160 * 4
+    # Typically under 10 ms; generous for loaded CI machines
+    assert elapsed < 2.0
+
+
+# ---------------------------------------------------------------------------
+# Overlay
+# ---------------------------------------------------------------------------
+
+
+def test_overlay_uploads_only_when_an_input_changes():
+    backend = FakeOverlayBackend()
+    overlay = WatermarkOverlay(backend, FakeMonitor(0, 0, 1920, 1080))
+
+    assert overlay.update("SECRET", "#FF0000", 8)
+    for _ in range(100):
+        assert not overlay.update("SECRET", "#FF0000", 8)
+    assert not overlay.move_to(FakeMonitor(0, 0, 1920, 1080))
+    assert (overlay.uploads, overlay.skipped) == (1, 101)
+
+    assert overlay.update("TOP SECRET", "#FF8C00", 8)
+    assert overlay.update("TOP SECRET", "#FF8C00", 12)
+    assert overlay.move_to(FakeMonitor(1920, 0, 2560, 1440))
+    handle, x, y, watermark = backend.uploads[-1]
+    assert (x, y, watermark.width, watermark.height) == (1920, 0, 2560, 1440)
+    assert overlay.uploads == 4
+
+    overlay.destroy()
+    overlay.destroy()
+    assert (backend.destroyed, backend.live) == (1, {})
+
+
+def test_overlay_without_backend_support_renders_nothing():
+    class NoOverlays(FakeOverlayBackend):
+        def create_overlay(self, x, y, width, height):
+            return None
+
+    backend = NoOverlays()
+    overlay = WatermarkOverlay(backend, FakeMonitor(0, 0, 1920, 1080))
+    misses = render_watermark.cache_info().misses
+
+    assert not overlay.update("SECRET", "#FF0000", 8)
+    assert backend.uploads == []
+    assert render_watermark.cache_info().misses == misses
+
+
+# ---------------------------------------------------------------------------
+# Banner
+# ---------------------------------------------------------------------------
+
+
+def test_banner_redraws_the_watermark_only_on_change():
+    scheduler = VirtualScheduler()
+    factory = FakeWindowFactory(scheduler)
+    registry = FakeRegistryManager(WATERMARK)
+    render_watermark.cache_clear()
+    banner = ClassificationBanner(
+        registry_manager=registry,
+        monitor_manager=FakeMonitorManager(make_monitor_row(2)),
+        scheduler=scheduler,
+        window_factory=factory,
+    )
+    overlays = factory.overlays
+
+    # Identical monitors share one render
+    assert (overlays.created, len(overlays.uploads)) == (2, 2)
+    assert render_watermark.cache_info().misses == 1
+
+    scheduler.advance(3600 * 1000)
+    assert len(overlays.uploads) == 2
+
+    # Opacity is a repaint, not a rebuild
+    registry.values["WatermarkOpacity"] = 20
+    banner._check_registry_changes()
+    assert banner.rebuild_count == 0
+    assert len(overlays.uploads) == 4
+    assert overlays.uploads[-1][3].pixels.count(premultiply("#FF0000", 20)) > 0
+
+    registry.values["Watermark"] = 0
+    banner._check_registry_changes()
+    assert banner.rebuild_count == 1
+    assert (overlays.destroyed, overlays.live) == (2, {})
+
+
+def test_idle_hour_costs_no_renders_uploads_or_timers():
+    idle = measure_idle_overlay(monitors=2, hours=1.0)
+
+    assert idle["overlays"] == 2
+    assert (idle["renders"], idle["uploads"], idle["extra_callbacks"]) == (0, 0, 0)
+
+
+# ---------------------------------------------------------------------------
+# Windows layered window
+# ---------------------------------------------------------------------------
+
+
+def test_windows_overlay_is_click_through_and_uploaded_once_per_change():
+    fake = win32.use_fake(win32.FakeWin32({"CreateWindowExW": 0x500, "GetDC": 0x10,
+                                           "CreateCompatibleDC": 0x20, "CreateDIBSection": 0x30}))
+    try:
+        backend = WindowsBackend()
+        overlay = WatermarkOverlay(backend, FakeMonitor(-1920, 0, 1920, 1080))
+        overlay.update("SECRET", "#FF0000", 8)
+        overlay.update("SECRET", "#FF0000", 8)
+
+        (create,) = fake.called("CreateWindowExW")
+        assert create[0] == OVERLAY_EX_STYLE and create[0] & WS_EX_TRANSPARENT
+        assert create[4:8] == (-1920, 0, 1920, 1080)
+        (upload,) = fake.called("UpdateLayeredWindow")
+        assert upload[0] == 0x500 and upload[-1] == ULW_ALPHA
+        assert len(fake.called("ShowWindow")) == 1
+        # The window keeps its copy; the DIB and DCs are released at once
+        assert fake.called("DeleteObject") == [(0x30,)]
+        assert fake.called("DeleteDC") == [(0x20,)]
+        assert fake.called("ReleaseDC") == [(None, 0x10)]
+
+        overlay.destroy()
+        assert fake.called("DestroyWindow") == [(0x500,)]
+    finally:
+        win32.reset()
+
+
+def test_windows_overlay_failure_keeps_the_banner_running():
+    fake = win32.use_fake(win32.FakeWin32({"CreateWindowExW": 0x500}))
+    try:
+        overlay = WatermarkOverlay(WindowsBackend(), FakeMonitor(0, 0, 800, 600))
+        # CreateDIBSection returns NULL: logged, nothing shown
+        overlay.update("SECRET", "#FF0000", 8)
+        assert fake.called("UpdateLayeredWindow") == []
+        assert fake.called("ShowWindow") == []
+    finally:
+        win32.reset()
@@ -0,0 +1,101 @@
+# tests/test_win32.py
+#
+# Pytest coverage for the typed Win32 bindings and the AppBar calls made
+# through them. Uses the FakeWin32 implementation, so it runs on any platform.
+
+import ctypes
+import os
+import sys
+from ctypes import wintypes
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+from classification_banner import appbar, win32
+from classification_banner.constants import ABM_NEW, ABM_REMOVE, ABM_SETPOS
+
+# Above 2**32: truncated if passed through an unprototyped C int
+HWND = 0x1_0000_0042
+
+
+@pytest.fixture
+def fake():
+    fake = win32.use_fake()
+    yield fake
+    win32.reset()
+
+
+# ---------------------------------------------------------------------------
+# Bindings
+# ---------------------------------------------------------------------------
+
+
+def test_prototypes_pass_window_handles_pointer_sized():
+    for name, (_dll, _restype, argtypes, _errcheck) in win32.PROTOTYPES.items():
+        assert isinstance(argtypes, list), name
+    assert win32.PROTOTYPES["MoveWindow"][2][0] is wintypes.HWND
+    assert ctypes.sizeof(wintypes.HWND) == ctypes.sizeof(ctypes.c_void_p)
+
+
+def test_real_api_reports_missing_dlls_as_oserror():
+    if sys.platform == "win32":
+        pytest.skip("DLLs are available on Windows")
+    with pytest.raises(OSError):
+        win32.Win32Api().MoveWindow
+
+
+def test_default_api_is_never_the_fake():
+    win32.reset()
+    try:
+        assert isinstance(win32.api(), win32.Win32Api)
+        if sys.platform != "win32":
+            # Off Windows a call fails instead of quietly "succeeding"
+            with pytest.raises(OSError):
+                win32.api().SHAppBarMessage(0, None)
+    finally:
+        win32.reset()
+
+
+def test_unknown_function_is_not_bound(fake):
+    with pytest.raises(AttributeError):
+        fake.ExitWindowsEx
+
+
+def test_check_bool_raises_last_error():
+    with pytest.raises(OSError):
+        win32._check_bool(0, None, ())
+    assert win32._check_bool(5, None, ()) == 5
+
+
+# ---------------------------------------------------------------------------
+# AppBar calls through the bindings
+# ---------------------------------------------------------------------------
+
+
+def test_register_reuses_one_structure_per_window(fake):
+    first = appbar.register_appbar_for_window(HWND, 0, 0, 1920, 30)
+    second = appbar.register_appbar_for_window(HWND, 1920, 0, 2560, 30)
+
+    assert first is second
+    assert [args[0] for args in fake.called("SHAppBarMessage")] == [
+        ABM_NEW, ABM_SETPOS, ABM_NEW, ABM_SETPOS]
+    assert fake.called("MoveWindow")[-1] == (HWND, 1920, 0, 2560, 30, True)
+
+    data = fake.called("SHAppBarMessage")[-1][1]._obj
+    assert data.hWnd == HWND
+    assert data.cbSize == ctypes.sizeof(win32.APPBARDATA)
+
+    appbar.remove_appbar_for_window(HWND)
+    assert fake.called("SHAppBarMessage")[-1][0] == ABM_REMOVE
+    assert HWND not in appbar._appbars
+
+
+def test_register_logs_move_failure_instead_of_raising(fake):
+    fake.results["MoveWindow"] = OSError(5, "Access is denied")
+
+    data = appbar.register_appbar_for_window(HWND, 0, 0, 800, 30)
+    assert data.rc.bottom == 30
+
+    appbar.remove_appbar_for_window(HWND)